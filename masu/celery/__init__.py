@@ -19,9 +19,10 @@ import logging
 
 from celery import Celery
 from celery.schedules import crontab
-from celery.signals import after_setup_logger
+from celery.signals import after_setup_logger, worker_process_init
 
 from masu.config import Config
+from masu.database.schema_snapshot import load_snapshot
 from masu.util import setup_cloudwatch_logging
 
 
@@ -42,6 +43,13 @@ def setup_loggers(logger, *args, **kwargs):  # pylint: disable=unused-argument
     setup_cloudwatch_logging(logger)
 
 
+@worker_process_init.connect
+def load_schema_snapshot(*args, **kwargs):  # pylint: disable=unused-argument
+    """Read the schema snapshot once in each new worker process."""
+    if Config.SCHEMA_SNAPSHOT:
+        load_snapshot()
+
+
 def update_celery_config(celery, app):
     """Create Celery app object using the Flask app's settings."""
     celery.conf.update(app.config)
@@ -50,7 +50,10 @@ class Config:
 
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
-    SQLALCHEMY_POOL_SIZE = 10
+    SQLALCHEMY_POOL_SIZE = int(os.getenv('SQLALCHEMY_POOL_SIZE', '10'))
+
+    # Connections opened beyond the pool size before a checkout has to wait
+    SQLALCHEMY_MAX_OVERFLOW = int(os.getenv('SQLALCHEMY_MAX_OVERFLOW', '10'))
 
     # Koku Connectivity
     KOKU_HOST = os.getenv('KOKU_HOST_ADDRESS', 'localhost')
@@ -100,6 +103,77 @@ class Config:
 
     REPORT_PROCESSING_BATCH_SIZE = 100000
 
+    # Number of OCP batches streamed into the temp table before they are
+    # merged into the line item table and the file's checkpoint is saved
+    OCP_MERGE_BATCH_COUNT = int(os.getenv('OCP_MERGE_BATCH_COUNT', '10'))
+
+    # Number of processes a single AWS report file is processed with.
+    # The default of 1 processes the file serially in the worker.
+    REPORT_PROCESSING_WORKERS = int(os.getenv('REPORT_PROCESSING_WORKERS', '1'))
+
+    # Maximum number of ids kept in each report dimension cache, besides the
+    # ids of the bills and report periods it loaded from the database
+    REPORT_PROCESSING_CACHE_SIZE = int(os.getenv('REPORT_PROCESSING_CACHE_SIZE', '250000'))
+
+    # Number of seconds the report column map is kept before it is read again
+    COLUMN_MAP_TTL = int(os.getenv('COLUMN_MAP_TTL', '3600'))
+
+    # Number of seconds a reflected schema is reused before its applied
+    # migrations are checked again
+    SCHEMA_CACHE_TTL = int(os.getenv('SCHEMA_CACHE_TTL', '300'))
+
+    # Maximum number of parsed OCP label and timestamp strings kept per file
+    OCP_PARSE_CACHE_SIZE = int(os.getenv('OCP_PARSE_CACHE_SIZE', '10000'))
+
+    # Load re-published AWS reports as a delta of the line items already saved
+    # for their bills instead of deleting and reloading every line item.
+    AWS_DELTA_INGESTION = False if os.getenv(
+        'AWS_DELTA_INGESTION', 'False') == 'False' else True
+
+    # Load the line items of a manifest into staging tables and swap them in
+    # as the partitions of their bill or report period once the manifest is
+    # complete. Only used when the line item tables are partitioned.
+    LINE_ITEM_PARTITION_SWAP = False if os.getenv(
+        'LINE_ITEM_PARTITION_SWAP', 'False') == 'False' else True
+
+    # Process the usage and storage files of an OCP manifest at the same time
+    OCP_CONCURRENT_FILES = False if os.getenv(
+        'OCP_CONCURRENT_FILES', 'False') == 'False' else True
+
+    # Load reflected schemas from a snapshot file, rebuilt whenever the
+    # applied migrations change, instead of reflecting them in each process.
+    # The directory must be owned by the worker's user and not writable by
+    # anyone else, or the snapshot is not used.
+    SCHEMA_SNAPSHOT = False if os.getenv(
+        'SCHEMA_SNAPSHOT', 'False') == 'False' else True
+    SCHEMA_SNAPSHOT_DIR = os.getenv('SCHEMA_SNAPSHOT_DIR',
+                                    f'/var/tmp/masu-schema-{os.getuid()}')
+
+    # Number of days of OCP on AWS summary data computed by each statement,
+    # with up to OCP_AWS_SUMMARY_WORKERS statements running at once. The
+    # default of 0 computes the whole date range in a single statement.
+    OCP_AWS_SUMMARY_SHARD_DAYS = int(os.getenv('OCP_AWS_SUMMARY_SHARD_DAYS', '0'))
+    OCP_AWS_SUMMARY_WORKERS = int(os.getenv('OCP_AWS_SUMMARY_WORKERS', '4'))
+
+    # Record the usage dates touched by each processed report file and only
+    # rebuild the daily and summary tables for those dates.
+    INCREMENTAL_SUMMARY = False if os.getenv(
+        'INCREMENTAL_SUMMARY', 'False') == 'False' else True
+
+    # Create the indexes the summary SQL relies on in each tenant schema
+    # before its first summary in a process.
+    SUMMARY_INDEX_MIGRATIONS = False if os.getenv(
+        'SUMMARY_INDEX_MIGRATIONS', 'False') == 'False' else True
+    # Number of seconds before indexes that failed to build are tried again
+    SUMMARY_INDEX_RETRY_SECONDS = int(os.getenv('SUMMARY_INDEX_RETRY_SECONDS', '3600'))
+
+    # Record the node capacity of each OCP report interval while processing
+    # usage files, so the daily summary does not derive it from line items.
+    # Intervals with recorded capacity count only their recorded nodes, so
+    # report periods partly processed before it was enabled are processed again.
+    OCP_NODE_CAPACITY = False if os.getenv(
+        'OCP_NODE_CAPACITY', 'False') == 'False' else True
+
     AWS_DATETIME_STR_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
     OCP_DATETIME_STR_FORMAT = '%Y-%m-%d %H:%M:%S +0000 UTC'
 
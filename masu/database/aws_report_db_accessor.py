@@ -18,13 +18,17 @@
 
 # pylint: skip-file
 
+import datetime
 import logging
-import pkgutil
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from dateutil import parser
 
 from masu.config import Config
 from masu.database import AWS_CUR_TABLE_MAP
 from masu.database.report_db_accessor_base import ReportDBAccessorBase
+from masu.database.sql_templates import get_sql_template
 from masu.external.date_accessor import DateAccessor
 
 LOG = logging.getLogger(__name__)
@@ -47,12 +51,17 @@ class AWSReportDBAccessor(ReportDBAccessorBase):
         self._schema_name = schema
         self.date_accessor = DateAccessor()
 
-    def get_cost_entry_bills(self):
-        """Get all cost entry bill objects."""
+    def get_cost_entry_bills(self, provider_id=None, billing_period_start=None):
+        """Get all cost entry bill objects, optionally of one provider and period."""
         table_name = AWS_CUR_TABLE_MAP['bill']
 
         columns = ['id', 'bill_type', 'payer_account_id', 'billing_period_start', 'provider_id']
-        bills = self._get_db_obj_query(table_name, columns=columns).all()
+        query = self._get_db_obj_query(table_name, columns=columns)
+        if provider_id is not None:
+            query = query.filter_by(provider_id=provider_id)
+        if billing_period_start is not None:
+            query = query.filter_by(billing_period_start=billing_period_start)
+        bills = query.all()
 
         return {(bill.bill_type, bill.payer_account_id,
                  bill.billing_period_start, bill.provider_id): bill.id
@@ -150,10 +159,13 @@ class AWSReportDBAccessor(ReportDBAccessorBase):
         line_item_query = base_query.filter(cost_entry_bill_id == bill_id)
         return line_item_query
 
-    def get_cost_entries(self):
-        """Make a mapping of cost entries by start time."""
+    def get_cost_entries(self, bill_id=None):
+        """Make a mapping of cost entries by start time, optionally of one bill."""
         table_name = AWS_CUR_TABLE_MAP['cost_entry']
-        cost_entries = self._get_db_obj_query(table_name).all()
+        query = self._get_db_obj_query(table_name)
+        if bill_id is not None:
+            query = query.filter_by(bill_id=bill_id)
+        cost_entries = query.all()
 
         return {(ce.bill_id, ce.interval_start.strftime(self._datetime_format)): ce.id
                 for ce in cost_entries}
@@ -195,17 +207,18 @@ class AWSReportDBAccessor(ReportDBAccessorBase):
 
         """
         table_name = AWS_CUR_TABLE_MAP['line_item_daily']
-        daily_sql = pkgutil.get_data(
-            'masu.database',
-            'sql/reporting_awscostentrylineitem_daily.sql'
-        )
-        daily_sql = daily_sql.decode('utf-8').format(
-            uuid=str(uuid.uuid4()).replace('-', '_'),
-            start_date=start_date,
-            end_date=end_date,
-            cost_entry_bill_ids=','.join(bill_ids)
+        self._execute_sql_template(
+            table_name,
+            'reporting_awscostentrylineitem_daily',
+            start_date,
+            end_date,
+            identifiers={'uuid': str(uuid.uuid4()).replace('-', '_')},
+            bind_params={
+                'start_date': start_date,
+                'end_date': end_date,
+                'bill_ids': [int(bill_id) for bill_id in bill_ids]
+            }
         )
-        self._commit_and_vacuum(table_name, daily_sql, start_date, end_date)
 
     # pylint: disable=invalid-name
     def populate_line_item_daily_summary_table(self, start_date, end_date, bill_ids):
@@ -220,17 +233,90 @@ class AWSReportDBAccessor(ReportDBAccessorBase):
 
         """
         table_name = AWS_CUR_TABLE_MAP['line_item_daily_summary']
-        summary_sql = pkgutil.get_data(
-            'masu.database',
-            'sql/reporting_awscostentrylineitem_daily_summary.sql'
+        self._execute_sql_template(
+            table_name,
+            'reporting_awscostentrylineitem_daily_summary',
+            start_date,
+            end_date,
+            identifiers={'uuid': str(uuid.uuid4()).replace('-', '_')},
+            bind_params={
+                'start_date': start_date,
+                'end_date': end_date,
+                'bill_ids': [int(bill_id) for bill_id in bill_ids]
+            }
         )
-        summary_sql = summary_sql.decode('utf-8').format(
-            uuid=str(uuid.uuid4()).replace('-', '_'),
-            start_date=start_date,
-            end_date=end_date,
-            cost_entry_bill_ids=','.join(bill_ids)
+
+    def create_line_item_delta_table(self):
+        """Create the staging table line item deltas are loaded into.
+
+        The table outlives a connection since the files of a manifest are
+        each processed with their own accessor.
+
+        Returns:
+            (str): The name of the staging table
+
+        """
+        table_name = AWS_CUR_TABLE_MAP['line_item']
+        staging_table = f'{table_name}_delta'
+        self._cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {staging_table} '
+            f'AS SELECT * FROM {table_name} WITH NO DATA'
         )
-        self._commit_and_vacuum(table_name, summary_sql, start_date, end_date)
+        self._pg2_conn.commit()
+        return staging_table
+
+    def clear_line_item_delta(self, bill_ids, commit=True):
+        """Remove the staged line items of bills.
+
+        Args:
+            bill_ids (list): The bills to clear the staged line items of
+            commit (bool): Whether to commit the removal
+
+        Returns:
+            (None)
+
+        """
+        if not bill_ids:
+            return
+        staging_table = AWS_CUR_TABLE_MAP['line_item'] + '_delta'
+        self._cursor.execute(
+            f'DELETE FROM {staging_table} WHERE cost_entry_bill_id = ANY(%s)',
+            [list(bill_ids)]
+        )
+        if commit:
+            self._pg2_conn.commit()
+
+    def apply_line_item_delta(self, bill_ids):
+        """Replace the line items of bills with their staged line items.
+
+        Only rows that are new, changed or gone are written, which makes
+        most of a re-published report a no-op.
+
+        Args:
+            bill_ids (list): The bills of the manifest being applied
+
+        Returns:
+            (dict): The number of rows inserted, updated and removed
+
+        """
+        table_name = AWS_CUR_TABLE_MAP['line_item']
+        counts = {'inserted': 0, 'updated': 0, 'removed': 0}
+        if not bill_ids:
+            return counts
+
+        template = get_sql_template('reporting_awscostentrylineitem_delta')
+        bind_params = {'bill_ids': [int(bill_id) for bill_id in bill_ids]}
+        delta_sql = template.render({'staging_table': f'{table_name}_delta'}, bind_params)
+        LOG.info('Applying line item delta for bills %s.', bill_ids)
+        with template.timed('execute'):
+            self._cursor.execute(delta_sql, bind_params)
+            counts['inserted'], counts['updated'], counts['removed'] = self._cursor.fetchone()
+        self.clear_line_item_delta(bill_ids, commit=False)
+        self._pg2_conn.commit()
+
+        if counts['updated'] or counts['removed']:
+            self.vacuum_table(table_name)
+        return counts
 
     def mark_bill_as_finalized(self, bill_id):
         """Mark a bill in the database as finalized."""
@@ -244,20 +330,37 @@ class AWSReportDBAccessor(ReportDBAccessorBase):
             bill.finalized_datetime = self.date_accessor.today_with_timezone('UTC')
 
     # pylint: disable=invalid-name
-    def populate_tags_summary_table(self):
-        """Populate the line item aggregated totals data table."""
-        table_name = AWS_CUR_TABLE_MAP['tags_summary']
+    def populate_tags_summary_table(self, start_date=None, end_date=None):
+        """Populate the tag keys and values summary table.
+
+        With a start and end date, only the daily rows of those dates are
+        read and their values are merged into the saved ones. Without them
+        the summary is rebuilt from every daily row.
+
+        Args:
+            start_date (datetime.date) The date to start merging values from.
+            end_date (datetime.date) The date to end on.
 
-        agg_sql = pkgutil.get_data(
-            'masu.database',
-            f'sql/reporting_awstags_summary.sql'
+        Returns
+            (None)
+
+        """
+        table_name = AWS_CUR_TABLE_MAP['tags_summary']
+        self._execute_sql_template(
+            table_name,
+            'reporting_awstags_summary',
+            start_date,
+            end_date,
+            bind_params={'start_date': start_date, 'end_date': end_date}
         )
-        self._commit_and_vacuum(table_name, agg_sql)
 
     def populate_ocp_on_aws_cost_daily_summary(self, start_date, end_date,
                                                cluster_id=None, bill_ids=None):
         """Populate the daily cost aggregated summary for OCP on AWS.
 
+        With OCP_AWS_SUMMARY_SHARD_DAYS set, the date range is split into
+        shards of that many days that are computed concurrently.
+
         Args:
             start_date (datetime.date) The date to start populating the table.
             end_date (datetime.date) The date to end on.
@@ -266,24 +369,140 @@ class AWSReportDBAccessor(ReportDBAccessorBase):
             (None)
 
         """
-        aws_where_clause = ''
-        ocp_where_clause = ''
-        if bill_ids:
-            ids = ','.join(bill_ids)
-            aws_where_clause = f'AND cost_entry_bill_id IN ({ids})'
-        if cluster_id:
-            ocp_where_clause = f"AND cluster_id = '{cluster_id}'"
-
         table_name = AWS_CUR_TABLE_MAP['ocp_on_aws_daily_summary']
-        summary_sql = pkgutil.get_data(
-            'masu.database',
-            'sql/reporting_ocpawscostlineitem_daily_summary.sql'
+        bind_params = {
+            'start_date': start_date,
+            'end_date': end_date,
+            'bill_ids': [int(bill_id) for bill_id in bill_ids] if bill_ids else None,
+            'cluster_id': cluster_id if cluster_id else None
+        }
+        shards = self._get_date_shards(start_date, end_date,
+                                       Config.OCP_AWS_SUMMARY_SHARD_DAYS)
+        if len(shards) > 1:
+            self._populate_ocp_on_aws_shards(shards, bind_params)
+            return
+
+        self._execute_sql_template(
+            table_name,
+            'reporting_ocpawscostlineitem_daily_summary',
+            start_date,
+            end_date,
+            identifiers={
+                'uuid': str(uuid.uuid4()).replace('-', '_'),
+                'summary_table': table_name,
+                'project_summary_table': AWS_CUR_TABLE_MAP['ocp_on_aws_project_daily_summary']
+            },
+            bind_params=bind_params
         )
-        summary_sql = summary_sql.decode('utf-8').format(
-            uuid=str(uuid.uuid4()).replace('-', '_'),
-            start_date=start_date,
-            end_date=end_date,
-            aws_where_clause=aws_where_clause,
-            ocp_where_clause=ocp_where_clause
+
+    def _get_date_shards(self, start_date, end_date, shard_days):
+        """Split a date range into ranges of at most a number of days.
+
+        Args:
+            start_date (datetime.date, str) The first date of the range.
+            end_date (datetime.date, str) The last date of the range.
+            shard_days (int) The number of days in each shard, 0 for one shard.
+
+        Returns
+            ([]) (start date, end date) pairs covering the range.
+
+        """
+        if shard_days <= 0 or not start_date or not end_date:
+            return [(start_date, end_date)]
+
+        start = parser.parse(str(start_date)).date()
+        end = parser.parse(str(end_date)).date()
+        shards = []
+        while start <= end:
+            shard_end = min(start + datetime.timedelta(days=shard_days - 1), end)
+            shards.append((start, shard_end))
+            start = shard_end + datetime.timedelta(days=1)
+        return shards if shards else [(start_date, end_date)]
+
+    def _populate_ocp_on_aws_shards(self, shards, bind_params):
+        """Compute the OCP on AWS summaries a shard of dates at a time.
+
+        Each shard runs the summary SQL on its own pooled connection into
+        unlogged staging tables, with at most OCP_AWS_SUMMARY_WORKERS
+        shards at once. The staged rows then replace the summary rows of
+        the whole date range in a single transaction.
+
+        Args:
+            shards (list): The (start date, end date) of each shard
+            bind_params (dict): The summary SQL parameters for the whole range
+
+        Returns
+            (None)
+
+        """
+        table_name = AWS_CUR_TABLE_MAP['ocp_on_aws_daily_summary']
+        project_table_name = AWS_CUR_TABLE_MAP['ocp_on_aws_project_daily_summary']
+        suffix = str(uuid.uuid4()).replace('-', '_')
+        staging = {
+            'summary_table': f'{table_name}_{suffix}',
+            'project_summary_table': f'{project_table_name}_{suffix}'
+        }
+        for source, staging_table in ((table_name, staging['summary_table']),
+                                      (project_table_name, staging['project_summary_table'])):
+            self._cursor.execute(
+                f'CREATE UNLOGGED TABLE {staging_table} '
+                f'AS SELECT * FROM {source} WITH NO DATA'
+            )
+        self._pg2_conn.commit()
+
+        LOG.info('Computing %s in %d shards with up to %d connections.',
+                 table_name, len(shards), Config.OCP_AWS_SUMMARY_WORKERS)
+        try:
+            with ThreadPoolExecutor(max_workers=max(Config.OCP_AWS_SUMMARY_WORKERS, 1)) as executor:
+                futures = [
+                    executor.submit(self._populate_ocp_on_aws_shard,
+                                    shard_start, shard_end, bind_params, staging)
+                    for shard_start, shard_end in shards
+                ]
+                for future in futures:
+                    future.result()
+
+            self._execute_sql_template(
+                table_name,
+                'reporting_ocpawscostlineitem_daily_summary_merge',
+                bind_params['start_date'],
+                bind_params['end_date'],
+                identifiers=staging,
+                bind_params=bind_params
+            )
+        finally:
+            self._pg2_conn.rollback()
+            for staging_table in staging.values():
+                self._cursor.execute(f'DROP TABLE IF EXISTS {staging_table}')
+            self._pg2_conn.commit()
+
+    def _populate_ocp_on_aws_shard(self, start_date, end_date, bind_params, staging):
+        """Compute a shard of the OCP on AWS summaries into staging tables.
+
+        Args:
+            start_date (datetime.date) The first date of the shard.
+            end_date (datetime.date) The last date of the shard.
+            bind_params (dict): The summary SQL parameters for the whole range
+            staging (dict): The staging tables keyed on the SQL identifiers
+
+        Returns
+            (None)
+
+        """
+        template = get_sql_template('reporting_ocpawscostlineitem_daily_summary')
+        shard_params = dict(bind_params, start_date=start_date, end_date=end_date)
+        sql = template.render(
+            dict(staging, uuid=str(uuid.uuid4()).replace('-', '_')),
+            shard_params
         )
-        self._commit_and_vacuum(table_name, summary_sql, start_date, end_date)
+        conn = self._get_psycopg2_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f'SET search_path TO {self.schema}')
+                with template.timed('execute'):
+                    cursor.execute(sql, shard_params)
+            conn.commit()
+        finally:
+            self._release_psycopg2_connection(conn)
+        LOG.info('Computed the OCP on AWS summary shard from %s to %s.',
+                 start_date, end_date)
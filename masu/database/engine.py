@@ -19,6 +19,7 @@ from tempfile import NamedTemporaryFile
 
 import sqlalchemy
 
+import masu.prometheus_stats as worker_stats
 from masu.config import Config
 
 
@@ -33,7 +34,9 @@ def _create_engine_kwargs(db_ca_cert):
     """
     kwargs = {
         'client_encoding': 'utf8',
-        'pool_size': Config.SQLALCHEMY_POOL_SIZE
+        'pool_size': Config.SQLALCHEMY_POOL_SIZE,
+        'max_overflow': Config.SQLALCHEMY_MAX_OVERFLOW,
+        'pool_pre_ping': True
     }
     cert_path = None
     if db_ca_cert:
@@ -58,10 +61,32 @@ def create_engine():
         (sqlalchemy.sql.schema.MetaData): "SQLAlchemy engine metadata"
     """
     kwargs, _ = _create_engine_kwargs(Config.DB_CA_CERT)
-    return sqlalchemy.create_engine(
+    engine = sqlalchemy.create_engine(
         Config.SQLALCHEMY_DATABASE_URI,
         **kwargs
     )
+    _register_pool_metrics(engine)
+    return engine
+
+
+def _register_pool_metrics(engine):
+    """Track the saturation of an engine's connection pool.
+
+    Args:
+        engine (sqlalchemy.engine.base.Engine): The engine to track
+    Returns:
+        None
+    """
+    # pylint: disable=unused-argument
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        worker_stats.DB_POOL_CHECKED_OUT_GAUGE.inc()
+        worker_stats.DB_POOL_OVERFLOW_GAUGE.set(max(engine.pool.overflow(), 0))
+
+    def on_checkin(dbapi_connection, connection_record):
+        worker_stats.DB_POOL_CHECKED_OUT_GAUGE.dec()
+
+    sqlalchemy.event.listen(engine, 'checkout', on_checkout)
+    sqlalchemy.event.listen(engine, 'checkin', on_checkin)
 
 
 DB_ENGINE = create_engine()
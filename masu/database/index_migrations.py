@@ -0,0 +1,192 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Indexes masu adds to the tenant reporting tables for its summary SQL.
+
+The summary SQL templates filter the daily and summary tables on half-open
+usage_start ranges of a cluster. The tables are migrated by Koku, which
+only indexes usage_start on its own, so masu creates the composite indexes
+those filters rely on. Indexes are built concurrently, so that report
+processing is not blocked while they build, and are created once per
+schema in each process. A schema whose indexes fail to build is not tried
+again by the process until its retry time.
+"""
+import logging
+import threading
+import time
+from collections import namedtuple
+
+import psycopg2
+
+LOG = logging.getLogger(__name__)
+
+IndexMigration = namedtuple('IndexMigration', ['name', 'table', 'columns'])
+
+SUMMARY_INDEXES = (
+    IndexMigration('masu_ocp_usage_daily_cluster_start_idx',
+                   'reporting_ocpusagelineitem_daily',
+                   ('cluster_id', 'usage_start')),
+    IndexMigration('masu_ocp_storage_daily_cluster_start_idx',
+                   'reporting_ocpstoragelineitem_daily',
+                   ('cluster_id', 'usage_start')),
+    IndexMigration('masu_ocp_usage_summary_cluster_start_idx',
+                   'reporting_ocpusagelineitem_daily_summary',
+                   ('cluster_id', 'usage_start')),
+    IndexMigration('masu_ocp_storage_summary_cluster_start_idx',
+                   'reporting_ocpstoragelineitem_daily_summary',
+                   ('cluster_id', 'usage_start')),
+    IndexMigration('masu_ocp_costs_summary_cluster_start_idx',
+                   'reporting_ocpcosts_summary',
+                   ('cluster_id', 'usage_start')),
+    IndexMigration('masu_ocp_aws_project_summary_cluster_start_idx',
+                   'reporting_ocpawscostlineitem_project_daily_summary',
+                   ('cluster_id', 'usage_start')),
+)
+
+_MIGRATED_SCHEMAS = set()
+_RETRY_TIMES = {}
+_MIGRATED_LOCK = threading.Lock()
+
+
+def pending_indexes(cursor, schema, indexes=SUMMARY_INDEXES):
+    """Return the indexes a schema is missing.
+
+    An index left invalid by an interrupted concurrent build is returned
+    too. Indexes of tables the schema does not have are skipped.
+
+    Args:
+        cursor (psycopg2.extensions.cursor): A database cursor
+        schema (str): The schema name
+        indexes (tuple): The index migrations to check
+
+    Returns:
+        (list): The (IndexMigration, bool) of each pending index, with
+            True if an invalid index of that name exists
+
+    """
+    cursor.execute(
+        """
+        SELECT c.relname, i.indisvalid
+            FROM pg_index AS i
+            JOIN pg_class AS c
+                ON c.oid = i.indexrelid
+            JOIN pg_namespace AS n
+                ON n.oid = c.relnamespace
+            WHERE n.nspname = %s
+                AND c.relname = ANY(%s)
+        """,
+        [schema, [index.name for index in indexes]]
+    )
+    existing = dict(cursor.fetchall())
+    cursor.execute(
+        """
+        SELECT c.relname
+            FROM pg_class AS c
+            JOIN pg_namespace AS n
+                ON n.oid = c.relnamespace
+            WHERE n.nspname = %s
+                AND c.relname = ANY(%s)
+        """,
+        [schema, list({index.table for index in indexes})]
+    )
+    tables = {row[0] for row in cursor.fetchall()}
+    return [(index, index.name in existing)
+            for index in indexes
+            if index.table in tables and not existing.get(index.name, False)]
+
+
+def apply_index_migrations(conn, schema, indexes=SUMMARY_INDEXES):
+    """Create the indexes a schema is missing.
+
+    The connection must be in autocommit mode, since indexes cannot be
+    built concurrently inside a transaction. An index that fails to build
+    is logged and left for the next attempt.
+
+    Args:
+        conn (psycopg2.extensions.connection): An autocommit connection
+        schema (str): The schema name
+        indexes (tuple): The index migrations to apply
+
+    Returns:
+        (list): The names of the indexes created
+
+    """
+    created = []
+    with conn.cursor() as cursor:
+        for index, invalid in pending_indexes(cursor, schema, indexes):
+            columns = ', '.join(index.columns)
+            try:
+                if invalid:
+                    cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {schema}.{index.name}')
+                cursor.execute(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {index.name}'
+                    f' ON {schema}.{index.table} ({columns})'
+                )
+            except psycopg2.Error as err:
+                LOG.warning('Unable to create index %s on %s.%s: %s',
+                            index.name, schema, index.table, err)
+                continue
+            LOG.info('Created index %s on %s.%s.', index.name, schema, index.table)
+            created.append(index.name)
+    return created
+
+
+def is_migrated(schema):
+    """Return whether the indexes of a schema were applied in this process."""
+    with _MIGRATED_LOCK:
+        return schema in _MIGRATED_SCHEMAS
+
+
+def is_due(schema):
+    """Return whether the indexes of a schema should be applied now.
+
+    Args:
+        schema (str): The schema name
+
+    Returns:
+        (bool): False if they were applied or failed until a later retry time
+
+    """
+    with _MIGRATED_LOCK:
+        if schema in _MIGRATED_SCHEMAS:
+            return False
+        return time.monotonic() >= _RETRY_TIMES.get(schema, 0)
+
+
+def mark_migrated(schema):
+    """Record that the indexes of a schema were applied in this process."""
+    with _MIGRATED_LOCK:
+        _MIGRATED_SCHEMAS.add(schema)
+        _RETRY_TIMES.pop(schema, None)
+
+
+def mark_failed(schema, retry_seconds):
+    """Record that indexes of a schema failed to build, until a retry time.
+
+    Args:
+        schema (str): The schema name
+        retry_seconds (int): The number of seconds before they are tried again
+
+    """
+    with _MIGRATED_LOCK:
+        _RETRY_TIMES[schema] = time.monotonic() + retry_seconds
+
+
+def clear_migrated():
+    """Forget which schemas were migrated or failed in this process."""
+    with _MIGRATED_LOCK:
+        _MIGRATED_SCHEMAS.clear()
+        _RETRY_TIMES.clear()
@@ -17,15 +17,79 @@
 """Accessor for Customer information from koku database."""
 
 import logging
+import threading
+import time
 
 import sqlalchemy
 from sqlalchemy.ext.automap import automap_base
 from sqlalchemy.orm import scoped_session, sessionmaker
 
+import masu.prometheus_stats as worker_stats
+from masu.config import Config
+from masu.database import schema_snapshot
 from masu.database.engine import DB_ENGINE
 
 LOG = logging.getLogger(__name__)
 
+# Migration fingerprints, prepared automap bases and the time their
+# migrations are checked again by schema, shared by every accessor of the process
+_BASE_CACHE = {}
+_BASE_CACHE_LOCK = threading.Lock()
+_SCHEMA_LOCKS = {}
+
+
+def invalidate_base_cache(schema=None):
+    """Drop reflected schemas so the next accessor reflects them again.
+
+    Args:
+        schema (str): The schema to drop. Default: every schema
+
+    """
+    with _BASE_CACHE_LOCK:
+        if schema is None:
+            _BASE_CACHE.clear()
+        else:
+            _BASE_CACHE.pop(schema, None)
+
+
+def _get_unexpired_base(schema):
+    """Return the cached base of a schema if its migrations need no check yet.
+
+    Args:
+        schema (str): The schema name
+
+    Returns:
+        (sqlalchemy.ext.declarative.api.DeclarativeMeta): The cached base or None
+
+    """
+    entry = _BASE_CACHE.get(schema)
+    if entry is None or time.monotonic() >= entry[2]:
+        return None
+    return entry[1]
+
+
+def _get_cached_base(schema, fingerprint):
+    """Return the cached base of a schema, evicting it if migrations changed.
+
+    Args:
+        schema (str): The schema name
+        fingerprint (str): The schema's current migration fingerprint
+
+    Returns:
+        (sqlalchemy.ext.declarative.api.DeclarativeMeta): The cached base or None
+
+    """
+    entry = _BASE_CACHE.get(schema)
+    if entry is None:
+        return None
+    if entry[0] != fingerprint:
+        LOG.info('Migrations of schema %s changed since it was reflected.', schema)
+        invalidate_base_cache(schema)
+        return None
+    with _BASE_CACHE_LOCK:
+        _BASE_CACHE[schema] = (fingerprint, entry[1], time.monotonic() + Config.SCHEMA_CACHE_TTL)
+    return entry[1]
+
 
 class KokuDBAccess:
     """Base Class to connect to the koku database."""
@@ -40,11 +104,11 @@ class KokuDBAccess:
         """
         self.schema = schema
         self._db = DB_ENGINE
-        self._meta = self._create_metadata()
         self._session_factory = sessionmaker(bind=self._db)
         self._session_registry = scoped_session(self._session_factory)
         self._session = self._create_session()
         self._base = self._prepare_base()
+        self._meta = self._base.metadata
 
     def __enter__(self):
         """Context manager entry."""
@@ -82,13 +146,67 @@ class KokuDBAccess:
         """
         Prepare base classes.
 
+        The schema is reflected once per process and the prepared base is
+        reused by every accessor of the schema until the cache is
+        invalidated or the schema's applied migrations change. The
+        migrations are checked at most once every SCHEMA_CACHE_TTL seconds.
+
         Args:
             None
         Returns:
             (sqlalchemy.ext.declarative.api.DeclarativeMeta): "Declaritive metadata object",
         """
-        base = automap_base(metadata=self.get_meta())
+        base = _get_unexpired_base(self.schema)
+        if base is None:
+            fingerprint = schema_snapshot.migration_fingerprint(self._db, self.schema)
+            base = _get_cached_base(self.schema, fingerprint)
+        if base is not None:
+            worker_stats.SCHEMA_CACHE_COUNTER.labels(result='hit').inc()
+            return base
+
+        with _BASE_CACHE_LOCK:
+            schema_lock = _SCHEMA_LOCKS.setdefault(self.schema, threading.Lock())
+        # Accessors of other schemas are not held up while one is reflected
+        with schema_lock:
+            base = _get_cached_base(self.schema, fingerprint)
+            if base is not None:
+                worker_stats.SCHEMA_CACHE_COUNTER.labels(result='hit').inc()
+                return base
+
+            worker_stats.SCHEMA_CACHE_COUNTER.labels(result='miss').inc()
+            base = self._reflect_base(fingerprint)
+            with _BASE_CACHE_LOCK:
+                _BASE_CACHE[self.schema] = (fingerprint, base,
+                                            time.monotonic() + Config.SCHEMA_CACHE_TTL)
+        return base
+
+    def _reflect_base(self, fingerprint):
+        """
+        Reflect the schema into new base classes.
+
+        With schema snapshots enabled, the metadata is loaded from the
+        snapshot when it matches the schema's applied migrations, and a
+        fresh reflection replaces a snapshot that does not.
+
+        Args:
+            fingerprint (str): The schema's migration fingerprint or None
+        Returns:
+            (sqlalchemy.ext.declarative.api.DeclarativeMeta): "Declaritive metadata object",
+        """
+        use_snapshot = Config.SCHEMA_SNAPSHOT and fingerprint is not None
+        if use_snapshot:
+            metadata = schema_snapshot.load_metadata(self._db, self.schema, fingerprint)
+            if metadata is not None:
+                LOG.debug('Loaded schema %s from the schema snapshot.', self.schema)
+                base = automap_base(metadata=metadata)
+                base.prepare()
+                return base
+
+        LOG.debug('Reflecting schema %s.', self.schema)
+        base = automap_base(metadata=self._create_metadata())
         base.prepare(self.get_engine(), reflect=True)
+        if use_snapshot:
+            schema_snapshot.save_metadata(self.schema, fingerprint, base.metadata)
         return base
 
     def get_base(self):
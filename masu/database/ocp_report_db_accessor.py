@@ -16,13 +16,14 @@
 #
 """Database accessor for OCP report data."""
 
+import io
 import logging
-import pkgutil
 import uuid
 
 from masu.config import Config
-from masu.database import AWS_CUR_TABLE_MAP, OCP_REPORT_TABLE_MAP
+from masu.database import AWS_CUR_TABLE_MAP, OCP_REPORT_TABLE_MAP, table_migrations
 from masu.database.report_db_accessor_base import ReportDBAccessorBase
+from masu.database.table_migrations import NODE_CAPACITY_TABLE
 
 LOG = logging.getLogger(__name__)
 
@@ -44,13 +45,24 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
 
     # pylint: disable=too-many-arguments,arguments-differ
     def merge_temp_table(self, table_name, temp_table_name, columns,
-                         conflict_columns):
+                         conflict_columns, checkpoint=None, report_period_id=None,
+                         clear=True, unconfirmed_table_name=None):
         """INSERT temp table rows into the primary table specified.
 
+        The temp table is emptied with TRUNCATE in the same transaction as
+        the upsert, which leaves no dead rows to vacuum.
+
         Args:
             table_name (str): The main table to insert into
             temp_table_name (str): The temp table to pull from
             columns (list): A list of columns to use in the insert logic
+            checkpoint (tuple): An optional (report_name, manifest_id,
+                cursor_position) saved in the same transaction as the rows
+            report_period_id (int): Only merge the rows of this report period
+            clear (bool): Whether to empty the temp table once merged
+            unconfirmed_table_name (str): A temp table of rows that may repeat
+                the conflict columns of an earlier row of the file. They are
+                merged after the temp table, only where no row has them yet.
 
         Returns:
             (None)
@@ -61,21 +73,39 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
 
         set_clause = ','.join([f'{column} = excluded.{column}'
                                for column in columns])
+        where_clause = ''
+        if report_period_id is not None:
+            where_clause = f'WHERE report_period_id = {int(report_period_id)}'
         upsert_sql = f"""
             INSERT INTO {table_name} ({column_str})
                 SELECT {column_str}
                 FROM {temp_table_name}
+                {where_clause}
                 ON CONFLICT ({conflict_col_str}) DO UPDATE
                 SET {set_clause}
             """
         self._cursor.execute(upsert_sql)
+        if unconfirmed_table_name:
+            # Rows are only appended to the temp table, so ctid order is
+            # the order they were copied in and the first row is kept
+            self._cursor.execute(
+                f"""
+                INSERT INTO {table_name} ({column_str})
+                    SELECT {column_str}
+                    FROM {unconfirmed_table_name}
+                    {where_clause}
+                    ORDER BY ctid
+                    ON CONFLICT ({conflict_col_str}) DO NOTHING
+                """
+            )
+        if clear:
+            self._cursor.execute(f'TRUNCATE {temp_table_name}')
+            if unconfirmed_table_name:
+                self._cursor.execute(f'TRUNCATE {unconfirmed_table_name}')
+        if checkpoint:
+            self.save_checkpoint(*checkpoint)
         self._pg2_conn.commit()
 
-        delete_sql = f'DELETE FROM {temp_table_name}'
-        self._cursor.execute(delete_sql)
-        self._pg2_conn.commit()
-        self.vacuum_table(temp_table_name)
-
     def get_current_usage_report(self):
         """Get the most recent usage report object."""
         table_name = OCP_REPORT_TABLE_MAP['report']
@@ -235,21 +265,27 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
         usage_report_query = base_query.filter(report_period_id == period_id)
         return usage_report_query
 
-    def get_report_periods(self):
-        """Get all usage period objects."""
+    def get_report_periods(self, provider_id=None):
+        """Get all usage period objects, optionally of one provider."""
         table_name = OCP_REPORT_TABLE_MAP['report_period']
 
         columns = ['id', 'cluster_id', 'report_period_start', 'provider_id']
-        periods = self._get_db_obj_query(table_name, columns=columns).all()
+        query = self._get_db_obj_query(table_name, columns=columns)
+        if provider_id is not None:
+            query = query.filter_by(provider_id=provider_id)
+        periods = query.all()
 
         return {(p.cluster_id, p.report_period_start, p.provider_id): p.id
                 for p in periods}
 
-    def get_reports(self):
-        """Make a mapping of reports by time."""
+    def get_reports(self, report_period_id=None):
+        """Make a mapping of reports by time, optionally of one report period."""
         table_name = OCP_REPORT_TABLE_MAP['report']
 
-        reports = self._get_db_obj_query(table_name).all()
+        query = self._get_db_obj_query(table_name)
+        if report_period_id is not None:
+            query = query.filter_by(report_period_id=report_period_id)
+        reports = query.all()
 
         return {(entry.report_period_id,
                  entry.interval_start.strftime(self._datetime_format)): entry.id
@@ -303,6 +339,84 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
         reports = self._get_reports(table_name, cluster_id)
         return {entry.id: entry.volume_request_storage_gigabyte_months for entry in reports}
 
+    def save_node_capacity(self, capacity):
+        """Merge the node capacity of report intervals into the capacity table.
+
+        The rows are copied into a temp table and upserted in key order,
+        so that concurrent saves do not deadlock, keeping the highest
+        capacity seen for each node of an interval.
+
+        Args:
+            capacity (dict): The [cpu core seconds, memory byte seconds]
+                keyed on (report_id, node)
+
+        Returns:
+            (None)
+
+        """
+        if not capacity:
+            return
+        table_migrations.ensure_tables(self._db, self.schema)
+        temp_table = f'{NODE_CAPACITY_TABLE}_{uuid.uuid4().hex}'
+        columns = ('report_id', 'node', 'node_capacity_cpu_core_seconds',
+                   'node_capacity_memory_byte_seconds')
+        self._cursor.execute(
+            f"""
+            CREATE TEMPORARY TABLE {temp_table}
+                (LIKE {NODE_CAPACITY_TABLE} INCLUDING DEFAULTS)
+                ON COMMIT DROP
+            """
+        )
+        file_obj = io.StringIO()
+        for (report_id, node), (cpu, memory) in capacity.items():
+            file_obj.write(
+                f"{report_id}\t{node}\t{'' if cpu is None else cpu}"
+                f"\t{'' if memory is None else memory}\n"
+            )
+        file_obj.seek(0)
+        self._cursor.copy_from(file_obj, temp_table, columns=columns, null='')
+        self._cursor.execute(
+            f"""
+            INSERT INTO {NODE_CAPACITY_TABLE} AS nc ({', '.join(columns)})
+                SELECT {', '.join(columns)} FROM {temp_table}
+                    ORDER BY report_id, node
+                ON CONFLICT (report_id, node) DO UPDATE
+                    SET node_capacity_cpu_core_seconds = GREATEST(
+                            nc.node_capacity_cpu_core_seconds,
+                            EXCLUDED.node_capacity_cpu_core_seconds
+                        ),
+                        node_capacity_memory_byte_seconds = GREATEST(
+                            nc.node_capacity_memory_byte_seconds,
+                            EXCLUDED.node_capacity_memory_byte_seconds
+                        )
+            """
+        )
+        self._pg2_conn.commit()
+
+    def delete_node_capacity(self, report_period_id):
+        """Remove the node capacity recorded for the reports of a report period.
+
+        Args:
+            report_period_id (int): The report period id
+
+        Returns:
+            (int): The number of rows removed
+
+        """
+        table_migrations.ensure_tables(self._db, self.schema)
+        self._cursor.execute(
+            f"""
+            DELETE FROM {NODE_CAPACITY_TABLE} AS nc
+                USING {OCP_REPORT_TABLE_MAP['report']} AS ur
+                WHERE nc.report_id = ur.id
+                    AND ur.report_period_id = %s
+            """,
+            [report_period_id]
+        )
+        removed = self._cursor.rowcount
+        self._pg2_conn.commit()
+        return removed
+
     def populate_line_item_daily_table(self, start_date, end_date, cluster_id):
         """Populate the daily aggregate of line items table.
 
@@ -316,18 +430,21 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
 
         """
         table_name = OCP_REPORT_TABLE_MAP['line_item_daily']
-
-        daily_sql = pkgutil.get_data(
-            'masu.database',
-            'sql/reporting_ocpusagelineitem_daily.sql'
+        # The daily SQL reads the recorded node capacity, if any
+        table_migrations.ensure_tables(self._db, self.schema)
+
+        self._execute_sql_template(
+            table_name,
+            'reporting_ocpusagelineitem_daily',
+            start_date,
+            end_date,
+            identifiers={'uuid': str(uuid.uuid4()).replace('-', '_')},
+            bind_params={
+                'start_date': start_date,
+                'end_date': end_date,
+                'cluster_id': cluster_id
+            }
         )
-        daily_sql = daily_sql.decode('utf-8').format(
-            uuid=str(uuid.uuid4()).replace('-', '_'),
-            start_date=start_date,
-            end_date=end_date,
-            cluster_id=cluster_id
-        )
-        self._commit_and_vacuum(table_name, daily_sql, start_date, end_date)
 
     def populate_storage_line_item_daily_table(self, start_date, end_date, cluster_id):
         """Populate the daily storage aggregate of line items table.
@@ -343,17 +460,18 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
         """
         table_name = OCP_REPORT_TABLE_MAP['storage_line_item_daily']
 
-        daily_sql = pkgutil.get_data(
-            'masu.database',
-            'sql/reporting_ocpstoragelineitem_daily.sql'
-        )
-        daily_sql = daily_sql.decode('utf-8').format(
-            uuid=str(uuid.uuid4()).replace('-', '_'),
-            start_date=start_date,
-            end_date=end_date,
-            cluster_id=cluster_id
+        self._execute_sql_template(
+            table_name,
+            'reporting_ocpstoragelineitem_daily',
+            start_date,
+            end_date,
+            identifiers={'uuid': str(uuid.uuid4()).replace('-', '_')},
+            bind_params={
+                'start_date': start_date,
+                'end_date': end_date,
+                'cluster_id': cluster_id
+            }
         )
-        self._commit_and_vacuum(table_name, daily_sql, start_date, end_date)
 
     def populate_pod_charge(self, cpu_temp_table, mem_temp_table):
         """Populate the memory and cpu charge on daily summary table.
@@ -368,16 +486,11 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
         """
         table_name = OCP_REPORT_TABLE_MAP['line_item_daily_summary']
 
-        daily_charge_sql = pkgutil.get_data(
-            'masu.database',
-            'sql/reporting_ocpusagelineitem_daily_pod_charge.sql'
+        self._execute_sql_template(
+            table_name,
+            'reporting_ocpusagelineitem_daily_pod_charge',
+            identifiers={'cpu_temp': cpu_temp_table, 'mem_temp': mem_temp_table}
         )
-        charge_line_sql = daily_charge_sql.decode('utf-8').format(
-            cpu_temp=cpu_temp_table,
-            mem_temp=mem_temp_table
-        )
-
-        self._commit_and_vacuum(table_name, charge_line_sql)
 
     def populate_storage_charge(self, temp_table_name):
         """Populate the storage charge into the daily summary table.
@@ -391,14 +504,11 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
         """
         table_name = OCP_REPORT_TABLE_MAP['storage_line_item_daily_summary']
 
-        daily_charge_sql = pkgutil.get_data(
-            'masu.database',
-            'sql/reporting_ocp_storage_charge.sql'
+        self._execute_sql_template(
+            table_name,
+            'reporting_ocp_storage_charge',
+            identifiers={'temp_table': temp_table_name}
         )
-        charge_line_sql = daily_charge_sql.decode('utf-8').format(
-            temp_table=temp_table_name
-        )
-        self._commit_and_vacuum(table_name, charge_line_sql)
 
     def populate_line_item_daily_summary_table(self, start_date, end_date, cluster_id):
         """Populate the daily aggregate of line items table.
@@ -414,17 +524,18 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
         """
         table_name = OCP_REPORT_TABLE_MAP['line_item_daily_summary']
 
-        summary_sql = pkgutil.get_data(
-            'masu.database',
-            'sql/reporting_ocpusagelineitem_daily_summary.sql'
-        )
-        summary_sql = summary_sql.decode('utf-8').format(
-            uuid=str(uuid.uuid4()).replace('-', '_'),
-            start_date=start_date,
-            end_date=end_date,
-            cluster_id=cluster_id
+        self._execute_sql_template(
+            table_name,
+            'reporting_ocpusagelineitem_daily_summary',
+            start_date,
+            end_date,
+            identifiers={'uuid': str(uuid.uuid4()).replace('-', '_')},
+            bind_params={
+                'start_date': start_date,
+                'end_date': end_date,
+                'cluster_id': cluster_id
+            }
         )
-        self._commit_and_vacuum(table_name, summary_sql, start_date, end_date)
 
     def populate_storage_line_item_daily_summary_table(self, start_date, end_date, cluster_id):
         """Populate the daily aggregate of storage line items table.
@@ -439,17 +550,18 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
         """
         table_name = OCP_REPORT_TABLE_MAP['storage_line_item_daily_summary']
 
-        summary_sql = pkgutil.get_data(
-            'masu.database',
-            'sql/reporting_ocpstoragelineitem_daily_summary.sql'
+        self._execute_sql_template(
+            table_name,
+            'reporting_ocpstoragelineitem_daily_summary',
+            start_date,
+            end_date,
+            identifiers={'uuid': str(uuid.uuid4()).replace('-', '_')},
+            bind_params={
+                'start_date': start_date,
+                'end_date': end_date,
+                'cluster_id': cluster_id
+            }
         )
-        summary_sql = summary_sql.decode('utf-8').format(
-            uuid=str(uuid.uuid4()).replace('-', '_'),
-            start_date=start_date,
-            end_date=end_date,
-            cluster_id=cluster_id
-        )
-        self._commit_and_vacuum(table_name, summary_sql, start_date, end_date)
 
     def populate_cost_summary_table(self, cluster_id, start_date=None, end_date=None):
         """Populate the cost summary table.
@@ -478,18 +590,19 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
             end_date_qry = self._get_db_obj_query(table_name).order_by(usage_start.desc()).first()
             end_date = str(end_date_qry.usage_start) if end_date_qry else None
 
-        summary_sql = pkgutil.get_data(
-            'masu.database',
-            'sql/reporting_ocpcosts_summary.sql'
-        )
         if start_date and end_date:
-            summary_sql = summary_sql.decode('utf-8').format(
-                uuid=str(uuid.uuid4()).replace('-', '_'),
-                start_date=start_date,
-                end_date=end_date,
-                cluster_id=cluster_id
+            self._execute_sql_template(
+                table_name,
+                'reporting_ocpcosts_summary',
+                start_date,
+                end_date,
+                identifiers={'uuid': str(uuid.uuid4()).replace('-', '_')},
+                bind_params={
+                    'start_date': start_date,
+                    'end_date': end_date,
+                    'cluster_id': cluster_id
+                }
             )
-            self._commit_and_vacuum(table_name, summary_sql, start_date, end_date)
 
     def get_cost_summary_for_clusterid(self, cluster_identifier):
         """Get the cost summary for a cluster id query."""
@@ -503,37 +616,76 @@ class OCPReportDBAccessor(ReportDBAccessorBase):
         return cost_summary_query
 
     # pylint: disable=invalid-name
-    def populate_pod_label_summary_table(self):
-        """Populate the line item aggregated totals data table."""
-        table_name = OCP_REPORT_TABLE_MAP['pod_label_summary']
+    def populate_pod_label_summary_table(self, start_date=None, end_date=None):
+        """Populate the pod label keys and values summary table.
 
-        agg_sql = pkgutil.get_data(
-            'masu.database',
-            f'sql/reporting_ocpusagepodlabel_summary.sql'
-        )
+        With a start and end date, only the daily rows of those dates are
+        read and their values are merged into the saved ones. Without them
+        the summary is rebuilt from every daily row.
 
-        self._commit_and_vacuum(table_name, agg_sql)
+        Args:
+            start_date (datetime.date) The date to start merging values from.
+            end_date (datetime.date) The date to end on.
 
-    # pylint: disable=invalid-name
-    def populate_volume_claim_label_summary_table(self):
-        """Populate the OCP volume claim label summary table."""
-        table_name = OCP_REPORT_TABLE_MAP['volume_claim_label_summary']
+        Returns
+            (None)
 
-        agg_sql = pkgutil.get_data(
-            'masu.database',
-            f'sql/reporting_ocpstoragevolumeclaimlabel_summary.sql'
+        """
+        table_name = OCP_REPORT_TABLE_MAP['pod_label_summary']
+        self._execute_sql_template(
+            table_name,
+            'reporting_ocpusagepodlabel_summary',
+            start_date,
+            end_date,
+            bind_params={'start_date': start_date, 'end_date': end_date}
         )
 
-        self._commit_and_vacuum(table_name, agg_sql)
-
     # pylint: disable=invalid-name
-    def populate_volume_label_summary_table(self):
-        """Populate the OCP volume label summary table."""
-        table_name = OCP_REPORT_TABLE_MAP['volume_label_summary']
+    def populate_volume_claim_label_summary_table(self, start_date=None, end_date=None):
+        """Populate the OCP volume claim label summary table.
+
+        With a start and end date, only the daily rows of those dates are
+        read and their values are merged into the saved ones. Without them
+        the summary is rebuilt from every daily row.
+
+        Args:
+            start_date (datetime.date) The date to start merging values from.
+            end_date (datetime.date) The date to end on.
 
-        agg_sql = pkgutil.get_data(
-            'masu.database',
-            f'sql/reporting_ocpstoragevolumelabel_summary.sql'
+        Returns
+            (None)
+
+        """
+        table_name = OCP_REPORT_TABLE_MAP['volume_claim_label_summary']
+        self._execute_sql_template(
+            table_name,
+            'reporting_ocpstoragevolumeclaimlabel_summary',
+            start_date,
+            end_date,
+            bind_params={'start_date': start_date, 'end_date': end_date}
         )
 
-        self._commit_and_vacuum(table_name, agg_sql)
+    # pylint: disable=invalid-name
+    def populate_volume_label_summary_table(self, start_date=None, end_date=None):
+        """Populate the OCP volume label summary table.
+
+        With a start and end date, only the daily rows of those dates are
+        read and their values are merged into the saved ones. Without them
+        the summary is rebuilt from every daily row.
+
+        Args:
+            start_date (datetime.date) The date to start merging values from.
+            end_date (datetime.date) The date to end on.
+
+        Returns
+            (None)
+
+        """
+        table_name = OCP_REPORT_TABLE_MAP['volume_label_summary']
+        self._execute_sql_template(
+            table_name,
+            'reporting_ocpstoragevolumelabel_summary',
+            start_date,
+            end_date,
+            bind_params={'start_date': start_date, 'end_date': end_date}
+        )
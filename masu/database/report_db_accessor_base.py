@@ -17,18 +17,179 @@
 """Database accessor for report data."""
 
 import logging
+import queue
+import threading
+import time
 import uuid
 from decimal import Decimal, InvalidOperation
 
 import psycopg2
-from sqlalchemy.dialects.postgresql import insert
+from psycopg2.extras import Json, execute_values
+from sqlalchemy import String
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 
+import masu.prometheus_stats as worker_stats
 from masu.config import Config
+from masu.database import index_migrations, table_migrations
 from masu.database.koku_database_access import KokuDBAccess
+from masu.database.sql_templates import get_sql_template
+from masu.database.table_migrations import DIRTY_RANGE_TABLE
 
 LOG = logging.getLogger(__name__)
 
 
+class CopyStream:
+    """A file-like object streaming written rows to a COPY on another thread.
+
+    Writes are buffered into chunks and handed over through a queue. By
+    default the queue is bounded, so the writer blocks once the reader
+    falls a few chunks behind. An unbounded stream never blocks the
+    writer, which can go on to the next batch while the COPY drains.
+    """
+
+    chunk_size = 65536
+    max_chunks = 16
+    _cancelled = object()
+
+    def __init__(self, max_chunks=None):
+        """Initialize the stream.
+
+        Args:
+            max_chunks (int): The number of chunks queued before the writer
+                blocks, 0 for no limit. Default: CopyStream.max_chunks
+
+        """
+        if max_chunks is None:
+            max_chunks = self.max_chunks
+        self._queue = queue.Queue(maxsize=max_chunks)
+        self._buffer = []
+        self._buffered = 0
+        self._pending = ''
+        self._eof = False
+        self.error = None
+
+    def write(self, data):
+        """Buffer data, handing it to the reader in chunks."""
+        if self.error is not None:
+            raise self.error
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self.chunk_size:
+            self._put(''.join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+        return len(data)
+
+    def close(self):
+        """Flush buffered data and signal the end of the stream."""
+        if self._buffer:
+            self._put(''.join(self._buffer))
+            self._buffer = []
+            self._buffered = 0
+        self._put(None)
+
+    def cancel(self):
+        """Abandon the stream, failing the COPY reading from it."""
+        if self.error is None:
+            self._queue.put(self._cancelled)
+
+    def read(self, size=-1):
+        """Return up to size characters, blocking until they are written."""
+        while not self._eof and (size < 0 or len(self._pending) < size):
+            chunk = self._queue.get()
+            if chunk is self._cancelled:
+                self._eof = True
+                raise IOError('The COPY stream was cancelled by its writer.')
+            if chunk is None:
+                self._eof = True
+            else:
+                self._pending += chunk
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+    def abort(self, error):
+        """Record a reader failure and drain the stream so writers never block."""
+        self.error = error
+        self._eof = True
+        self._pending = ''
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        """Return the stream for writing."""
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        """End the stream, cancelling the COPY if the writer failed."""
+        if exception_type is None:
+            self.close()
+        else:
+            self.cancel()
+
+    def _put(self, chunk):
+        """Hand a chunk to the reader."""
+        if self.error is not None:
+            raise self.error
+        self._queue.put(chunk)
+
+
+def _clean_value(value):
+    """Return a value unchanged, with empty strings cleaned to None."""
+    if value is None or value == '':
+        return None
+    return value
+
+
+def _compile_decimal_converter(exponent):
+    """Compile a callable quantizing a raw value to a Decimal."""
+    def convert_decimal(value):
+        if value is None or value == '':
+            return None
+        try:
+            return Decimal(value).quantize(exponent)
+        except InvalidOperation:
+            return None
+    return convert_decimal
+
+
+def _compile_number_converter(column_type):
+    """Compile a callable converting a raw value to an int or float."""
+    def convert_number(value):
+        if value is None or value == '':
+            return None
+        try:
+            return column_type(value)
+        except ValueError as err:
+            LOG.warning(err)
+            return None
+    return convert_number
+
+
+def _compile_converter(column_type, exponent):
+    """Compile a callable converting a raw value to a column type.
+
+    Args:
+        column_type (type): A Python type
+        exponent (Decimal): The exponent Decimal values are quantized to
+
+    Returns:
+        (callable): Returns its value converted to type, or None if the
+            value is empty or the conversion fails
+
+    """
+    if column_type == Decimal:
+        return _compile_decimal_converter(exponent)
+    if column_type in (int, float):
+        return _compile_number_converter(column_type)
+    return _clean_value
+
+
 # pylint: disable=too-few-public-methods
 class ReportSchema:
     """A container for the reporting table objects."""
@@ -78,6 +239,10 @@ class ReportDBAccessorBase(KokuDBAccess):
         self._conn = self._db.connect()
         self._pg2_conn = self._get_psycopg2_connection()
         self._cursor = self._get_psycopg2_cursor()
+        self._copy_thread = None
+        self._copy_stream = None
+        self._decimal_exponent = Decimal(self.decimal_precision)
+        self._column_converters = {}
 
     def __exit__(self, exception_type, exception_value, traceback):
         """Context manager close connections."""
@@ -89,10 +254,47 @@ class ReportDBAccessorBase(KokuDBAccess):
         """Return database precision for decimal values."""
         return f'0E-{Config.REPORTING_DECIMAL_PRECISION}'
 
-    # pylint: disable=no-self-use
     def _get_psycopg2_connection(self):
-        """Get a low level database connection."""
-        return psycopg2.connect(Config.SQLALCHEMY_DATABASE_URI)
+        """Get a low level database connection from the engine's pool.
+
+        Returns:
+            (sqlalchemy.pool._ConnectionFairy): A pooled psycopg2 connection
+
+        """
+        start = time.time()
+        try:
+            conn = self._db.raw_connection()
+        except PoolTimeoutError:
+            worker_stats.DB_POOL_TIMEOUT_COUNTER.inc()
+            raise
+        worker_stats.DB_POOL_CHECKOUT_WAIT.observe(time.time() - start)
+        return conn
+
+    # pylint: disable=no-self-use
+    def _release_psycopg2_connection(self, conn):
+        """Return a low level connection to the pool.
+
+        Uncommitted work is rolled back, and the search_path and temporary
+        tables are reset before the connection is reused. A connection that
+        fails to reset is discarded instead.
+
+        Args:
+            conn (sqlalchemy.pool._ConnectionFairy): A pooled psycopg2 connection
+
+        """
+        if not conn.is_valid:
+            return
+        try:
+            conn.rollback()
+            with conn.cursor() as cursor:
+                cursor.execute('RESET search_path')
+                cursor.execute('DISCARD TEMP')
+            conn.commit()
+        except psycopg2.Error as err:
+            LOG.warning('Discarding a database connection that failed to reset: %s', err)
+            conn.invalidate()
+        else:
+            conn.close()
 
     def _get_psycopg2_cursor(self):
         """Get a cursor for the low level database connection."""
@@ -180,6 +382,111 @@ class ReportDBAccessorBase(KokuDBAccess):
 
         return is_finalized_data
 
+    def is_partitioned(self, table_name):
+        """Return whether a table of the schema is partitioned."""
+        self._cursor.execute(
+            """
+            SELECT c.relkind = 'p'
+                FROM pg_class AS c
+                JOIN pg_namespace AS n
+                    ON n.oid = c.relnamespace
+                WHERE n.nspname = %s
+                    AND c.relname = %s
+            """,
+            [self.schema, table_name]
+        )
+        result = self._cursor.fetchone()
+        return bool(result and result[0])
+
+    def create_partition_staging_table(self, table_name, value):
+        """Create the table the partition of a value is loaded into.
+
+        The staging table is shaped like the partitioned table and is
+        swapped in as the partition of the value by swap_partition.
+
+        Args:
+            table_name (str): The partitioned table
+            value (int): The partition key value the staging table is for
+
+        Returns:
+            (str): The name of the staging table
+
+        """
+        staging_table = f'{table_name}_{int(value)}_staging'
+        self._cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {staging_table} (LIKE {table_name} INCLUDING ALL)'
+        )
+        self._pg2_conn.commit()
+        return staging_table
+
+    def drop_partition_staging_table(self, table_name, value):
+        """Drop the staging table of a partition, discarding what it loaded."""
+        staging_table = f'{table_name}_{int(value)}_staging'
+        self._cursor.execute(f'DROP TABLE IF EXISTS {staging_table}')
+        self._pg2_conn.commit()
+
+    def swap_partition(self, table_name, column, value):
+        """Replace the partition of a value with its staging table.
+
+        The old partition is detached and dropped and the staging table is
+        attached in its place in one transaction. A check constraint on
+        the staging table lets the attach skip validating its rows.
+
+        Args:
+            table_name (str): The partitioned table
+            column (str): The partition key column
+            value (int): The partition key value to swap
+
+        Returns:
+            (bool): Whether a staging table was swapped in
+
+        """
+        value = int(value)
+        partition = f'{table_name}_{value}'
+        staging_table = f'{partition}_staging'
+        self._cursor.execute('SELECT to_regclass(%s), to_regclass(%s)',
+                             [staging_table, partition])
+        staging_exists, partition_exists = self._cursor.fetchone()
+        if not staging_exists:
+            return False
+
+        self._cursor.execute(
+            f'ALTER TABLE {staging_table} ADD CONSTRAINT {staging_table}_check '
+            f'CHECK ({column} IS NOT NULL AND {column} = {value})'
+        )
+        if partition_exists:
+            self._cursor.execute(f'ALTER TABLE {table_name} DETACH PARTITION {partition}')
+            self._cursor.execute(f'DROP TABLE {partition}')
+        self._cursor.execute(f'ALTER TABLE {staging_table} RENAME TO {partition}')
+        self._cursor.execute(
+            f'ALTER TABLE {table_name} ATTACH PARTITION {partition} FOR VALUES IN ({value})'
+        )
+        self._pg2_conn.commit()
+        LOG.info('Swapped in partition %s of %s.', partition, table_name)
+        return True
+
+    def drop_partition(self, table_name, value):
+        """Detach and drop the partition of a value.
+
+        Args:
+            table_name (str): The partitioned table
+            value (int): The partition key value to drop
+
+        Returns:
+            (bool): Whether a partition was dropped
+
+        """
+        partition = f'{table_name}_{int(value)}'
+        self._cursor.execute('SELECT to_regclass(%s)', [partition])
+        if not self._cursor.fetchone()[0]:
+            return False
+
+        self._cursor.execute(f'ALTER TABLE {table_name} DETACH PARTITION {partition}')
+        self._cursor.execute(f'DROP TABLE {partition}')
+        self._pg2_conn.commit()
+        LOG.info('Dropped partition %s of %s.', partition, table_name)
+        return True
+
     def vacuum_table(self, table_name):
         """Vacuum a table outside of a transaction."""
         isolation_level = self._pg2_conn.isolation_level
@@ -190,6 +497,11 @@ class ReportDBAccessorBase(KokuDBAccess):
         self._cursor.execute(vacuum)
         self._pg2_conn.set_isolation_level(isolation_level)
 
+    def analyze_table(self, table_name):
+        """Update the planner statistics of a table."""
+        self._cursor.execute(f'ANALYZE {table_name}')
+        self._pg2_conn.commit()
+
     # pylint: disable=too-many-arguments
     def bulk_insert_rows(self, file_obj, table, columns, sep='\t', null=''):
         r"""Insert many rows using Postgres copy functionality.
@@ -211,19 +523,238 @@ class ReportDBAccessorBase(KokuDBAccess):
         )
         self._pg2_conn.commit()
 
+    # pylint: disable=too-many-arguments
+    def stream_rows(self, table, columns, sep='\t', null='', checkpoint=None,
+                    max_chunks=None):
+        r"""Start a COPY on a background thread and return a stream to feed it.
+
+        Rows written to the returned stream are copied into the table as
+        they are written. Closing the stream ends the COPY, which then
+        completes in the background until wait_for_copy is called. The
+        low level connection must not be used in the meantime.
+
+        A bounded stream only lets the writer get a few chunks ahead of the
+        COPY. With max_chunks=0 a whole batch is queued as text, so the
+        writer can release its rows and parse the next batch while the
+        COPY drains the queue.
+
+        Args:
+            table (str): The table name in the databse to copy to
+            columns (list): A list of columns in the order of the rows
+            sep (str): The separator in the rows. Default: '\t'
+            null (str): How null is represented in the rows. Default: ''
+            checkpoint (tuple): An optional (report_name, manifest_id,
+                cursor_position) saved in the same transaction as the rows
+            max_chunks (int): The number of chunks queued before the writer
+                blocks, 0 for no limit. Default: CopyStream.max_chunks
+
+        Returns:
+            (CopyStream): The stream rows are written to
+
+        """
+        self.wait_for_copy()
+        stream = CopyStream(max_chunks)
+        self._copy_stream = stream
+        self._copy_thread = threading.Thread(
+            target=self._copy_from_stream,
+            args=(stream, table, columns, sep, null, checkpoint),
+            daemon=True
+        )
+        self._copy_thread.start()
+        return stream
+
+    # pylint: disable=too-many-arguments
+    def _copy_from_stream(self, stream, table, columns, sep, null, checkpoint):
+        """COPY a stream into a table, recording any failure on the stream."""
+        try:
+            self._cursor.copy_from(
+                stream,
+                table,
+                sep=sep,
+                columns=columns,
+                null=null
+            )
+            if checkpoint:
+                self.save_checkpoint(*checkpoint)
+            self._pg2_conn.commit()
+        except Exception as error:  # pylint: disable=broad-except
+            LOG.error('COPY into %s failed: %s', table, str(error))
+            self._pg2_conn.rollback()
+            stream.abort(error)
+
+    def save_checkpoint(self, report_name, manifest_id, cursor_position):
+        """Record how many rows of a report file are saved.
+
+        The checkpoint is written in the current transaction of the low
+        level connection, so it is committed together with the rows it
+        accounts for.
+
+        Args:
+            report_name (str): The name of the report file
+            manifest_id (int): The manifest the report file belongs to
+            cursor_position (int): The number of rows of the file saved
+
+        Returns:
+            (None)
+
+        """
+        checkpoint_sql = """
+            UPDATE public.reporting_common_costusagereportstatus
+                SET cursor_position = %s,
+                    manifest_id = %s
+                WHERE report_name = %s
+        """
+        self._cursor.execute(checkpoint_sql, [cursor_position, manifest_id, report_name])
+
+    def clear_checkpoint(self, report_name, manifest_id):
+        """Reset the checkpoint of a report file once it is fully processed.
+
+        Args:
+            report_name (str): The name of the report file
+            manifest_id (int): The manifest the report file belongs to
+
+        Returns:
+            (None)
+
+        """
+        self.wait_for_copy()
+        self.save_checkpoint(report_name, manifest_id, 0)
+        self._pg2_conn.commit()
+
+    def save_dirty_ranges(self, period_table, ranges):
+        """Record usage dates whose daily and summary rows need rebuilding.
+
+        Args:
+            period_table (str): The bill or report period table the ranges
+                belong to
+            ranges (dict): The first and last usage date keyed on the bill
+                or report period id
+
+        Returns:
+            (None)
+
+        """
+        if not ranges:
+            return
+        table_migrations.ensure_tables(self._db, self.schema)
+        execute_values(
+            self._cursor,
+            f"""
+            INSERT INTO {DIRTY_RANGE_TABLE} (period_table, period_id, start_date, end_date)
+                VALUES %s
+            """,
+            [(period_table, period_id, start, end)
+             for period_id, (start, end) in ranges.items()]
+        )
+        self._pg2_conn.commit()
+
+    def get_dirty_ranges(self, period_table, period_ids):
+        """Return the recorded usage date ranges of bills or report periods.
+
+        Args:
+            period_table (str): The bill or report period table
+            period_ids (list): The bill or report period ids
+
+        Returns:
+            (int, list): The id of the last range read, or None if none
+                are recorded, and the (start_date, end_date) of each range
+
+        """
+        table_migrations.ensure_tables(self._db, self.schema)
+        self._cursor.execute(
+            f"""
+            SELECT id, start_date, end_date
+                FROM {DIRTY_RANGE_TABLE}
+                WHERE period_table = %s
+                    AND period_id = ANY(%s)
+            """,
+            [period_table, [int(period_id) for period_id in period_ids]]
+        )
+        rows = self._cursor.fetchall()
+        self._pg2_conn.commit()
+        if not rows:
+            return None, []
+        return max(row[0] for row in rows), [(row[1], row[2]) for row in rows]
+
+    def clear_dirty_ranges(self, period_table, period_ids, last_id):
+        """Remove the recorded ranges of bills or report periods once summarized.
+
+        Ranges recorded after the ones read, while summarizing, are kept.
+
+        Args:
+            period_table (str): The bill or report period table
+            period_ids (list): The bill or report period ids
+            last_id (int): The id of the last range read
+
+        Returns:
+            (None)
+
+        """
+        table_migrations.ensure_tables(self._db, self.schema)
+        self._cursor.execute(
+            f"""
+            DELETE FROM {DIRTY_RANGE_TABLE}
+                WHERE period_table = %s
+                    AND period_id = ANY(%s)
+                    AND id <= %s
+            """,
+            [period_table, [int(period_id) for period_id in period_ids], last_id]
+        )
+        self._pg2_conn.commit()
+
+    def ensure_summary_indexes(self):
+        """Create the indexes the summary SQL relies on if they are missing.
+
+        The indexes are built on a separate autocommit connection, once per
+        schema in each process. Indexes that fail to build are tried again
+        by the first summary after SUMMARY_INDEX_RETRY_SECONDS.
+        """
+        if not Config.SUMMARY_INDEX_MIGRATIONS or not index_migrations.is_due(self.schema):
+            return
+        conn = self._get_psycopg2_connection()
+        try:
+            # The pool's pre-ping leaves a transaction open
+            conn.rollback()
+            conn.connection.autocommit = True
+            index_migrations.apply_index_migrations(conn, self.schema)
+            with conn.cursor() as cursor:
+                pending = index_migrations.pending_indexes(cursor, self.schema)
+        finally:
+            conn.connection.autocommit = False
+            self._release_psycopg2_connection(conn)
+        if pending:
+            LOG.warning('%d summary indexes of %s are not built, trying again in %d seconds.',
+                        len(pending), self.schema, Config.SUMMARY_INDEX_RETRY_SECONDS)
+            index_migrations.mark_failed(self.schema, Config.SUMMARY_INDEX_RETRY_SECONDS)
+        else:
+            index_migrations.mark_migrated(self.schema)
+
+    def wait_for_copy(self):
+        """Wait for a streamed COPY to complete and raise any error it hit."""
+        if self._copy_thread is None:
+            return
+        self._copy_thread.join()
+        stream = self._copy_stream
+        self._copy_thread = None
+        self._copy_stream = None
+        if stream.error is not None:
+            raise stream.error
+
     def close_connections(self, conn=None):
         """Close the low level database connection.
 
         Args:
-            conn (psycopg2.extensions.connection) An optional connection.
+            conn (sqlalchemy.pool._ConnectionFairy) An optional connection.
                 If none is supplied the class's connections are used.
 
         """
         if conn:
-            conn.close()
+            self._release_psycopg2_connection(conn)
         else:
+            if self._copy_thread is not None:
+                self._copy_thread.join()
             self._cursor.close()
-            self._pg2_conn.close()
+            self._release_psycopg2_connection(self._pg2_conn)
             self._conn.close()
 
     # pylint: disable=arguments-differ
@@ -283,14 +814,9 @@ class ReportDBAccessorBase(KokuDBAccess):
 
         """
         data = self.clean_data(data, table_name)
-        table = getattr(self.report_schema, table_name)
-        statement = insert(table).values(**data)
-
-        result = self._conn.execute(
-            statement.on_conflict_do_nothing(index_elements=conflict_columns)
-        )
-        if result.inserted_primary_key:
-            return result.inserted_primary_key[0]
+        row_id = self._execute_prepared_upsert(table_name, data, conflict_columns)
+        if row_id is not None:
+            return row_id
 
         if conflict_columns:
             data = {key: value for key, value in data.items()
@@ -319,25 +845,207 @@ class ReportDBAccessorBase(KokuDBAccess):
 
         """
         data = self.clean_data(data, table_name)
-        set_data = {key: value for key, value in data.items()
-                    if key in set_columns}
-        table = getattr(self.report_schema, table_name)
-        statement = insert(table).values(**data)
-
-        result = self._conn.execute(
-            statement.on_conflict_do_update(
-                index_elements=conflict_columns,
-                set_=set_data
-            )
-        )
-        if result.inserted_primary_key:
-            return result.inserted_primary_key[0]
+        row_id = self._execute_prepared_upsert(table_name, data, conflict_columns,
+                                               set_columns=set_columns)
+        if row_id is not None:
+            return row_id
 
         data = {key: value for key, value in data.items()
                 if key in conflict_columns}
 
         return self._get_primary_key(table_name, data)
 
+    def _prepare_statement(self, key, statement_sql):
+        """Return the name of a statement PREPAREd on the low level connection.
+
+        Statements are kept in the info of the pooled connection, so they
+        are prepared once per database connection and reused by every
+        accessor that checks the connection out.
+
+        Args:
+            key (tuple): A key identifying the statement
+            statement_sql (str): The SQL of the statement
+
+        Returns:
+            (str): The name of the prepared statement
+
+        """
+        statements = self._pg2_conn.info.setdefault('prepared_statements', {})
+        name = statements.get(key)
+        if name is None:
+            name = f'masu_statement_{len(statements)}'
+            self._cursor.execute(f'PREPARE {name} AS {statement_sql}')
+            statements[key] = name
+        return name
+
+    def _execute_prepared_upsert(self, table_name, data, conflict_columns, set_columns=None):
+        """Insert a single row with a prepared INSERT ... ON CONFLICT statement.
+
+        Args:
+            table_name (str): The name of the table to insert into
+            data (dict): The cleaned data of the row
+            conflict_columns (list): Columns to check conflict on
+            set_columns (list): Columns to update on conflict. Default: none,
+                the conflicting row is left as it is
+
+        Returns:
+            (int): The id of the inserted or updated row, None if a
+                conflicting row was left as it is
+
+        """
+        columns = tuple(data)
+        conflict_columns = tuple(conflict_columns) if conflict_columns else ()
+        if set_columns is not None:
+            set_columns = tuple(column for column in columns if column in set_columns)
+        key = (self.schema, table_name, columns, conflict_columns, set_columns)
+
+        conflict_target = f'({",".join(conflict_columns)})' if conflict_columns else ''
+        if set_columns:
+            set_clause = ','.join(f'{column} = EXCLUDED.{column}' for column in set_columns)
+            conflict_action = f'DO UPDATE SET {set_clause}'
+        else:
+            conflict_action = 'DO NOTHING'
+        placeholders = ','.join(f'${i}' for i in range(1, len(columns) + 1))
+        statement_sql = f"""
+            INSERT INTO {self.schema}.{table_name} ({",".join(columns)})
+                VALUES ({placeholders})
+                ON CONFLICT {conflict_target} {conflict_action}
+                RETURNING id
+        """
+        values = [Json(value) if isinstance(value, (dict, list)) else value
+                  for value in data.values()]
+
+        self.wait_for_copy()
+        try:
+            name = self._prepare_statement(key, statement_sql)
+            self._cursor.execute(
+                f'EXECUTE {name} ({",".join(["%s"] * len(values))})', values
+            )
+            result = self._cursor.fetchone()
+        except psycopg2.Error:
+            self._pg2_conn.rollback()
+            raise
+        self._pg2_conn.commit()
+
+        return result[0] if result else None
+
+    def insert_on_conflict_do_nothing_many(self,
+                                           table_name,
+                                           rows,
+                                           conflict_columns=None):
+        """Insert many rows with an ON CONFLICT clause and return their ids.
+
+        The batch counterpart of insert_on_conflict_do_nothing. New rows
+        are resolved with one multi-row INSERT ... RETURNING and rows that
+        already existed with one keyed SELECT.
+
+        Args:
+            table_name (str): The name of the table to insert into
+            rows (list): A list of dictionaries of data to insert
+            conflict_columns (list): A list of columns to check conflict on
+
+        Returns:
+            (list): The ids of the rows, in the order they were given
+
+        """
+        if not rows:
+            return []
+
+        rows = [self.clean_data(dict(row), table_name) for row in rows]
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        match_columns = conflict_columns if conflict_columns else columns
+        conflict_target = f'({",".join(conflict_columns)})' if conflict_columns else ''
+        column_str = ','.join(columns)
+        match_str = ','.join(match_columns)
+        join_clause = ' AND '.join(
+            f'(input_rows.{column} IS NULL) = (inserted.{column} IS NULL) AND '
+            f"coalesce(input_rows.{column}::text, '') = coalesce(inserted.{column}::text, '')"
+            for column in match_columns
+        )
+        insert_sql = f"""
+            WITH input_rows (input_order, {column_str}) AS (VALUES %s),
+            inserted AS (
+                INSERT INTO {table_name} ({column_str})
+                    SELECT {column_str}
+                    FROM input_rows
+                    ON CONFLICT {conflict_target} DO NOTHING
+                    RETURNING id, {match_str}
+            )
+            SELECT DISTINCT ON (input_rows.input_order) input_rows.input_order, inserted.id
+            FROM input_rows
+            JOIN inserted ON {join_clause}
+            ORDER BY input_rows.input_order, inserted.id
+        """
+        values = [[i] + [row.get(column) for column in columns]
+                  for i, row in enumerate(rows)]
+        results = execute_values(
+            self._cursor,
+            insert_sql,
+            values,
+            template=self._get_values_template(table_name, columns),
+            page_size=len(values),
+            fetch=True
+        )
+        ids = dict(results)
+
+        missing = [i for i in range(len(rows)) if i not in ids]
+        if missing:
+            operator = '=' if conflict_columns else 'IS NOT DISTINCT FROM'
+            lookup_clause = ' AND '.join(
+                f'existing.{column} {operator} input_rows.{column}'
+                for column in match_columns
+            )
+            lookup_sql = f"""
+                WITH input_rows (input_order, {match_str}) AS (VALUES %s)
+                SELECT DISTINCT ON (input_rows.input_order) input_rows.input_order, existing.id
+                FROM input_rows
+                JOIN {table_name} AS existing ON {lookup_clause}
+                ORDER BY input_rows.input_order, existing.id
+            """
+            values = [[i] + [rows[i].get(column) for column in match_columns]
+                      for i in missing]
+            results = execute_values(
+                self._cursor,
+                lookup_sql,
+                values,
+                template=self._get_values_template(table_name, match_columns),
+                page_size=len(values),
+                fetch=True
+            )
+            ids.update(dict(results))
+        self._pg2_conn.commit()
+
+        for i in range(len(rows)):
+            if i not in ids:
+                LOG.error('Row in %s does not exist in database.', table_name)
+                LOG.error('Failed row data: %s', rows[i])
+                raise LookupError(f'Unable to resolve row id in {table_name}.')
+
+        return [ids[i] for i in range(len(rows))]
+
+    def _get_values_template(self, table_name, columns):
+        """Return a VALUES row template casting each column to its type.
+
+        Args:
+            table_name (str): The name of the table the values are for
+            columns (list): The columns in the order of the values
+
+        Returns:
+            (str): A template usable with psycopg2's execute_values
+
+        """
+        table = getattr(self.report_schema, table_name).__table__
+        placeholders = ['%s']
+        for column in columns:
+            column_type = table.columns[column].type
+            if isinstance(column_type, String):
+                # Assignment casts keep the length checks of the column
+                placeholders.append('%s')
+            else:
+                sql_type = column_type.compile(dialect=postgresql.dialect())
+                placeholders.append(f'%s::{sql_type}')
+        return f'({", ".join(placeholders)})'
+
     def _get_primary_key(self, table_name, data):
         """Return the row id for a specific object."""
         query = self._get_db_obj_query(table_name)
@@ -361,6 +1069,29 @@ class ReportDBAccessorBase(KokuDBAccess):
         self._session.add(table)
         self._session.flush()
 
+    def get_column_converters(self, table_name):
+        """Return the compiled value converters of a table.
+
+        Converters are compiled once per table from the column types of
+        the report schema and reused for every row cleaned afterwards.
+
+        Args:
+            table_name (str): The table name the converters are for
+
+        Returns:
+            (dict): A mapping of column name to converter
+
+        """
+        converters = self._column_converters.get(table_name)
+        if converters is None:
+            column_types = self.report_schema.column_types[table_name]
+            converters = {
+                column: _compile_converter(column_type, self._decimal_exponent)
+                for column, column_type in column_types.items()
+            }
+            self._column_converters[table_name] = converters
+        return converters
+
     def clean_data(self, data, table_name):
         """Clean data for insertion into database.
 
@@ -372,46 +1103,37 @@ class ReportDBAccessorBase(KokuDBAccess):
             (dict): The data with values converted to required types
 
         """
-        column_types = self.report_schema.column_types[table_name]
+        converters = self.get_column_converters(table_name)
 
         for key, value in data.items():
-            if value is None or value == '':
-                data[key] = None
-                continue
-            if column_types.get(key) == int:
-                data[key] = self._convert_value(value, int)
-            elif column_types.get(key) == float:
-                data[key] = self._convert_value(value, float)
-            elif column_types.get(key) == Decimal:
-                data[key] = self._convert_value(value, Decimal)
+            data[key] = converters.get(key, _clean_value)(value)
 
         return data
 
-    def _convert_value(self, value, column_type):
-        """Convert a single value to the specified column type.
+    def clean_rows(self, rows, table_name, columns):
+        """Clean a batch of rows for insertion into database.
+
+        The batch counterpart of clean_data for rows given as sequences
+        of values ordered like columns.
 
         Args:
-            value (var): A value of any type
-            column_type (type) A Python type
+            rows (list): A list of tuples of values to be cleaned
+            table_name (str): The table name the data is associated with
+            columns (list): The column names of the values in each row
 
         Returns:
-            (var): The variable converted to type or None if conversion fails.
+            (list): A list of tuples of values converted to required types
 
         """
-        if column_type == Decimal:
-            try:
-                value = Decimal(value).quantize(Decimal(self.decimal_precision))
-            except InvalidOperation:
-                value = None
-        else:
-            try:
-                value = column_type(value)
-            except ValueError as err:
-                LOG.warning(err)
-                value = None
-        return value
+        column_converters = self.get_column_converters(table_name)
+        converters = [column_converters.get(column, _clean_value) for column in columns]
+        return [
+            tuple([convert(value) for convert, value in zip(converters, row)])
+            for row in rows
+        ]
 
-    def _commit_and_vacuum(self, table, sql, start=None, end=None):
+    # pylint: disable=too-many-arguments
+    def _commit_and_vacuum(self, table, sql, start=None, end=None, bind_params=None):
         """Commit query to a table and vacuum."""
         if start and end:
             LOG.info('Updating %s from %s to %s.',
@@ -419,7 +1141,30 @@ class ReportDBAccessorBase(KokuDBAccess):
         else:
             LOG.info('Updating %s', table)
 
-        self._cursor.execute(sql)
+        self._cursor.execute(sql, bind_params)
         self._pg2_conn.commit()
         self.vacuum_table(table)
         LOG.info('Finished updating %s.', table)
+
+    # pylint: disable=too-many-arguments
+    def _execute_sql_template(self, table, template_name, start=None, end=None,
+                              identifiers=None, bind_params=None):
+        """Run a SQL template that updates a table, commit and vacuum it.
+
+        Args:
+            table (str): The table the template updates
+            template_name (str): The name of the SQL template
+            start (datetime.date): The start of the updated range, for logging
+            end (datetime.date): The end of the updated range, for logging
+            identifiers (dict): The identifiers substituted in the SQL
+            bind_params (dict): The values bound when executing the SQL
+
+        Returns:
+            (None)
+
+        """
+        self.ensure_summary_indexes()
+        template = get_sql_template(template_name)
+        sql = template.render(identifiers, bind_params)
+        with template.timed('execute'):
+            self._commit_and_vacuum(table, sql, start, end, bind_params or None)
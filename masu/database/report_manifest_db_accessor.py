@@ -47,6 +47,30 @@ class ReportManifestDBAccessor(KokuDBAccess):
         manifest.manifest_updated_datetime = \
             self.date_accessor.today_with_timezone('UTC')
 
+    def increment_num_processed_files(self, manifest_id):
+        """Count a processed file of a manifest.
+
+        The count is incremented in the database rather than from a loaded
+        manifest, so files of a manifest completing at the same time are
+        all counted.
+
+        Args:
+            manifest_id (int): The id of the manifest
+
+        Returns:
+            (bool): Whether the manifest exists
+
+        """
+        updated = self._get_db_obj_query(id=manifest_id).update(
+            {
+                self._table.num_processed_files: self._table.num_processed_files + 1,
+                self._table.manifest_updated_datetime:
+                    self.date_accessor.today_with_timezone('UTC')
+            },
+            synchronize_session=False
+        )
+        return bool(updated)
+
     def add(self, use_savepoint=True, **kwargs):
         """
         Add a new row to the CUR stats database.
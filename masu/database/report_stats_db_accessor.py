@@ -16,7 +16,11 @@
 #
 """Downloader for cost usage reports."""
 
+import sqlalchemy
+
+from masu.database import table_migrations
 from masu.database.koku_database_access import KokuDBAccess
+from masu.database.table_migrations import REPORT_FINALIZATION_TABLE
 from masu.external.date_accessor import DateAccessor
 
 
@@ -57,6 +61,17 @@ class ReportStatsDBAccessor(KokuDBAccess):
         """
         return super()._get_db_obj_query(report_name=self._report_name)
 
+    def get_manifest_id(self):
+        """
+        Return the manifest the CUR file was last processed for.
+
+        Args:
+            None
+        Returns:
+            (Integer): The manifest id of the report file.
+        """
+        return self._obj.manifest_id
+
     def get_cursor_position(self):
         """
         Return current cursor position for processing CUR.
@@ -80,6 +95,48 @@ class ReportStatsDBAccessor(KokuDBAccess):
         """
         self._obj.cursor_position = new_position
 
+    def get_is_finalized(self):
+        """
+        Return whether the CUR file contained finalized bill data.
+
+        Args:
+            None
+        Returns:
+            (Boolean): Whether the bill data in the file is finalized,
+                None if the file was not processed yet.
+        """
+        table_migrations.ensure_tables(self._db, 'public')
+        return self._session.execute(
+            sqlalchemy.text(
+                f"""SELECT is_finalized FROM public.{REPORT_FINALIZATION_TABLE}
+                    WHERE report_name = :report_name"""
+            ),
+            {'report_name': self._report_name}
+        ).scalar()
+
+    def set_is_finalized(self, is_finalized):
+        """
+        Save whether the CUR file contained finalized bill data.
+
+        The value is saved with the next commit of the accessor.
+
+        Args:
+            is_finalized (Boolean): Whether the bill data in the file is finalized.
+        Returns:
+            None
+
+        """
+        table_migrations.ensure_tables(self._db, 'public')
+        self._session.execute(
+            sqlalchemy.text(
+                f"""INSERT INTO public.{REPORT_FINALIZATION_TABLE} (report_name, is_finalized)
+                    VALUES (:report_name, :is_finalized)
+                    ON CONFLICT (report_name) DO UPDATE
+                        SET is_finalized = EXCLUDED.is_finalized"""
+            ),
+            {'report_name': self._report_name, 'is_finalized': bool(is_finalized)}
+        )
+
     def get_last_completed_datetime(self):
         """
         Getter for last_completed_datetime.
@@ -16,10 +16,94 @@
 #
 """Downloader for cost usage reports."""
 
+import threading
+import time
 from collections import defaultdict
 
+from masu.config import Config
 from masu.database.koku_database_access import KokuDBAccess
 
+# The column map shared by the accessors and processors of the process
+_COLUMN_MAP = None
+_COLUMN_MAP_EXPIRES = 0
+_COLUMN_MAP_LOCK = threading.RLock()
+
+
+class ColumnMap(dict):
+    """A mapping of report columns to database columns by table.
+
+    Tables without mapped columns map to an empty dict. The map is shared,
+    so neither it nor its table mappings are modified once built.
+    """
+
+    def __init__(self, column_map):
+        """Compile the per-table views of a column map.
+
+        Args:
+            column_map (dict): Report to database column mappings by table
+
+        """
+        super().__init__(column_map)
+        self._columns = {table: tuple(columns.values())
+                         for table, columns in self.items()}
+        self._inverse = {table: {database_column: report_column
+                                 for report_column, database_column in columns.items()}
+                         for table, columns in self.items()}
+
+    def __missing__(self, key):
+        """Return an empty mapping for tables without mapped columns."""
+        return {}
+
+    def columns(self, table_name):
+        """Return the database columns mapped for a table.
+
+        Args:
+            table_name (str): The database table
+
+        Returns:
+            (tuple): The mapped database column names
+
+        """
+        return self._columns.get(table_name, ())
+
+    def inverse(self, table_name):
+        """Return the report columns of a table's database columns.
+
+        Args:
+            table_name (str): The database table
+
+        Returns:
+            (dict): Report column names keyed by database column name
+
+        """
+        return self._inverse.get(table_name, {})
+
+
+def get_column_map():
+    """Return the column map, reading it again once it has expired.
+
+    The map is read from the database at most once every COLUMN_MAP_TTL
+    seconds per process.
+
+    Returns:
+        (ColumnMap): The column map
+
+    """
+    global _COLUMN_MAP, _COLUMN_MAP_EXPIRES  # pylint: disable=global-statement
+    with _COLUMN_MAP_LOCK:
+        if _COLUMN_MAP is None or time.monotonic() >= _COLUMN_MAP_EXPIRES:
+            with ReportingCommonDBAccessor() as reporting_common:
+                _COLUMN_MAP = reporting_common.generate_column_map()
+            _COLUMN_MAP_EXPIRES = time.monotonic() + Config.COLUMN_MAP_TTL
+        return _COLUMN_MAP
+
+
+def refresh_column_map():
+    """Read the column map again on its next use."""
+    global _COLUMN_MAP  # pylint: disable=global-statement
+    with _COLUMN_MAP_LOCK:
+        _COLUMN_MAP = None
+
 
 class ReportingCommonDBAccessor(KokuDBAccess):
     """Class to interact with customer reporting tables."""
@@ -33,7 +117,11 @@ class ReportingCommonDBAccessor(KokuDBAccess):
         super().__init__(schema)
         self.report_common_schema = self.ReportingCommonSchema()
         self._get_reporting_tables()
-        self.column_map = self.generate_column_map()
+
+    @property
+    def column_map(self):
+        """Return the shared column map."""
+        return get_column_map()
 
     def _get_reporting_tables(self):
         """Load table objects for reference and creation."""
@@ -61,7 +149,12 @@ class ReportingCommonDBAccessor(KokuDBAccess):
         return self._session.query(table)
 
     def generate_column_map(self):
-        """Generate a mapping of provider data columns to db columns."""
+        """Generate a mapping of provider data columns to db columns.
+
+        Returns:
+            (ColumnMap): The column map read from the database
+
+        """
         column_map = defaultdict(dict)
 
         report_column_map = \
@@ -71,7 +164,7 @@ class ReportingCommonDBAccessor(KokuDBAccess):
             entry = {row.provider_column_name: row.database_column}
             column_map[row.database_table].update(entry)
 
-        return column_map
+        return ColumnMap(column_map)
 
     def add(self, table, fields, use_savepoint=True):
         """
@@ -0,0 +1,217 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Snapshots of reflected schema metadata shared by worker processes.
+
+Reflecting a schema queries the catalog for every table, column, index and
+constraint. The reflected metadata of the public schema and of one tenant
+schema is pickled to a local file instead, keyed by a fingerprint of the
+schema's applied migrations. The file is only read from a directory that
+no other user can write to. Every tenant schema is migrated alike, so the
+tenant metadata is retargeted to whichever tenant schema is requested. A
+snapshot whose fingerprint no longer matches is ignored and replaced by the
+next reflection.
+"""
+import logging
+import os
+import pickle
+import stat
+import tempfile
+import threading
+
+import sqlalchemy
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.schema import DefaultClause, RETAIN_SCHEMA
+
+from masu.config import Config
+
+LOG = logging.getLogger(__name__)
+
+# Bumped whenever the layout of the snapshot file changes
+SNAPSHOT_VERSION = 1
+
+_SNAPSHOT = None
+_SNAPSHOT_LOCK = threading.Lock()
+
+
+def snapshot_path():
+    """Return the path of the snapshot file of this version."""
+    file_name = f'schema_v{SNAPSHOT_VERSION}_sqlalchemy{sqlalchemy.__version__}.pickle'
+    return os.path.join(Config.SCHEMA_SNAPSHOT_DIR, file_name)
+
+
+def _is_private(path):
+    """Return whether a path is owned by this user and writable by no one else."""
+    try:
+        path_stat = os.lstat(path)
+    except OSError:
+        return False
+    if stat.S_ISLNK(path_stat.st_mode) or path_stat.st_uid != os.getuid():
+        return False
+    return not path_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def _snapshot_key(schema):
+    """Return the snapshot entry a schema is stored under."""
+    return 'public' if schema == 'public' else 'tenant'
+
+
+def migration_fingerprint(engine, schema):
+    """Return a hash of the migrations applied to a schema.
+
+    Args:
+        engine (sqlalchemy.engine.base.Engine): The database engine
+        schema (str): The schema name
+
+    Returns:
+        (str): The fingerprint, None if the schema has no migrations table
+
+    """
+    table = f'{schema}.django_migrations'
+    with engine.connect() as connection:
+        exists = connection.execute(
+            sqlalchemy.text('SELECT to_regclass(:table_name)'),
+            table_name=table
+        ).scalar()
+        if exists is None:
+            return None
+        return connection.execute(
+            "SELECT md5(coalesce(string_agg(app || '.' || name, ',' ORDER BY app, name), ''))"
+            f' FROM {table}'
+        ).scalar()
+
+
+def _read_snapshot(path):
+    """Return the snapshot entries of a file, or none if it cannot be trusted."""
+    if not os.path.exists(path):
+        return {}
+    # Unpickling runs code, so a file others could have written is not read
+    if not (_is_private(os.path.dirname(path)) and _is_private(path)):
+        LOG.warning('Ignoring schema snapshot %s writable by other users.', path)
+        return {}
+    try:
+        with open(path, 'rb') as snapshot_file:
+            return pickle.load(snapshot_file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError) as err:
+        LOG.warning('Ignoring unreadable schema snapshot %s: %s', path, err)
+        return {}
+
+
+def load_snapshot():
+    """Read the snapshot file into memory.
+
+    Returns:
+        (dict): The snapshot entries by key
+
+    """
+    global _SNAPSHOT  # pylint: disable=global-statement
+    with _SNAPSHOT_LOCK:
+        if _SNAPSHOT is None:
+            _SNAPSHOT = _read_snapshot(snapshot_path())
+        return _SNAPSHOT
+
+
+def _retarget_sequence(column, source, schema):
+    """Point a reflected nextval() default at the sequence of a schema."""
+    default = column.server_default
+    if not isinstance(default, DefaultClause) or not isinstance(default.arg, TextClause):
+        return
+    text = default.arg.text
+    retargeted = text.replace(f"'\"{source}\".", f"'\"{schema}\".")
+    retargeted = retargeted.replace(f"'{source}.", f"'{schema}.")
+    if retargeted != text:
+        column.server_default = DefaultClause(sqlalchemy.text(retargeted))
+
+
+def _retarget(metadata, engine, schema):
+    """Copy snapshot metadata into new metadata for a schema.
+
+    Tables of the snapshot's own schema are moved to the requested schema,
+    along with the sequences of their defaults. The tables they reference
+    in other schemas are copied as they are.
+    """
+    target = sqlalchemy.MetaData(bind=engine, schema=schema)
+    for table in metadata.sorted_tables:
+        if table.schema != metadata.schema:
+            table.tometadata(target, schema=RETAIN_SCHEMA)
+            continue
+        copy = table.tometadata(target, schema=schema)
+        if schema != metadata.schema:
+            for column in copy.columns:
+                _retarget_sequence(column, metadata.schema, schema)
+    return target
+
+
+def load_metadata(engine, schema, fingerprint):
+    """Return the snapshot metadata of a schema.
+
+    Args:
+        engine (sqlalchemy.engine.base.Engine): The database engine
+        schema (str): The schema name
+        fingerprint (str): The schema's current migration fingerprint
+
+    Returns:
+        (sqlalchemy.MetaData): The schema metadata, None if no snapshot
+            matches the fingerprint
+
+    """
+    entry = load_snapshot().get(_snapshot_key(schema))
+    if entry is None or entry[0] != fingerprint:
+        return None
+    return _retarget(entry[1], engine, schema)
+
+
+def save_metadata(schema, fingerprint, metadata):
+    """Store the reflected metadata of a schema in the snapshot file.
+
+    The file is replaced atomically so that other processes never read a
+    partial snapshot.
+
+    Args:
+        schema (str): The schema name
+        fingerprint (str): The schema's migration fingerprint
+        metadata (sqlalchemy.MetaData): The reflected metadata
+
+    Returns:
+        None
+
+    """
+    snapshot = load_snapshot()
+    with _SNAPSHOT_LOCK:
+        snapshot[_snapshot_key(schema)] = (fingerprint, metadata)
+        path = snapshot_path()
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            if not _is_private(os.path.dirname(path)):
+                raise PermissionError(f'{os.path.dirname(path)} is writable by other users')
+            handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(handle, 'wb') as snapshot_file:
+                pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as err:
+            LOG.warning('Unable to write schema snapshot %s: %s', path, err)
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+        else:
+            LOG.info('Saved schema snapshot of %s to %s.', schema, path)
+
+
+def clear_snapshot():
+    """Forget the snapshot read into memory."""
+    global _SNAPSHOT  # pylint: disable=global-statement
+    with _SNAPSHOT_LOCK:
+        _SNAPSHOT = None
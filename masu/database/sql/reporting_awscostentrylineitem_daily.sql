@@ -42,9 +42,9 @@ CREATE TEMPORARY TABLE aws_tag_summary_{uuid} AS (
             FROM reporting_awscostentrylineitem AS li
             JOIN reporting_awscostentry AS ce
                 ON li.cost_entry_id = ce.id
-            WHERE date(ce.interval_start) >= '{start_date}'
-                AND date(ce.interval_start) <= '{end_date}'
-                AND li.cost_entry_bill_id IN ({cost_entry_bill_ids})
+            WHERE ce.interval_start >= %(start_date)s::date
+                AND ce.interval_start < %(end_date)s::date + 1
+                AND li.cost_entry_bill_id = ANY(%(bill_ids)s)
         ) li,
         jsonb_each_text(li.tags) tags
     ) t
@@ -100,9 +100,9 @@ CREATE TEMPORARY TABLE reporting_awscostentrylineitem_daily_{uuid} AS (
         FROM reporting_awscostentrylineitem AS li
         JOIN reporting_awscostentry AS ce
             ON li.cost_entry_id = ce.id
-        WHERE date(ce.interval_start) >= '{start_date}'
-            AND date(ce.interval_start) <= '{end_date}'
-            AND li.cost_entry_bill_id IN ({cost_entry_bill_ids})
+        WHERE ce.interval_start >= %(start_date)s::date
+            AND ce.interval_start < %(end_date)s::date + 1
+            AND li.cost_entry_bill_id = ANY(%(bill_ids)s)
         GROUP BY date(ce.interval_start),
             li.cost_entry_bill_id,
             li.cost_entry_product_id,
@@ -172,9 +172,9 @@ CREATE TEMPORARY TABLE reporting_awscostentrylineitem_daily_{uuid} AS (
 
 -- Clear out old entries first
 DELETE FROM reporting_awscostentrylineitem_daily
-WHERE usage_start >= '{start_date}'
-    AND usage_start <= '{end_date}'
-    AND cost_entry_bill_id IN ({cost_entry_bill_ids})
+WHERE usage_start >= %(start_date)s::date
+    AND usage_start < %(end_date)s::date + 1
+    AND cost_entry_bill_id = ANY(%(bill_ids)s)
 ;
 
 -- Populate the daily aggregate line item data
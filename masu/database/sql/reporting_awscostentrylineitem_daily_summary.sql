@@ -41,9 +41,9 @@ CREATE TEMPORARY TABLE aws_tag_summary_{uuid} AS (
             ON li.cost_entry_product_id = p.id
         LEFT JOIN reporting_awscostentrypricing as pr
             ON li.cost_entry_pricing_id = pr.id
-        WHERE date(li.usage_start) >= '{start_date}'
-            AND date(li.usage_start) <= '{end_date}'
-            AND li.cost_entry_bill_id IN ({cost_entry_bill_ids})
+        WHERE li.usage_start >= %(start_date)s::date
+            AND li.usage_start < %(end_date)s::date + 1
+            AND li.cost_entry_bill_id = ANY(%(bill_ids)s)
         GROUP BY li.cost_entry_bill_id,
             li.usage_start,
             li.usage_end,
@@ -107,9 +107,9 @@ CREATE TEMPORARY TABLE reporting_awscostentrylineitem_daily_summary_{uuid} AS (
             ON li.cost_entry_pricing_id = pr.id
         LEFT JOIN reporting_awsaccountalias AS aa
             ON li.usage_account_id = aa.account_id
-        WHERE date(li.usage_start) >= '{start_date}'
-            AND date(li.usage_start) <= '{end_date}'
-            AND li.cost_entry_bill_id IN ({cost_entry_bill_ids})
+        WHERE li.usage_start >= %(start_date)s::date
+            AND li.usage_start < %(end_date)s::date + 1
+            AND li.cost_entry_bill_id = ANY(%(bill_ids)s)
         GROUP BY li.cost_entry_bill_id,
             li.usage_start,
             li.usage_end,
@@ -160,9 +160,9 @@ CREATE TEMPORARY TABLE reporting_awscostentrylineitem_daily_summary_{uuid} AS (
 
 -- -- Clear out old entries first
 DELETE FROM reporting_awscostentrylineitem_daily_summary
-WHERE usage_start >= '{start_date}'
-    AND usage_start <= '{end_date}'
-    AND cost_entry_bill_id IN ({cost_entry_bill_ids})
+WHERE usage_start >= %(start_date)s::date
+    AND usage_start < %(end_date)s::date + 1
+    AND cost_entry_bill_id = ANY(%(bill_ids)s)
 ;
 
 -- Populate the daily aggregate line item data
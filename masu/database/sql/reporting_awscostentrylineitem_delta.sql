@@ -0,0 +1,217 @@
+-- Apply the line items of a new assembly as a delta of the saved line items.
+-- Each line item is fingerprinted by a hash of its identity columns,
+-- numbered within identical rows, and a hash of its cost columns. Saved
+-- rows missing from the assembly are removed, rows whose cost hash changed
+-- are updated and rows not saved yet are inserted.
+WITH staged_line_items AS (
+    SELECT li.*,
+        li.identity_hash || '-' || row_number() OVER (
+            PARTITION BY li.identity_hash
+            ORDER BY li.content_hash
+        ) as line_item_key
+    FROM (
+        SELECT li.*,
+            md5(ROW(
+                li.cost_entry_bill_id,
+                li.cost_entry_id,
+                li.cost_entry_product_id,
+                li.cost_entry_pricing_id,
+                li.cost_entry_reservation_id,
+                li.line_item_type,
+                li.usage_account_id,
+                li.usage_start,
+                li.usage_end,
+                li.product_code,
+                li.usage_type,
+                li.operation,
+                li.availability_zone,
+                li.resource_id,
+                li.tax_type,
+                li.tags
+            )::text) as identity_hash,
+            md5(ROW(
+                li.invoice_id,
+                li.usage_amount,
+                li.normalization_factor,
+                li.normalized_usage_amount,
+                li.currency_code,
+                li.unblended_rate,
+                li.unblended_cost,
+                li.blended_rate,
+                li.blended_cost,
+                li.public_on_demand_cost,
+                li.public_on_demand_rate,
+                li.reservation_amortized_upfront_fee,
+                li.reservation_amortized_upfront_cost_for_usage,
+                li.reservation_recurring_fee_for_usage,
+                li.reservation_unused_quantity,
+                li.reservation_unused_recurring_fee
+            )::text) as content_hash
+        FROM {staging_table} AS li
+        WHERE li.cost_entry_bill_id = ANY(%(bill_ids)s)
+    ) AS li
+),
+saved_line_items AS (
+    SELECT li.id,
+        li.content_hash,
+        li.identity_hash || '-' || row_number() OVER (
+            PARTITION BY li.identity_hash
+            ORDER BY li.content_hash
+        ) as line_item_key
+    FROM (
+        SELECT li.id,
+            md5(ROW(
+                li.cost_entry_bill_id,
+                li.cost_entry_id,
+                li.cost_entry_product_id,
+                li.cost_entry_pricing_id,
+                li.cost_entry_reservation_id,
+                li.line_item_type,
+                li.usage_account_id,
+                li.usage_start,
+                li.usage_end,
+                li.product_code,
+                li.usage_type,
+                li.operation,
+                li.availability_zone,
+                li.resource_id,
+                li.tax_type,
+                li.tags
+            )::text) as identity_hash,
+            md5(ROW(
+                li.invoice_id,
+                li.usage_amount,
+                li.normalization_factor,
+                li.normalized_usage_amount,
+                li.currency_code,
+                li.unblended_rate,
+                li.unblended_cost,
+                li.blended_rate,
+                li.blended_cost,
+                li.public_on_demand_cost,
+                li.public_on_demand_rate,
+                li.reservation_amortized_upfront_fee,
+                li.reservation_amortized_upfront_cost_for_usage,
+                li.reservation_recurring_fee_for_usage,
+                li.reservation_unused_quantity,
+                li.reservation_unused_recurring_fee
+            )::text) as content_hash
+        FROM reporting_awscostentrylineitem AS li
+        WHERE li.cost_entry_bill_id = ANY(%(bill_ids)s)
+    ) AS li
+),
+removed AS (
+    DELETE FROM reporting_awscostentrylineitem AS li
+    USING saved_line_items AS saved
+    WHERE li.id = saved.id
+        AND NOT EXISTS (
+            SELECT 1
+            FROM staged_line_items AS staged
+            WHERE staged.line_item_key = saved.line_item_key
+        )
+    RETURNING li.id
+),
+updated AS (
+    UPDATE reporting_awscostentrylineitem AS li
+    SET invoice_id = staged.invoice_id,
+        usage_amount = staged.usage_amount,
+        normalization_factor = staged.normalization_factor,
+        normalized_usage_amount = staged.normalized_usage_amount,
+        currency_code = staged.currency_code,
+        unblended_rate = staged.unblended_rate,
+        unblended_cost = staged.unblended_cost,
+        blended_rate = staged.blended_rate,
+        blended_cost = staged.blended_cost,
+        public_on_demand_cost = staged.public_on_demand_cost,
+        public_on_demand_rate = staged.public_on_demand_rate,
+        reservation_amortized_upfront_fee = staged.reservation_amortized_upfront_fee,
+        reservation_amortized_upfront_cost_for_usage = staged.reservation_amortized_upfront_cost_for_usage,
+        reservation_recurring_fee_for_usage = staged.reservation_recurring_fee_for_usage,
+        reservation_unused_quantity = staged.reservation_unused_quantity,
+        reservation_unused_recurring_fee = staged.reservation_unused_recurring_fee
+    FROM saved_line_items AS saved
+    JOIN staged_line_items AS staged
+        ON staged.line_item_key = saved.line_item_key
+    WHERE li.id = saved.id
+        AND staged.content_hash != saved.content_hash
+    RETURNING li.id
+),
+inserted AS (
+    INSERT INTO reporting_awscostentrylineitem (
+        cost_entry_bill_id,
+        cost_entry_id,
+        cost_entry_product_id,
+        cost_entry_pricing_id,
+        cost_entry_reservation_id,
+        line_item_type,
+        usage_account_id,
+        usage_start,
+        usage_end,
+        product_code,
+        usage_type,
+        operation,
+        availability_zone,
+        resource_id,
+        tax_type,
+        tags,
+        invoice_id,
+        usage_amount,
+        normalization_factor,
+        normalized_usage_amount,
+        currency_code,
+        unblended_rate,
+        unblended_cost,
+        blended_rate,
+        blended_cost,
+        public_on_demand_cost,
+        public_on_demand_rate,
+        reservation_amortized_upfront_fee,
+        reservation_amortized_upfront_cost_for_usage,
+        reservation_recurring_fee_for_usage,
+        reservation_unused_quantity,
+        reservation_unused_recurring_fee
+    )
+        SELECT cost_entry_bill_id,
+            cost_entry_id,
+            cost_entry_product_id,
+            cost_entry_pricing_id,
+            cost_entry_reservation_id,
+            line_item_type,
+            usage_account_id,
+            usage_start,
+            usage_end,
+            product_code,
+            usage_type,
+            operation,
+            availability_zone,
+            resource_id,
+            tax_type,
+            tags,
+            invoice_id,
+            usage_amount,
+            normalization_factor,
+            normalized_usage_amount,
+            currency_code,
+            unblended_rate,
+            unblended_cost,
+            blended_rate,
+            blended_cost,
+            public_on_demand_cost,
+            public_on_demand_rate,
+            reservation_amortized_upfront_fee,
+            reservation_amortized_upfront_cost_for_usage,
+            reservation_recurring_fee_for_usage,
+            reservation_unused_quantity,
+            reservation_unused_recurring_fee
+        FROM staged_line_items AS staged
+        WHERE NOT EXISTS (
+            SELECT 1
+            FROM saved_line_items AS saved
+            WHERE saved.line_item_key = staged.line_item_key
+        )
+    RETURNING id
+)
+SELECT (SELECT count(*) FROM inserted) as inserted,
+    (SELECT count(*) FROM updated) as updated,
+    (SELECT count(*) FROM removed) as removed
+;
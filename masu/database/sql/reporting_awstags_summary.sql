@@ -1,3 +1,7 @@
+-- Summarize the tag keys and values of the daily line items.
+-- With a start and end date only the daily rows of those dates are read
+-- and their values are merged into the saved ones. Without them every
+-- daily row is read and the saved values are replaced.
 INSERT INTO reporting_awstags_summary
 SELECT l.key,
     array_agg(DISTINCT l.value) as values
@@ -6,8 +10,17 @@ FROM (
         value
     FROM reporting_awscostentrylineitem_daily AS li,
         jsonb_each_text(li.tags) labels
+    WHERE (%(start_date)s::date IS NULL OR li.usage_start >= %(start_date)s::date)
+        AND (%(end_date)s::date IS NULL OR li.usage_start < %(end_date)s::date + 1)
 ) l
 GROUP BY l.key
 ON CONFLICT (key) DO UPDATE
-SET values = EXCLUDED.values
+SET values = CASE
+    WHEN %(start_date)s::date IS NULL THEN EXCLUDED.values
+    ELSE ARRAY(
+        SELECT DISTINCT value
+        FROM unnest(reporting_awstags_summary.values || EXCLUDED.values) AS value
+        ORDER BY value
+    )
+END
 ;
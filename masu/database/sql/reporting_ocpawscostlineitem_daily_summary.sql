@@ -1,7 +1,7 @@
--- The Python string variable subsitutions {aws_where_clause} and
--- {ocp_where_clause} optionally filter AWS and OCP data by provider/source
--- Ex aws_where_clause: 'AND cost_entry_bill_id IN (1, 2, 3)'
--- Ex ocp_where_clause: "AND cluster_id = 'abcd-1234`"
+-- The optional bill_ids and cluster_id parameters filter AWS and OCP data by
+-- provider/source. A NULL parameter leaves the data unfiltered.
+-- The results are written to summary_table and project_summary_table, the
+-- summary tables themselves or staging tables for a shard of the dates.
 
 -- We use a LATERAL JOIN here to get the JSON tags split out into key, value
 -- columns. We reference this split multiple times so we put it in a
@@ -12,9 +12,9 @@ CREATE TEMPORARY TABLE reporting_aws_tags AS (
         LOWER(value) as value
         FROM reporting_awscostentrylineitem_daily as aws,
             jsonb_each_text(aws.tags) labels
-        WHERE date(aws.usage_start) >= '{start_date}'
-            AND date(aws.usage_start) <= '{end_date}'
-            {aws_where_clause}
+        WHERE aws.usage_start >= %(start_date)s::date
+            AND aws.usage_start < %(end_date)s::date + 1
+            AND (%(bill_ids)s::integer[] IS NULL OR cost_entry_bill_id = ANY(%(bill_ids)s::integer[]))
 )
 ;
 
@@ -27,9 +27,9 @@ CREATE TEMPORARY TABLE reporting_ocp_storage_tags AS (
         LOWER(value) as value
     FROM reporting_ocpstoragelineitem_daily as ocp,
         jsonb_each_text(ocp.persistentvolume_labels) labels
-    WHERE date(ocp.usage_start) >= '{start_date}'
-        AND date(ocp.usage_start) <= '{end_date}'
-        {ocp_where_clause}
+    WHERE ocp.usage_start >= %(start_date)s::date
+        AND ocp.usage_start < %(end_date)s::date + 1
+        AND (%(cluster_id)s::text IS NULL OR cluster_id = %(cluster_id)s)
 
     UNION ALL
 
@@ -38,9 +38,9 @@ CREATE TEMPORARY TABLE reporting_ocp_storage_tags AS (
         LOWER(value) as value
     FROM reporting_ocpstoragelineitem_daily as ocp,
         jsonb_each_text(ocp.persistentvolumeclaim_labels) labels
-    WHERE date(ocp.usage_start) >= '{start_date}'
-        AND date(ocp.usage_start) <= '{end_date}'
-        {ocp_where_clause}
+    WHERE ocp.usage_start >= %(start_date)s::date
+        AND ocp.usage_start < %(end_date)s::date + 1
+        AND (%(cluster_id)s::text IS NULL OR cluster_id = %(cluster_id)s)
 )
 ;
 
@@ -53,9 +53,9 @@ CREATE TEMPORARY TABLE reporting_ocp_pod_tags AS (
         LOWER(value) as value
     FROM reporting_ocpusagelineitem_daily as ocp,
         jsonb_each_text(ocp.pod_labels) labels
-    WHERE date(ocp.usage_start) >= '{start_date}'
-        AND date(ocp.usage_start) <= '{end_date}'
-        {ocp_where_clause}
+    WHERE ocp.usage_start >= %(start_date)s::date
+        AND ocp.usage_start < %(end_date)s::date + 1
+        AND (%(cluster_id)s::text IS NULL OR cluster_id = %(cluster_id)s)
 )
 ;
 
@@ -111,8 +111,8 @@ CREATE TEMPORARY TABLE reporting_ocp_aws_resource_id_matched AS (
         JOIN reporting_ocpusagelineitem_daily as ocp
             ON aws.resource_id = ocp.resource_id
                 AND aws.usage_start::date = ocp.usage_start::date
-        WHERE date(aws.usage_start) >= '{start_date}'
-            AND date(aws.usage_start) <= '{end_date}'
+        WHERE aws.usage_start >= %(start_date)s::date
+            AND aws.usage_start < %(end_date)s::date + 1
     ),
     cte_number_of_shared_projects AS (
         SELECT aws_id,
@@ -194,8 +194,8 @@ CREATE TEMPORARY TABLE reporting_ocp_aws_direct_tag_matched AS (
                 AND aws.usage_start::date = ocp.usage_start::date
         LEFT JOIN reporting_ocp_aws_resource_id_matched AS rm
             ON rm.aws_id = aws.id
-        WHERE date(aws.usage_start) >= '{start_date}'
-            AND date(aws.usage_start) <= '{end_date}'
+        WHERE aws.usage_start >= %(start_date)s::date
+            AND aws.usage_start < %(end_date)s::date + 1
             AND rm.aws_id IS NULL
     ),
     cte_number_of_shared_projects AS (
@@ -278,8 +278,8 @@ CREATE TEMPORARY TABLE reporting_ocp_aws_openshift_project_tag_matched AS (
             ON rm.aws_id = aws.id
         LEFT JOIN reporting_ocp_aws_direct_tag_matched AS dtm
             ON dtm.aws_id = aws.id
-        WHERE date(aws.usage_start) >= '{start_date}'
-            AND date(aws.usage_start) <= '{end_date}'
+        WHERE aws.usage_start >= %(start_date)s::date
+            AND aws.usage_start < %(end_date)s::date + 1
             AND rm.aws_id IS NULL
             AND dtm.aws_id IS NULL
 
@@ -367,8 +367,8 @@ CREATE TEMPORARY TABLE reporting_ocp_aws_openshift_node_tag_matched AS (
             ON dtm.aws_id = aws.id
         LEFT JOIN reporting_ocp_aws_openshift_project_tag_matched as ptm
             ON ptm.aws_id = aws.id
-        WHERE date(aws.usage_start) >= '{start_date}'
-            AND date(aws.usage_start) <= '{end_date}'
+        WHERE aws.usage_start >= %(start_date)s::date
+            AND aws.usage_start < %(end_date)s::date + 1
             AND rm.aws_id IS NULL
             AND dtm.aws_id IS NULL
             AND ptm.aws_id IS NULL
@@ -459,8 +459,8 @@ CREATE TEMPORARY TABLE reporting_ocp_aws_openshift_cluster_tag_matched AS (
             ON ptm.aws_id = aws.id
         LEFT JOIN reporting_ocp_aws_openshift_node_tag_matched as ntm
             ON ntm.aws_id = aws.id
-        WHERE date(aws.usage_start) >= '{start_date}'
-            AND date(aws.usage_start) <= '{end_date}'
+        WHERE aws.usage_start >= %(start_date)s::date
+            AND aws.usage_start < %(end_date)s::date + 1
             AND rm.aws_id IS NULL
             AND dtm.aws_id IS NULL
             AND ptm.aws_id IS NULL
@@ -567,8 +567,8 @@ CREATE TEMPORARY TABLE reporting_ocp_aws_storage_direct_tag_matched AS (
             ON aws.key = ocp.key
                 AND aws.value = ocp.value
                 AND aws.usage_start::date = ocp.usage_start::date
-        WHERE date(aws.usage_start) >= '{start_date}'
-            AND date(aws.usage_start) <= '{end_date}'
+        WHERE aws.usage_start >= %(start_date)s::date
+            AND aws.usage_start < %(end_date)s::date + 1
     ),
     cte_number_of_shared_projects AS (
         SELECT aws_id,
@@ -645,8 +645,8 @@ CREATE TEMPORARY TABLE reporting_ocp_aws_storage_openshift_project_tag_matched A
                 AND aws.usage_start::date = ocp.usage_start::date
         LEFT JOIN reporting_ocp_aws_storage_direct_tag_matched AS dtm
             ON dtm.aws_id = aws.id
-        WHERE date(aws.usage_start) >= '{start_date}'
-            AND date(aws.usage_start) <= '{end_date}'
+        WHERE aws.usage_start >= %(start_date)s::date
+            AND aws.usage_start < %(end_date)s::date + 1
             AND dtm.aws_id IS NULL
 
     ),
@@ -728,8 +728,8 @@ CREATE TEMPORARY TABLE reporting_ocp_aws_storage_openshift_node_tag_matched AS (
             ON dtm.aws_id = aws.id
         LEFT JOIN reporting_ocp_aws_storage_openshift_project_tag_matched as ptm
             ON ptm.aws_id = aws.id
-        WHERE date(aws.usage_start) >= '{start_date}'
-            AND date(aws.usage_start) <= '{end_date}'
+        WHERE aws.usage_start >= %(start_date)s::date
+            AND aws.usage_start < %(end_date)s::date + 1
             AND dtm.aws_id IS NULL
             AND ptm.aws_id IS NULL
     ),
@@ -814,8 +814,8 @@ CREATE TEMPORARY TABLE reporting_ocp_aws_storage_openshift_cluster_tag_matched A
             ON ptm.aws_id = aws.id
         LEFT JOIN reporting_ocp_aws_storage_openshift_node_tag_matched as ntm
             ON ntm.aws_id = aws.id
-        WHERE date(aws.usage_start) >= '{start_date}'
-            AND date(aws.usage_start) <= '{end_date}'
+        WHERE aws.usage_start >= %(start_date)s::date
+            AND aws.usage_start < %(end_date)s::date + 1
             AND dtm.aws_id IS NULL
             AND ptm.aws_id IS NULL
             AND ntm.aws_id IS NULL
@@ -929,8 +929,8 @@ CREATE TEMPORARY TABLE reporting_ocpawscostlineitem_daily_summary_{uuid} AS (
         ON li.cost_entry_pricing_id = pr.id
     LEFT JOIN reporting_awsaccountalias AS aa
         ON li.usage_account_id = aa.account_id
-    WHERE date(li.usage_start) >= '{start_date}'
-        AND date(li.usage_start) <= '{end_date}'
+    WHERE li.usage_start >= %(start_date)s::date
+        AND li.usage_start < %(end_date)s::date + 1
     -- Dedup on AWS line item so we never double count usage or cost
     GROUP BY li.aws_id, li.tags, pc.project_costs
 
@@ -970,8 +970,8 @@ CREATE TEMPORARY TABLE reporting_ocpawscostlineitem_daily_summary_{uuid} AS (
         ON li.usage_account_id = aa.account_id
     LEFT JOIN reporting_ocpawsusagelineitem_daily_{uuid} AS ulid
         ON ulid.aws_id = li.aws_id
-    WHERE date(li.usage_start) >= '{start_date}'
-        AND date(li.usage_start) <= '{end_date}'
+    WHERE li.usage_start >= %(start_date)s::date
+        AND li.usage_start < %(end_date)s::date + 1
         AND ulid.aws_id IS NULL
     GROUP BY li.aws_id, li.tags, pc.project_costs
 )
@@ -1016,8 +1016,8 @@ CREATE TEMPORARY TABLE reporting_ocpawscostlineitem_project_daily_summary_{uuid}
         ON li.cost_entry_pricing_id = pr.id
     LEFT JOIN reporting_awsaccountalias AS aa
         ON li.usage_account_id = aa.account_id
-    WHERE date(li.usage_start) >= '{start_date}'
-        AND date(li.usage_start) <= '{end_date}'
+    WHERE li.usage_start >= %(start_date)s::date
+        AND li.usage_start < %(end_date)s::date + 1
     -- Grouping by OCP this time for the by project view
     GROUP BY li.ocp_id,
         li.cluster_id,
@@ -1062,8 +1062,8 @@ CREATE TEMPORARY TABLE reporting_ocpawscostlineitem_project_daily_summary_{uuid}
         ON li.usage_account_id = aa.account_id
     LEFT JOIN reporting_ocpawsusagelineitem_daily_{uuid} AS ulid
         ON ulid.aws_id = li.aws_id
-    WHERE date(li.usage_start) >= '{start_date}'
-        AND date(li.usage_start) <= '{end_date}'
+    WHERE li.usage_start >= %(start_date)s::date
+        AND li.usage_start < %(end_date)s::date + 1
         AND ulid.aws_id IS NULL
     GROUP BY li.ocp_id,
         li.cluster_id,
@@ -1078,15 +1078,15 @@ CREATE TEMPORARY TABLE reporting_ocpawscostlineitem_project_daily_summary_{uuid}
 ;
 
 -- Clear out old entries first
-DELETE FROM reporting_ocpawscostlineitem_daily_summary
-WHERE date(usage_start) >= '{start_date}'
-    AND date(usage_start) <= '{end_date}'
-    {aws_where_clause}
-    {ocp_where_clause}
+DELETE FROM {summary_table}
+WHERE usage_start >= %(start_date)s::date
+    AND usage_start < %(end_date)s::date + 1
+    AND (%(bill_ids)s::integer[] IS NULL OR cost_entry_bill_id = ANY(%(bill_ids)s::integer[]))
+    AND (%(cluster_id)s::text IS NULL OR cluster_id = %(cluster_id)s)
 ;
 
 -- Populate the daily aggregate line item data
-INSERT INTO reporting_ocpawscostlineitem_daily_summary (
+INSERT INTO {summary_table} (
     cluster_id,
     cluster_alias,
     namespace,
@@ -1137,14 +1137,14 @@ INSERT INTO reporting_ocpawscostlineitem_daily_summary (
     FROM reporting_ocpawscostlineitem_daily_summary_{uuid}
 ;
 
-DELETE FROM reporting_ocpawscostlineitem_project_daily_summary
-WHERE date(usage_start) >= '{start_date}'
-    AND date(usage_start) <= '{end_date}'
-    {aws_where_clause}
-    {ocp_where_clause}
+DELETE FROM {project_summary_table}
+WHERE usage_start >= %(start_date)s::date
+    AND usage_start < %(end_date)s::date + 1
+    AND (%(bill_ids)s::integer[] IS NULL OR cost_entry_bill_id = ANY(%(bill_ids)s::integer[]))
+    AND (%(cluster_id)s::text IS NULL OR cluster_id = %(cluster_id)s)
 ;
 
-INSERT INTO reporting_ocpawscostlineitem_project_daily_summary (
+INSERT INTO {project_summary_table} (
     cluster_id,
     cluster_alias,
     namespace,
@@ -0,0 +1,115 @@
+-- Replace the summarized dates with the rows staged by every shard
+DELETE FROM reporting_ocpawscostlineitem_daily_summary
+WHERE usage_start >= %(start_date)s::date
+    AND usage_start < %(end_date)s::date + 1
+    AND (%(bill_ids)s::integer[] IS NULL OR cost_entry_bill_id = ANY(%(bill_ids)s::integer[]))
+    AND (%(cluster_id)s::text IS NULL OR cluster_id = %(cluster_id)s)
+;
+
+-- Populate the daily aggregate line item data
+INSERT INTO reporting_ocpawscostlineitem_daily_summary (
+    cluster_id,
+    cluster_alias,
+    namespace,
+    pod,
+    node,
+    resource_id,
+    usage_start,
+    usage_end,
+    product_code,
+    product_family,
+    instance_type,
+    cost_entry_bill_id,
+    usage_account_id,
+    account_alias_id,
+    availability_zone,
+    region,
+    unit,
+    tags,
+    usage_amount,
+    normalized_usage_amount,
+    unblended_cost,
+    shared_projects,
+    project_costs
+)
+    SELECT cluster_id,
+        cluster_alias,
+        namespace,
+        pod,
+        node,
+        resource_id,
+        usage_start,
+        usage_end,
+        product_code,
+        product_family,
+        instance_type,
+        cost_entry_bill_id,
+        usage_account_id,
+        account_alias_id,
+        availability_zone,
+        region,
+        unit,
+        tags,
+        usage_amount,
+        normalized_usage_amount,
+        unblended_cost,
+        shared_projects,
+        project_costs
+    FROM {summary_table}
+;
+
+DELETE FROM reporting_ocpawscostlineitem_project_daily_summary
+WHERE usage_start >= %(start_date)s::date
+    AND usage_start < %(end_date)s::date + 1
+    AND (%(bill_ids)s::integer[] IS NULL OR cost_entry_bill_id = ANY(%(bill_ids)s::integer[]))
+    AND (%(cluster_id)s::text IS NULL OR cluster_id = %(cluster_id)s)
+;
+
+INSERT INTO reporting_ocpawscostlineitem_project_daily_summary (
+    cluster_id,
+    cluster_alias,
+    namespace,
+    pod,
+    node,
+    pod_labels,
+    resource_id,
+    usage_start,
+    usage_end,
+    product_code,
+    product_family,
+    instance_type,
+    cost_entry_bill_id,
+    usage_account_id,
+    account_alias_id,
+    availability_zone,
+    region,
+    unit,
+    usage_amount,
+    normalized_usage_amount,
+    unblended_cost,
+    pod_cost
+)
+    SELECT cluster_id,
+        cluster_alias,
+        namespace,
+        pod,
+        node,
+        pod_labels,
+        resource_id,
+        usage_start,
+        usage_end,
+        product_code,
+        product_family,
+        instance_type,
+        cost_entry_bill_id,
+        usage_account_id,
+        account_alias_id,
+        availability_zone,
+        region,
+        unit,
+        usage_amount,
+        normalized_usage_amount,
+        unblended_cost,
+        pod_cost
+    FROM {project_summary_table}
+;
@@ -13,9 +13,9 @@ CREATE TEMPORARY TABLE reporting_ocpcosts_summary_{uuid} AS (
         0::decimal as infra_cost,
         0::decimal as project_infra_cost
     FROM reporting_ocpusagelineitem_daily_summary as usageli
-    WHERE date(usageli.usage_start) >= '{start_date}'
-        AND date(usageli.usage_start) <= '{end_date}'
-        AND usageli.cluster_id = '{cluster_id}'
+    WHERE usageli.usage_start >= %(start_date)s::date
+        AND usageli.usage_start < %(end_date)s::date + 1
+        AND usageli.cluster_id = %(cluster_id)s
 
     UNION ALL
 
@@ -33,9 +33,9 @@ CREATE TEMPORARY TABLE reporting_ocpcosts_summary_{uuid} AS (
         0::decimal as infra_cost,
         0::decimal as project_infra_cost
     FROM reporting_ocpstoragelineitem_daily_summary as storageli
-    WHERE date(storageli.usage_start) >= '{start_date}'
-        AND date(storageli.usage_start) <= '{end_date}'
-        AND storageli.cluster_id = '{cluster_id}'
+    WHERE storageli.usage_start >= %(start_date)s::date
+        AND storageli.usage_start < %(end_date)s::date + 1
+        AND storageli.cluster_id = %(cluster_id)s
 
     UNION ALL
 
@@ -53,17 +53,17 @@ CREATE TEMPORARY TABLE reporting_ocpcosts_summary_{uuid} AS (
         ocp_aws.unblended_cost AS infra_cost,
         ocp_aws.pod_cost AS project_infra_cost
     FROM reporting_ocpawscostlineitem_project_daily_summary AS ocp_aws
-    WHERE date(ocp_aws.usage_start) >= '{start_date}'
-        AND date(ocp_aws.usage_start) <= '{end_date}'
-        AND ocp_aws.cluster_id = '{cluster_id}'
+    WHERE ocp_aws.usage_start >= %(start_date)s::date
+        AND ocp_aws.usage_start < %(end_date)s::date + 1
+        AND ocp_aws.cluster_id = %(cluster_id)s
 )
 ;
 
 -- Clear out old entries first
 DELETE FROM reporting_ocpcosts_summary
-WHERE date(usage_start) >= '{start_date}'
-    AND date(usage_start) <= '{end_date}'
-    AND cluster_id = '{cluster_id}'
+WHERE usage_start >= %(start_date)s::date
+    AND usage_start < %(end_date)s::date + 1
+    AND cluster_id = %(cluster_id)s
 ;
 
 -- Populate the ocp costs summary table
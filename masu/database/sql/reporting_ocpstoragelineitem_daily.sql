@@ -34,9 +34,9 @@ CREATE TEMPORARY TABLE persistentvolume_labels_{uuid} AS (
             ON li.report_id = ur.id
         JOIN reporting_ocpusagereportperiod AS rp
             ON li.report_period_id = rp.id
-        WHERE date(ur.interval_start) >= '{start_date}'
-            AND date(ur.interval_start) <= '{end_date}'
-            AND rp.cluster_id = '{cluster_id}'
+        WHERE ur.interval_start >= %(start_date)s::date
+            AND ur.interval_start < %(end_date)s::date + 1
+            AND rp.cluster_id = %(cluster_id)s
         GROUP BY rp.cluster_id,
             li.namespace,
             li.pod,
@@ -93,9 +93,9 @@ CREATE TEMPORARY TABLE persistentvolumeclaim_labels_{uuid} AS (
             ON li.report_id = ur.id
         JOIN reporting_ocpusagereportperiod AS rp
             ON li.report_period_id = rp.id
-        WHERE date(ur.interval_start) >= '{start_date}'
-            AND date(ur.interval_start) <= '{end_date}'
-            AND rp.cluster_id = '{cluster_id}'
+        WHERE ur.interval_start >= %(start_date)s::date
+            AND ur.interval_start < %(end_date)s::date + 1
+            AND rp.cluster_id = %(cluster_id)s
         GROUP BY rp.cluster_id,
             li.namespace,
             li.pod,
@@ -191,9 +191,9 @@ CREATE TEMPORARY TABLE reporting_ocpstoragelineitem_daily_{uuid} AS (
             ON rp.provider_id = p.id
         LEFT JOIN volume_nodes_{uuid} as uli
             ON li.id = uli.id
-        WHERE date(ur.interval_start) >= '{start_date}'
-            AND date(ur.interval_start) <= '{end_date}'
-            AND rp.cluster_id = '{cluster_id}'
+        WHERE ur.interval_start >= %(start_date)s::date
+            AND ur.interval_start < %(end_date)s::date + 1
+            AND rp.cluster_id = %(cluster_id)s
         GROUP BY rp.cluster_id,
             date(ur.interval_start),
             li.namespace,
@@ -209,9 +209,9 @@ CREATE TEMPORARY TABLE reporting_ocpstoragelineitem_daily_{uuid} AS (
 
 -- Clear out old entries first
 DELETE FROM reporting_ocpstoragelineitem_daily
-WHERE usage_start >= '{start_date}'
-    AND usage_start <= '{end_date}'
-    AND cluster_id = '{cluster_id}'
+WHERE usage_start >= %(start_date)s::date
+    AND usage_start < %(end_date)s::date + 1
+    AND cluster_id = %(cluster_id)s
 ;
 
 -- Populate the daily aggregate line item data
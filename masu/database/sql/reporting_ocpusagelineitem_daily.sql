@@ -1,21 +1,44 @@
--- Calculate cluster capacity at daily level
+-- Calculate cluster capacity at daily level from the node capacity recorded
+-- at ingest, and from the line items of intervals with none recorded, such
+-- as intervals processed before it was recorded. An interval with recorded
+-- capacity only counts its recorded nodes, so a report period is processed
+-- again once recording is enabled part way through one of its intervals.
 CREATE TEMPORARY TABLE ocp_cluster_capacity_{uuid} AS (
     SELECT cc.cluster_id,
         date(cc.interval_start) as usage_start,
         sum(cluster_capacity_cpu_core_seconds) as cluster_capacity_cpu_core_seconds,
         sum(cluster_capacity_memory_byte_seconds) as cluster_capacity_memory_byte_seconds
     FROM (
+        SELECT rp.cluster_id,
+            ur.interval_start,
+            nc.node_capacity_cpu_core_seconds as cluster_capacity_cpu_core_seconds,
+            nc.node_capacity_memory_byte_seconds as cluster_capacity_memory_byte_seconds
+        FROM reporting_ocpnodecapacity AS nc
+        JOIN reporting_ocpusagereport AS ur
+            ON nc.report_id = ur.id
+        JOIN reporting_ocpusagereportperiod AS rp
+            ON ur.report_period_id = rp.id
+        WHERE ur.interval_start >= %(start_date)s::date
+            AND ur.interval_start < %(end_date)s::date + 1
+
+        UNION ALL
+
         SELECT rp.cluster_id,
             ur.interval_start,
             max(li.node_capacity_cpu_core_seconds) as cluster_capacity_cpu_core_seconds,
             max(li.node_capacity_memory_byte_seconds) as cluster_capacity_memory_byte_seconds
-        FROM reporting_ocpusagelineitem AS li
-        JOIN reporting_ocpusagereport AS ur
-            ON li.report_id = ur.id
+        FROM reporting_ocpusagereport AS ur
         JOIN reporting_ocpusagereportperiod AS rp
-            ON li.report_period_id = rp.id
-        WHERE date(ur.interval_start) >= '{start_date}'
-            AND date(ur.interval_start) <= '{end_date}'
+            ON ur.report_period_id = rp.id
+        JOIN reporting_ocpusagelineitem AS li
+            ON li.report_id = ur.id
+        WHERE ur.interval_start >= %(start_date)s::date
+            AND ur.interval_start < %(end_date)s::date + 1
+            AND NOT EXISTS (
+                SELECT 1
+                FROM reporting_ocpnodecapacity AS nc
+                WHERE nc.report_id = ur.id
+            )
         GROUP BY rp.cluster_id,
             ur.interval_start,
             li.node
@@ -61,9 +84,9 @@ CREATE TEMPORARY TABLE ocp_daily_labels_{uuid} AS (
             ON li.report_id = ur.id
         JOIN reporting_ocpusagereportperiod AS rp
             ON li.report_period_id = rp.id
-        WHERE date(ur.interval_start) >= '{start_date}'
-            AND date(ur.interval_start) <= '{end_date}'
-            AND rp.cluster_id = '{cluster_id}'
+        WHERE ur.interval_start >= %(start_date)s::date
+            AND ur.interval_start < %(end_date)s::date + 1
+            AND rp.cluster_id = %(cluster_id)s
         GROUP BY rp.cluster_id,
             li.namespace,
             li.pod,
@@ -124,9 +147,9 @@ CREATE TEMPORARY TABLE reporting_ocpusagelineitem_daily_{uuid} AS (
             AND date(ur.interval_start) = dl.usage_start
     LEFT JOIN public.api_provider AS p
         ON rp.provider_id = p.id
-    WHERE date(ur.interval_start) >= '{start_date}'
-        AND date(ur.interval_start) <= '{end_date}'
-        AND rp.cluster_id = '{cluster_id}'
+    WHERE ur.interval_start >= %(start_date)s::date
+        AND ur.interval_start < %(end_date)s::date + 1
+        AND rp.cluster_id = %(cluster_id)s
     GROUP BY rp.cluster_id,
         date(ur.interval_start),
         li.namespace,
@@ -138,9 +161,9 @@ CREATE TEMPORARY TABLE reporting_ocpusagelineitem_daily_{uuid} AS (
 
 -- Clear out old entries first
 DELETE FROM reporting_ocpusagelineitem_daily
-WHERE usage_start >= '{start_date}'
-    AND usage_start <= '{end_date}'
-    AND cluster_id = '{cluster_id}'
+WHERE usage_start >= %(start_date)s::date
+    AND usage_start < %(end_date)s::date + 1
+    AND cluster_id = %(cluster_id)s
 ;
 
 -- Populate the daily aggregate line item data
@@ -24,17 +24,17 @@ CREATE TEMPORARY TABLE reporting_ocpusagelineitem_daily_summary_{uuid} AS (
         li.total_capacity_cpu_core_seconds / 3600 as total_capacity_cpu_core_hours,
         li.total_capacity_memory_byte_seconds / 3600 * POWER(2, -30) as total_capacity_memory_gigabyte_hours
     FROM reporting_ocpusagelineitem_daily AS li
-    WHERE usage_start >= '{start_date}'
-        AND usage_start <= '{end_date}'
-        AND cluster_id = '{cluster_id}'
+    WHERE usage_start >= %(start_date)s::date
+        AND usage_start < %(end_date)s::date + 1
+        AND cluster_id = %(cluster_id)s
 )
 ;
 
 -- Clear out old entries first
 DELETE FROM reporting_ocpusagelineitem_daily_summary
-WHERE usage_start >= '{start_date}'
-    AND usage_start <= '{end_date}'
-    AND cluster_id = '{cluster_id}'
+WHERE usage_start >= %(start_date)s::date
+    AND usage_start < %(end_date)s::date + 1
+    AND cluster_id = %(cluster_id)s
 ;
 
 -- Populate the daily aggregate line item data
@@ -0,0 +1,142 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Registry of the SQL templates under masu/database/sql.
+
+Every template is read and validated once, when the module is imported.
+Templates take two kinds of values:
+
+* identifiers, such as temporary table names, are substituted with
+  str.format from ``{name}`` fields and must be plain SQL identifiers;
+* values, such as dates, cluster ids and bill id arrays, are bound by
+  psycopg2 from ``%(name)s`` parameters and never formatted into the SQL.
+"""
+import logging
+import os
+import pkgutil
+import re
+import string
+import time
+from contextlib import contextmanager
+
+import masu.prometheus_stats as worker_stats
+
+LOG = logging.getLogger(__name__)
+
+_PARAM_PATTERN = re.compile(r'%\((\w+)\)s')
+_IDENTIFIER_PATTERN = re.compile(r'^\w+$')
+
+
+class SQLTemplate:
+    """A validated SQL template."""
+
+    def __init__(self, name, text):
+        """Parse and validate a template.
+
+        Args:
+            name (str): The template file name
+            text (str): The template SQL
+
+        Raises:
+            (ValueError): If the template is malformed
+
+        """
+        self.name = name
+        self.text = text
+        self.identifiers = frozenset(
+            field for _, field, _, _ in string.Formatter().parse(text) if field
+        )
+        self.params = frozenset(_PARAM_PATTERN.findall(text))
+        unbound = _PARAM_PATTERN.sub('', text)
+        if '%' in (unbound.replace('%%', '') if self.params else unbound):
+            raise ValueError(f'{name} has a % that is not a bound parameter.')
+
+    @contextmanager
+    def timed(self, phase):
+        """Record how long a phase of running the template takes.
+
+        Args:
+            phase (str): The phase being timed, render or execute
+
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            elapsed = time.time() - start
+            worker_stats.SQL_TEMPLATE_DURATION.labels(template=self.name,
+                                                      phase=phase).observe(elapsed)
+            LOG.debug('%s of %s took %.3fs.', phase, self.name, elapsed)
+
+    def render(self, identifiers=None, bind_params=None):
+        """Return the SQL of the template, checking its values.
+
+        Args:
+            identifiers (dict): The identifiers substituted in the SQL
+            bind_params (dict): The values bound by psycopg2 when executing
+
+        Returns:
+            (str): The SQL to execute with the bind parameters
+
+        Raises:
+            (ValueError): If a value is missing, unexpected or unsafe
+
+        """
+        identifiers = identifiers if identifiers else {}
+        bind_params = bind_params if bind_params else {}
+        with self.timed('render'):
+            if set(identifiers) != self.identifiers:
+                raise ValueError(
+                    f'{self.name} takes identifiers {sorted(self.identifiers)}, '
+                    f'got {sorted(identifiers)}.'
+                )
+            if set(bind_params) != self.params:
+                raise ValueError(
+                    f'{self.name} takes parameters {sorted(self.params)}, '
+                    f'got {sorted(bind_params)}.'
+                )
+            for value in identifiers.values():
+                if not _IDENTIFIER_PATTERN.match(str(value)):
+                    raise ValueError(f'{value} is not a valid identifier for {self.name}.')
+            return self.text.format(**identifiers)
+
+
+def _load_templates():
+    """Read and validate every SQL template of the package."""
+    sql_dir = os.path.join(os.path.dirname(__file__), 'sql')
+    templates = {}
+    for file_name in sorted(os.listdir(sql_dir)):
+        if not file_name.endswith('.sql'):
+            continue
+        text = pkgutil.get_data('masu.database', f'sql/{file_name}').decode('utf-8')
+        templates[file_name[:-len('.sql')]] = SQLTemplate(file_name, text)
+    return templates
+
+
+SQL_TEMPLATES = _load_templates()
+
+
+def get_sql_template(name):
+    """Return a SQL template by name.
+
+    Args:
+        name (str): The template file name without its .sql extension
+
+    Returns:
+        (SQLTemplate): The template
+
+    """
+    return SQL_TEMPLATES[name]
@@ -0,0 +1,129 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Tables masu keeps next to the Koku reporting tables.
+
+Koku migrates the public and tenant schemas. The few tables masu needs
+for its own bookkeeping are created here instead, once per schema in each
+process. The tables only ever gain new definitions, so creating the ones
+that are missing is the whole migration.
+"""
+import logging
+import threading
+from collections import namedtuple
+
+import sqlalchemy
+
+LOG = logging.getLogger(__name__)
+
+TableMigration = namedtuple('TableMigration', ['name', 'columns'])
+
+# Whether the bill data of each processed report file was finalized
+REPORT_FINALIZATION_TABLE = 'reporting_common_reportfinalization'
+
+PUBLIC_TABLES = (
+    TableMigration(REPORT_FINALIZATION_TABLE, """
+        report_name varchar(128) PRIMARY KEY,
+        is_finalized boolean NOT NULL
+    """),
+)
+
+# Usage date ranges of processed report files that are not summarized yet
+DIRTY_RANGE_TABLE = 'reporting_summary_dirty_range'
+
+# Highest node capacity of each OCP report interval, recorded at ingest.
+# Rows are removed with their report period by the OCP report cleaner.
+NODE_CAPACITY_TABLE = 'reporting_ocpnodecapacity'
+
+TENANT_TABLES = (
+    TableMigration(DIRTY_RANGE_TABLE, """
+        id serial PRIMARY KEY,
+        period_table varchar(64) NOT NULL,
+        period_id integer NOT NULL,
+        start_date date NOT NULL,
+        end_date date NOT NULL
+    """),
+    TableMigration(NODE_CAPACITY_TABLE, """
+        report_id integer NOT NULL,
+        node varchar(253) NOT NULL,
+        node_capacity_cpu_core_seconds numeric(24,6),
+        node_capacity_memory_byte_seconds numeric(24,6),
+        PRIMARY KEY (report_id, node)
+    """),
+)
+
+_MIGRATED_SCHEMAS = set()
+_MIGRATED_LOCK = threading.Lock()
+
+
+def schema_tables(schema):
+    """Return the table migrations of a schema."""
+    return PUBLIC_TABLES if schema == 'public' else TENANT_TABLES
+
+
+def apply_table_migrations(connection, schema, tables=None):
+    """Create the masu tables a schema is missing.
+
+    Workers creating the tables of the same schema at once are serialized
+    by a transaction-level advisory lock.
+
+    Args:
+        connection (sqlalchemy.engine.Connection): A connection in a transaction
+        schema (str): The schema name
+        tables (tuple): The table migrations to apply. Default: the
+            migrations of the schema
+
+    Returns:
+        (None)
+
+    """
+    if tables is None:
+        tables = schema_tables(schema)
+    if not tables:
+        return
+    connection.execute(
+        sqlalchemy.text("SELECT pg_advisory_xact_lock(hashtext('masu_tables.' || :schema))"),
+        schema=schema
+    )
+    for table in tables:
+        connection.execute(f'CREATE TABLE IF NOT EXISTS {schema}.{table.name} ({table.columns})')
+
+
+def ensure_tables(engine, schema):
+    """Create the masu tables of a schema once per process.
+
+    Args:
+        engine (sqlalchemy.engine.base.Engine): The database engine
+        schema (str): The schema name
+
+    Returns:
+        (None)
+
+    """
+    with _MIGRATED_LOCK:
+        if schema in _MIGRATED_SCHEMAS:
+            return
+    with engine.begin() as connection:
+        apply_table_migrations(connection, schema)
+    LOG.debug('Created the masu tables of schema %s.', schema)
+    with _MIGRATED_LOCK:
+        _MIGRATED_SCHEMAS.add(schema)
+
+
+def clear_migrated():
+    """Forget which schemas were migrated in this process."""
+    with _MIGRATED_LOCK:
+        _MIGRATED_SCHEMAS.clear()
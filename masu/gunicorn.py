@@ -4,6 +4,9 @@ import os
 
 from prometheus_flask_exporter.multiprocess import GunicornPrometheusMetrics
 
+from masu.config import Config
+from masu.database.schema_snapshot import load_snapshot
+
 BIND = 'unix:/var/run/masu/gunicorn.sock'
 WORKERS = multiprocessing.cpu_count() * 2 + 1
 
@@ -17,3 +20,9 @@ def when_ready(server):  # pylint: disable=unused-argument
 def child_exit(server, worker):  # pylint: disable=unused-argument
     """Mark process dead when gunicorn worker dies."""
     GunicornPrometheusMetrics.mark_process_dead_on_child_exit(worker.pid)
+
+
+def post_fork(server, worker):  # pylint: disable=unused-argument
+    """Read the schema snapshot once in each new gunicorn worker."""
+    if Config.SCHEMA_SNAPSHOT:
+        load_snapshot()
@@ -16,6 +16,7 @@
 #
 """Asynchronous tasks."""
 
+from concurrent.futures import ThreadPoolExecutor
 from os import path
 
 import psutil
@@ -24,13 +25,15 @@ from celery.utils.log import get_task_logger
 from masu.database.provider_db_accessor import ProviderDBAccessor
 from masu.database.report_manifest_db_accessor import ReportManifestDBAccessor
 from masu.database.report_stats_db_accessor import ReportStatsDBAccessor
+from masu.processor.ocp.ocp_report_processor import SharedOCPDimensions, detect_report_type
 from masu.processor.report_processor import ReportProcessor
 
 LOG = get_task_logger(__name__)
 
 
 # pylint: disable=too-many-arguments,too-many-locals
-def _process_report_file(schema_name, provider, provider_uuid, report_dict):
+def _process_report_file(schema_name, provider, provider_uuid, report_dict,
+                         shared_dimensions=None):
     """
     Task to process a Report.
 
@@ -39,6 +42,8 @@ def _process_report_file(schema_name, provider, provider_uuid, report_dict):
         provider      (String) provider type
         provider_uuid (String) provider uuid
         report_dict   (dict) The report data dict from previous task
+        shared_dimensions (SharedOCPDimensions) Ids shared with the other
+                      files of the manifest processed at the same time
 
     Returns:
         None
@@ -76,16 +81,15 @@ def _process_report_file(schema_name, provider, provider_uuid, report_dict):
                                     compression=compression,
                                     provider=provider,
                                     provider_id=provider_id,
-                                    manifest_id=manifest_id)
-        processor.process()
+                                    manifest_id=manifest_id,
+                                    shared_dimensions=shared_dimensions)
+        is_finalized = processor.process()
+        stats_recorder.set_is_finalized(bool(is_finalized))
         stats_recorder.log_last_completed_datetime()
         stats_recorder.commit()
 
     with ReportManifestDBAccessor() as manifest_accesor:
-        manifest = manifest_accesor.get_manifest_by_id(manifest_id)
-        if manifest:
-            manifest.num_processed_files += 1
-            manifest_accesor.mark_manifest_as_updated(manifest)
+        if manifest_accesor.increment_num_processed_files(manifest_id):
             manifest_accesor.commit()
         else:
             LOG.error('Unable to find manifest for ID: %s, file %s', manifest_id, file_name)
@@ -96,3 +100,44 @@ def _process_report_file(schema_name, provider, provider_uuid, report_dict):
 
     files = processor.remove_processed_files(path.dirname(report_path))
     LOG.info('Temporary files removed: %s', str(files))
+
+
+def _process_ocp_report_files(schema_name, provider, provider_uuid, report_dicts,
+                              processed_reports):
+    """
+    Process the files of an OCP manifest concurrently.
+
+    Files loading different line item tables are processed at the same
+    time, one thread per table. Report periods and reports are resolved
+    once and shared between the threads. When a file fails, the other
+    tables' files still finish before the first error is raised.
+
+    Args:
+        schema_name   (String) db schema name
+        provider      (String) provider type
+        provider_uuid (String) provider uuid
+        report_dicts  (list) The report data dicts of the manifest's files
+        processed_reports (list) Each report data dict is appended once
+                      its file is processed
+
+    Returns:
+        None
+
+    """
+    groups = {}
+    for report_dict in report_dicts:
+        report_type = detect_report_type(report_dict.get('file'))
+        groups.setdefault(report_type, []).append(report_dict)
+    shared_dimensions = SharedOCPDimensions()
+
+    def process_files(group):
+        for report_dict in group:
+            _process_report_file(schema_name, provider, provider_uuid, report_dict,
+                                 shared_dimensions=shared_dimensions)
+            processed_reports.append(report_dict)
+
+    with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+        futures = [executor.submit(process_files, group) for group in groups.values()]
+    errors = [future.exception() for future in futures if future.exception()]
+    if errors:
+        raise errors[0]
@@ -18,8 +18,9 @@
 
 import logging
 
+from masu.database import AWS_CUR_TABLE_MAP
 from masu.database.aws_report_db_accessor import AWSReportDBAccessor
-from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
+from masu.database.reporting_common_db_accessor import get_column_map
 
 LOG = logging.getLogger(__name__)
 
@@ -53,8 +54,7 @@ class AWSReportDBCleaner():
             ([{}]) List of dictionaries containing 'account_payer_id' and 'billing_period_start'
 
         """
-        with ReportingCommonDBAccessor() as reporting_common:
-            column_map = reporting_common.column_map
+        column_map = get_column_map()
 
         with AWSReportDBAccessor(self._schema, column_map) as accessor:
             if ((expired_date is None and provider_id is None) or  # noqa: W504
@@ -62,11 +62,24 @@ class AWSReportDBCleaner():
                 err = 'This method must be called with either expired_date or provider_id'
                 raise AWSReportDBCleanerError(err)
             removed_items = []
+            line_item_table = AWS_CUR_TABLE_MAP['line_item']
+            is_partitioned = accessor.is_partitioned(line_item_table)
 
             if expired_date is not None:
                 bill_objects = accessor.get_bill_query_before_date(expired_date)
             else:
                 bill_objects = accessor.get_cost_entry_bills_query_by_provider(provider_id)
+
+            if is_partitioned and not simulate:
+                # Whole partitions are dropped instead of deleting line items,
+                # before the session takes locks that detaching would wait on
+                bill_ids = [bill.id for bill in bill_objects.all()]
+                accessor.commit()
+                for bill_id in bill_ids:
+                    if accessor.drop_partition(line_item_table, bill_id):
+                        LOG.info('Removed the cost entry line item partition of bill id %s',
+                                 bill_id)
+
             for bill in bill_objects.all():
                 bill_id = bill.id
                 removed_payer_account_id = bill.payer_account_id
@@ -82,8 +95,10 @@ class AWSReportDBCleaner():
                     LOG.info('Removing %s OCP-on-AWS project summary items for bill id %s',
                              del_count, bill_id)
 
-                    del_count = accessor.get_lineitem_query_for_billid(bill_id).delete()
-                    LOG.info('Removing %s cost entry line items for bill id %s', del_count, bill_id)
+                    if not is_partitioned:
+                        del_count = accessor.get_lineitem_query_for_billid(bill_id).delete()
+                        LOG.info('Removing %s cost entry line items for bill id %s',
+                                 del_count, bill_id)
 
                     del_count = accessor.get_daily_query_for_billid(bill_id).delete()
                     LOG.info('Removing %s cost entry daily items for bill id %s',
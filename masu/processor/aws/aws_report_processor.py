@@ -17,25 +17,47 @@
 
 """Processor for Cost Usage Reports."""
 
+import calendar
 import csv
 import gzip
 import io
 import json
 import logging
-from os import listdir, path, remove
-
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timezone
+from decimal import Decimal
+from itertools import chain
+from operator import itemgetter
+from os import getpid, listdir, path, remove
+
+import masu.prometheus_stats as worker_stats
 from masu.config import Config
 from masu.database import AWS_CUR_TABLE_MAP
 from masu.database.aws_report_db_accessor import AWSReportDBAccessor
+from masu.database.engine import DB_ENGINE
 from masu.database.report_manifest_db_accessor import ReportManifestDBAccessor
 from masu.database.report_stats_db_accessor import ReportStatsDBAccessor
-from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
+from masu.database.reporting_common_db_accessor import get_column_map
 from masu.external import GZIP_COMPRESSED
+from masu.processor.dimension_cache import DimensionCache
 from masu.processor.report_processor_base import ReportProcessorBase
 from masu.util.common import extract_uuids_from_string
 
 LOG = logging.getLogger(__name__)
 
+# How line items are loaded when they are not saved in place
+DELTA_LOAD = 'delta'
+PARTITION_LOAD = 'partition'
+
+# The processor of the file a pool process is currently working on
+_WORKER_PROCESSOR = None
+
+# The pool process that set up its own connection pool, and the
+# connection pools it inherited from the parent process
+_WORKER_POOL_PID = None
+_PARENT_POOLS = []
+
 
 # pylint: disable=too-few-public-methods
 class ProcessedReport:
@@ -63,6 +85,134 @@ class ProcessedReport:
         self.pricing = {}
 
 
+class ReportProjection:
+    """Positions of report columns for each database table.
+
+    Compiled once from the report header so that rows can be read with
+    a plain csv.reader and sliced by index instead of walking a dict
+    of every column once per table.
+    """
+
+    def __init__(self, header, column_map, converters=None, tag_prefix='resourceTags'):
+        """Compile the projection for a report header.
+
+        Args:
+            header (list): The column names from the first line of the report
+            column_map (dict): A mapping of report columns to database columns
+            converters (dict): Per table, a mapping of database column to
+                a callable converting a raw report value to the column type
+            tag_prefix (str): A specifier used to identify a value as a tag
+
+        """
+        header = list(header)
+        self._memory_index = None
+        self._memory_unit_index = None
+        # Memory can come as a single number or a number with a unit
+        # e.g. "1" vs. "1 Gb" so the unit gets its own virtual column.
+        if 'product/memory' in header:
+            if 'product/memory_unit' not in header:
+                header.append('product/memory_unit')
+            self._memory_index = header.index('product/memory')
+            self._memory_unit_index = header.index('product/memory_unit')
+
+        self.width = len(header)
+        # Key order follows the first occurrence of a column, the value
+        # the last one, matching the behavior of csv.DictReader.
+        self.index = {column: i for i, column in enumerate(header)}
+
+        converters = converters if converters else {}
+        self.tables = {}
+        for table_name, table_columns in column_map.items():
+            table_converters = converters.get(table_name, {})
+            self.tables[table_name] = [
+                (index, table_columns[column], table_converters.get(table_columns[column]))
+                for column, index in self.index.items()
+                if column in table_columns
+            ]
+
+        self.tag_columns = [(index, column.split(':')[-1])
+                            for column, index in self.index.items()
+                            if tag_prefix in column and len(column.split(':')) > 1]
+
+    def prepare(self, row):
+        """Normalize a raw report row in place before it is projected.
+
+        Args:
+            row (list): A list representation of a CSV file row
+
+        Returns:
+            (list): The same row, padded to the header width
+
+        """
+        if len(row) < self.width:
+            row.extend([None] * (self.width - len(row)))
+
+        if self._memory_index is not None and row[self._memory_index] is not None:
+            memory = row[self._memory_index]
+            unit = None
+            if len(memory.split(' ')) > 1:
+                memory, unit = memory.split(' ')
+            row[self._memory_index] = memory
+            row[self._memory_unit_index] = unit
+
+        return row
+
+    def get(self, row, column, default=None):
+        """Return the value of a report column in a row."""
+        index = self.index.get(column)
+        if index is None:
+            return default
+        return row[index]
+
+    def project(self, row, table_name):
+        """Extract the raw data from a row for a specific table.
+
+        Args:
+            row (list): A list representation of a CSV file row
+            table_name (str): The DB table fields are required for
+
+        Returns:
+            (dict): The data from the row keyed on the DB table's column names
+
+        """
+        return {column: row[index] for index, column, _ in self.tables[table_name]}
+
+    def project_clean(self, row, table_name):
+        """Extract the data from a row converted to the table's column types.
+
+        Args:
+            row (list): A list representation of a CSV file row
+            table_name (str): The DB table fields are required for
+
+        Returns:
+            (dict): The converted data keyed on the DB table's column names
+
+        """
+        data = {}
+        for index, column, converter in self.tables[table_name]:
+            value = row[index]
+            if value is None or value == '':
+                value = None
+            elif converter is not None:
+                value = converter(value)
+            data[column] = value
+        return data
+
+    def tags(self, row):
+        """Return a JSON string of AWS resource tags.
+
+        Args:
+            row (list): A list representation of a CSV file row
+
+        Returns:
+            (str): A JSON string of AWS resource tags
+
+        """
+        return json.dumps({key: row[index]
+                           for index, key in self.tag_columns
+                           if row[index]})
+
+
 # pylint: disable=too-many-instance-attributes
 class AWSReportProcessor(ReportProcessorBase):
     """Cost Usage Report processor."""
@@ -82,29 +232,41 @@ class AWSReportProcessor(ReportProcessorBase):
             schema_name=schema_name,
             report_path=report_path,
             compression=compression,
-            provider_id=provider_id
+            provider_id=provider_id,
+            manifest_id=manifest_id
         )
 
-        self.manifest_id = manifest_id
         self._report_name = path.basename(report_path)
         self._datetime_format = Config.AWS_DATETIME_STR_FORMAT
         self._batch_size = Config.REPORT_PROCESSING_BATCH_SIZE
+        self._workers = Config.REPORT_PROCESSING_WORKERS
 
         self.processed_report = ProcessedReport()
 
         # Gather database accessors
-        with ReportingCommonDBAccessor() as report_common_db:
-            self.column_map = report_common_db.column_map
+        self.column_map = get_column_map()
 
         with AWSReportDBAccessor(self._schema_name, self.column_map) as report_db:
             self.report_schema = report_db.report_schema
-            self.existing_bill_map = report_db.get_cost_entry_bills()
-            self.existing_cost_entry_map = report_db.get_cost_entries()
-            self.existing_product_map = report_db.get_products()
-            self.existing_pricing_map = report_db.get_pricing()
-            self.existing_reservation_map = report_db.get_reservations()
+
+        # Existing ids are loaded lazily, a bill at a time, or resolved
+        # with the rows of each batch instead of preloading the schema
+        cache_size = Config.REPORT_PROCESSING_CACHE_SIZE
+        self.existing_bill_map = DimensionCache(cache_size, loader=self._load_bills)
+        self.existing_cost_entry_map = DimensionCache(
+            cache_size,
+            loader=self._load_cost_entries,
+            scope=itemgetter(0)
+        )
+        self.existing_product_map = DimensionCache(cache_size)
+        self.existing_pricing_map = DimensionCache(cache_size)
+        self.existing_reservation_map = DimensionCache(cache_size)
 
         self.line_item_columns = None
+        self._projection = None
+        self._line_item_table = AWS_CUR_TABLE_MAP['line_item']
+        self._partition_staging = None
+        self.delta_counts = None
 
         LOG.info('Initialized report processor for file: %s and schema: %s',
                  self._report_name, self._schema_name)
@@ -113,61 +275,518 @@ class AWSReportProcessor(ReportProcessorBase):
         """Process CUR file.
 
         Returns:
-            (None)
+            (Boolean): Whether the file contained finalized bill data
 
         """
-        row_count = 0
-        self._delete_line_items()
+        bill_id = None
+        # Rows before the checkpoint were saved by an earlier attempt
+        checkpoint = self._get_checkpoint()
+        load_mode, manifest_progress = self._get_load_mode()
+        if not checkpoint and load_mode is None:
+            self._delete_line_items()
+        self._warm_caches()
+        is_finalized_data = False
         opener, mode = self._get_file_opener(self._compression)
-        is_finalized_data = self._check_for_finalized_bill()
         # pylint: disable=invalid-name
         with opener(self._report_path, mode) as f:
             with AWSReportDBAccessor(self._schema_name, self.column_map) as report_db:
                 LOG.info('File %s opened for processing', str(f))
-                reader = csv.DictReader(f)
-                for row in reader:
-                    bill_id = self.create_cost_entry_objects(row, report_db)
-                    if len(self.processed_report.line_items) >= self._batch_size:
-                        LOG.debug('Saving report rows %d to %d for %s', row_count,
-                                  row_count + len(self.processed_report.line_items),
-                                  self._report_name)
-                        self._save_to_db(report_db)
-
-                        row_count += len(self.processed_report.line_items)
-                        self._update_mappings()
-
-                if self.processed_report.line_items:
-                    LOG.debug('Saving report rows %d to %d for %s', row_count,
-                              row_count + len(self.processed_report.line_items),
-                              self._report_name)
-                    self._save_to_db(report_db)
-
-                    row_count += len(self.processed_report.line_items)
+                self._start_load(load_mode, manifest_progress, report_db, checkpoint)
+                reader = csv.reader(f)
+                header = next(reader)
+                self._projection = self._compile_projection(header, report_db)
+                # The file's first row is checked even if the checkpoint skips it
+                first_row, rows = self._read_first_row(reader)
+                if first_row is not None:
+                    is_finalized_data = self._check_for_finalized_bill(first_row)
+                batches = self._read_batches(rows, skip=checkpoint)
+                if self._use_process_pool():
+                    bill_id = self._process_in_parallel(batches, header, report_db, checkpoint)
+                else:
+                    row_count = checkpoint
+                    for rows in batches:
+                        bill_id = self._process_rows(rows, report_db, row_count)
+                        row_count += len(rows)
+                    report_db.wait_for_copy()
+                if self.manifest_id:
+                    report_db.clear_checkpoint(self._report_name, self.manifest_id)
+
+                self._finish_load(load_mode, manifest_progress, report_db)
 
                 if is_finalized_data:
+                    if bill_id is None:
+                        # Every row was saved by an earlier attempt
+                        bill_id = self.existing_bill_map.get(self._get_bill_key(first_row))
                     report_db.mark_bill_as_finalized(bill_id)
                     report_db.commit()
-                report_db.vacuum_table(AWS_CUR_TABLE_MAP['line_item'])
 
         LOG.info('Completed report processing for file: %s and schema: %s',
                  self._report_name, self._schema_name)
 
         return is_finalized_data
 
-    def _check_for_finalized_bill(self):
-        """Read one line of the report file to check for finalization.
+    def _get_load_mode(self):
+        """Determine how the line items of the file are loaded.
+
+        Line items are staged for a delta or for a partition swap when one
+        is enabled and the file belongs to a manifest. Otherwise they are
+        saved in place once the bill's line items are deleted.
+
+        Returns:
+            (str, dict): The load mode or None, and the manifest progress
+
+        """
+        if not Config.AWS_DELTA_INGESTION and not Config.LINE_ITEM_PARTITION_SWAP:
+            return None, None
+
+        manifest_progress = self._get_manifest_progress()
+        if manifest_progress is None:
+            return None, None
+        if Config.AWS_DELTA_INGESTION:
+            return DELTA_LOAD, manifest_progress
+
+        table_name = AWS_CUR_TABLE_MAP['line_item']
+        with AWSReportDBAccessor(self._schema_name, self.column_map) as report_db:
+            if report_db.is_partitioned(table_name):
+                return PARTITION_LOAD, manifest_progress
+        LOG.warning('Loading line items of %s in place since %s is not partitioned.',
+                    self._report_name, table_name)
+        return None, None
+
+    def _start_load(self, load_mode, manifest_progress, report_db_accessor, checkpoint):
+        """Prepare the staging table of a delta or partition load."""
+        if load_mode == DELTA_LOAD:
+            self._start_delta(manifest_progress, report_db_accessor, checkpoint)
+        elif load_mode == PARTITION_LOAD:
+            self._start_partition_load(manifest_progress, report_db_accessor, checkpoint)
+
+    def _finish_load(self, load_mode, manifest_progress, report_db_accessor):
+        """Vacuum the line items or apply the manifest's staged line items.
+
+        A delta or partition load is only applied by the manifest's last file.
+        """
+        if load_mode is None:
+            report_db_accessor.vacuum_table(AWS_CUR_TABLE_MAP['line_item'])
+        elif manifest_progress['is_last_file'] and load_mode == DELTA_LOAD:
+            self._apply_delta(manifest_progress, report_db_accessor)
+        elif manifest_progress['is_last_file']:
+            self._swap_partitions(manifest_progress, report_db_accessor)
+
+    def _get_manifest_bill_ids(self, manifest_progress, report_db_accessor):
+        """Return the ids of the saved bills of the manifest's billing period."""
+        bills = report_db_accessor.get_cost_entry_bills(
+            provider_id=self._provider_id,
+            billing_period_start=manifest_progress['billing_period_start']
+        )
+        return sorted(bills.values())
+
+    def _start_delta(self, manifest_progress, report_db_accessor, checkpoint):
+        """Stage the line items of the file instead of saving them directly.
+
+        The first file of a manifest clears anything staged by an earlier
+        assembly of the same bills.
+        """
+        self._line_item_table = report_db_accessor.create_line_item_delta_table()
+        if manifest_progress['is_first_file'] and not checkpoint:
+            report_db_accessor.clear_line_item_delta(
+                self._get_manifest_bill_ids(manifest_progress, report_db_accessor)
+            )
+
+    def _apply_delta(self, manifest_progress, report_db_accessor):
+        """Apply the line items staged for the manifest to its bills.
+
+        Returns:
+            (dict): The number of rows inserted, updated and removed
+
+        """
+        bill_ids = self._get_manifest_bill_ids(manifest_progress, report_db_accessor)
+        self.delta_counts = report_db_accessor.apply_line_item_delta(bill_ids)
+        for change, count in self.delta_counts.items():
+            worker_stats.LINE_ITEM_DELTA_ROWS_COUNTER.labels(change=change).inc(count)
+        LOG.info('Line item delta for manifest %s: %d inserted, %d updated, %d removed.',
+                 self.manifest_id, self.delta_counts['inserted'],
+                 self.delta_counts['updated'], self.delta_counts['removed'])
+        if self.delta_counts['removed']:
+            # Removed line items may be from days the new assembly has no rows for
+            billing_period_start = manifest_progress['billing_period_start'].date()
+            last_day = calendar.monthrange(billing_period_start.year,
+                                           billing_period_start.month)[1]
+            billing_period_end = billing_period_start.replace(day=last_day)
+            self._save_usage_ranges(
+                ((bill_id, day) for bill_id in bill_ids
+                 for day in (billing_period_start, billing_period_end)),
+                AWS_CUR_TABLE_MAP['bill'],
+                report_db_accessor
+            )
+        return self.delta_counts
+
+    def _start_partition_load(self, manifest_progress, report_db_accessor, checkpoint):
+        """Load the line items of the file into staging tables, one per bill.
+
+        The first file of a manifest drops anything staged by an earlier
+        assembly of the same bills.
+        """
+        self._partition_staging = {}
+        if manifest_progress['is_first_file'] and not checkpoint:
+            table_name = AWS_CUR_TABLE_MAP['line_item']
+            for bill_id in self._get_manifest_bill_ids(manifest_progress, report_db_accessor):
+                report_db_accessor.drop_partition_staging_table(table_name, bill_id)
+
+    def _get_line_item_table(self, bill_id, report_db_accessor):
+        """Return the table the line items of a bill are saved to."""
+        if self._partition_staging is None:
+            return self._line_item_table
+        if bill_id not in self._partition_staging:
+            self._partition_staging[bill_id] = report_db_accessor.create_partition_staging_table(
+                AWS_CUR_TABLE_MAP['line_item'], bill_id
+            )
+        return self._partition_staging[bill_id]
+
+    def _swap_partitions(self, manifest_progress, report_db_accessor):
+        """Swap the bills' staging tables in as their line item partitions."""
+        table_name = AWS_CUR_TABLE_MAP['line_item']
+        for bill_id in self._get_manifest_bill_ids(manifest_progress, report_db_accessor):
+            report_db_accessor.swap_partition(table_name, 'cost_entry_bill_id', bill_id)
+
+    def _load_bills(self, _):
+        """Load the ids of the bills of the provider."""
+        with AWSReportDBAccessor(self._schema_name, self.column_map) as report_db:
+            bills = report_db.get_cost_entry_bills(provider_id=self._provider_id)
+        return self._get_bill_keys(bills)
+
+    def _get_bill_keys(self, bills):
+        """Key bills from the database the way they are keyed from report rows."""
+        return {
+            (bill_type, payer_account_id,
+             start.astimezone(timezone.utc).strftime(self._datetime_format),
+             provider_id): bill_id
+            for (bill_type, payer_account_id, start, provider_id), bill_id in bills.items()
+        }
+
+    def _load_cost_entries(self, bill_id):
+        """Load the ids of the cost entries of a bill."""
+        with AWSReportDBAccessor(self._schema_name, self.column_map) as report_db:
+            return report_db.get_cost_entries(bill_id=bill_id)
+
+    def _warm_caches(self):
+        """Load the bills of the manifest's billing period and their cost entries."""
+        if not self.manifest_id:
+            return
+
+        with ReportManifestDBAccessor() as manifest_accessor:
+            manifest = manifest_accessor.get_manifest_by_id(self.manifest_id)
+            if manifest is None:
+                return
+            billing_period_start = manifest.billing_period_start_datetime
+
+        with AWSReportDBAccessor(self._schema_name, self.column_map) as report_db:
+            bills = report_db.get_cost_entry_bills(
+                provider_id=self._provider_id,
+                billing_period_start=billing_period_start
+            )
+        self.existing_bill_map.update(self._get_bill_keys(bills))
+        for bill_id in bills.values():
+            self.existing_cost_entry_map.load(bill_id)
+
+    def _read_first_row(self, reader):
+        """Read the first data row of a file.
+
+        Args:
+            reader (csv.reader): A reader positioned after the header row
+
+        Returns:
+            (list, iterator): The first prepared row, None for an empty
+                file, and the file's rows from the first one on
+
+        """
+        first_row = next((row for row in reader if row), None)
+        if first_row is None:
+            return None, reader
+        # Prepare a copy since _read_batches prepares the row it reads back
+        return self._projection.prepare(list(first_row)), chain([first_row], reader)
+
+    def _read_batches(self, reader, skip=0):
+        """Yield batches of prepared rows from a CSV reader.
+
+        Args:
+            reader (csv.reader): A reader positioned after the header row
+            skip (int): The number of rows to skip, saved by an earlier attempt
+
+        Returns:
+            (generator): Lists of at most batch size prepared rows
+
+        """
+        rows = []
+        for row in reader:
+            if not row:
+                continue
+            if skip:
+                skip -= 1
+                continue
+            rows.append(self._projection.prepare(row))
+            if len(rows) >= self._batch_size:
+                yield rows
+                rows = []
+        if rows:
+            yield rows
+
+    def _use_process_pool(self):
+        """Determine whether the file should be processed with a process pool."""
+        if self._workers <= 1:
+            return False
+        if multiprocessing.current_process().daemon:
+            LOG.warning('Processing %s serially since daemonic processes '
+                        'cannot start a process pool.', self._report_name)
+            return False
+        return True
+
+    def _process_rows(self, rows, report_db_accessor, row_count):
+        """Create and save the objects for a batch of report rows.
+
+        Args:
+            rows (list): Prepared list representations of CSV file rows
+            report_db_accessor (AWSReportDBAccessor): The report accessor
+            row_count (int): The number of rows already saved for the file
+
+        Returns:
+            (str): The cost entry bill id of the last row
+
+        """
+        report_db_accessor.wait_for_copy()
+        self._resolve_dimensions(rows, report_db_accessor)
+        self._save_batch_usage_ranges(rows, report_db_accessor)
+        return self._save_rows(rows, report_db_accessor, row_count)
+
+    def _save_batch_usage_ranges(self, rows, report_db_accessor):
+        """Record the usage dates of each bill in a batch of resolved rows."""
+        processed = self.processed_report
+
+        def usage_dates():
+            for row in rows:
+                bill_key = self._get_bill_key(row)
+                bill_id = processed.bills.get(bill_key, self.existing_bill_map.get(bill_key))
+                yield bill_id, self._projection.get(row, 'identity/TimeInterval')[:10]
+
+        self._save_usage_ranges(usage_dates(), AWS_CUR_TABLE_MAP['bill'], report_db_accessor)
+
+    def _save_rows(self, rows, report_db_accessor, row_count):
+        """Save the line items of a batch of rows with resolved dimensions.
+
+        Args:
+            rows (list): Prepared list representations of CSV file rows
+            report_db_accessor (AWSReportDBAccessor): The report accessor
+            row_count (int): The number of rows already saved for the file
+
+        Returns:
+            (str): The cost entry bill id of the last row
+
+        """
+        for row in rows:
+            bill_id = self.create_cost_entry_objects(row, report_db_accessor)
+
+        LOG.debug('Saving report rows %d to %d for %s', row_count,
+                  row_count + len(self.processed_report.line_items),
+                  self._report_name)
+        self._save_to_db(report_db_accessor, row_count + len(rows))
+        self._update_mappings()
+
+        return bill_id
+
+    def _process_in_parallel(self, batches, header, report_db_accessor, row_count=0):
+        """Process batches of rows with a pool of processes.
+
+        Dimensions are resolved here, one batch at a time, so that every
+        process shares the same bill, cost entry, product, pricing and
+        reservation ids. The pool processes build the line items of a
+        batch and COPY them in with their own database connections.
+        Batches finish out of order, so no checkpoint is saved for them.
+
+        Args:
+            batches (generator): Lists of prepared rows
+            header (list): The header row of the report
+            report_db_accessor (AWSReportDBAccessor): The report accessor
+            row_count (int): The number of rows already saved for the file
+
+        Returns:
+            (str): The cost entry bill id of the last row
+
+        """
+        bill_id = None
+        pending = set()
+        with ProcessPoolExecutor(max_workers=self._workers) as executor:
+            for rows in batches:
+                self._resolve_dimensions(rows, report_db_accessor)
+                self._save_batch_usage_ranges(rows, report_db_accessor)
+                self._update_mappings()
+                mappings = self._get_batch_mappings(rows)
+                bill_id = self.existing_bill_map[self._get_bill_key(rows[-1])]
+                for batch_bill_id in set(mappings['bills'].values()):
+                    self._get_line_item_table(batch_bill_id, report_db_accessor)
+
+                # Bound the number of batches held in memory at once
+                if len(pending) >= self._workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+
+                pending.add(executor.submit(
+                    _save_rows_in_worker,
+                    self._schema_name,
+                    self._report_path,
+                    self._compression,
+                    self._provider_id,
+                    header,
+                    rows,
+                    mappings,
+                    row_count,
+                    self._line_item_table,
+                    self._partition_staging
+                ))
+                row_count += len(rows)
+
+            for future in pending:
+                future.result()
+
+        LOG.info('Saved %d report rows for %s with %d processes.',
+                 row_count, self._report_name, self._workers)
+        return bill_id
+
+    def _get_batch_mappings(self, rows):
+        """Return the resolved dimension ids a batch of rows refers to.
+
+        Args:
+            rows (list): Prepared list representations of CSV file rows
+
+        Returns:
+            (dict): Dimension ids keyed on the processor's cache keys
+
+        """
+        mappings = {
+            'bills': {},
+            'cost_entries': {},
+            'products': {},
+            'pricing': {},
+            'reservations': {}
+        }
+        for row in rows:
+            bill_key = self._get_bill_key(row)
+            bill_id = self.existing_bill_map[bill_key]
+            mappings['bills'][bill_key] = bill_id
+
+            key, _ = self._get_cost_entry_key(row, bill_id)
+            mappings['cost_entries'][key] = self.existing_cost_entry_map[key]
+
+            key = self._get_product_key(row)
+            if key in self.existing_product_map:
+                mappings['products'][key] = self.existing_product_map[key]
+
+            key = self._get_pricing_key(row)
+            if key in self.existing_pricing_map:
+                mappings['pricing'][key] = self.existing_pricing_map[key]
+
+            key = self._projection.get(row, 'reservation/ReservationARN')
+            if key in self.existing_reservation_map:
+                mappings['reservations'][key] = self.existing_reservation_map[key]
+        return mappings
+
+    def _resolve_dimensions(self, rows, report_db_accessor):
+        """Resolve the ids of every unseen dimension in a batch of rows.
+
+        Bills are resolved first since cost entries are keyed on them.
+        Every table then costs one multi-row insert instead of one round
+        trip per unseen key. Reservation fee rows are left to
+        _create_cost_entry_reservation since they update existing rows.
+
+        Args:
+            rows (list): Prepared list representations of CSV file rows
+            report_db_accessor (AWSReportDBAccessor): The report accessor
+
+        Returns:
+            (None)
+
+        """
+        processed = self.processed_report
+        bills = {}
+        for row in rows:
+            key = self._get_bill_key(row)
+            if key not in processed.bills and key not in self.existing_bill_map:
+                bills.setdefault(key, row)
+        self._resolve_table(
+            AWS_CUR_TABLE_MAP['bill'],
+            {key: self._get_bill_data(row) for key, row in bills.items()},
+            processed.bills,
+            report_db_accessor,
+            conflict_columns=['bill_type', 'payer_account_id',
+                              'billing_period_start', 'provider_id']
+        )
+
+        cost_entries, products, pricing, reservations = self._get_pending_dimensions(rows)
+        self._resolve_table(AWS_CUR_TABLE_MAP['cost_entry'], cost_entries,
+                            processed.cost_entries, report_db_accessor)
+        self._resolve_table(AWS_CUR_TABLE_MAP['product'], products,
+                            processed.products, report_db_accessor,
+                            conflict_columns=['sku', 'product_name', 'region'])
+        self._resolve_table(AWS_CUR_TABLE_MAP['pricing'], pricing,
+                            processed.pricing, report_db_accessor)
+        self._resolve_table(AWS_CUR_TABLE_MAP['reservation'], reservations,
+                            processed.reservations, report_db_accessor,
+                            conflict_columns=['reservation_arn'])
+
+    def _get_pending_dimensions(self, rows):
+        """Collect the unseen cost entries, products, pricing and reservations of a batch.
+
+        Args:
+            rows (list): Prepared list representations of CSV file rows
+
+        Returns:
+            (tuple): The pending cost entry, product, pricing and
+                reservation data, each keyed on the processor's cache key
+
+        """
+        processed = self.processed_report
+        cost_entries, products, pricing, reservations = {}, {}, {}, {}
+        for row in rows:
+            bill_key = self._get_bill_key(row)
+            bill_id = processed.bills.get(bill_key, self.existing_bill_map.get(bill_key))
+            key, data = self._get_cost_entry_key(row, bill_id)
+            if key not in processed.cost_entries and key not in self.existing_cost_entry_map:
+                cost_entries.setdefault(key, data)
+
+            key = self._get_product_key(row)
+            if key not in processed.products and key not in self.existing_product_map:
+                self._add_pending_data(products, key, row, AWS_CUR_TABLE_MAP['product'])
+
+            key = self._get_pricing_key(row)
+            if key not in processed.pricing and key not in self.existing_pricing_map:
+                self._add_pending_data(pricing, key, row, AWS_CUR_TABLE_MAP['pricing'])
+
+            key = self._projection.get(row, 'reservation/ReservationARN')
+            line_item_type = self._projection.get(row, 'lineItem/LineItemType', '').lower()
+            if key not in processed.reservations and key not in self.existing_reservation_map \
+                    and line_item_type != 'rifee':
+                self._add_pending_data(reservations, key, row, AWS_CUR_TABLE_MAP['reservation'])
+        return cost_entries, products, pricing, reservations
+
+    def _add_pending_data(self, pending, key, row, table_name):
+        """Add a row's data for a table unless its key is pending or the data is empty."""
+        if key in pending:
+            return
+        data = self._get_data_for_table(row, table_name)
+        if set(data.values()) != {''}:
+            pending[key] = data
+
+    def _check_for_finalized_bill(self, row):
+        """Check the first row of the report file for finalization.
+
+        Args:
+            row (list): The first prepared row of the report file
 
         Returns:
             (Boolean): Whether the bill is finalized
 
         """
-        opener, mode = self._get_file_opener(self._compression)
-        # pylint: disable=invalid-name
-        with opener(self._report_path, mode) as f:
-            reader = csv.DictReader(f)
-            row = reader.__next__()
-            invoice_id = row.get('bill/InvoiceId')
-            return invoice_id is not None and invoice_id != ''
+        invoice_id = self._projection.get(row, 'bill/InvoiceId')
+        return invoice_id is not None and invoice_id != ''
 
     # pylint: disable=too-many-locals
     def remove_temp_cur_files(self, report_path, manifest_id):
@@ -221,20 +840,45 @@ class AWSReportProcessor(ReportProcessorBase):
             return gzip.open, 'rt'
         return open, 'r'    # assume uncompressed by default
 
-    def _save_to_db(self, report_db_accessor):
-        """Save current batch of records to the database."""
+    def _save_to_db(self, report_db_accessor, cursor_position=None):
+        """Save current batch of records to the database.
+
+        Args:
+            report_db_accessor (AWSReportDBAccessor): The report accessor
+            cursor_position (int): The number of rows of the file saved with
+                this batch, checkpointed in the same transaction as the COPY
+
+        Returns:
+            (None)
+
+        """
         columns = tuple(self.processed_report.line_items[0].keys())
-        csv_file = self._write_processed_rows_to_csv()
+        checkpoint = None
+        if cursor_position is not None:
+            checkpoint = self._get_checkpoint_args(cursor_position)
 
         # This will commit all pricing, products, and reservations
         # on the session
         report_db_accessor.commit()
-        # This will add line items to the line item table
-        report_db_accessor.bulk_insert_rows(
-            csv_file,
-            AWS_CUR_TABLE_MAP['line_item'],
-            columns
-        )
+        if self._partition_staging is None:
+            tables = {self._line_item_table: self.processed_report.line_items}
+        else:
+            tables = {}
+            for line_item in self.processed_report.line_items:
+                table = self._get_line_item_table(line_item['cost_entry_bill_id'],
+                                                  report_db_accessor)
+                tables.setdefault(table, []).append(line_item)
+
+        # This will stream line items into the line item table, the COPY
+        # finishing in the background while the next batch is read. The
+        # checkpoint is saved with the last table of the batch. The last
+        # table is queued whole so the next batch is parsed during its COPY.
+        for index, (table, line_items) in enumerate(tables.items()):
+            is_last = index == len(tables) - 1
+            with report_db_accessor.stream_rows(table, columns,
+                                                checkpoint=checkpoint if is_last else None,
+                                                max_chunks=0 if is_last else None) as stream:
+                self._write_processed_rows_to_csv(stream, line_items)
 
     def _delete_line_items(self):
         """Delete stale data for the report being processed, if necessary."""
@@ -264,6 +908,7 @@ class AWSReportProcessor(ReportProcessorBase):
 
     def _update_mappings(self):
         """Update cache of database objects for reference."""
+        self.existing_bill_map.update(self.processed_report.bills)
         self.existing_cost_entry_map.update(self.processed_report.cost_entries)
         self.existing_product_map.update(self.processed_report.products)
         self.existing_pricing_map.update(self.processed_report.pricing)
@@ -271,71 +916,83 @@ class AWSReportProcessor(ReportProcessorBase):
 
         self.processed_report.remove_processed_rows()
 
-    def _write_processed_rows_to_csv(self):
-        """Output CSV content to file stream object."""
-        values = [tuple(item.values())
-                  for item in self.processed_report.line_items]
+    def _write_processed_rows_to_csv(self, file_obj=None, line_items=None):
+        """Output CSV content to file stream object.
+
+        Args:
+            file_obj (file): An optional file-like object to write to.
+                An in-memory file is created and rewound if none is given.
+            line_items (list): The line items to write.
+                Default: every processed line item
+
+        Returns:
+            (file): The file-like object the rows were written to
 
-        file_obj = io.StringIO()
+        """
+        rewind = file_obj is None
+        if rewind:
+            file_obj = io.StringIO()
         writer = csv.writer(
             file_obj,
             delimiter='\t',
             quoting=csv.QUOTE_NONE,
             quotechar=''
         )
-        writer.writerows(values)
-        file_obj.seek(0)
+        if line_items is None:
+            line_items = self.processed_report.line_items
+        writer.writerows(item.values() for item in line_items)
+        if rewind:
+            file_obj.seek(0)
 
         return file_obj
 
+    def _compile_projection(self, header, report_db_accessor):
+        """Compile the column projection for a report header.
+
+        Args:
+            header (list): The column names from the first line of the report
+            report_db_accessor (AWSReportDBAccessor): The accessor used to
+                look up column types
+
+        Returns:
+            (ReportProjection): The compiled projection
+
+        """
+        converters = {}
+        column_types = report_db_accessor.report_schema.column_types
+        for table_name, types in column_types.items():
+            table_converters = report_db_accessor.get_column_converters(table_name)
+            converters[table_name] = {
+                column: table_converters[column]
+                for column, column_type in types.items()
+                if column_type in (int, float, Decimal)
+            }
+        return ReportProjection(header, self.column_map, converters)
+
     def _get_data_for_table(self, row, table_name):
         """Extract the data from a row for a specific table.
 
         Args:
-            row (dict): A dictionary representation of a CSV file row
+            row (list): A list representation of a CSV file row
             table_name (str): The DB table fields are required for
 
         Returns:
             (dict): The data from the row keyed on the DB table's column names
 
         """
-        # Memory can come as a single number or a number with a unit
-        # e.g. "1" vs. "1 Gb" so it gets special cased.
-        if 'product/memory' in row and row['product/memory'] is not None:
-            memory_list = row['product/memory'].split(' ')
-            if len(memory_list) > 1:
-                memory, unit = row['product/memory'].split(' ')
-            else:
-                memory = memory_list[0]
-                unit = None
-            row['product/memory'] = memory
-            row['product/memory_unit'] = unit
+        return self._projection.project(row, table_name)
 
-        column_map = self.column_map[table_name]
-
-        return {column_map[key]: value
-                for key, value in row.items()
-                if key in column_map}
-
-    # pylint: disable=no-self-use
-    def _process_tags(self, row, tag_prefix='resourceTags'):
+    def _process_tags(self, row):
         """Return a JSON string of AWS resource tags.
 
         Args:
-            row (dict): A dictionary representation of a CSV file row
-            tag_prefix (str): A specifier used to identify a value as a tag
+            row (list): A list representation of a CSV file row
 
         Returns:
             (str): A JSON string of AWS resource tags
 
         """
-        tag_dict = {}
-        for key, value in row.items():
-            if tag_prefix in key and row[key]:
-                key_value = key.split(':')
-                if len(key_value) > 1:
-                    tag_dict[key_value[-1]] = value
-        return json.dumps(tag_dict)
+        return self._projection.tags(row)
 
     # pylint: disable=no-self-use
     def _get_cost_entry_time_interval(self, interval):
@@ -351,31 +1008,62 @@ class AWSReportProcessor(ReportProcessorBase):
         start, end = interval.split('/')
         return start, end
 
+    def _get_bill_key(self, row):
+        """Return the cache key of the bill a row belongs to."""
+        return (self._projection.get(row, 'bill/BillType'),
+                self._projection.get(row, 'bill/PayerAccountId'),
+                self._projection.get(row, 'bill/BillingPeriodStartDate'),
+                self._provider_id)
+
+    def _get_bill_data(self, row):
+        """Return the data for the bill a row belongs to."""
+        data = self._get_data_for_table(row, AWS_CUR_TABLE_MAP['bill'])
+        data['provider_id'] = self._provider_id
+        return data
+
+    def _get_cost_entry_key(self, row, bill_id):
+        """Return the cache key and data of the cost entry of a row."""
+        interval = self._projection.get(row, 'identity/TimeInterval')
+        start, end = self._get_cost_entry_time_interval(interval)
+        data = {
+            'bill_id': bill_id,
+            'interval_start': start,
+            'interval_end': end
+        }
+        return (bill_id, start), data
+
+    def _get_product_key(self, row):
+        """Return the cache key of the product of a row."""
+        return (self._projection.get(row, 'product/sku'),
+                self._projection.get(row, 'product/ProductName'),
+                self._projection.get(row, 'product/region'))
+
+    def _get_pricing_key(self, row):
+        """Return the cache key of the pricing of a row."""
+        term = self._projection.get(row, 'pricing/term')
+        unit = self._projection.get(row, 'pricing/unit')
+        return '{term}-{unit}'.format(term=term if term else 'None',
+                                      unit=unit if unit else 'None')
+
     def _create_cost_entry_bill(self, row, report_db_accessor):
         """Create a cost entry bill object.
 
         Args:
-            row (dict): A dictionary representation of a CSV file row
+            row (list): A list representation of a CSV file row
 
         Returns:
             (str): A cost entry bill object id
 
         """
         table_name = AWS_CUR_TABLE_MAP['bill']
-        start_date = row.get('bill/BillingPeriodStartDate')
-        bill_type = row.get('bill/BillType')
-        payer_account_id = row.get('bill/PayerAccountId')
-
-        key = (bill_type, payer_account_id, start_date, self._provider_id)
+        key = self._get_bill_key(row)
         if key in self.processed_report.bills:
             return self.processed_report.bills[key]
 
         if key in self.existing_bill_map:
             return self.existing_bill_map[key]
 
-        data = self._get_data_for_table(row, table_name)
-
-        data['provider_id'] = self._provider_id
+        data = self._get_bill_data(row)
 
         bill_id = report_db_accessor.insert_on_conflict_do_nothing(
             table_name,
@@ -392,7 +1080,7 @@ class AWSReportProcessor(ReportProcessorBase):
         """Create a cost entry object.
 
         Args:
-            row (dict): A dictionary representation of a CSV file row
+            row (list): A list representation of a CSV file row
             bill_id (str): The current cost entry bill id
 
         Returns:
@@ -400,22 +1088,13 @@ class AWSReportProcessor(ReportProcessorBase):
 
         """
         table_name = AWS_CUR_TABLE_MAP['cost_entry']
-        interval = row.get('identity/TimeInterval')
-        start, end = self._get_cost_entry_time_interval(interval)
-
-        key = (bill_id, start)
+        key, data = self._get_cost_entry_key(row, bill_id)
         if key in self.processed_report.cost_entries:
             return self.processed_report.cost_entries[key]
 
         if key in self.existing_cost_entry_map:
             return self.existing_cost_entry_map[key]
 
-        data = {
-            'bill_id': bill_id,
-            'interval_start': start,
-            'interval_end': end
-        }
-
         cost_entry_id = report_db_accessor.insert_on_conflict_do_nothing(
             table_name,
             data
@@ -424,7 +1103,7 @@ class AWSReportProcessor(ReportProcessorBase):
 
         return cost_entry_id
 
-    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-arguments,unused-argument
     def _create_cost_entry_line_item(self,
                                      row,
                                      cost_entry_id,
@@ -436,7 +1115,7 @@ class AWSReportProcessor(ReportProcessorBase):
         """Create a cost entry line item object.
 
         Args:
-            row (dict): A dictionary representation of a CSV file row
+            row (list): A list representation of a CSV file row
             cost_entry_id (str): A processed cost entry object id
             bill_id (str): A processed cost entry bill object id
             product_id (str): A processed product object id
@@ -448,11 +1127,7 @@ class AWSReportProcessor(ReportProcessorBase):
 
         """
         table_name = AWS_CUR_TABLE_MAP['line_item']
-        data = self._get_data_for_table(row, table_name)
-        data = report_db_accesor.clean_data(
-            data,
-            table_name
-        )
+        data = self._projection.project_clean(row, table_name)
 
         data['tags'] = self._process_tags(row)
         data['cost_entry_id'] = cost_entry_id
@@ -470,18 +1145,14 @@ class AWSReportProcessor(ReportProcessorBase):
         """Create a cost entry pricing object.
 
         Args:
-            row (dict): A dictionary representation of a CSV file row
+            row (list): A list representation of a CSV file row
 
         Returns:
             (str): The DB id of the pricing object
 
         """
         table_name = AWS_CUR_TABLE_MAP['pricing']
-
-        term = row.get('pricing/term') if row.get('pricing/term') else 'None'
-        unit = row.get('pricing/unit') if row.get('pricing/unit') else 'None'
-
-        key = '{term}-{unit}'.format(term=term, unit=unit)
+        key = self._get_pricing_key(row)
         if key in self.processed_report.pricing:
             return self.processed_report.pricing[key]
 
@@ -508,18 +1179,14 @@ class AWSReportProcessor(ReportProcessorBase):
         """Create a cost entry product object.
 
         Args:
-            row (dict): A dictionary representation of a CSV file row
+            row (list): A list representation of a CSV file row
 
         Returns:
             (str): The DB id of the product object
 
         """
         table_name = AWS_CUR_TABLE_MAP['product']
-        sku = row.get('product/sku')
-        product_name = row.get('product/ProductName')
-        region = row.get('product/region')
-        key = (sku, product_name, region)
-
+        key = self._get_product_key(row)
         if key in self.processed_report.products:
             return self.processed_report.products[key]
 
@@ -547,15 +1214,15 @@ class AWSReportProcessor(ReportProcessorBase):
         """Create a cost entry reservation object.
 
         Args:
-            row (dict): A dictionary representation of a CSV file row
+            row (list): A list representation of a CSV file row
 
         Returns:
             (str): The DB id of the reservation object
 
         """
         table_name = AWS_CUR_TABLE_MAP['reservation']
-        arn = row.get('reservation/ReservationARN')
-        line_item_type = row.get('lineItem/LineItemType', '').lower()
+        arn = self._projection.get(row, 'reservation/ReservationARN')
+        line_item_type = self._projection.get(row, 'lineItem/LineItemType', '').lower()
         reservation_id = None
 
         if arn in self.processed_report.reservations:
@@ -610,3 +1277,76 @@ class AWSReportProcessor(ReportProcessorBase):
         )
 
         return bill_id
+
+
+# pylint: disable=global-statement
+def _use_worker_connection_pool():
+    """Give a pool process a connection pool of its own, once.
+
+    The pool inherited from the parent process is set aside instead of
+    disposed, since closing its connections would close them for the
+    parent as well. Pool processes exit without garbage collecting it.
+    """
+    global _WORKER_POOL_PID
+    if _WORKER_POOL_PID == getpid():
+        return
+    _PARENT_POOLS.append(DB_ENGINE.pool)
+    DB_ENGINE.pool = DB_ENGINE.pool.recreate()
+    _WORKER_POOL_PID = getpid()
+
+
+# pylint: disable=too-many-arguments,protected-access,global-statement
+def _save_rows_in_worker(schema_name, report_path, compression, provider_id,
+                         header, rows, mappings, row_count,
+                         line_item_table=AWS_CUR_TABLE_MAP['line_item'],
+                         partition_staging=None):
+    """Save a batch of rows from a process pool worker.
+
+    The processor for a report file is created once per pool process and
+    reused for the rest of the batches of that file it receives.
+
+    Args:
+        schema_name (str): The name of the customer schema to process into
+        report_path (str): Where the report file lives in the file system
+        compression (CONST): How the report file is compressed.
+        provider_id (int): The provider the report belongs to
+        header (list): The header row of the report
+        rows (list): Prepared list representations of CSV file rows
+        mappings (dict): The resolved dimension ids the rows refer to
+        row_count (int): The number of rows before this batch in the file
+        line_item_table (str): The table line items are saved to
+        partition_staging (dict): The staging tables line items are saved
+            to keyed on bill id, when loading partitions
+
+    Returns:
+        (int): The number of rows saved
+
+    """
+    global _WORKER_PROCESSOR
+    _use_worker_connection_pool()
+    processor = _WORKER_PROCESSOR
+    if processor is None or processor._report_path != report_path \
+            or processor._schema_name != schema_name:
+        processor = AWSReportProcessor(
+            schema_name=schema_name,
+            report_path=report_path,
+            compression=compression,
+            provider_id=provider_id
+        )
+        _WORKER_PROCESSOR = processor
+
+    processor._line_item_table = line_item_table
+    processor._partition_staging = partition_staging
+    processor.existing_bill_map.update(mappings['bills'])
+    processor.existing_cost_entry_map.update(mappings['cost_entries'])
+    processor.existing_product_map.update(mappings['products'])
+    processor.existing_pricing_map.update(mappings['pricing'])
+    processor.existing_reservation_map.update(mappings['reservations'])
+
+    with AWSReportDBAccessor(schema_name, processor.column_map) as report_db:
+        if processor._projection is None:
+            processor._projection = processor._compile_projection(header, report_db)
+        processor._save_rows(rows, report_db, row_count)
+        report_db.wait_for_copy()
+
+    return len(rows)
@@ -20,10 +20,13 @@ import calendar
 import datetime
 import logging
 
+from masu.config import Config
+from masu.database import AWS_CUR_TABLE_MAP
 from masu.database.aws_report_db_accessor import AWSReportDBAccessor
-from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
+from masu.database.reporting_common_db_accessor import get_column_map
 from masu.external.date_accessor import DateAccessor
 from masu.util.aws.common import get_bills_from_provider
+from masu.util.common import merge_date_ranges
 
 LOG = logging.getLogger(__name__)
 
@@ -41,9 +44,10 @@ class AWSReportSummaryUpdater:
         self._schema_name = schema
         self._provider = provider
         self._manifest = manifest
-        with ReportingCommonDBAccessor() as reporting_common:
-            self._column_map = reporting_common.column_map
+        self._column_map = get_column_map()
         self._date_accessor = DateAccessor()
+        self._summary_ranges = None
+        self._dirty_range_id = None
 
     def update_daily_tables(self, start_date, end_date):
         """Populate the daily tables for reporting.
@@ -69,7 +73,9 @@ class AWSReportSummaryUpdater:
                  '\n\tProvider: %s \n\tDates: %s - %s',
                  self._schema_name, self._provider.uuid, start_date, end_date)
         with AWSReportDBAccessor(self._schema_name, self._column_map) as accessor:
-            accessor.populate_line_item_daily_table(start_date, end_date, bill_ids)
+            for range_start, range_end in self._get_summary_ranges(
+                    accessor, start_date, end_date, bill_ids):
+                accessor.populate_line_item_daily_table(range_start, range_end, bill_ids)
 
         return start_date, end_date
 
@@ -105,8 +111,11 @@ class AWSReportSummaryUpdater:
             LOG.info('Updating AWS report summary tables: \n\tSchema: %s'
                      '\n\tProvider: %s \n\tDates: %s - %s',
                      self._schema_name, self._provider.uuid, start_date, end_date)
-            accessor.populate_line_item_daily_summary_table(start_date, end_date, bill_ids)
-            accessor.populate_tags_summary_table()
+            for range_start, range_end in self._get_summary_ranges(
+                    accessor, start_date, end_date, bill_ids):
+                accessor.populate_line_item_daily_summary_table(range_start, range_end,
+                                                                bill_ids)
+            self._update_tags_summary_table(accessor, start_date, end_date, bill_ids)
 
             for bill in bills:
                 if bill.summary_data_creation_datetime is None:
@@ -116,8 +125,70 @@ class AWSReportSummaryUpdater:
                     self._date_accessor.today_with_timezone('UTC')
 
             accessor.commit()
+            if self._dirty_range_id is not None:
+                accessor.clear_dirty_ranges(AWS_CUR_TABLE_MAP['bill'], bill_ids,
+                                            self._dirty_range_id)
         return start_date, end_date
 
+    def _update_tags_summary_table(self, accessor, start_date, end_date, bill_ids):
+        """Merge the tags of the summarized dates into the tag summary.
+
+        Summaries without a manifest, such as those requested through the
+        API, rebuild the tag summary from every daily row instead.
+        """
+        if not self._manifest:
+            accessor.populate_tags_summary_table()
+            return
+        for range_start, range_end in self._get_summary_ranges(
+                accessor, start_date, end_date, bill_ids):
+            accessor.populate_tags_summary_table(range_start, range_end)
+
+    def _get_summary_ranges(self, accessor, start_date, end_date, bill_ids):
+        """Return the date ranges the daily and summary tables are rebuilt for.
+
+        When the dates touched by processing are recorded, only those dates
+        within the start and end date are rebuilt. Otherwise the whole range
+        is. The ranges are read once and reused by the summary update.
+
+        Args:
+            accessor (AWSReportDBAccessor): The report accessor
+            start_date (str) The date to start populating the table.
+            end_date   (str) The date to end on.
+            bill_ids (list): The bills being summarized
+
+        Returns
+            ([]) (start date, end date) string pairs.
+
+        """
+        if self._summary_ranges is not None:
+            return self._summary_ranges
+
+        self._summary_ranges = [(start_date, end_date)]
+        if not (Config.INCREMENTAL_SUMMARY and self._manifest and bill_ids):
+            return self._summary_ranges
+
+        last_id, ranges = accessor.get_dirty_ranges(AWS_CUR_TABLE_MAP['bill'], bill_ids)
+        if last_id is None:
+            LOG.info('No processed dates recorded for bills %s, summarizing %s - %s.',
+                     bill_ids, start_date, end_date)
+            return self._summary_ranges
+
+        start = datetime.datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.datetime.strptime(end_date, '%Y-%m-%d').date()
+        merged = merge_date_ranges(ranges, start, end)
+        total_days = (end - start).days + 1
+        dirty_days = sum((range_end - range_start).days + 1
+                         for range_start, range_end in merged)
+        LOG.info('Summarizing %d of %d days from %s - %s for schema %s, '
+                 'skipping %d unchanged days.', dirty_days, total_days,
+                 start_date, end_date, self._schema_name, total_days - dirty_days)
+
+        self._dirty_range_id = last_id
+        self._summary_ranges = [(range_start.strftime('%Y-%m-%d'),
+                                 range_end.strftime('%Y-%m-%d'))
+                                for range_start, range_end in merged]
+        return self._summary_ranges
+
     def _get_sql_inputs(self, start_date, end_date):
         """Get the required inputs for running summary SQL."""
         with AWSReportDBAccessor(self._schema_name, self._column_map) as accessor:
@@ -0,0 +1,120 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Bounded caches of report dimension ids."""
+
+from collections import OrderedDict
+
+
+def _single_scope(key):  # pylint: disable=unused-argument
+    """Place every key in the same scope."""
+    return None
+
+
+class DimensionCache:
+    """A bounded mapping of report dimension keys to their database ids.
+
+    Once full, the least recently used entries are evicted. A loader may be
+    given to fill the cache lazily: the first lookup of a key in a scope
+    that has not been seen yet loads every id of that scope at once, for
+    example all of the cost entries of one bill.
+
+    A key missing from a loaded scope is taken to be missing from the
+    database, so the entries of loaded scopes are never evicted.
+    """
+
+    def __init__(self, maxsize, loader=None, scope=None):
+        """Initialize the cache.
+
+        Args:
+            maxsize (int): The number of entries of scopes that are not
+                loaded kept before evicting
+            loader (callable): Called with a scope, returns a dict of ids
+                keyed like the cache for every entry of that scope
+            scope (callable): Called with a key, returns its scope.
+                Default: every key is in the same scope
+
+        """
+        self.maxsize = maxsize
+        self._loader = loader
+        self._scope = scope if scope else _single_scope
+        self._entries = OrderedDict()
+        self._loaded_entries = {}
+        self._loaded_scopes = set()
+
+    def load(self, scope):
+        """Load the ids of a scope, if it has not been loaded already."""
+        if self._loader is None or scope in self._loaded_scopes:
+            return
+        self._loaded_scopes.add(scope)
+        self.update(self._loader(scope))
+
+    def _lookup(self, key):
+        """Return whether a key is cached, loading its scope if needed."""
+        self.load(self._scope(key))
+        if key in self._loaded_entries:
+            return True
+        if key not in self._entries:
+            return False
+        self._entries.move_to_end(key)
+        return True
+
+    def get(self, key, default=None):
+        """Return the id of a key or default if it is not cached."""
+        if not self._lookup(key):
+            return default
+        return self[key]
+
+    def update(self, entries):
+        """Add a dict of ids to the cache."""
+        for key, value in entries.items():
+            self[key] = value
+
+    def values(self):
+        """Return the cached ids."""
+        return list(self._loaded_entries.values()) + list(self._entries.values())
+
+    def clear(self):
+        """Empty the cache and forget which scopes were loaded."""
+        self._entries.clear()
+        self._loaded_entries.clear()
+        self._loaded_scopes.clear()
+
+    def __contains__(self, key):
+        """Return whether a key is cached, loading its scope if needed."""
+        return self._lookup(key)
+
+    def __getitem__(self, key):
+        """Return the id of a key, loading its scope if needed."""
+        self._lookup(key)
+        if key in self._loaded_entries:
+            return self._loaded_entries[key]
+        return self._entries[key]
+
+    def __setitem__(self, key, value):
+        """Cache the id of a key, evicting the least recently used entries."""
+        if self._loader is not None and self._scope(key) in self._loaded_scopes:
+            self._entries.pop(key, None)
+            self._loaded_entries[key] = value
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        """Return the number of cached ids."""
+        return len(self._loaded_entries) + len(self._entries)
@@ -0,0 +1,75 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Compact sets of line item conflict keys."""
+from enum import Enum
+
+
+class KeyStatus(Enum):
+    """The result of recording a line item key."""
+
+    NEW = 1
+    DUPLICATE = 2
+    UNCONFIRMED = 3
+
+
+class LineItemKeySet:
+    """The conflict keys of the line items of a report file.
+
+    Only a 64-bit hash of each key is kept for the whole file. Full keys
+    are kept for the current batch so that a matching hash can be
+    confirmed as a duplicate. Any other matching hash is reported as
+    unconfirmed. The line item is then checked against the database row
+    with its key instead of being dropped, so a key that only collides
+    with an earlier one is still saved.
+    """
+
+    def __init__(self):
+        """Initialize the key set."""
+        self._hashes = set()
+        self._batch_keys = {}
+
+    def add(self, key):
+        """Record a key.
+
+        Args:
+            key (tuple): The conflict column values of a line item
+
+        Returns:
+            (KeyStatus): NEW for a key not seen before, DUPLICATE for a key
+                seen earlier in the batch, UNCONFIRMED for any other key
+                whose hash was seen before
+
+        """
+        key_hash = hash(key)
+        if key_hash not in self._hashes:
+            self._hashes.add(key_hash)
+            self._batch_keys[key_hash] = key
+            return KeyStatus.NEW
+
+        if self._batch_keys.get(key_hash) == key:
+            return KeyStatus.DUPLICATE
+
+        self._batch_keys[key_hash] = key
+        return KeyStatus.UNCONFIRMED
+
+    def release_batch(self):
+        """Forget the full keys of the current batch, keeping their hashes."""
+        self._batch_keys = {}
+
+    def __len__(self):
+        """Return the number of distinct key hashes."""
+        return len(self._hashes)
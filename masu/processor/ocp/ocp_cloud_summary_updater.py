@@ -21,7 +21,7 @@ import logging
 
 from masu.database.aws_report_db_accessor import AWSReportDBAccessor
 from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
-from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
+from masu.database.reporting_common_db_accessor import get_column_map
 from masu.external.date_accessor import DateAccessor
 from masu.util.aws.common import get_bills_from_provider
 from masu.util.ocp.common import get_cluster_id_from_provider
@@ -41,8 +41,7 @@ class OCPCloudReportSummaryUpdater:
         self._schema_name = schema
         self._provider = provider
         self._manifest = manifest
-        with ReportingCommonDBAccessor() as reporting_common:
-            self._column_map = reporting_common.column_map
+        self._column_map = get_column_map()
         self._date_accessor = DateAccessor()
 
     def update_summary_tables(self, start_date, end_date):
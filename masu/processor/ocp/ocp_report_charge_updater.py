@@ -23,7 +23,7 @@ from decimal import Decimal
 
 from masu.database.ocp_rate_db_accessor import OCPRateDBAccessor
 from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
-from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
+from masu.database.reporting_common_db_accessor import get_column_map
 from masu.util.ocp.common import get_cluster_id_from_provider
 
 LOG = logging.getLogger(__name__)
@@ -44,8 +44,7 @@ class OCPReportChargeUpdater:
             schema (str): The customer schema to associate with
         """
         self._schema = schema
-        with ReportingCommonDBAccessor() as reporting_common:
-            self._column_map = reporting_common.column_map
+        self._column_map = get_column_map()
         self._provider_uuid = provider_uuid
         self._cluster_id = None
 
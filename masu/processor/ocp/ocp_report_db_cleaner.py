@@ -18,8 +18,9 @@
 
 import logging
 
+from masu.database import OCP_REPORT_TABLE_MAP
 from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
-from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
+from masu.database.reporting_common_db_accessor import get_column_map
 
 LOG = logging.getLogger(__name__)
 
@@ -54,8 +55,7 @@ class OCPReportDBCleaner():
             ([{}]) List of dictionaries containing 'usage_period_id' and 'interval_start'
 
         """
-        with ReportingCommonDBAccessor() as reporting_common:
-            column_map = reporting_common.column_map
+        column_map = get_column_map()
 
         with OCPReportDBAccessor(self._schema, column_map) as accessor:
             if ((expired_date is not None and provider_id is not None) or  # noqa: W504
@@ -68,15 +68,23 @@ class OCPReportDBCleaner():
                 usage_period_objs = accessor.get_usage_period_before_date(expired_date)
             else:
                 usage_period_objs = accessor.get_usage_period_query_by_provider(provider_id)
+
+            partitioned_tables = self._get_partitioned_tables(accessor)
+            if partitioned_tables and not simulate:
+                # Whole partitions are dropped instead of deleting line items,
+                # before the session takes locks that detaching would wait on
+                self._drop_partitions(accessor, usage_period_objs, partitioned_tables)
+
             for usage_period in usage_period_objs.all():
                 report_period_id = usage_period.id
                 cluster_id = usage_period.cluster_id
                 removed_usage_start_period = usage_period.report_period_start
 
                 if not simulate:
-                    qty = accessor.get_item_query_report_period_id(report_period_id).delete()
-                    LOG.info('Removing %s usage period line items for usage period id %s',
-                             qty, report_period_id)
+                    if OCP_REPORT_TABLE_MAP['line_item'] not in partitioned_tables:
+                        qty = accessor.get_item_query_report_period_id(report_period_id).delete()
+                        LOG.info('Removing %s usage period line items for usage period id %s',
+                                 qty, report_period_id)
 
                     qty = accessor.get_daily_usage_query_for_clusterid(cluster_id).delete()
                     LOG.info('Removing %s usage daily items for cluster id %s',
@@ -90,10 +98,12 @@ class OCPReportDBCleaner():
                     LOG.info('Removing %s cost summary items for cluster id %s',
                              qty, cluster_id)
 
-                    qty = accessor.get_storage_item_query_report_period_id(report_period_id).\
-                        delete()
-                    LOG.info('Removing %s storage line items for usage period id %s',
-                             qty, report_period_id)
+                    if OCP_REPORT_TABLE_MAP['storage_line_item'] not in partitioned_tables:
+                        qty = accessor.get_storage_item_query_report_period_id(
+                            report_period_id
+                        ).delete()
+                        LOG.info('Removing %s storage line items for usage period id %s',
+                                 qty, report_period_id)
 
                     qty = accessor.get_daily_storage_item_query_cluster_id(cluster_id).\
                         delete()
@@ -105,6 +115,10 @@ class OCPReportDBCleaner():
                     LOG.info('Removing %s storage summary for cluster id %s',
                              qty, cluster_id)
 
+                    qty = accessor.delete_node_capacity(report_period_id)
+                    LOG.info('Removing %s node capacity items for usage period id %s',
+                             qty, report_period_id)
+
                     qty = accessor.get_report_query_report_period_id(report_period_id).delete()
                     LOG.info('Removing %s usage period items for usage period id %s',
                              qty, report_period_id)
@@ -127,3 +141,23 @@ class OCPReportDBCleaner():
                 usage_period_objs.delete()
                 accessor.commit()
         return removed_items
+
+    @staticmethod
+    def _get_partitioned_tables(accessor):
+        """Return the line item tables that are partitioned by report period."""
+        return [
+            table_name for table_name in (OCP_REPORT_TABLE_MAP['line_item'],
+                                          OCP_REPORT_TABLE_MAP['storage_line_item'])
+            if accessor.is_partitioned(table_name)
+        ]
+
+    @staticmethod
+    def _drop_partitions(accessor, usage_period_objs, partitioned_tables):
+        """Drop the line item partitions of the usage periods."""
+        report_period_ids = [usage_period.id for usage_period in usage_period_objs.all()]
+        accessor.commit()
+        for report_period_id in report_period_ids:
+            for table_name in partitioned_tables:
+                if accessor.drop_partition(table_name, report_period_id):
+                    LOG.info('Removed the %s partition of usage period id %s',
+                             table_name, report_period_id)
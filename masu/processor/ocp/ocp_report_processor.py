@@ -26,21 +26,31 @@ import gzip
 import io
 import json
 import logging
-from datetime import datetime
+import threading
+from datetime import datetime, timezone
 from enum import Enum
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
 from os import listdir, path, remove
 
 from masu.config import Config
 from masu.database import OCP_REPORT_TABLE_MAP
 from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
 from masu.database.report_stats_db_accessor import ReportStatsDBAccessor
-from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
+from masu.database.reporting_common_db_accessor import get_column_map
 from masu.external import GZIP_COMPRESSED
+from masu.processor.dimension_cache import DimensionCache
+from masu.processor.line_item_keys import KeyStatus, LineItemKeySet
 from masu.processor.report_processor_base import ReportProcessorBase
 from masu.util.common import extract_uuids_from_string
 
 LOG = logging.getLogger(__name__)
 
+# The line item tables loaded through partition staging tables
+OCP_PARTITIONED_TABLES = (OCP_REPORT_TABLE_MAP['line_item'],
+                          OCP_REPORT_TABLE_MAP['storage_line_item'])
+
 
 class OCPReportProcessorError(Exception):
     """OCPReportProcessor Error."""
@@ -65,13 +75,51 @@ class ProcessedOCPReport:
         self.report_periods = {}
         self.reports = {}
         self.line_items = []
-        self.line_item_keys = {}
+        self.line_item_keys = LineItemKeySet()
 
     def remove_processed_rows(self):
         """Clear a batch of rows from their containers."""
         self.report_periods = {}
         self.reports = {}
         self.line_items = []
+        self.line_item_keys.release_batch()
+
+
+class SharedOCPDimensions:
+    """Report period and report ids shared by the processors of a manifest.
+
+    The files of a manifest processed at the same time resolve the same
+    report periods and reports. Holding the lock while resolving them
+    lets each one be inserted once and keeps the inserts of two files
+    from waiting on each other.
+    """
+
+    def __init__(self):
+        """Initialize the shared ids."""
+        self.lock = threading.Lock()
+        self.report_periods = {}
+        self.reports = {}
+
+
+def detect_report_type(report_path):
+    """Detect the OCP report type of a file from its header.
+
+    Args:
+        report_path (str): Where the report file lives in the file system
+
+    Returns:
+        (OCPReportTypes): The type of the report
+
+    """
+    report_type = OCPReportTypes.UNKNOWN
+    with open(report_path) as report_file:
+        reader = csv.reader(report_file)
+        column_names = next(reader)
+        if sorted(column_names) == sorted(OCPReportProcessor.storage_columns):
+            report_type = OCPReportTypes.STORAGE
+        elif sorted(column_names) == sorted(OCPReportProcessor.cpu_mem_usage_columns):
+            report_type = OCPReportTypes.CPU_MEM_USAGE
+    return report_type
 
 
 class OCPReportProcessor():
@@ -94,7 +142,9 @@ class OCPReportProcessor():
                              'node_capacity_memory_bytes', 'node_capacity_memory_byte_seconds',
                              'pod_labels']
 
-    def __init__(self, schema_name, report_path, compression, provider_id):
+    # pylint: disable=too-many-arguments
+    def __init__(self, schema_name, report_path, compression, provider_id, manifest_id=None,
+                 shared_dimensions=None):
         """Initialize the report processor.
 
         Args:
@@ -102,30 +152,26 @@ class OCPReportProcessor():
             report_path (str): Where the report file lives in the file system
             compression (CONST): How the report file is compressed.
                 Accepted values: UNCOMPRESSED, GZIP_COMPRESSED
+            shared_dimensions (SharedOCPDimensions): Ids shared with the
+                processors of the manifest's other files
 
         """
         self._processor = None
         self.report_type = self._detect_report_type(report_path)
         if self.report_type == OCPReportTypes.CPU_MEM_USAGE:
             self._processor = OCPCpuMemReportProcessor(schema_name, report_path,
-                                                       compression, provider_id)
+                                                       compression, provider_id,
+                                                       manifest_id, shared_dimensions)
         elif self.report_type == OCPReportTypes.STORAGE:
             self._processor = OCPStorageProcessor(schema_name, report_path,
-                                                  compression, provider_id)
+                                                  compression, provider_id,
+                                                  manifest_id, shared_dimensions)
         elif self.report_type == OCPReportTypes.UNKNOWN:
             raise OCPReportProcessorError('Unknown OCP report type.')
 
-    def _detect_report_type(self, report_path):
+    def _detect_report_type(self, report_path):  # pylint: disable=no-self-use
         """Detect OCP report type."""
-        report_type = OCPReportTypes.UNKNOWN
-        with open(report_path) as report_file:
-            reader = csv.reader(report_file)
-            column_names = next(reader)
-            if sorted(column_names) == sorted(self.storage_columns):
-                report_type = OCPReportTypes.STORAGE
-            elif sorted(column_names) == sorted(self.cpu_mem_usage_columns):
-                report_type = OCPReportTypes.CPU_MEM_USAGE
-        return report_type
+        return detect_report_type(report_path)
 
     def process(self):
         """Process report file."""
@@ -170,13 +216,16 @@ class OCPReportProcessor():
 class OCPReportProcessorBase(ReportProcessorBase):
     """Base class for OCP report processing."""
 
-    def __init__(self, schema_name, report_path, compression, provider_id):
+    # pylint: disable=too-many-arguments
+    def __init__(self, schema_name, report_path, compression, provider_id, manifest_id=None,
+                 shared_dimensions=None):
         """Initialize base class."""
         super().__init__(
             schema_name=schema_name,
             report_path=report_path,
             compression=compression,
-            provider_id=provider_id
+            provider_id=provider_id,
+            manifest_id=manifest_id
         )
 
         self._report_name = path.basename(report_path)
@@ -184,17 +233,56 @@ class OCPReportProcessorBase(ReportProcessorBase):
 
         self._datetime_format = Config.OCP_DATETIME_STR_FORMAT
         self._batch_size = Config.REPORT_PROCESSING_BATCH_SIZE
+        self._merge_batch_count = Config.OCP_MERGE_BATCH_COUNT
+        self._pending_batch_count = 0
+        self._pending_cursor_position = None
+        self._unconfirmed_line_items = []
+        self._unconfirmed_table = None
+        self._partition_staging = None
+        self._pending_report_period_ids = set()
+        self._shared_dimensions = shared_dimensions
+
+        self.column_map = get_column_map()
+
+        # Existing ids are loaded lazily, a report period at a time
+        cache_size = Config.REPORT_PROCESSING_CACHE_SIZE
+        self.existing_report_periods_map = DimensionCache(
+            cache_size,
+            loader=self._load_report_periods
+        )
+        self.existing_report_map = DimensionCache(
+            cache_size,
+            loader=self._load_reports,
+            scope=itemgetter(0)
+        )
 
-        with ReportingCommonDBAccessor() as report_common_db:
-            self.column_map = report_common_db.column_map
-
-        with OCPReportDBAccessor(self._schema_name, self.column_map) as report_db:
-            self.existing_report_periods_map = report_db.get_report_periods()
-            self.existing_report_map = report_db.get_reports()
+        # Label and timestamp strings repeat for every hour of a pod, so
+        # their parsed values are memoized for the whole file.
+        parse_cache_size = Config.OCP_PARSE_CACHE_SIZE
+        self._parse_labels = lru_cache(maxsize=parse_cache_size)(self._parse_labels)
+        self._parse_datetime = lru_cache(maxsize=parse_cache_size)(self._parse_datetime)
 
         self.line_item_columns = None
         self.processed_report = ProcessedOCPReport()
 
+    def _load_report_periods(self, _):
+        """Load the ids of the report periods of the provider."""
+        with OCPReportDBAccessor(self._schema_name, self.column_map) as report_db:
+            periods = report_db.get_report_periods(provider_id=self._provider_id)
+        return {
+            (cluster_id, start.astimezone(timezone.utc).replace(tzinfo=None), provider_id): period_id
+            for (cluster_id, start, provider_id), period_id in periods.items()
+        }
+
+    def _load_reports(self, report_period_id):
+        """Load the ids of the reports of a report period."""
+        with OCPReportDBAccessor(self._schema_name, self.column_map) as report_db:
+            reports = report_db.get_reports(report_period_id=report_period_id)
+        return {
+            (period_id, datetime.strptime(start, self._datetime_format)): report_id
+            for (period_id, start), report_id in reports.items()
+        }
+
     def _get_file_opener(self, compression):
         """Get the file opener for the file's compression.
 
@@ -227,6 +315,29 @@ class OCPReportProcessorBase(ReportProcessorBase):
                 for key, value in row.items()
                 if key in column_map}
 
+    def _get_report_key(self, row, report_period_id):
+        """Return the cache key and data of the report of a row."""
+        start = self._parse_datetime(row.get('interval_start'))
+        end = self._parse_datetime(row.get('interval_end'))
+        data = {
+            'report_period_id': report_period_id,
+            'interval_start': start,
+            'interval_end': end
+        }
+        return (report_period_id, start), data
+
+    def _get_report_period_key(self, row, cluster_id):
+        """Return the cache key and data of the report period of a row."""
+        start = self._parse_datetime(row.get('report_period_start'))
+        end = self._parse_datetime(row.get('report_period_end'))
+        data = {
+            'cluster_id': cluster_id,
+            'report_period_start': start,
+            'report_period_end': end,
+            'provider_id': self._provider_id
+        }
+        return (cluster_id, start, self._provider_id), data
+
     def _create_report(self, row, report_period_id, report_db_accessor):
         """Create a report object.
 
@@ -239,21 +350,13 @@ class OCPReportProcessorBase(ReportProcessorBase):
 
         """
         table_name = OCP_REPORT_TABLE_MAP['report']
-        start = datetime.strptime(row.get('interval_start'), Config.OCP_DATETIME_STR_FORMAT)
-        end = datetime.strptime(row.get('interval_end'), Config.OCP_DATETIME_STR_FORMAT)
-
-        key = (report_period_id, start)
+        key, data = self._get_report_key(row, report_period_id)
         if key in self.processed_report.reports:
             return self.processed_report.reports[key]
 
         if key in self.existing_report_map:
             return self.existing_report_map[key]
 
-        data = {
-            'report_period_id': report_period_id,
-            'interval_start': start,
-            'interval_end': end
-        }
         report_id = report_db_accessor.insert_on_conflict_do_nothing(
             table_name,
             data,
@@ -276,23 +379,13 @@ class OCPReportProcessorBase(ReportProcessorBase):
 
         """
         table_name = OCP_REPORT_TABLE_MAP['report_period']
-        start = datetime.strptime(row.get('report_period_start'), Config.OCP_DATETIME_STR_FORMAT)
-        end = datetime.strptime(row.get('report_period_end'), Config.OCP_DATETIME_STR_FORMAT)
-
-        key = (cluster_id, start, self._provider_id)
+        key, data = self._get_report_period_key(row, cluster_id)
         if key in self.processed_report.report_periods:
             return self.processed_report.report_periods[key]
 
         if key in self.existing_report_periods_map:
             return self.existing_report_periods_map[key]
 
-        data = {
-            'cluster_id': cluster_id,
-            'report_period_start': start,
-            'report_period_end': end,
-            'provider_id': self._provider_id
-        }
-
         report_period_id = report_db_accessor.insert_on_conflict_do_nothing(
             table_name,
             data,
@@ -303,6 +396,10 @@ class OCPReportProcessorBase(ReportProcessorBase):
 
         return report_period_id
 
+    def _parse_datetime(self, value):
+        """Parse a report timestamp string, memoized per file."""
+        return datetime.strptime(value, Config.OCP_DATETIME_STR_FORMAT)
+
     def _process_pod_labels(self, label_string):
         """Convert the report string to a JSON dictionary.
 
@@ -313,6 +410,10 @@ class OCPReportProcessorBase(ReportProcessorBase):
             (dict): The JSON dictionary made from the label string
 
         """
+        return self._parse_labels(label_string)
+
+    def _parse_labels(self, label_string):
+        """Convert a label string to JSON, memoized per file."""
         labels = label_string.split('|') if label_string else []
         label_dict = {}
 
@@ -328,36 +429,208 @@ class OCPReportProcessorBase(ReportProcessorBase):
 
         return json.dumps(label_dict)
 
-    def _write_processed_rows_to_csv(self):
-        """Output CSV content to file stream object."""
-        values = [tuple(item.values())
-                  for item in self.processed_report.line_items]
+    def _write_processed_rows_to_csv(self, file_obj=None, line_items=None):
+        """Output CSV content to file stream object.
+
+        Args:
+            file_obj (file): An optional file-like object to write to.
+                An in-memory file is created and rewound if none is given.
+            line_items (list): The line items to write.
+                Default: the line items of the current batch
+
+        Returns:
+            (file): The file-like object the rows were written to
 
-        file_obj = io.StringIO()
+        """
+        rewind = file_obj is None
+        if rewind:
+            file_obj = io.StringIO()
         writer = csv.writer(
             file_obj,
             delimiter='\t',
             quoting=csv.QUOTE_NONE,
             quotechar=''
         )
-        writer.writerows(values)
-        file_obj.seek(0)
+        if line_items is None:
+            line_items = self.processed_report.line_items
+        writer.writerows(item.values() for item in line_items)
+        if rewind:
+            file_obj.seek(0)
 
         return file_obj
 
-    def _save_to_db(self, temp_table, report_db_accessor):
+    def _save_to_db(self, temp_table, report_db_accessor, cursor_position=None):
         """Save current batch of records to the database."""
         columns = tuple(self.processed_report.line_items[0].keys())
-        csv_file = self._write_processed_rows_to_csv()
 
         # This will commit all pricing, products, and reservations
         # on the session
         report_db_accessor.commit()
 
+        # The batch is queued whole so the next batch is parsed during its COPY
+        with report_db_accessor.stream_rows(temp_table, columns, max_chunks=0) as stream:
+            self._write_processed_rows_to_csv(stream)
+        self._pending_batch_count += 1
+        self._pending_cursor_position = cursor_position
+        if self._partition_staging is not None:
+            self._pending_report_period_ids.update(
+                line_item['report_period_id'] for line_item in self.processed_report.line_items
+            )
+
+    def _merge_temp_table(self, temp_table, report_db_accessor):
+        """Merge the rows streamed into the temp table into the line item table.
+
+        The checkpoint of the streamed rows is saved in the same transaction
+        as the merge, since rows only in the temp table are lost on a crash.
+        """
+        report_db_accessor.wait_for_copy()
+        if not self._pending_batch_count and not self._unconfirmed_line_items:
+            return
+
+        report_db_accessor.analyze_table(temp_table)
+
+        checkpoint = None
+        if self._pending_cursor_position is not None:
+            checkpoint = self._get_checkpoint_args(self._pending_cursor_position)
+        unconfirmed_table = self._stage_unconfirmed_line_items(report_db_accessor)
+        if self._partition_staging is None:
+            report_db_accessor.merge_temp_table(
+                self.table_name,
+                temp_table,
+                self.line_item_columns,
+                self.line_item_conflict_columns,
+                checkpoint=checkpoint,
+                unconfirmed_table_name=unconfirmed_table
+            )
+        else:
+            # Merges are upserts, so the checkpoint saved with the last
+            # report period only repeats idempotent merges when resumed
+            report_period_ids = sorted(self._pending_report_period_ids)
+            for index, report_period_id in enumerate(report_period_ids):
+                is_last = index == len(report_period_ids) - 1
+                report_db_accessor.merge_temp_table(
+                    self._get_staging_table(report_period_id, report_db_accessor),
+                    temp_table,
+                    self.line_item_columns,
+                    self.line_item_conflict_columns,
+                    checkpoint=checkpoint if is_last else None,
+                    report_period_id=report_period_id,
+                    clear=is_last,
+                    unconfirmed_table_name=unconfirmed_table
+                )
+        self._pending_batch_count = 0
+        self._pending_cursor_position = None
+        self._pending_report_period_ids = set()
+
+    def _stage_unconfirmed_line_items(self, report_db_accessor):
+        """Copy the pending line items with unconfirmed keys into their temp table.
+
+        They may repeat an earlier line item of the file, whose values are
+        kept, so they are merged apart from the other line items.
+
+        Returns:
+            (str): The temp table name, None if there are no such line items
+
+        """
+        line_items = self._unconfirmed_line_items
+        if not line_items:
+            return None
+        LOG.info('Merging %d line items of %s with unconfirmed keys.',
+                 len(line_items), self._report_name)
+        if self._unconfirmed_table is None:
+            self._unconfirmed_table = report_db_accessor.create_temp_table(
+                self.table_name,
+                drop_column='id'
+            )
         report_db_accessor.bulk_insert_rows(
-            csv_file,
-            temp_table,
-            columns)
+            self._write_processed_rows_to_csv(line_items=line_items),
+            self._unconfirmed_table,
+            tuple(line_items[0].keys())
+        )
+        if self._partition_staging is not None:
+            self._pending_report_period_ids.update(
+                line_item['report_period_id'] for line_item in line_items
+            )
+        self._unconfirmed_line_items = []
+        return self._unconfirmed_table
+
+    def _add_line_item(self, data):
+        """Add a line item to the batch unless it repeats an earlier one.
+
+        Args:
+            data (dict): The line item's column values
+
+        Returns:
+            (bool): Whether the line item was added to the batch
+
+        """
+        key = tuple(data.get(column)
+                    for column in self.line_item_conflict_columns)
+        status = self.processed_report.line_item_keys.add(key)
+        if status is KeyStatus.DUPLICATE:
+            return False
+        if status is KeyStatus.UNCONFIRMED:
+            self._unconfirmed_line_items.append(data)
+            return False
+
+        self.processed_report.line_items.append(data)
+        if self.line_item_columns is None:
+            self.line_item_columns = list(data.keys())
+        return True
+
+    def _is_partition_load(self, manifest_progress):
+        """Determine whether line items are loaded into partition staging tables."""
+        if not Config.LINE_ITEM_PARTITION_SWAP or manifest_progress is None:
+            return False
+
+        with OCPReportDBAccessor(self._schema_name, self.column_map) as report_db:
+            if report_db.is_partitioned(self.table_name):
+                return True
+        LOG.warning('Loading line items of %s in place since %s is not partitioned.',
+                    self._report_name, self.table_name)
+        return False
+
+    def _get_manifest_report_period_ids(self, manifest_progress):
+        """Return the ids of the cluster's saved report periods of the manifest."""
+        billing_start = manifest_progress['billing_period_start']
+        if billing_start.tzinfo is not None:
+            billing_start = billing_start.astimezone(timezone.utc).replace(tzinfo=None)
+        periods = self._load_report_periods(None)
+        return sorted(
+            period_id for (cluster_id, start, _), period_id in periods.items()
+            if cluster_id == self._cluster_id and start == billing_start
+        )
+
+    def _start_partition_load(self, manifest_progress, report_db_accessor, checkpoint):
+        """Load the line items of the file into staging tables, one per report period.
+
+        The first file of a manifest drops anything staged by an earlier
+        assembly of the same report periods, for usage and storage alike.
+        """
+        self._partition_staging = {}
+        if manifest_progress['is_first_file'] and not checkpoint:
+            for report_period_id in self._get_manifest_report_period_ids(manifest_progress):
+                for table_name in OCP_PARTITIONED_TABLES:
+                    report_db_accessor.drop_partition_staging_table(table_name, report_period_id)
+
+    def _get_staging_table(self, report_period_id, report_db_accessor):
+        """Return the staging table of the line items of a report period."""
+        if report_period_id not in self._partition_staging:
+            self._partition_staging[report_period_id] = report_db_accessor.create_partition_staging_table(
+                self.table_name, report_period_id
+            )
+        return self._partition_staging[report_period_id]
+
+    def _swap_partitions(self, manifest_progress, report_db_accessor):
+        """Swap the staging tables of the manifest in as line item partitions.
+
+        Usage and storage files share a manifest, so the last file of
+        either kind swaps the staging tables of both.
+        """
+        for report_period_id in self._get_manifest_report_period_ids(manifest_progress):
+            for table_name in OCP_PARTITIONED_TABLES:
+                report_db_accessor.swap_partition(table_name, 'report_period_id',
+                                                  report_period_id)
 
     def _update_mappings(self):
         """Update cache of database objects for reference."""
@@ -373,64 +646,154 @@ class OCPReportProcessorBase(ReportProcessorBase):
             (None)
 
         """
-        row_count = 0
+        # Rows before the checkpoint were saved by an earlier attempt
+        checkpoint = self._get_checkpoint()
+        row_count = checkpoint
+        manifest_progress = None
+        if Config.LINE_ITEM_PARTITION_SWAP:
+            manifest_progress = self._get_manifest_progress()
+        is_partition_load = self._is_partition_load(manifest_progress)
         opener, mode = self._get_file_opener(self._compression)
 
         with opener(self._report_path, mode) as f:
             with OCPReportDBAccessor(self._schema_name, self.column_map) as report_db:
+                if is_partition_load:
+                    self._start_partition_load(manifest_progress, report_db, checkpoint)
+                # Batches are streamed into the temp table and merged into
+                # the line item table every OCP_MERGE_BATCH_COUNT batches.
                 temp_table = report_db.create_temp_table(
                     self.table_name,
                     drop_column='id'
                 )
+                self._unconfirmed_table = None
 
                 LOG.info('File %s opened for processing', str(f))
                 reader = csv.DictReader(f)
-                for row in reader:
-                    report_period_id = self._create_report_period(row, self._cluster_id, report_db)
-                    report_id = self._create_report(row, report_period_id, report_db)
-                    self._create_usage_report_line_item(row, report_period_id, report_id, report_db)
-
-                    if len(self.processed_report.line_items) >= self._batch_size:
-                        self._save_to_db(temp_table, report_db)
-
-                        report_db.merge_temp_table(
-                            self.table_name,
-                            temp_table,
-                            self.line_item_columns,
-                            self.line_item_conflict_columns
-                        )
-
-                        LOG.info('Saving report rows %d to %d for %s', row_count,
-                                 row_count + len(self.processed_report.line_items),
-                                 self._report_name)
-                        row_count += len(self.processed_report.line_items)
-
+                rows = []
+                for row in islice(reader, checkpoint, None):
+                    rows.append(row)
+                    if len(rows) >= self._batch_size:
+                        self._process_rows(rows, temp_table, report_db, row_count)
+                        row_count += len(rows)
                         self._update_mappings()
+                        rows = []
+
+                if rows:
+                    self._process_rows(rows, temp_table, report_db, row_count)
+                    row_count += len(rows)
+                    self._update_mappings()
+                self._merge_temp_table(temp_table, report_db)
+                if self.manifest_id:
+                    report_db.clear_checkpoint(self._report_name, self.manifest_id)
+                if is_partition_load and manifest_progress['is_last_file']:
+                    self._swap_partitions(manifest_progress, report_db)
+
+        self._log_parse_cache_stats()
+        LOG.info('Completed report processing for file: %s and schema: %s',
+                 self._report_path, self._schema_name)
 
-                if self.processed_report.line_items:
-                    self._save_to_db(temp_table, report_db)
+    def _log_parse_cache_stats(self):
+        """Log the hit rates of the label and timestamp parse caches."""
+        for name, cache in (('label', self._parse_labels),
+                            ('timestamp', self._parse_datetime)):
+            info = cache.cache_info()
+            lookups = info.hits + info.misses
+            hit_rate = info.hits / lookups if lookups else 0
+            LOG.info('OCP %s parse cache for %s: %d hits, %d misses (%.1f%% hit rate).',
+                     name, self._report_name, info.hits, info.misses, hit_rate * 100)
+
+    def _process_rows(self, rows, temp_table, report_db_accessor, row_count):
+        """Create and save the objects for a batch of report rows."""
+        # Dimensions are resolved on the connection streaming the last batch
+        report_db_accessor.wait_for_copy()
+        self._resolve_dimensions(rows, report_db_accessor)
+        usage_dates = set()
+        for row in rows:
+            report_period_id = self._create_report_period(row, self._cluster_id, report_db_accessor)
+            report_id = self._create_report(row, report_period_id, report_db_accessor)
+            self._create_usage_report_line_item(row, report_period_id, report_id, report_db_accessor)
+            usage_dates.add((report_period_id, row.get('interval_start')))
+
+        self._save_usage_ranges(
+            ((report_period_id, self._parse_datetime(interval_start).date())
+             for report_period_id, interval_start in usage_dates),
+            OCP_REPORT_TABLE_MAP['report_period'],
+            report_db_accessor
+        )
 
-                    report_db.merge_temp_table(
-                        self.table_name,
-                        temp_table,
-                        self.line_item_columns,
-                        self.line_item_conflict_columns
-                    )
+        if not self.processed_report.line_items:
+            return
 
-                    LOG.info('Saving report rows %d to %d for %s', row_count,
-                             row_count + len(self.processed_report.line_items),
-                             self._report_name)
+        self._save_to_db(temp_table, report_db_accessor, row_count + len(rows))
 
-                    row_count += len(self.processed_report.line_items)
+        LOG.info('Saving report rows %d to %d for %s', row_count,
+                 row_count + len(self.processed_report.line_items),
+                 self._report_name)
 
-        LOG.info('Completed report processing for file: %s and schema: %s',
-                 self._report_path, self._schema_name)
+        if self._pending_batch_count >= self._merge_batch_count:
+            self._merge_temp_table(temp_table, report_db_accessor)
+
+    def _resolve_dimensions(self, rows, report_db_accessor):
+        """Resolve the ids of every unseen report period and report in a batch.
+
+        Report periods are resolved first since reports are keyed on them.
+        Each table then costs one multi-row insert instead of one round
+        trip per unseen key.
+        """
+        shared = self._shared_dimensions
+        if shared is None:
+            self._resolve_batch_dimensions(rows, report_db_accessor)
+            return
+
+        processed = self.processed_report
+        with shared.lock:
+            processed.report_periods.update(shared.report_periods)
+            processed.reports.update(shared.reports)
+            self._resolve_batch_dimensions(rows, report_db_accessor)
+            shared.report_periods.update(processed.report_periods)
+            shared.reports.update(processed.reports)
+
+    def _resolve_batch_dimensions(self, rows, report_db_accessor):
+        """Insert the unseen report periods and reports of a batch."""
+        processed = self.processed_report
+        report_periods = {}
+        for row in rows:
+            key, data = self._get_report_period_key(row, self._cluster_id)
+            if key not in processed.report_periods and key not in self.existing_report_periods_map:
+                report_periods.setdefault(key, data)
+        self._resolve_table(
+            OCP_REPORT_TABLE_MAP['report_period'],
+            report_periods,
+            processed.report_periods,
+            report_db_accessor,
+            conflict_columns=['cluster_id', 'report_period_start', 'provider_id']
+        )
+
+        reports = {}
+        for row in rows:
+            period_key, _ = self._get_report_period_key(row, self._cluster_id)
+            report_period_id = processed.report_periods.get(
+                period_key,
+                self.existing_report_periods_map.get(period_key)
+            )
+            key, data = self._get_report_key(row, report_period_id)
+            if key not in processed.reports and key not in self.existing_report_map:
+                reports.setdefault(key, data)
+        self._resolve_table(
+            OCP_REPORT_TABLE_MAP['report'],
+            reports,
+            processed.reports,
+            report_db_accessor,
+            conflict_columns=['report_period_id', 'interval_start']
+        )
 
 
 class OCPCpuMemReportProcessor(OCPReportProcessorBase):
     """OCP Usage Report processor."""
 
-    def __init__(self, schema_name, report_path, compression, provider_id):
+    # pylint: disable=too-many-arguments
+    def __init__(self, schema_name, report_path, compression, provider_id, manifest_id=None,
+                 shared_dimensions=None):
         """Initialize the report processor.
 
         Args:
@@ -438,18 +801,53 @@ class OCPCpuMemReportProcessor(OCPReportProcessorBase):
             report_path (str): Where the report file lives in the file system
             compression (CONST): How the report file is compressed.
                 Accepted values: UNCOMPRESSED, GZIP_COMPRESSED
+            shared_dimensions (SharedOCPDimensions): Ids shared with the
+                processors of the manifest's other files
 
         """
         super().__init__(
             schema_name=schema_name,
             report_path=report_path,
             compression=compression,
-            provider_id=provider_id
+            provider_id=provider_id,
+            manifest_id=manifest_id,
+            shared_dimensions=shared_dimensions
         )
         self.table_name = OCP_REPORT_TABLE_MAP['line_item']
+        # Highest [cpu core seconds, memory byte seconds] keyed on
+        # (report_id, node), saved before the file's line items are merged
+        self._node_capacity = {} if Config.OCP_NODE_CAPACITY else None
         LOG.info('Initialized report processor for file: %s and schema: %s',
                  self._report_path, self._schema_name)
 
+    def _record_node_capacity(self, data):
+        """Keep the highest node capacity of a line item's interval."""
+        key = (data['report_id'], data.get('node'))
+        if key[1] is None:
+            return
+        cpu = data.get('node_capacity_cpu_core_seconds')
+        memory = data.get('node_capacity_memory_byte_seconds')
+        capacity = self._node_capacity.get(key)
+        if capacity is None:
+            self._node_capacity[key] = [cpu, memory]
+            return
+        if cpu is not None and (capacity[0] is None or cpu > capacity[0]):
+            capacity[0] = cpu
+        if memory is not None and (capacity[1] is None or memory > capacity[1]):
+            capacity[1] = memory
+
+    def _merge_temp_table(self, temp_table, report_db_accessor):
+        """Save the recorded node capacity, then merge the pending line items.
+
+        The capacity is committed before the merge and its checkpoint, so a
+        resumed file only adds to the capacity of the rows it reprocesses.
+        """
+        if self._node_capacity:
+            report_db_accessor.wait_for_copy()
+            report_db_accessor.save_node_capacity(self._node_capacity)
+            self._node_capacity = {}
+        super()._merge_temp_table(temp_table, report_db_accessor)
+
     def _create_usage_report_line_item(self,
                                        row,
                                        report_period_id,
@@ -482,16 +880,8 @@ class OCPCpuMemReportProcessor(OCPReportProcessorBase):
         data['pod_labels'] = self._process_pod_labels(pod_label_str)
 
         # Deduplicate potential repeated rows in data
-        key = tuple(data.get(column)
-                    for column in self.line_item_conflict_columns)
-        if key in self.processed_report.line_item_keys:
-            return
-
-        self.processed_report.line_items.append(data)
-        self.processed_report.line_item_keys[key] = True
-
-        if self.line_item_columns is None:
-            self.line_item_columns = list(data.keys())
+        if self._add_line_item(data) and self._node_capacity is not None:
+            self._record_node_capacity(data)
 
     @property
     def line_item_conflict_columns(self):
@@ -502,7 +892,9 @@ class OCPCpuMemReportProcessor(OCPReportProcessorBase):
 class OCPStorageProcessor(OCPReportProcessorBase):
     """OCP Usage Report processor."""
 
-    def __init__(self, schema_name, report_path, compression, provider_id):
+    # pylint: disable=too-many-arguments
+    def __init__(self, schema_name, report_path, compression, provider_id, manifest_id=None,
+                 shared_dimensions=None):
         """Initialize the report processor.
 
         Args:
@@ -510,13 +902,17 @@ class OCPStorageProcessor(OCPReportProcessorBase):
             report_path (str): Where the report file lives in the file system
             compression (CONST): How the report file is compressed.
                 Accepted values: UNCOMPRESSED, GZIP_COMPRESSED
+            shared_dimensions (SharedOCPDimensions): Ids shared with the
+                processors of the manifest's other files
 
         """
         super().__init__(
             schema_name=schema_name,
             report_path=report_path,
             compression=compression,
-            provider_id=provider_id
+            provider_id=provider_id,
+            manifest_id=manifest_id,
+            shared_dimensions=shared_dimensions
         )
         self.table_name = OCP_REPORT_TABLE_MAP['storage_line_item']
         LOG.info('Initialized report processor for file: %s and schema: %s',
@@ -559,16 +955,7 @@ class OCPStorageProcessor(OCPReportProcessorBase):
         data['persistentvolumeclaim_labels'] = self._process_pod_labels(persistentvolumeclaim_labels_str)
 
         # Deduplicate potential repeated rows in data
-        key = tuple(data.get(column)
-                    for column in self.line_item_conflict_columns)
-        if key in self.processed_report.line_item_keys:
-            return
-
-        self.processed_report.line_items.append(data)
-        self.processed_report.line_item_keys[key] = True
-
-        if self.line_item_columns is None:
-            self.line_item_columns = list(data.keys())
+        self._add_line_item(data)
 
     @property
     def line_item_conflict_columns(self):
@@ -21,9 +21,12 @@ import calendar
 import datetime
 import logging
 
+from masu.config import Config
+from masu.database import OCP_REPORT_TABLE_MAP
 from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
-from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
+from masu.database.reporting_common_db_accessor import get_column_map
 from masu.external.date_accessor import DateAccessor
+from masu.util.common import merge_date_ranges
 from masu.util.ocp.common import get_cluster_id_from_provider
 
 LOG = logging.getLogger(__name__)
@@ -42,9 +45,10 @@ class OCPReportSummaryUpdater:
         self._provider = provider
         self._manifest = manifest
         self._cluster_id = get_cluster_id_from_provider(self._provider.uuid)
-        with ReportingCommonDBAccessor() as reporting_common:
-            self._column_map = reporting_common.column_map
+        self._column_map = get_column_map()
         self._date_accessor = DateAccessor()
+        self._summary_ranges = None
+        self._dirty_range_id = None
 
     def update_daily_tables(self, start_date, end_date):
         """Populate the daily tables for reporting.
@@ -66,8 +70,14 @@ class OCPReportSummaryUpdater:
                  self._schema_name, self._provider.uuid, self._cluster_id,
                  start_date, end_date)
         with OCPReportDBAccessor(self._schema_name, self._column_map) as accessor:
-            accessor.populate_line_item_daily_table(start_date, end_date, self._cluster_id)
-            accessor.populate_storage_line_item_daily_table(start_date, end_date, self._cluster_id)
+            report_period_ids = [period.id for period in
+                                 self._get_report_periods(accessor, start_date)]
+            for range_start, range_end in self._get_summary_ranges(
+                    accessor, start_date, end_date, report_period_ids):
+                accessor.populate_line_item_daily_table(range_start, range_end,
+                                                        self._cluster_id)
+                accessor.populate_storage_line_item_daily_table(range_start, range_end,
+                                                                self._cluster_id)
 
         return start_date, end_date
 
@@ -91,20 +101,26 @@ class OCPReportSummaryUpdater:
                  self._schema_name, self._provider.uuid, self._cluster_id,
                  start_date, end_date)
         with OCPReportDBAccessor(self._schema_name, self._column_map) as accessor:
-            report_date = datetime.datetime.strptime(start_date, '%Y-%m-%d')\
-                .replace(day=1).date()
-            report_periods = accessor.get_usage_period_query_by_provider(
-                self._provider.id
+            # Need these report periods on the session to update dates after processing
+            report_periods = self._get_report_periods(accessor, start_date)
+            report_period_ids = [period.id for period in report_periods]
+
+            summary_ranges = self._get_summary_ranges(accessor, start_date, end_date,
+                                                      report_period_ids)
+            for range_start, range_end in summary_ranges:
+                accessor.populate_line_item_daily_summary_table(range_start, range_end,
+                                                                self._cluster_id)
+            self._update_label_summary_table(accessor.populate_pod_label_summary_table,
+                                             summary_ranges)
+            for range_start, range_end in summary_ranges:
+                accessor.populate_storage_line_item_daily_summary_table(range_start, range_end,
+                                                                        self._cluster_id)
+            self._update_label_summary_table(
+                accessor.populate_volume_claim_label_summary_table,
+                summary_ranges
             )
-            report_periods = report_periods.filter_by(
-                report_period_start=report_date
-            ).all()
-
-            accessor.populate_line_item_daily_summary_table(start_date, end_date, self._cluster_id)
-            accessor.populate_pod_label_summary_table()
-            accessor.populate_storage_line_item_daily_summary_table(start_date, end_date, self._cluster_id)
-            accessor.populate_volume_claim_label_summary_table()
-            accessor.populate_volume_label_summary_table()
+            self._update_label_summary_table(accessor.populate_volume_label_summary_table,
+                                             summary_ranges)
 
             for period in report_periods:
                 if period.summary_data_creation_datetime is None:
@@ -114,9 +130,82 @@ class OCPReportSummaryUpdater:
                     self._date_accessor.today_with_timezone('UTC')
 
             accessor.commit()
+            if self._dirty_range_id is not None:
+                accessor.clear_dirty_ranges(OCP_REPORT_TABLE_MAP['report_period'],
+                                            report_period_ids, self._dirty_range_id)
 
         return start_date, end_date
 
+    def _update_label_summary_table(self, populate, summary_ranges):
+        """Merge the labels of the summarized dates into a label summary.
+
+        Summaries without a manifest, such as those requested through the
+        API, rebuild the label summary from every daily row instead.
+        """
+        if not self._manifest:
+            populate()
+            return
+        for range_start, range_end in summary_ranges:
+            populate(range_start, range_end)
+
+    def _get_report_periods(self, accessor, start_date):
+        """Return the provider's report periods for a date's month."""
+        report_date = datetime.datetime.strptime(start_date, '%Y-%m-%d')\
+            .replace(day=1).date()
+        report_periods = accessor.get_usage_period_query_by_provider(
+            self._provider.id
+        )
+        return report_periods.filter_by(
+            report_period_start=report_date
+        ).all()
+
+    def _get_summary_ranges(self, accessor, start_date, end_date, report_period_ids):
+        """Return the date ranges the daily and summary tables are rebuilt for.
+
+        When the dates touched by processing are recorded, only those dates
+        within the start and end date are rebuilt. Otherwise the whole range
+        is. The ranges are read once and reused by the summary update.
+
+        Args:
+            accessor (OCPReportDBAccessor): The report accessor
+            start_date (str) The date to start populating the table.
+            end_date   (str) The date to end on.
+            report_period_ids (list): The report periods being summarized
+
+        Returns
+            ([]) (start date, end date) string pairs.
+
+        """
+        if self._summary_ranges is not None:
+            return self._summary_ranges
+
+        self._summary_ranges = [(start_date, end_date)]
+        if not (Config.INCREMENTAL_SUMMARY and self._manifest and report_period_ids):
+            return self._summary_ranges
+
+        last_id, ranges = accessor.get_dirty_ranges(OCP_REPORT_TABLE_MAP['report_period'],
+                                                    report_period_ids)
+        if last_id is None:
+            LOG.info('No processed dates recorded for report periods %s, '
+                     'summarizing %s - %s.', report_period_ids, start_date, end_date)
+            return self._summary_ranges
+
+        start = datetime.datetime.strptime(start_date, '%Y-%m-%d').date()
+        end = datetime.datetime.strptime(end_date, '%Y-%m-%d').date()
+        merged = merge_date_ranges(ranges, start, end)
+        total_days = (end - start).days + 1
+        dirty_days = sum((range_end - range_start).days + 1
+                         for range_start, range_end in merged)
+        LOG.info('Summarizing %d of %d days from %s - %s for cluster %s, '
+                 'skipping %d unchanged days.', dirty_days, total_days,
+                 start_date, end_date, self._cluster_id, total_days - dirty_days)
+
+        self._dirty_range_id = last_id
+        self._summary_ranges = [(range_start.strftime('%Y-%m-%d'),
+                                 range_end.strftime('%Y-%m-%d'))
+                                for range_start, range_end in merged]
+        return self._summary_ranges
+
     def _get_sql_inputs(self, start_date, end_date):
         """Get the required inputs for running summary SQL."""
         # Default to this month's bill
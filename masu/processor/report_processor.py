@@ -39,7 +39,7 @@ class ReportProcessor:
     """Interface for masu to use to processor CUR."""
 
     def __init__(self, schema_name, report_path, compression, provider,
-                 provider_id, manifest_id):
+                 provider_id, manifest_id, shared_dimensions=None):
         """Set the processor based on the data provider."""
         self.schema_name = schema_name
         self.report_path = report_path
@@ -47,6 +47,7 @@ class ReportProcessor:
         self.provider_type = provider
         self.provider_id = provider_id
         self.manifest_id = manifest_id
+        self.shared_dimensions = shared_dimensions
         try:
             self._processor = self._set_processor()
         except Exception as err:
@@ -79,7 +80,9 @@ class ReportProcessor:
             return OCPReportProcessor(schema_name=self.schema_name,
                                       report_path=self.report_path,
                                       compression=self.compression,
-                                      provider_id=self.provider_id)
+                                      provider_id=self.provider_id,
+                                      manifest_id=self.manifest_id,
+                                      shared_dimensions=self.shared_dimensions)
 
         return None
 
@@ -15,9 +15,18 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 """Report Processor base class."""
+import logging
+from os import path
+
+import masu.prometheus_stats as worker_stats
+from masu.config import Config
+from masu.database.report_manifest_db_accessor import ReportManifestDBAccessor
+from masu.database.report_stats_db_accessor import ReportStatsDBAccessor
 from masu.exceptions import MasuProcessingError
 from masu.processor import ALLOWED_COMPRESSIONS
 
+LOG = logging.getLogger(__name__)
+
 
 # pylint: disable=too-few-public-methods
 class ReportProcessorBase():
@@ -27,7 +36,9 @@ class ReportProcessorBase():
     Base object class for downloading cost reports from a cloud provider.
     """
 
-    def __init__(self, schema_name, report_path, compression, provider_id):
+    # pylint: disable=too-many-arguments
+    def __init__(self, schema_name, report_path, compression, provider_id,
+                 manifest_id=None):
         """Initialize the report processor base class.
 
         Args:
@@ -35,6 +46,8 @@ class ReportProcessorBase():
             report_path (str): Where the report file lives in the file system
             compression (CONST): How the report file is compressed.
                 Accepted values: UNCOMPRESSED, GZIP_COMPRESSED
+            provider_id (int): The provider the report belongs to
+            manifest_id (int): The manifest the report belongs to
 
         """
         if compression.upper() not in ALLOWED_COMPRESSIONS:
@@ -45,3 +58,118 @@ class ReportProcessorBase():
         self._report_path = report_path
         self._compression = compression.upper()
         self._provider_id = provider_id
+        self.manifest_id = manifest_id
+
+    def _get_checkpoint(self):
+        """Return the number of rows saved by a previous attempt at the file.
+
+        The checkpoint is only trusted when it was saved for the same
+        manifest, since a new manifest replaces the data of the report.
+
+        Returns:
+            (int): The number of rows of the file already saved
+
+        """
+        if not self.manifest_id:
+            return 0
+
+        with ReportStatsDBAccessor(path.basename(self._report_path),
+                                   self.manifest_id) as stats:
+            if stats.get_manifest_id() != self.manifest_id:
+                return 0
+            cursor_position = stats.get_cursor_position() or 0
+
+        if cursor_position:
+            LOG.info('Resuming processing of %s from row %d.',
+                     path.basename(self._report_path), cursor_position)
+            worker_stats.PROCESS_REPORT_RESUMED_COUNTER.inc()
+            worker_stats.PROCESS_REPORT_RESUMED_ROWS_COUNTER.inc(cursor_position)
+        return cursor_position
+
+    def _get_manifest_progress(self):
+        """Return where the report file stands in its manifest.
+
+        Returns:
+            (dict): The billing period start of the manifest and whether
+                the file is its first and last, or None without a manifest
+
+        """
+        if not self.manifest_id:
+            return None
+
+        with ReportManifestDBAccessor() as manifest_accessor:
+            manifest = manifest_accessor.get_manifest_by_id(self.manifest_id)
+            if manifest is None:
+                return None
+            return {
+                'billing_period_start': manifest.billing_period_start_datetime,
+                'is_first_file': manifest.num_processed_files == 0,
+                'is_last_file': manifest.num_processed_files + 1 >= manifest.num_total_files
+            }
+
+    def _get_checkpoint_args(self, cursor_position):
+        """Return the checkpoint saved with a batch, if the file has a manifest.
+
+        Args:
+            cursor_position (int): The number of rows of the file saved
+
+        Returns:
+            (tuple): The report name, manifest id and cursor position or None
+
+        """
+        if not self.manifest_id:
+            return None
+        LOG.info('Checkpoint for %s: %d rows saved.',
+                 path.basename(self._report_path), cursor_position)
+        return (path.basename(self._report_path), self.manifest_id, cursor_position)
+
+    # pylint: disable=no-self-use
+    def _save_usage_ranges(self, usage_dates, period_table, report_db_accessor):
+        """Record the first and last usage date of each period in a batch.
+
+        The summary updaters rebuild only the recorded dates. Ranges are
+        saved before the batch's line items, so a batch that fails is
+        summarized again rather than missed.
+
+        Args:
+            usage_dates (iterable): The (period id, usage date) of each row
+            period_table (str): The bill or report period table
+            report_db_accessor (ReportDBAccessorBase): The report accessor
+
+        Returns:
+            (None)
+
+        """
+        if not Config.INCREMENTAL_SUMMARY:
+            return
+        ranges = {}
+        for period_id, usage_date in usage_dates:
+            start, end = ranges.get(period_id, (usage_date, usage_date))
+            ranges[period_id] = (min(start, usage_date), max(end, usage_date))
+        report_db_accessor.save_dirty_ranges(period_table, ranges)
+
+    # pylint: disable=no-self-use
+    def _resolve_table(self, table_name, pending, resolved, report_db_accessor,
+                       conflict_columns=None):
+        """Insert pending dimension rows and record their ids.
+
+        Args:
+            table_name (str): The dimension table to insert into
+            pending (dict): Dimension data keyed on the processor's cache key
+            resolved (dict): The cache the resolved ids are added to
+            report_db_accessor (ReportDBAccessorBase): The report accessor
+            conflict_columns (list): A list of columns to check conflict on
+
+        Returns:
+            (None)
+
+        """
+        if not pending:
+            return
+        keys = list(pending)
+        ids = report_db_accessor.insert_on_conflict_do_nothing_many(
+            table_name,
+            [pending[key] for key in keys],
+            conflict_columns=conflict_columns
+        )
+        resolved.update(zip(keys, ids))
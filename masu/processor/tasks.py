@@ -27,11 +27,13 @@ from dateutil import parser
 
 import masu.prometheus_stats as worker_stats
 from masu.celery import celery
+from masu.config import Config
 from masu.database.report_stats_db_accessor import ReportStatsDBAccessor
+from masu.external import OCP_LOCAL_SERVICE_PROVIDER, OPENSHIFT_CONTAINER_PLATFORM
 from masu.external.accounts_accessor import (AccountsAccessor, AccountsAccessorError)
 from masu.external.date_accessor import DateAccessor
 from masu.processor._tasks.download import _get_report_files
-from masu.processor._tasks.process import _process_report_file
+from masu.processor._tasks.process import _process_ocp_report_files, _process_report_file
 from masu.processor._tasks.remove_expired import _remove_expired_data
 from masu.processor.report_charge_updater import ReportChargeUpdater
 from masu.processor.report_processor import ReportProcessorError
@@ -40,6 +42,43 @@ from masu.processor.report_summary_updater import ReportSummaryUpdater
 LOG = get_task_logger(__name__)
 
 
+def _is_concurrent_processing(provider_type):
+    """Determine whether the files of a manifest are processed concurrently."""
+    if not Config.OCP_CONCURRENT_FILES:
+        return False
+    if provider_type not in (OPENSHIFT_CONTAINER_PLATFORM, OCP_LOCAL_SERVICE_PROVIDER):
+        return False
+    # Partition staging tells the first and last file of a manifest apart
+    # as the files start, which files running at the same time cannot do.
+    if Config.LINE_ITEM_PARTITION_SWAP:
+        LOG.warning('Processing OCP files serially since their line items are staged.')
+        return False
+    return True
+
+
+def _is_processing_skipped(report_dict):
+    """Determine whether a report file is in progress or already processed."""
+    file_name = os.path.basename(report_dict.get('file'))
+    with ReportStatsDBAccessor(file_name, report_dict.get('manifest_id')) as stats:
+        started_date = stats.get_last_started_datetime()
+        completed_date = stats.get_last_completed_datetime()
+
+    # Skip processing if already in progress.
+    if started_date and not completed_date:
+        expired_start_date = started_date + datetime.timedelta(hours=2)
+        if DateAccessor().today_with_timezone('UTC') < expired_start_date:
+            LOG.info('Skipping processing task for %s since it was started at: %s.',
+                     file_name, str(started_date))
+            return True
+
+    # Skip processing if complete.
+    if started_date and completed_date:
+        LOG.info('Skipping processing task for %s. Started on: %s and completed on: %s.',
+                 file_name, str(started_date), str(completed_date))
+        return True
+    return False
+
+
 # pylint: disable=too-many-locals
 @celery.task(name='masu.processor.tasks.get_report_files', queue_name='download')
 def get_report_files(customer_name,
@@ -75,50 +114,50 @@ def get_report_files(customer_name,
                                 provider_type,
                                 provider_uuid)
 
+    is_concurrent = _is_concurrent_processing(provider_type)
+    reports_to_summarize = []
+    processed_reports = []
+    manifest_reports = {}
     try:
         LOG.info('Reports to be processed: %s', str(reports))
-        reports_to_summarize = []
         for report_dict in reports:
             manifest_id = report_dict.get('manifest_id')
-            file_name = os.path.basename(report_dict.get('file'))
-            with ReportStatsDBAccessor(file_name, manifest_id) as stats:
-                started_date = stats.get_last_started_datetime()
-                completed_date = stats.get_last_completed_datetime()
-
-            # Skip processing if already in progress.
-            if started_date and not completed_date:
-                expired_start_date = started_date + datetime.timedelta(hours=2)
-                if DateAccessor().today_with_timezone('UTC') < expired_start_date:
-                    LOG.info('Skipping processing task for %s since it was started at: %s.',
-                             file_name, str(started_date))
-                    continue
-
-            # Skip processing if complete.
-            if started_date and completed_date:
-                LOG.info('Skipping processing task for %s. Started on: %s and completed on: %s.',
-                         file_name, str(started_date), str(completed_date))
+            if _is_processing_skipped(report_dict):
                 continue
 
             LOG.info('Processing starting - schema_name: %s, provider_uuid: %s, File: %s',
                      schema_name, provider_uuid, report_dict.get('file'))
             worker_stats.PROCESS_REPORT_ATTEMPTS_COUNTER.labels(provider_type=provider_type).inc()
+            if is_concurrent:
+                manifest_reports.setdefault(manifest_id, []).append(report_dict)
+                continue
             _process_report_file(schema_name,
                                  provider_type,
                                  provider_uuid,
                                  report_dict)
-            report_meta = {}
-            known_manifest_ids = [report.get('manifest_id') for report in reports_to_summarize]
-            if report_dict.get('manifest_id') not in known_manifest_ids:
-                report_meta['start_date'] = report_dict.get('start_date')
-                report_meta['schema_name'] = schema_name
-                report_meta['provider_type'] = provider_type
-                report_meta['provider_uuid'] = provider_uuid
-                report_meta['manifest_id'] = report_dict.get('manifest_id')
-                reports_to_summarize.append(report_meta)
+            processed_reports.append(report_dict)
+
+        for report_dicts in manifest_reports.values():
+            _process_ocp_report_files(schema_name,
+                                      provider_type,
+                                      provider_uuid,
+                                      report_dicts,
+                                      processed_reports)
     except ReportProcessorError as processing_error:
         worker_stats.PROCESS_REPORT_ERROR_COUNTER.labels(provider_type=provider_type).inc()
         LOG.error(str(processing_error))
 
+    for report_dict in processed_reports:
+        report_meta = {}
+        known_manifest_ids = [report.get('manifest_id') for report in reports_to_summarize]
+        if report_dict.get('manifest_id') not in known_manifest_ids:
+            report_meta['start_date'] = report_dict.get('start_date')
+            report_meta['schema_name'] = schema_name
+            report_meta['provider_type'] = provider_type
+            report_meta['provider_uuid'] = provider_uuid
+            report_meta['manifest_id'] = report_dict.get('manifest_id')
+            reports_to_summarize.append(report_meta)
+
     return reports_to_summarize
 
 
@@ -15,7 +15,12 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 #
 """Prometheus Stats."""
-from prometheus_client import CollectorRegistry, Counter, multiprocess, start_http_server
+from prometheus_client import (CollectorRegistry,
+                               Counter,
+                               Gauge,
+                               Histogram,
+                               multiprocess,
+                               start_http_server)
 
 
 WORKER_REGISTRY = CollectorRegistry()
@@ -41,6 +46,39 @@ REPORT_SUMMARY_ATTEMPTS_COUNTER = Counter('report_summary_attempts_count',
                                           'Number of report summary attempts',
                                           ['provider_type'],
                                           registry=WORKER_REGISTRY)
+PROCESS_REPORT_RESUMED_COUNTER = Counter('process_report_resumed_count',
+                                         'Number of report files resumed from a checkpoint',
+                                         registry=WORKER_REGISTRY)
+PROCESS_REPORT_RESUMED_ROWS_COUNTER = Counter('process_report_resumed_rows_count',
+                                              'Number of report rows skipped by resuming '
+                                              'from a checkpoint',
+                                              registry=WORKER_REGISTRY)
+LINE_ITEM_DELTA_ROWS_COUNTER = Counter('line_item_delta_rows_count',
+                                       'Number of line item rows changed by delta ingestion',
+                                       ['change'],
+                                       registry=WORKER_REGISTRY)
+SCHEMA_CACHE_COUNTER = Counter('schema_cache_count',
+                               'Number of reflected schema cache lookups',
+                               ['result'],
+                               registry=WORKER_REGISTRY)
+DB_POOL_CHECKED_OUT_GAUGE = Gauge('db_pool_checked_out',
+                                  'Number of database connections checked out of the pool',
+                                  registry=WORKER_REGISTRY,
+                                  multiprocess_mode='livesum')
+DB_POOL_OVERFLOW_GAUGE = Gauge('db_pool_overflow',
+                               'Number of database connections open beyond the pool size',
+                               registry=WORKER_REGISTRY,
+                               multiprocess_mode='livesum')
+DB_POOL_CHECKOUT_WAIT = Histogram('db_pool_checkout_wait_seconds',
+                                  'Time spent checking a low level connection out of the pool',
+                                  registry=WORKER_REGISTRY)
+DB_POOL_TIMEOUT_COUNTER = Counter('db_pool_timeout_count',
+                                  'Number of connection checkouts that timed out on a full pool',
+                                  registry=WORKER_REGISTRY)
+SQL_TEMPLATE_DURATION = Histogram('sql_template_duration_seconds',
+                                  'Time spent rendering and executing SQL templates',
+                                  ['template', 'phase'],
+                                  registry=WORKER_REGISTRY)
 CHARGE_UPDATE_ATTEMPTS_COUNTER = Counter('charge_update_attempts_count',
                                          'Number of derivied cost update attempts',
                                          registry=WORKER_REGISTRY)
@@ -27,7 +27,7 @@ from dateutil.relativedelta import relativedelta
 from masu.database import AWS_CUR_TABLE_MAP
 from masu.database.aws_report_db_accessor import AWSReportDBAccessor
 from masu.database.provider_db_accessor import ProviderDBAccessor
-from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
+from masu.database.reporting_common_db_accessor import get_column_map
 from masu.external import AMAZON_WEB_SERVICES, AWS_LOCAL_SERVICE_PROVIDER
 from masu.util import common as utils
 
@@ -213,8 +213,7 @@ def get_bills_from_provider(provider_uuid, schema, start_date=None, end_date=Non
     if isinstance(end_date, datetime.datetime):
         end_date = end_date.strftime('%Y-%m-%d')
 
-    with ReportingCommonDBAccessor() as reporting_common:
-        column_map = reporting_common.column_map
+    column_map = get_column_map()
 
     with ProviderDBAccessor(provider_uuid) as provider_accessor:
         provider = provider_accessor.get_provider()
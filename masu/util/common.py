@@ -17,6 +17,7 @@
 
 """Common util functions."""
 import re
+from datetime import timedelta
 
 from masu.external import (AMAZON_WEB_SERVICES,
                            AWS_LOCAL_SERVICE_PROVIDER,
@@ -65,3 +66,28 @@ def ingest_method_for_provider(provider):
         OPENSHIFT_CONTAINER_PLATFORM: LISTEN_INGEST
     }
     return ingest_map.get(provider)
+
+
+def merge_date_ranges(ranges, start_date, end_date):
+    """Merge date ranges into the contiguous ranges they cover within a window.
+
+    Args:
+        ranges (list): (start, end) pairs of datetime.date, both inclusive
+        start_date (datetime.date): The first date of the window
+        end_date (datetime.date): The last date of the window
+
+    Returns:
+        ([]) Sorted (start, end) pairs, with overlapping and adjacent
+            ranges joined
+
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        start, end = max(start, start_date), min(end, end_date)
+        if start > end:
+            continue
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
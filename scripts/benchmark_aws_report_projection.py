@@ -0,0 +1,124 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark AWS CUR row extraction with and without a compiled projection.
+
+Usage:
+    python scripts/benchmark_aws_report_projection.py <cur.csv> [extra_columns] [repeat]
+
+The report is optionally widened with `extra_columns` synthetic resource tag
+columns to approximate wide production CURs. The column map is read from the
+database configured for masu.
+"""
+
+import csv
+import io
+import json
+import sys
+import time
+
+from masu.database import AWS_CUR_TABLE_MAP
+from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
+from masu.processor.aws.aws_report_processor import ReportProjection
+
+TABLES = [AWS_CUR_TABLE_MAP['bill'],
+          AWS_CUR_TABLE_MAP['product'],
+          AWS_CUR_TABLE_MAP['pricing'],
+          AWS_CUR_TABLE_MAP['reservation'],
+          AWS_CUR_TABLE_MAP['line_item']]
+
+
+def widen_report(report_path, extra_columns):
+    """Return the report contents with synthetic tag columns appended."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    with open(report_path, 'r') as report:
+        reader = csv.reader(report)
+        header = next(reader)
+        writer.writerow(header + [f'resourceTags/user:tag_{i}' for i in range(extra_columns)])
+        for row in reader:
+            writer.writerow(row + [f'value_{i}' if i % 3 else '' for i in range(extra_columns)])
+    return output.getvalue()
+
+
+def legacy_extract(contents, column_map):
+    """Extract table data the way the processor did with csv.DictReader."""
+    for row in csv.DictReader(io.StringIO(contents)):
+        for table_name in TABLES:
+            if 'product/memory' in row and row['product/memory'] is not None:
+                memory_list = row['product/memory'].split(' ')
+                if len(memory_list) > 1:
+                    memory, unit = row['product/memory'].split(' ')
+                else:
+                    memory = memory_list[0]
+                    unit = None
+                row['product/memory'] = memory
+                row['product/memory_unit'] = unit
+            table_map = column_map[table_name]
+            _ = {table_map[key]: value for key, value in row.items() if key in table_map}
+        tag_dict = {}
+        for key, value in row.items():
+            if 'resourceTags' in key and row[key]:
+                key_value = key.split(':')
+                if len(key_value) > 1:
+                    tag_dict[key_value[-1]] = value
+        _ = json.dumps(tag_dict)
+
+
+def projected_extract(contents, column_map):
+    """Extract table data using a compiled ReportProjection."""
+    reader = csv.reader(io.StringIO(contents))
+    projection = ReportProjection(next(reader), column_map)
+    for row in reader:
+        if not row:
+            continue
+        projection.prepare(row)
+        for table_name in TABLES:
+            _ = projection.project(row, table_name)
+        _ = projection.tags(row)
+
+
+def measure(func, contents, column_map, repeat):
+    """Return the best rows per second over several runs."""
+    row_count = contents.count('\n') - 1
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(contents, column_map)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return row_count / best
+
+
+def main(argv):
+    """Run the benchmark."""
+    report_path = argv[1]
+    extra_columns = int(argv[2]) if len(argv) > 2 else 0
+    repeat = int(argv[3]) if len(argv) > 3 else 5
+
+    with ReportingCommonDBAccessor() as report_common_db:
+        column_map = report_common_db.column_map
+
+    contents = widen_report(report_path, extra_columns)
+    before = measure(legacy_extract, contents, column_map, repeat)
+    after = measure(projected_extract, contents, column_map, repeat)
+    print(f'dict rows/sec:      {before:,.0f}')
+    print(f'projected rows/sec: {after:,.0f}')
+    print(f'speedup:            {after / before:.2f}x')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
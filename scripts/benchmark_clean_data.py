@@ -0,0 +1,126 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark per-value data cleaning against compiled converters.
+
+Usage:
+    python scripts/benchmark_clean_data.py <schema> [rows] [repeat]
+
+Synthetic AWS line items are cleaned the way clean_data did before
+converters were compiled, with clean_data and with the batch clean_rows.
+The outputs are compared before the best rows per second of each are
+reported.
+"""
+
+import random
+import sys
+import time
+from decimal import Decimal, InvalidOperation
+
+from masu.database import AWS_CUR_TABLE_MAP
+from masu.database.report_db_accessor_base import ReportDBAccessorBase
+from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
+
+TABLE = AWS_CUR_TABLE_MAP['line_item']
+
+
+def build_rows(columns, column_types, row_count):
+    """Return raw line item rows as read from a report."""
+    def raw_value(column_type):
+        if column_type in (Decimal, float):
+            return '' if random.random() < 0.1 else f'{random.random() * 100:.12f}'
+        if column_type == int:
+            return str(random.randint(0, 1000))
+        return f'value-{random.getrandbits(16)}'
+
+    return [tuple(raw_value(column_types[column]) for column in columns)
+            for _ in range(row_count)]
+
+
+def legacy_clean(accessor, rows, columns):
+    """Clean each value with a lookup and a freshly parsed exponent."""
+    column_types = accessor.report_schema.column_types[TABLE]
+    cleaned = []
+    for row in rows:
+        data = dict(zip(columns, row))
+        for key, value in data.items():
+            if value is None or value == '':
+                data[key] = None
+                continue
+            if column_types.get(key) == int:
+                data[key] = int(value)
+            elif column_types.get(key) == float:
+                data[key] = float(value)
+            elif column_types.get(key) == Decimal:
+                try:
+                    data[key] = Decimal(value).quantize(Decimal(accessor.decimal_precision))
+                except InvalidOperation:
+                    data[key] = None
+        cleaned.append(tuple(data.values()))
+    return cleaned
+
+
+def compiled_clean(accessor, rows, columns):
+    """Clean each row's data with the compiled converters."""
+    return [tuple(accessor.clean_data(dict(zip(columns, row)), TABLE).values())
+            for row in rows]
+
+
+def batch_clean(accessor, rows, columns):
+    """Clean the whole batch with clean_rows."""
+    return accessor.clean_rows(rows, TABLE, columns)
+
+
+def measure(func, accessor, rows, columns, repeat):
+    """Return the output and the best rows per second over several runs."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cleaned = func(accessor, rows, columns)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return cleaned, len(rows) / best
+
+
+def main(argv):
+    """Run the benchmark."""
+    schema = argv[1]
+    row_count = int(argv[2]) if len(argv) > 2 else 100000
+    repeat = int(argv[3]) if len(argv) > 3 else 5
+
+    with ReportingCommonDBAccessor() as report_common_db:
+        column_map = report_common_db.column_map
+
+    with ReportDBAccessorBase(schema, column_map) as accessor:
+        column_types = accessor.report_schema.column_types[TABLE]
+        columns = list(column_types)
+        rows = build_rows(columns, column_types, row_count)
+
+        expected, before = measure(legacy_clean, accessor, rows, columns, repeat)
+        compiled, after = measure(compiled_clean, accessor, rows, columns, repeat)
+        batched, batch = measure(batch_clean, accessor, rows, columns, repeat)
+
+    if repr(compiled) != repr(expected) or repr(batched) != repr(expected):
+        print('cleaned rows differ from the per-value results')
+        sys.exit(1)
+
+    print(f'per-value rows/sec:  {before:,.0f}')
+    print(f'clean_data rows/sec: {after:,.0f} ({after / before:.2f}x)')
+    print(f'clean_rows rows/sec: {batch:,.0f} ({batch / before:.2f}x)')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
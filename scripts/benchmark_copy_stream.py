@@ -0,0 +1,124 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark batch COPY through an in-memory file against a streamed COPY.
+
+Usage:
+    python scripts/benchmark_copy_stream.py <schema> [batches] [batch_size]
+
+Synthetic line item batches are built and copied into a temporary table in
+the given schema, the way the report processors save a batch. Wall-clock
+time and the peak of traced Python memory are reported for both writers.
+"""
+
+import csv
+import io
+import random
+import resource
+import sys
+import time
+import tracemalloc
+
+from masu.database.report_db_accessor_base import ReportDBAccessorBase
+from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
+
+COLUMNS = ('usage_start', 'usage_end', 'resource_id', 'usage_amount',
+           'unblended_rate', 'unblended_cost', 'tags')
+
+
+def build_batch(batch_size):
+    """Return a batch of line item dictionaries, standing in for parsing."""
+    return [
+        {
+            'usage_start': '2019-02-01 00:00:00',
+            'usage_end': '2019-02-01 01:00:00',
+            'resource_id': f'i-{random.getrandbits(64):016x}',
+            'usage_amount': random.random() * 100,
+            'unblended_rate': random.random(),
+            'unblended_cost': random.random() * 10,
+            'tags': '{"environment": "prod", "app": "masu"}'
+        }
+        for _ in range(batch_size)
+    ]
+
+
+def write_rows(file_obj, line_items):
+    """Write line items the way the report processors do."""
+    writer = csv.writer(file_obj, delimiter='\t', quoting=csv.QUOTE_NONE, quotechar='')
+    writer.writerows(item.values() for item in line_items)
+
+
+def copy_in_memory(accessor, table, batches, batch_size):
+    """Copy each batch from a fully built StringIO."""
+    for _ in range(batches):
+        line_items = build_batch(batch_size)
+        file_obj = io.StringIO()
+        write_rows(file_obj, line_items)
+        file_obj.seek(0)
+        accessor.bulk_insert_rows(file_obj, table, COLUMNS)
+
+
+def copy_streamed(accessor, table, batches, batch_size):
+    """Stream each batch into a COPY that overlaps building the next one."""
+    for _ in range(batches):
+        line_items = build_batch(batch_size)
+        accessor.wait_for_copy()
+        with accessor.stream_rows(table, COLUMNS) as stream:
+            write_rows(stream, line_items)
+    accessor.wait_for_copy()
+
+
+def measure(func, accessor, table, batches, batch_size):
+    """Return the wall-clock seconds and peak traced bytes of a run."""
+    accessor._cursor.execute(f'TRUNCATE {table}')  # pylint: disable=protected-access
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(accessor, table, batches, batch_size)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(argv):
+    """Run the benchmark."""
+    schema = argv[1]
+    batches = int(argv[2]) if len(argv) > 2 else 10
+    batch_size = int(argv[3]) if len(argv) > 3 else 100000
+
+    with ReportingCommonDBAccessor() as report_common_db:
+        column_map = report_common_db.column_map
+
+    with ReportDBAccessorBase(schema, column_map) as accessor:
+        table = accessor.create_new_temp_table(
+            'benchmark_copy_stream',
+            [{'usage_start': 'timestamp'}, {'usage_end': 'timestamp'},
+             {'resource_id': 'varchar(256)'}, {'usage_amount': 'numeric(24,9)'},
+             {'unblended_rate': 'numeric(24,9)'}, {'unblended_cost': 'numeric(24,9)'},
+             {'tags': 'jsonb'}]
+        )
+        before, before_peak = measure(copy_in_memory, accessor, table, batches, batch_size)
+        after, after_peak = measure(copy_streamed, accessor, table, batches, batch_size)
+
+    print(f'in-memory: {before:.2f}s, peak {before_peak / 2**20:,.1f} MiB')
+    print(f'streamed:  {after:.2f}s, peak {after_peak / 2**20:,.1f} MiB')
+    print(f'wall-clock saved: {before - after:.2f}s ({1 - after / before:.0%})')
+    print(f'peak memory saved: {(before_peak - after_peak) / 2**20:,.1f} MiB')
+    print(f'process max RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.1f} MiB')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
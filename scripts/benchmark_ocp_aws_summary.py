@@ -0,0 +1,144 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark the sharded OCP on AWS summary against a single statement.
+
+Usage:
+    python scripts/benchmark_ocp_aws_summary.py <schema> <start_date> <end_date> \
+        [shard_days] [workers] [--synthetic]
+
+The OCP on AWS summaries of the date range are computed with a single
+statement, then in shards of shard_days (default 1) on up to workers
+(default 4) connections. The summary rows of both runs are compared
+before the time of each is reported.
+
+With --synthetic, the AWS and OCP daily rows of the start date are copied
+to every other date of the range first, and the copies are deleted
+afterwards. The daily tables must have rows for the start date.
+"""
+
+import sys
+import time
+from datetime import timedelta
+from unittest.mock import patch
+
+from dateutil import parser
+
+from masu.config import Config
+from masu.database import AWS_CUR_TABLE_MAP, OCP_REPORT_TABLE_MAP
+from masu.database.aws_report_db_accessor import AWSReportDBAccessor
+from masu.database.reporting_common_db_accessor import get_column_map
+
+DAILY_TABLES = (AWS_CUR_TABLE_MAP['line_item_daily'], OCP_REPORT_TABLE_MAP['line_item_daily'])
+
+SUMMARY_SQL = """
+    SELECT cluster_id, namespace, resource_id, usage_start, cost_entry_bill_id,
+            unblended_cost, shared_projects, project_costs::text
+        FROM reporting_ocpawscostlineitem_daily_summary
+        WHERE usage_start >= %s AND usage_start < %s::date + 1
+        ORDER BY usage_start, resource_id, cluster_id, unblended_cost, namespace
+"""
+
+
+def copy_daily_rows(accessor, start_date, end_date):
+    """Copy the daily rows of the start date to the other dates of the range.
+
+    Returns:
+        (dict): The last id of each daily table before the copies
+
+    """
+    cursor = accessor._cursor  # pylint: disable=protected-access
+    last_ids = {}
+    for table in DAILY_TABLES:
+        cursor.execute(
+            """
+            SELECT column_name
+                FROM information_schema.columns
+                WHERE table_schema = %s
+                    AND table_name = %s
+                    AND column_name NOT IN ('id', 'usage_start', 'usage_end')
+            """,
+            [accessor.schema, table]
+        )
+        columns = ', '.join(row[0] for row in cursor.fetchall())
+        cursor.execute(f'SELECT coalesce(max(id), 0) FROM {table}')
+        last_ids[table] = cursor.fetchone()[0]
+        cursor.execute(
+            f"""
+            INSERT INTO {table} ({columns}, usage_start, usage_end)
+                SELECT {columns},
+                        usage_start + days.day * interval '1 day',
+                        usage_end + days.day * interval '1 day'
+                    FROM {table},
+                        generate_series(1, %s) AS days(day)
+                    WHERE usage_start >= %s
+                        AND usage_start < %s::date + 1
+            """,
+            [(end_date - start_date).days, start_date, start_date]
+        )
+    accessor._pg2_conn.commit()  # pylint: disable=protected-access
+    return last_ids
+
+
+def delete_daily_rows(accessor, last_ids):
+    """Delete the daily rows copied by copy_daily_rows."""
+    cursor = accessor._cursor  # pylint: disable=protected-access
+    for table, last_id in last_ids.items():
+        cursor.execute(f'DELETE FROM {table} WHERE id > %s', [last_id])
+    accessor._pg2_conn.commit()  # pylint: disable=protected-access
+
+
+def measure(accessor, start_date, end_date, shard_days):
+    """Return the summary rows and the seconds taken to compute them."""
+    with patch.object(Config, 'OCP_AWS_SUMMARY_SHARD_DAYS', shard_days):
+        start = time.perf_counter()
+        accessor.populate_ocp_on_aws_cost_daily_summary(start_date, end_date)
+        elapsed = time.perf_counter() - start
+    accessor._cursor.execute(SUMMARY_SQL, [start_date, end_date])  # pylint: disable=protected-access
+    return accessor._cursor.fetchall(), elapsed  # pylint: disable=protected-access
+
+
+def main(argv):
+    """Run the benchmark."""
+    synthetic = '--synthetic' in argv
+    args = [arg for arg in argv if arg != '--synthetic']
+    schema = args[1]
+    start_date = parser.parse(args[2]).date()
+    end_date = parser.parse(args[3]).date()
+    shard_days = int(args[4]) if len(args) > 4 else 1
+    workers = int(args[5]) if len(args) > 5 else 4
+
+    with AWSReportDBAccessor(schema, get_column_map()) as accessor:
+        last_ids = copy_daily_rows(accessor, start_date, end_date) if synthetic else {}
+        try:
+            expected, single = measure(accessor, start_date, end_date, 0)
+            with patch.object(Config, 'OCP_AWS_SUMMARY_WORKERS', workers):
+                sharded_rows, sharded = measure(accessor, start_date, end_date, shard_days)
+        finally:
+            delete_daily_rows(accessor, last_ids)
+
+    if sharded_rows != expected:
+        print('sharded summary rows differ from the single statement')
+        sys.exit(1)
+
+    print(f'summary rows:             {len(expected):,}')
+    print(f'single statement seconds: {single:.2f}')
+    print(f'sharded seconds:          {sharded:.2f} ({single / sharded:.2f}x, '
+          f'{shard_days} day shards, {workers} connections)')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,94 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark the memory of OCP line item deduplication keys.
+
+Usage:
+    python scripts/benchmark_ocp_line_item_keys.py [rows] [batch_size]
+
+Synthetic usage line item keys are recorded the way the processor did
+with a dict of key tuples and with a LineItemKeySet. Every key is built
+from fresh strings, as csv.DictReader does for each row, and the peak of
+traced Python memory is reported for both.
+"""
+
+import sys
+import time
+import tracemalloc
+
+from masu.processor.line_item_keys import LineItemKeySet
+
+PODS = 5000
+NODES = 50
+
+
+def generate_keys(rows):
+    """Yield hourly usage keys of a cluster's pods."""
+    for row in range(rows):
+        pod = row % PODS
+        report_id = row // PODS
+        yield (report_id, f'namespace-{pod % 100}', f'pod-{pod}-{pod * 7919:x}',
+               f'node-{pod % NODES}.compute.internal')
+
+
+def tuple_keys(rows, batch_size):  # pylint: disable=unused-argument
+    """Record every key tuple for the whole file."""
+    keys = {}
+    for key in generate_keys(rows):
+        if key in keys:
+            continue
+        keys[key] = True
+    return keys
+
+
+def hashed_keys(rows, batch_size):
+    """Record key hashes, releasing full keys after each batch."""
+    keys = LineItemKeySet()
+    for row, key in enumerate(generate_keys(rows), 1):
+        keys.add(key)
+        if row % batch_size == 0:
+            keys.release_batch()
+    return keys
+
+
+def measure(func, rows, batch_size):
+    """Return the wall-clock seconds and peak traced bytes of a run."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    keys = func(rows, batch_size)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del keys
+    return elapsed, peak
+
+
+def main(argv):
+    """Run the benchmark."""
+    rows = int(argv[1]) if len(argv) > 1 else 5000000
+    batch_size = int(argv[2]) if len(argv) > 2 else 100000
+
+    before, before_peak = measure(tuple_keys, rows, batch_size)
+    after, after_peak = measure(hashed_keys, rows, batch_size)
+
+    print(f'key tuples: {before:.2f}s, peak {before_peak / 2**20:,.1f} MiB')
+    print(f'key hashes: {after:.2f}s, peak {after_peak / 2**20:,.1f} MiB')
+    print(f'peak memory saved: {(before_peak - after_peak) / 2**20:,.1f} MiB '
+          f'({1 - after_peak / before_peak:.0%})')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
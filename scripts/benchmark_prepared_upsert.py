@@ -0,0 +1,113 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Benchmark compiled single-row upserts against prepared statements.
+
+Usage:
+    python scripts/benchmark_prepared_upsert.py <schema> [rows] [repeat]
+
+Reservation rows are upserted one at a time the way the report processors
+save rifee rows: first by compiling a SQLAlchemy INSERT ... ON CONFLICT for
+every row, then with insert_on_conflict_do_update and its statement
+prepared on the connection. The best upserts per second of each are
+reported. The benchmark rows are deleted afterwards.
+"""
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects.postgresql import insert
+
+from masu.database import AWS_CUR_TABLE_MAP
+from masu.database.aws_report_db_accessor import AWSReportDBAccessor
+from masu.database.reporting_common_db_accessor import get_column_map
+
+TABLE = AWS_CUR_TABLE_MAP['reservation']
+ARN_PREFIX = 'arn:aws:ec2:us-east-1:111111111111:reserved-instances/benchmark-'
+
+
+def build_rows(row_count):
+    """Return reservation rows with a quarter of them repeated."""
+    start = datetime(2019, 1, 1)
+    arns = [f'{ARN_PREFIX}{i}' for i in range(int(row_count * 0.75) or 1)]
+    return [
+        {
+            'reservation_arn': random.choice(arns),
+            'number_of_reservations': str(random.randint(1, 10)),
+            'units_per_reservation': f'{random.random() * 10:.9f}',
+            'start_time': start,
+            'end_time': start + timedelta(days=365)
+        }
+        for _ in range(row_count)
+    ]
+
+
+def compiled_upsert(accessor, rows):
+    """Compile and execute an INSERT ... ON CONFLICT for every row."""
+    table = getattr(accessor.report_schema, TABLE)
+    for row in rows:
+        data = accessor.clean_data(dict(row), TABLE)
+        statement = insert(table).values(**data)
+        accessor._conn.execute(  # pylint: disable=protected-access
+            statement.on_conflict_do_update(index_elements=['reservation_arn'], set_=data)
+        )
+
+
+def prepared_upsert(accessor, rows):
+    """Upsert every row with the prepared statement."""
+    for row in rows:
+        accessor.insert_on_conflict_do_update(TABLE, dict(row),
+                                              conflict_columns=['reservation_arn'],
+                                              set_columns=list(row))
+
+
+def measure(func, accessor, rows, repeat):
+    """Return the best upserts per second over several runs."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(accessor, rows)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(rows) / best
+
+
+def main(argv):
+    """Run the benchmark."""
+    schema = argv[1]
+    row_count = int(argv[2]) if len(argv) > 2 else 5000
+    repeat = int(argv[3]) if len(argv) > 3 else 3
+
+    rows = build_rows(row_count)
+    with AWSReportDBAccessor(schema, get_column_map()) as accessor:
+        try:
+            before = measure(compiled_upsert, accessor, rows, repeat)
+            after = measure(prepared_upsert, accessor, rows, repeat)
+        finally:
+            accessor._cursor.execute(  # pylint: disable=protected-access
+                f'DELETE FROM {TABLE} WHERE reservation_arn LIKE %s', [f'{ARN_PREFIX}%']
+            )
+            accessor._pg2_conn.commit()  # pylint: disable=protected-access
+
+    print(f'compiled upserts/sec: {before:,.0f}')
+    print(f'prepared upserts/sec: {after:,.0f} ({after / before:.2f}x)')
+    print(f'per-call overhead saved: {(1 / before - 1 / after) * 1e6:,.0f} us')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
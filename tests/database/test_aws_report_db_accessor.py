@@ -31,12 +31,14 @@ from sqlalchemy.orm.query import Query
 from sqlalchemy.sql import func
 
 
+from masu.config import Config
 from masu.database import AWS_CUR_TABLE_MAP
-from masu.database.report_db_accessor_base import ReportSchema
+from masu.database.report_db_accessor_base import CopyStream, ReportSchema, _compile_converter
 from masu.database.aws_report_db_accessor import AWSReportDBAccessor
 from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
 from masu.database.provider_db_accessor import ProviderDBAccessor
 from masu.database.report_manifest_db_accessor import ReportManifestDBAccessor
+from masu.database.report_stats_db_accessor import ReportStatsDBAccessor
 from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
 from masu.external.date_accessor import DateAccessor
 from masu.util.ocp.common import get_cluster_id_from_provider
@@ -149,7 +151,7 @@ class ReportDBAccessorTest(MasuTestCase):
         super().setUp()
         if self.accessor._conn.closed:
             self.accessor._conn = self.accessor._db.connect()
-        if self.accessor._pg2_conn.closed:
+        if not self.accessor._pg2_conn.is_valid:
             self.accessor._pg2_conn = self.accessor._get_psycopg2_connection()
         if self.accessor._cursor.closed:
             self.accessor._cursor = self.accessor._get_psycopg2_cursor()
@@ -196,7 +198,8 @@ class ReportDBAccessorTest(MasuTestCase):
         """Test the psycopg2 connection."""
         conn = self.accessor._get_psycopg2_connection()
 
-        self.assertIsInstance(conn, psycopg2.extensions.connection)
+        self.assertIsInstance(conn.connection, psycopg2.extensions.connection)
+        self.accessor.close_connections(conn)
 
     def test_get_psycopg2_cursor(self):
         """Test that a psycopg2 cursor is returned."""
@@ -345,17 +348,35 @@ class ReportDBAccessorTest(MasuTestCase):
 
         self.accessor.close_connections(conn)
 
-        self.assertTrue(conn.closed)
+        self.assertFalse(conn.is_valid)
 
     def test_close_connections_default(self):
         """Test that the accessor's psycopg2 connection is closed."""
         self.accessor.close_connections()
 
         self.assertTrue(self.accessor._conn.closed)
-        self.assertTrue(self.accessor._pg2_conn.closed)
+        self.assertFalse(self.accessor._pg2_conn.is_valid)
         # Return the accessor's connection to its open state
         self.accessor._conn = self.accessor._db.connect()
         self.accessor._pg2_conn = self.accessor._get_psycopg2_connection()
+        self.accessor._cursor = self.accessor._get_psycopg2_cursor()
+
+    def test_release_psycopg2_connection(self):
+        """Test that a released connection is pooled with its search_path reset."""
+        conn = self.accessor._get_psycopg2_connection()
+        raw_connection = conn.connection
+        with conn.cursor() as cursor:
+            cursor.execute('SET search_path TO acct10001')
+        conn.commit()
+
+        self.accessor._release_psycopg2_connection(conn)
+
+        self.assertFalse(conn.is_valid)
+        self.assertFalse(raw_connection.closed)
+        with raw_connection.cursor() as cursor:
+            cursor.execute('SHOW search_path')
+            self.assertNotEqual(cursor.fetchone()[0], 'acct10001')
+        raw_connection.rollback()
 
     def test_get_db_obj_query_default(self):
         """Test that a query is returned."""
@@ -423,6 +444,185 @@ class ReportDBAccessorTest(MasuTestCase):
                 value = self.creator.stringify_datetime(value)
             self.assertEqual(value, data_dict[column])
 
+    def test_stream_rows(self):
+        """Test that streamed rows are copied in the background."""
+        self.accessor.commit()
+
+        table_name = AWS_CUR_TABLE_MAP['line_item']
+        query = self.accessor._get_db_obj_query(table_name)
+        initial_count = query.count()
+        cost_entry = query.first()
+
+        data_dict = self.creator.create_columns_for_table(table_name)
+        data_dict['cost_entry_bill_id'] = cost_entry.cost_entry_bill_id
+        data_dict['cost_entry_id'] = cost_entry.cost_entry_id
+        data_dict['cost_entry_product_id'] = cost_entry.cost_entry_product_id
+        data_dict['cost_entry_pricing_id'] = cost_entry.cost_entry_pricing_id
+        data_dict['cost_entry_reservation_id'] = cost_entry.cost_entry_reservation_id
+
+        columns = list(data_dict.keys())
+        file_obj = self.creator.create_csv_file_stream(list(data_dict.values()))
+
+        with self.accessor.stream_rows(table_name, columns) as stream:
+            stream.write(file_obj.getvalue())
+        self.accessor.wait_for_copy()
+
+        self.assertEqual(query.count(), initial_count + 1)
+
+    def test_stream_rows_saves_checkpoint(self):
+        """Test that a checkpoint is committed with the streamed rows."""
+        self.accessor.commit()
+        report_name = 'checkpoint_report.csv'
+        with ReportStatsDBAccessor(report_name, None) as stats:
+            stats.commit()
+
+        table_name = AWS_CUR_TABLE_MAP['line_item']
+        cost_entry = self.accessor._get_db_obj_query(table_name).first()
+        data_dict = self.creator.create_columns_for_table(table_name)
+        data_dict['cost_entry_bill_id'] = cost_entry.cost_entry_bill_id
+        data_dict['cost_entry_id'] = cost_entry.cost_entry_id
+        columns = list(data_dict.keys())
+        file_obj = self.creator.create_csv_file_stream(list(data_dict.values()))
+
+        with self.accessor.stream_rows(table_name, columns,
+                                       checkpoint=(report_name, None, 10)) as stream:
+            stream.write(file_obj.getvalue())
+        self.accessor.wait_for_copy()
+
+        with ReportStatsDBAccessor(report_name, None) as stats:
+            self.assertEqual(stats.get_cursor_position(), 10)
+
+        self.accessor.clear_checkpoint(report_name, None)
+
+        with ReportStatsDBAccessor(report_name, None) as stats:
+            self.assertEqual(stats.get_cursor_position(), 0)
+            stats.delete()
+            stats.commit()
+
+    def test_apply_line_item_delta(self):
+        """Test that only new, changed and removed line items are written."""
+        self.accessor.commit()
+        table_name = AWS_CUR_TABLE_MAP['line_item']
+        query = self.accessor._get_db_obj_query(table_name)
+        bill_id = query.first().cost_entry_bill_id
+        staging_table = self.accessor.create_line_item_delta_table()
+        stage_sql = f"""
+            INSERT INTO {staging_table}
+                SELECT * FROM {table_name} WHERE cost_entry_bill_id = %s
+        """
+
+        self.accessor._cursor.execute(stage_sql, [bill_id])
+        counts = self.accessor.apply_line_item_delta([bill_id])
+        self.assertEqual(counts, {'inserted': 0, 'updated': 0, 'removed': 0})
+
+        self.accessor._cursor.execute(stage_sql, [bill_id])
+        self.accessor._cursor.execute(
+            f'UPDATE {staging_table} SET unblended_cost = coalesce(unblended_cost, 0) + 1'
+        )
+        self.accessor._cursor.execute(f'INSERT INTO {staging_table} SELECT * FROM {staging_table}')
+        counts = self.accessor.apply_line_item_delta([bill_id])
+        self.assertEqual(counts, {'inserted': 1, 'updated': 1, 'removed': 0})
+        self.assertEqual(query.filter_by(cost_entry_bill_id=bill_id).count(), 2)
+
+        counts = self.accessor.apply_line_item_delta([bill_id])
+        self.assertEqual(counts, {'inserted': 0, 'updated': 0, 'removed': 2})
+        self.assertEqual(query.filter_by(cost_entry_bill_id=bill_id).count(), 0)
+
+    def test_clear_line_item_delta(self):
+        """Test that the staged line items of a bill are removed."""
+        self.accessor.commit()
+        table_name = AWS_CUR_TABLE_MAP['line_item']
+        bill_id = self.accessor._get_db_obj_query(table_name).first().cost_entry_bill_id
+        staging_table = self.accessor.create_line_item_delta_table()
+        self.accessor._cursor.execute(f'INSERT INTO {staging_table} SELECT * FROM {table_name}')
+
+        self.accessor.clear_line_item_delta([bill_id])
+
+        self.accessor._cursor.execute(
+            f'SELECT count(*) FROM {staging_table} WHERE cost_entry_bill_id = %s',
+            [bill_id]
+        )
+        self.assertEqual(self.accessor._cursor.fetchone()[0], 0)
+
+    def test_is_partitioned(self):
+        """Test that a table that is not partitioned is reported as such."""
+        self.assertFalse(self.accessor.is_partitioned(AWS_CUR_TABLE_MAP['line_item']))
+
+    def test_swap_partition(self):
+        """Test that staging tables replace and drop partitions."""
+        cursor = self.accessor._cursor
+        table_name = 'test_partitioned_line_item'
+        cursor.execute(f"""
+            CREATE TABLE {table_name} (
+                id serial,
+                cost_entry_bill_id integer NOT NULL,
+                usage_type text
+            ) PARTITION BY LIST (cost_entry_bill_id)
+        """)
+        self.accessor._pg2_conn.commit()
+        try:
+            self.assertTrue(self.accessor.is_partitioned(table_name))
+
+            staging_table = self.accessor.create_partition_staging_table(table_name, 1)
+            cursor.execute(f"INSERT INTO {staging_table} (cost_entry_bill_id, usage_type) "
+                           "VALUES (1, 'old')")
+            self.assertTrue(self.accessor.swap_partition(table_name, 'cost_entry_bill_id', 1))
+
+            staging_table = self.accessor.create_partition_staging_table(table_name, 1)
+            cursor.execute(f"INSERT INTO {staging_table} (cost_entry_bill_id, usage_type) "
+                           "VALUES (1, 'new'), (1, 'new')")
+            self.assertTrue(self.accessor.swap_partition(table_name, 'cost_entry_bill_id', 1))
+            self.assertFalse(self.accessor.swap_partition(table_name, 'cost_entry_bill_id', 1))
+
+            cursor.execute(f'SELECT usage_type FROM {table_name}')
+            self.assertEqual(cursor.fetchall(), [('new',), ('new',)])
+
+            self.assertTrue(self.accessor.drop_partition(table_name, 1))
+            self.assertFalse(self.accessor.drop_partition(table_name, 1))
+            cursor.execute(f'SELECT count(*) FROM {table_name}')
+            self.assertEqual(cursor.fetchone()[0], 0)
+        finally:
+            self.accessor._pg2_conn.rollback()
+            cursor.execute(f'DROP TABLE IF EXISTS {table_name}_1_staging')
+            cursor.execute(f'DROP TABLE {table_name}')
+            self.accessor._pg2_conn.commit()
+
+    def test_stream_rows_cancelled(self):
+        """Test that a failed writer rolls back the streamed COPY."""
+        self.accessor.commit()
+
+        table_name = AWS_CUR_TABLE_MAP['line_item']
+        query = self.accessor._get_db_obj_query(table_name)
+        initial_count = query.count()
+
+        with self.assertRaises(ValueError):
+            with self.accessor.stream_rows(table_name, ['usage_type']) as stream:
+                stream.write('usage\n')
+                raise ValueError('Writer failed.')
+
+        with self.assertRaises((IOError, psycopg2.Error)):
+            self.accessor.wait_for_copy()
+        self.assertEqual(query.count(), initial_count)
+
+    def test_copy_stream_unbounded(self):
+        """Test that an unbounded stream queues a whole batch without a reader."""
+        stream = CopyStream(max_chunks=0)
+        data = 'x' * CopyStream.chunk_size * (CopyStream.max_chunks + 4)
+
+        stream.write(data)
+        stream.close()
+
+        self.assertEqual(stream.read(), data)
+
+    def test_stream_rows_copy_error(self):
+        """Test that a failed COPY is raised to the writer."""
+        table_name = AWS_CUR_TABLE_MAP['line_item']
+
+        with self.assertRaises(psycopg2.DataError):
+            with self.accessor.stream_rows(table_name, ['usage_start']) as stream:
+                stream.write('not a timestamp\n')
+            self.accessor.wait_for_copy()
+
     def test_create_db_object(self):
         """Test that a mapped database object is returned."""
         table = random.choice(self.all_tables)
@@ -477,6 +677,56 @@ class ReportDBAccessorTest(MasuTestCase):
             previous_count = count
             previous_row_id = row_id
 
+    def test_insert_on_conflict_do_nothing_many(self):
+        """Test that a batch INSERT returns ids in input order."""
+        table_name = AWS_CUR_TABLE_MAP['product']
+        data = [
+            self.creator.create_columns_for_table(table_name),
+            self.creator.create_columns_for_table(table_name)
+        ]
+        query = self.accessor._get_db_obj_query(table_name)
+        conflict_columns = ['sku', 'product_name', 'region']
+
+        existing_id = self.accessor.insert_on_conflict_do_nothing(
+            table_name,
+            data[0],
+            conflict_columns=conflict_columns
+        )
+        initial_count = query.count()
+
+        row_ids = self.accessor.insert_on_conflict_do_nothing_many(
+            table_name,
+            data + [data[0]],
+            conflict_columns=conflict_columns
+        )
+
+        self.assertEqual(query.count(), initial_count + 1)
+        self.assertEqual(len(row_ids), 3)
+        self.assertEqual(row_ids[0], existing_id)
+        self.assertEqual(row_ids[2], existing_id)
+        self.assertNotEqual(row_ids[1], existing_id)
+
+    def test_insert_on_conflict_do_nothing_many_without_conflict_columns(self):
+        """Test that a batch INSERT matches rows on every column by default."""
+        table_name = AWS_CUR_TABLE_MAP['pricing']
+        data = [
+            self.creator.create_columns_for_table(table_name),
+            self.creator.create_columns_for_table(table_name)
+        ]
+        query = self.accessor._get_db_obj_query(table_name)
+        initial_count = query.count()
+
+        row_ids = self.accessor.insert_on_conflict_do_nothing_many(table_name, data)
+        expected = [self.accessor._get_primary_key(table_name, entry) for entry in data]
+
+        self.assertEqual(query.count(), initial_count + 2)
+        self.assertEqual(row_ids, expected)
+
+    def test_insert_on_conflict_do_nothing_many_no_rows(self):
+        """Test that a batch INSERT of nothing does not touch the database."""
+        table_name = AWS_CUR_TABLE_MAP['product']
+        self.assertEqual(self.accessor.insert_on_conflict_do_nothing_many(table_name, []), [])
+
     def test_insert_on_conflict_do_update_with_conflict(self):
         """Test that an INSERT succeeds ignoring the conflicting row."""
         table_name = AWS_CUR_TABLE_MAP['reservation']
@@ -537,6 +787,36 @@ class ReportDBAccessorTest(MasuTestCase):
             previous_count = count
             previous_row_id = row_id
 
+    def test_insert_on_conflict_prepares_once(self):
+        """Test that single-row upserts reuse a statement prepared on the connection."""
+        table_name = AWS_CUR_TABLE_MAP['reservation']
+        data = [
+            self.creator.create_columns_for_table(table_name),
+            self.creator.create_columns_for_table(table_name)
+        ]
+        statements = self.accessor._pg2_conn.info.setdefault('prepared_statements', {})
+        statements.clear()
+        self.accessor._cursor.execute('DEALLOCATE ALL')
+        self.accessor._pg2_conn.commit()
+
+        for entry in data:
+            self.accessor.insert_on_conflict_do_update(
+                table_name,
+                entry,
+                conflict_columns=['reservation_arn'],
+                set_columns=list(entry.keys())
+            )
+        self.accessor.insert_on_conflict_do_nothing(
+            table_name,
+            data[0],
+            conflict_columns=['reservation_arn']
+        )
+
+        self.assertEqual(len(statements), 2)
+        self.accessor._cursor.execute('SELECT name FROM pg_prepared_statements')
+        prepared = {row[0] for row in self.accessor._cursor.fetchall()}
+        self.assertEqual(prepared, set(statements.values()))
+
     def test_get_primary_key(self):
         """Test that a primary key is returned."""
         table_name = random.choice(self.foreign_key_tables)
@@ -592,21 +872,46 @@ class ReportDBAccessorTest(MasuTestCase):
                 value = self.creator.datetimeify_string(value)
             self.assertIsInstance(value, column_types[key])
 
-    def test_convert_value_decimal_invalid_operation(self):
-        """Test that an InvalidOperation is raised and None is returned."""
-        dec = Decimal('123342348239472398472309847230984723098427309')
+    def test_get_column_converters_cached(self):
+        """Test that converters are compiled once per table."""
+        table_name = AWS_CUR_TABLE_MAP['line_item']
+        converters = self.accessor.get_column_converters(table_name)
+
+        self.assertIs(self.accessor.get_column_converters(table_name), converters)
+        self.assertEqual(converters['usage_amount']('1.5'),
+                         Decimal('1.5').quantize(Decimal(self.accessor.decimal_precision)))
+        self.assertIsNone(converters['usage_amount']('not a number'))
+        self.assertIsNone(converters['usage_amount'](None))
+
+    def test_clean_rows(self):
+        """Test that batch cleaning matches cleaning each row's data."""
+        table_name = AWS_CUR_TABLE_MAP['line_item']
+        data = self.creator.create_columns_for_table(table_name)
+        data['usage_amount'] = '1.123456789123'
+        data['invoice_id'] = ''
+        columns = list(data.keys())
+        rows = [tuple(data.values()), tuple(data.values())]
+
+        cleaned_rows = self.accessor.clean_rows(rows, table_name, columns)
+        expected = tuple(self.accessor.clean_data(dict(data), table_name).values())
 
-        result = self.accessor._convert_value(dec, Decimal)
-        self.assertIsNone(result)
+        self.assertEqual(cleaned_rows, [expected, expected])
+        self.assertEqual(cleaned_rows[0][columns.index('usage_amount')],
+                         Decimal('1.123456789'))
+        self.assertIsNone(cleaned_rows[0][columns.index('invoice_id')])
 
-        result = self.accessor._convert_value('', Decimal)
-        self.assertIsNone(result)
+    def test_decimal_converter_invalid_operation(self):
+        """Test that a value that cannot be quantized is converted to None."""
+        converter = _compile_converter(Decimal, self.accessor._decimal_exponent)
 
-    def test_convert_value_value_error(self):
+        self.assertIsNone(converter(Decimal('123342348239472398472309847230984723098427309')))
+        self.assertIsNone(converter(''))
+
+    def test_number_converter_value_error(self):
         """Test that a value error results in a None value."""
-        value = 'Not a Number'
-        result = self.accessor._convert_value(value, float)
-        self.assertIsNone(result)
+        converter = _compile_converter(float, self.accessor._decimal_exponent)
+
+        self.assertIsNone(converter('Not a Number'))
 
     def test_get_cost_entry_bills(self):
         """Test that bills are returned in a dict."""
@@ -620,6 +925,21 @@ class ReportDBAccessorTest(MasuTestCase):
         self.assertIn(expected_key, bill_map)
         self.assertEqual(bill_map[expected_key], bill.id)
 
+    def test_get_cost_entry_bills_filtered(self):
+        """Test that bills can be limited to a provider and billing period."""
+        table_name = AWS_CUR_TABLE_MAP['bill']
+        bill = self.accessor._get_db_obj_query(table_name).first()
+        expected_key = (bill.bill_type, bill.payer_account_id, bill.billing_period_start, bill.provider_id)
+
+        bill_map = self.accessor.get_cost_entry_bills(
+            provider_id=bill.provider_id,
+            billing_period_start=bill.billing_period_start
+        )
+        self.assertEqual(bill_map[expected_key], bill.id)
+
+        bill_map = self.accessor.get_cost_entry_bills(provider_id=bill.provider_id + 1)
+        self.assertNotIn(expected_key, bill_map)
+
     def test_get_cost_entry_bills_by_date(self):
         table_name = AWS_CUR_TABLE_MAP['bill']
         today = datetime.datetime.utcnow()
@@ -697,6 +1017,17 @@ class ReportDBAccessorTest(MasuTestCase):
         self.assertEqual(len(cost_entries.keys()), count)
         self.assertIn(first_entry.id, cost_entries.values())
 
+    def test_get_cost_entries_for_bill(self):
+        """Test that cost entries can be limited to one bill."""
+        table_name = 'reporting_awscostentry'
+        first_entry = self.accessor._get_db_obj_query(table_name).first()
+
+        cost_entries = self.accessor.get_cost_entries(bill_id=first_entry.bill_id)
+        self.assertIn(first_entry.id, cost_entries.values())
+
+        cost_entries = self.accessor.get_cost_entries(bill_id=first_entry.bill_id + 1)
+        self.assertNotIn(first_entry.id, cost_entries.values())
+
     def test_get_products(self):
         """Test that a dict of products are returned."""
         table_name = 'reporting_awscostentryproduct'
@@ -945,6 +1276,39 @@ class ReportDBAccessorTest(MasuTestCase):
 
         self.assertEqual(sorted(tag_keys), sorted(expected_tag_keys))
 
+    def test_populate_awstags_summary_table_date_range(self):
+        """Test that tags of a date range are merged into the saved tags."""
+        tags_summary_name = AWS_CUR_TABLE_MAP['tags_summary']
+        today = DateAccessor().today_with_timezone('UTC')
+        last_month = today - relativedelta.relativedelta(months=1)
+
+        bill_ids = []
+        for cost_entry_date in (today, last_month):
+            bill = self.creator.create_cost_entry_bill(cost_entry_date)
+            bill_ids.append(str(bill.id))
+            cost_entry = self.creator.create_cost_entry(bill, cost_entry_date)
+            product = self.creator.create_cost_entry_product()
+            pricing = self.creator.create_cost_entry_pricing()
+            reservation = self.creator.create_cost_entry_reservation()
+            self.creator.create_cost_entry_line_item(
+                bill,
+                cost_entry,
+                product,
+                pricing,
+                reservation
+            )
+
+        self.accessor.populate_line_item_daily_table(last_month.date(), today.date(), bill_ids)
+        self.accessor.populate_tags_summary_table()
+        query = self.accessor._get_db_obj_query(tags_summary_name)
+        expected = {tag.key: set(tag.values) for tag in query.all()}
+
+        self.accessor.populate_tags_summary_table(today.date(), today.date())
+
+        self.accessor._session.expire_all()
+        tags = {tag.key: set(tag.values) for tag in query.all()}
+        self.assertEqual(tags, expected)
+
     def test_populate_ocp_on_aws_cost_daily_summary(self):
         """Test that the OCP on AWS cost summary table is populated."""
         summary_table_name = AWS_CUR_TABLE_MAP['ocp_on_aws_daily_summary']
@@ -1016,3 +1380,60 @@ class ReportDBAccessorTest(MasuTestCase):
 
         self.assertEqual(sum_cost, sum_project_cost)
         self.assertLessEqual(sum_cost, sum_aws_cost)
+
+    def test_populate_ocp_on_aws_cost_daily_summary_sharded(self):
+        """Test that a sharded OCP on AWS summary matches a single statement."""
+        bill_ids = []
+        today = DateAccessor().today_with_timezone('UTC')
+        last_month = today - relativedelta.relativedelta(months=1)
+        resource_id = 'i-12345'
+        for cost_entry_date in (today, last_month):
+            bill = self.creator.create_cost_entry_bill(cost_entry_date)
+            bill_ids.append(str(bill.id))
+            cost_entry = self.creator.create_cost_entry(bill, cost_entry_date)
+            product = self.creator.create_cost_entry_product('Compute Instance')
+            pricing = self.creator.create_cost_entry_pricing()
+            reservation = self.creator.create_cost_entry_reservation()
+            self.creator.create_cost_entry_line_item(
+                bill,
+                cost_entry,
+                product,
+                pricing,
+                reservation,
+                resource_id=resource_id
+            )
+        self.accessor.populate_line_item_daily_table(last_month, today, bill_ids)
+
+        with OCPReportDBAccessor(self.test_schema, self.column_map) as ocp_accessor:
+            cluster_id = self.ocp_provider_resource_name
+            with ProviderDBAccessor(provider_uuid=self.ocp_test_provider_uuid) as provider_access:
+                provider_id = provider_access.get_provider().id
+
+            for cost_entry_date in (today, last_month):
+                period = self.creator.create_ocp_report_period(cost_entry_date, provider_id=provider_id, cluster_id=cluster_id)
+                report = self.creator.create_ocp_report(period, cost_entry_date)
+                self.creator.create_ocp_usage_line_item(
+                    period,
+                    report,
+                    resource_id=resource_id
+                )
+            cluster_id = get_cluster_id_from_provider(self.ocp_test_provider_uuid)
+            ocp_accessor.populate_line_item_daily_table(last_month, today, cluster_id)
+
+        summary_sql = """
+            SELECT cluster_id, namespace, resource_id, usage_start,
+                    unblended_cost, project_costs::text
+                FROM reporting_ocpawscostlineitem_daily_summary
+                ORDER BY usage_start, resource_id
+        """
+        self.accessor.populate_ocp_on_aws_cost_daily_summary(last_month, today)
+        self.accessor._cursor.execute(summary_sql)
+        expected = self.accessor._cursor.fetchall()
+
+        with patch.object(Config, 'OCP_AWS_SUMMARY_SHARD_DAYS', 7):
+            self.accessor.populate_ocp_on_aws_cost_daily_summary(last_month, today)
+        self.accessor._cursor.execute(summary_sql)
+        sharded = self.accessor._cursor.fetchall()
+
+        self.assertNotEqual(expected, [])
+        self.assertEqual(sharded, expected)
@@ -17,10 +17,12 @@
 
 """Test the SQLAlchemy enginer creation."""
 
+import sqlalchemy
 from sqlalchemy import engine, pool
 
+import masu.prometheus_stats as worker_stats
 from masu.config import Config
-from masu.database.engine import create_engine, _create_engine_kwargs
+from masu.database.engine import create_engine, _create_engine_kwargs, _register_pool_metrics
 from tests import MasuTestCase
 
 class DBEngineTest(MasuTestCase):
@@ -48,9 +50,23 @@ class DBEngineTest(MasuTestCase):
         expected = {
             'client_encoding': 'utf8',
             'pool_size': Config.SQLALCHEMY_POOL_SIZE,
+            'max_overflow': Config.SQLALCHEMY_MAX_OVERFLOW,
+            'pool_pre_ping': True,
             'connect_args': {
                 'sslmode': 'verify-full',
                 'sslrootcert': cert_file
             }
         }
         self.assertEqual(expected, kwargs)
+
+    def test_register_pool_metrics(self):
+        """Test that pool checkouts are tracked."""
+        db_engine = sqlalchemy.create_engine('sqlite://', poolclass=pool.QueuePool)
+        _register_pool_metrics(db_engine)
+        gauge = worker_stats.DB_POOL_CHECKED_OUT_GAUGE
+        checked_out = gauge._value.get()
+
+        conn = db_engine.raw_connection()
+        self.assertEqual(gauge._value.get(), checked_out + 1)
+        conn.close()
+        self.assertEqual(gauge._value.get(), checked_out)
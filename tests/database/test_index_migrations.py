@@ -0,0 +1,196 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Test the index_migrations module."""
+import json
+import time
+from unittest.mock import patch
+
+from masu.config import Config
+from masu.database import index_migrations
+from masu.database.engine import DB_ENGINE
+from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
+from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
+from masu.database.sql_templates import SQL_TEMPLATES
+from tests import MasuTestCase
+
+
+def _seed_table(cursor, table, rows=5000):
+    """Fill a table with rows of many clusters and days for the planner."""
+    cursor.execute(
+        """
+        SELECT column_name, data_type
+            FROM information_schema.columns
+            WHERE table_schema = current_schema()
+                AND table_name = %s
+                AND is_nullable = 'NO'
+                AND column_default IS NULL
+        """,
+        [table]
+    )
+    values = {'cluster_id': "'cluster_' || n % 50",
+              'usage_start': "'2018-01-01'::date + n % 365",
+              'usage_end': "'2018-01-01'::date + n % 365"}
+    for column, data_type in cursor.fetchall():
+        if column in values:
+            continue
+        if data_type in ('character varying', 'text'):
+            values[column] = "'seed'"
+        elif data_type == 'jsonb':
+            values[column] = "'{}'::jsonb"
+        elif data_type == 'boolean':
+            values[column] = 'false'
+        else:
+            values[column] = '0'
+    cursor.execute(
+        f"INSERT INTO {table} ({', '.join(values)})"
+        f" SELECT {', '.join(values.values())} FROM generate_series(1, {rows}) AS n"
+    )
+    cursor.execute(f'ANALYZE {table}')
+
+
+def _index_names(plan):
+    """Return the names of the indexes scanned by a query plan."""
+    names = set()
+    if 'Index Name' in plan:
+        names.add(plan['Index Name'])
+    for child in plan.get('Plans', []):
+        names |= _index_names(child)
+    return names
+
+
+class IndexMigrationsTest(MasuTestCase):
+    """Test cases for the summary index migrations."""
+
+    def setUp(self):
+        """Drop the indexes created by other tests."""
+        super().setUp()
+        index_migrations.clear_migrated()
+        self.conn = DB_ENGINE.raw_connection()
+        # The pool's pre-ping leaves a transaction open
+        self.conn.rollback()
+        self.conn.connection.autocommit = True
+        with self.conn.cursor() as cursor:
+            for index in index_migrations.SUMMARY_INDEXES:
+                cursor.execute(f'DROP INDEX IF EXISTS {self.test_schema}.{index.name}')
+
+    def tearDown(self):
+        """Return the connection to the pool."""
+        self.conn.connection.autocommit = False
+        self.conn.close()
+        index_migrations.clear_migrated()
+
+    def test_apply_index_migrations(self):
+        """Test that missing indexes are created once."""
+        with self.conn.cursor() as cursor:
+            pending = index_migrations.pending_indexes(cursor, self.test_schema)
+        self.assertEqual(len(pending), len(index_migrations.SUMMARY_INDEXES))
+        self.assertFalse(any(invalid for _, invalid in pending))
+
+        created = index_migrations.apply_index_migrations(self.conn, self.test_schema)
+
+        self.assertEqual(created, [index.name for index, _ in pending])
+        with self.conn.cursor() as cursor:
+            self.assertEqual(index_migrations.pending_indexes(cursor, self.test_schema), [])
+        self.assertEqual(index_migrations.apply_index_migrations(self.conn, self.test_schema), [])
+
+    def test_pending_indexes_missing_table(self):
+        """Test that indexes of tables a schema lacks are skipped."""
+        missing = index_migrations.IndexMigration('masu_missing_idx', 'no_such_table', ('id',))
+        with self.conn.cursor() as cursor:
+            self.assertEqual(
+                index_migrations.pending_indexes(cursor, self.test_schema, (missing,)), []
+            )
+
+    @patch('masu.database.report_db_accessor_base.Config.SUMMARY_INDEX_MIGRATIONS', True)
+    def test_ensure_summary_indexes_once(self):
+        """Test that an accessor applies the migrations once per schema."""
+        column_map = ReportingCommonDBAccessor().column_map
+        with OCPReportDBAccessor(self.test_schema, column_map) as accessor:
+            with patch.object(index_migrations, 'apply_index_migrations',
+                              wraps=index_migrations.apply_index_migrations) as mock_apply:
+                accessor.ensure_summary_indexes()
+                accessor.ensure_summary_indexes()
+            self.assertEqual(mock_apply.call_count, 1)
+        self.assertTrue(index_migrations.is_migrated(self.test_schema))
+
+    @patch('masu.database.report_db_accessor_base.Config.SUMMARY_INDEX_MIGRATIONS', True)
+    def test_ensure_summary_indexes_failed(self):
+        """Test that a schema with indexes left to build is tried again after its retry time."""
+        column_map = ReportingCommonDBAccessor().column_map
+        with OCPReportDBAccessor(self.test_schema, column_map) as accessor:
+            with patch.object(index_migrations, 'apply_index_migrations',
+                              return_value=[]) as mock_apply:
+                accessor.ensure_summary_indexes()
+                accessor.ensure_summary_indexes()
+                self.assertEqual(mock_apply.call_count, 1)
+                retry_time = time.monotonic() + Config.SUMMARY_INDEX_RETRY_SECONDS
+                with patch('masu.database.index_migrations.time.monotonic',
+                           return_value=retry_time):
+                    accessor.ensure_summary_indexes()
+                    accessor.ensure_summary_indexes()
+            self.assertEqual(mock_apply.call_count, 2)
+        self.assertFalse(index_migrations.is_migrated(self.test_schema))
+
+    def test_summary_deletes_use_indexes(self):
+        """Test that the range deletes of the summary SQL scan the masu indexes."""
+        index_migrations.apply_index_migrations(self.conn, self.test_schema)
+        table_indexes = {index.table: index.name for index in index_migrations.SUMMARY_INDEXES}
+        # The seeded rows are rolled back with the rest of the test
+        self.conn.connection.autocommit = False
+        identifiers = {
+            'uuid': 'explain',
+            'summary_table': 'reporting_ocpawscostlineitem_daily_summary',
+            'project_summary_table': 'reporting_ocpawscostlineitem_project_daily_summary',
+        }
+        bind_params = {
+            'start_date': '2019-01-01',
+            'end_date': '2019-01-31',
+            'cluster_id': 'testcluster',
+            'bill_ids': [1],
+        }
+        explained = set()
+        with self.conn.cursor() as cursor:
+            cursor.execute(f'SET LOCAL search_path TO {self.test_schema}')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            for table in table_indexes:
+                _seed_table(cursor, table)
+            for name, template in SQL_TEMPLATES.items():
+                if not template.identifiers <= set(identifiers):
+                    continue
+                sql = template.render(
+                    {key: identifiers[key] for key in template.identifiers},
+                    {key: bind_params[key] for key in template.params}
+                )
+                for statement in sql.split(';'):
+                    lines = [line for line in statement.strip().splitlines()
+                             if not line.strip().startswith('--')]
+                    if not lines or not lines[0].startswith('DELETE FROM'):
+                        continue
+                    table = lines[0].split()[2]
+                    if table not in table_indexes:
+                        continue
+                    with self.subTest(template=name, statement=lines[0]):
+                        cursor.execute(f'EXPLAIN (FORMAT JSON) {statement}', bind_params)
+                        plan = cursor.fetchone()[0]
+                        if isinstance(plan, str):
+                            plan = json.loads(plan)
+                        self.assertIn(table_indexes[table], _index_names(plan[0]['Plan']))
+                    explained.add(table)
+        self.conn.rollback()
+        self.conn.connection.autocommit = True
+
+        self.assertEqual(explained, set(table_indexes))
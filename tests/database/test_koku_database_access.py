@@ -0,0 +1,113 @@
+#
+# Copyright 2018 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Test the KokuDBAccess reflected schema cache."""
+from unittest.mock import patch
+
+from sqlalchemy.ext.automap import automap_base
+
+import masu.prometheus_stats as worker_stats
+from masu.config import Config
+from masu.database.koku_database_access import KokuDBAccess, invalidate_base_cache
+from tests import MasuTestCase
+
+
+class KokuDBAccessTest(MasuTestCase):
+    """Test cases for the reflected schema cache."""
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        super().setUp()
+        invalidate_base_cache()
+
+    def tearDown(self):
+        """Leave an empty cache behind."""
+        invalidate_base_cache()
+
+    @staticmethod
+    def _count(result):
+        """Return the count of cache lookups with a result."""
+        return worker_stats.SCHEMA_CACHE_COUNTER.labels(result=result)._value.get()
+
+    def test_base_reused(self):
+        """Test that a schema is reflected once for every accessor."""
+        misses = self._count('miss')
+        hits = self._count('hit')
+
+        first = KokuDBAccess(self.test_schema)
+        second = KokuDBAccess(self.test_schema)
+
+        self.assertIs(first.get_base(), second.get_base())
+        self.assertIs(second.get_meta(), second.get_base().metadata)
+        self.assertEqual(self._count('miss'), misses + 1)
+        self.assertEqual(self._count('hit'), hits + 1)
+        first.close_session()
+        second.close_session()
+
+    def test_invalidate_base_cache(self):
+        """Test that an invalidated schema is reflected again."""
+        first = KokuDBAccess(self.test_schema)
+        invalidate_base_cache(self.test_schema)
+        misses = self._count('miss')
+
+        with patch('masu.database.koku_database_access.automap_base',
+                   wraps=automap_base) as mock_automap:
+            second = KokuDBAccess(self.test_schema)
+            mock_automap.assert_called_once()
+
+        self.assertIsNot(first.get_base(), second.get_base())
+        self.assertEqual(self._count('miss'), misses + 1)
+        first.close_session()
+        second.close_session()
+
+    def test_invalidate_other_schema(self):
+        """Test that invalidating another schema keeps the cached base."""
+        first = KokuDBAccess(self.test_schema)
+        invalidate_base_cache('acct10002')
+        second = KokuDBAccess(self.test_schema)
+
+        self.assertIs(first.get_base(), second.get_base())
+        first.close_session()
+        second.close_session()
+
+    def test_base_reflected_after_migrations(self):
+        """Test that a cached base is evicted when the schema's migrations change."""
+        with patch.object(Config, 'SCHEMA_CACHE_TTL', 0):
+            with patch('masu.database.koku_database_access.schema_snapshot.migration_fingerprint',
+                       return_value='before'):
+                first = KokuDBAccess(self.test_schema)
+                second = KokuDBAccess(self.test_schema)
+            with patch('masu.database.koku_database_access.schema_snapshot.migration_fingerprint',
+                       return_value='after'):
+                third = KokuDBAccess(self.test_schema)
+
+        self.assertIs(first.get_base(), second.get_base())
+        self.assertIsNot(first.get_base(), third.get_base())
+        for accessor in (first, second, third):
+            accessor.close_session()
+
+    def test_migrations_checked_once_per_ttl(self):
+        """Test that accessors reuse a base without checking migrations within the TTL."""
+        with patch('masu.database.koku_database_access.schema_snapshot.migration_fingerprint',
+                   return_value='before') as mock_fingerprint:
+            first = KokuDBAccess(self.test_schema)
+            second = KokuDBAccess(self.test_schema)
+
+        mock_fingerprint.assert_called_once()
+        self.assertIs(first.get_base(), second.get_base())
+        first.close_session()
+        second.close_session()
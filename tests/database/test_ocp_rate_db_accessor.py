@@ -52,7 +52,7 @@ class OCPRateDBAccessorTest(MasuTestCase):
         super().setUp()
         if self.accessor._conn.closed:
             self.accessor._conn = self.accessor._db.connect()
-        if self.accessor._pg2_conn.closed:
+        if not self.accessor._pg2_conn.is_valid:
             self.accessor._pg2_conn = self.accessor._get_psycopg2_connection()
         if self.accessor._cursor.closed:
             self.accessor._cursor = self.accessor._get_psycopg2_cursor()
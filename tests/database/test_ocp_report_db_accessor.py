@@ -31,7 +31,7 @@ from sqlalchemy.sql import func
 
 from masu.database import OCP_REPORT_TABLE_MAP
 from masu.database.report_db_accessor_base import ReportSchema
-from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
+from masu.database.ocp_report_db_accessor import NODE_CAPACITY_TABLE, OCPReportDBAccessor
 from masu.database.provider_db_accessor import ProviderDBAccessor
 from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
 from masu.external.date_accessor import DateAccessor
@@ -64,7 +64,7 @@ class OCPReportDBAccessorTest(MasuTestCase):
         super().setUp()
         if self.accessor._conn.closed:
             self.accessor._conn = self.accessor._db.connect()
-        if self.accessor._pg2_conn.closed:
+        if not self.accessor._pg2_conn.is_valid:
             self.accessor._pg2_conn = self.accessor._get_psycopg2_connection()
         if self.accessor._cursor.closed:
             self.accessor._cursor = self.accessor._get_psycopg2_cursor()
@@ -205,6 +205,60 @@ class OCPReportDBAccessorTest(MasuTestCase):
         self.assertIsNotNone(current_report_period.report_period_start)
         self.assertIsNotNone(current_report_period.report_period_end)
 
+    def test_merge_temp_table_truncates(self):
+        """Test that merged rows are removed from the temp table."""
+        table_name = OCP_REPORT_TABLE_MAP['line_item']
+        cursor = self.accessor._cursor
+        temp_table = self.accessor.create_temp_table(table_name, drop_column='id')
+        cursor.execute(
+            """SELECT column_name FROM information_schema.columns
+                WHERE table_schema = 'acct10001' AND table_name = %s""",
+            [table_name]
+        )
+        columns = [row[0] for row in cursor.fetchall() if row[0] != 'id']
+        column_str = ','.join(columns)
+        cursor.execute(f'INSERT INTO {temp_table} ({column_str}) SELECT {column_str} FROM {table_name}')
+        cursor.execute(f'SELECT count(*) FROM {table_name}')
+        expected = cursor.fetchone()[0]
+
+        self.accessor.merge_temp_table(table_name, temp_table, columns,
+                                       ['report_id', 'namespace', 'pod', 'node'])
+
+        cursor.execute(f'SELECT count(*) FROM {table_name}')
+        self.assertEqual(cursor.fetchone()[0], expected)
+        cursor.execute(f'SELECT count(*) FROM {temp_table}')
+        self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_merge_temp_table_unconfirmed(self):
+        """Test that rows repeated in the unconfirmed table keep the first row."""
+        table_name = OCP_REPORT_TABLE_MAP['line_item']
+        cursor = self.accessor._cursor
+        temp_table = self.accessor.create_temp_table(table_name, drop_column='id')
+        unconfirmed_table = self.accessor.create_temp_table(table_name, drop_column='id')
+        cursor.execute(
+            """SELECT column_name FROM information_schema.columns
+                WHERE table_schema = 'acct10001' AND table_name = %s""",
+            [table_name]
+        )
+        columns = [row[0] for row in cursor.fetchall() if row[0] != 'id']
+        column_str = ','.join(columns)
+        cursor.execute(f'INSERT INTO {temp_table} ({column_str}) SELECT {column_str} FROM {table_name}')
+        cursor.execute(f'INSERT INTO {unconfirmed_table} ({column_str}) SELECT {column_str} FROM {table_name}')
+        cursor.execute(f'UPDATE {unconfirmed_table} SET pod_usage_cpu_core_seconds = -1')
+        cursor.execute(f'SELECT count(*) FROM {table_name}')
+        expected = cursor.fetchone()[0]
+
+        self.accessor.merge_temp_table(table_name, temp_table, columns,
+                                       ['report_id', 'namespace', 'pod', 'node'],
+                                       unconfirmed_table_name=unconfirmed_table)
+
+        cursor.execute(f'SELECT count(*) FROM {table_name}')
+        self.assertEqual(cursor.fetchone()[0], expected)
+        cursor.execute(f'SELECT count(*) FROM {table_name} WHERE pod_usage_cpu_core_seconds = -1')
+        self.assertEqual(cursor.fetchone()[0], 0)
+        cursor.execute(f'SELECT count(*) FROM {unconfirmed_table}')
+        self.assertEqual(cursor.fetchone()[0], 0)
+
     def test_get_usage_periods_by_date(self):
         """Test that report periods are returned by date filter."""
         period_start = DateAccessor().today_with_timezone('UTC').replace(day=1)
@@ -234,6 +288,26 @@ class OCPReportDBAccessorTest(MasuTestCase):
 
         self.assertEqual(period.provider_id, provider_id)
 
+    def test_get_report_periods_by_provider(self):
+        """Test that report periods can be limited to one provider."""
+        provider_id = self.ocp_provider_id
+
+        periods = self.accessor.get_report_periods(provider_id=provider_id)
+
+        self.assertGreater(len(periods), 0)
+        for _, _, period_provider_id in periods:
+            self.assertEqual(period_provider_id, provider_id)
+
+    def test_get_reports_by_report_period(self):
+        """Test that reports can be limited to one report period."""
+        current_report = self.accessor.get_current_usage_report()
+
+        reports = self.accessor.get_reports(report_period_id=current_report.report_period_id)
+
+        self.assertIn(current_report.id, reports.values())
+        for report_period_id, _ in reports:
+            self.assertEqual(report_period_id, current_report.report_period_id)
+
     def test_get_lineitem_query_for_reportid(self):
         """Test that the line item data is returned given a report_id."""
         current_report = self.accessor.get_current_usage_report()
@@ -255,6 +329,107 @@ class OCPReportDBAccessorTest(MasuTestCase):
         self.assertIsNotNone(query_report.pod_request_memory_byte_seconds)
         self.assertIsNotNone(query_report.pod_limit_memory_byte_seconds)
 
+    def test_save_node_capacity_keeps_highest(self):
+        """Test that saved node capacity keeps the highest value of each node."""
+        report_table = getattr(self.accessor.report_schema, OCP_REPORT_TABLE_MAP['report'])
+        report_id = self.accessor._session.query(report_table).first().id
+
+        self.accessor.save_node_capacity({(report_id, 'node_1'): [Decimal('10'), Decimal('20')]})
+        self.accessor.save_node_capacity({
+            (report_id, 'node_1'): [Decimal('5'), Decimal('30')],
+            (report_id, 'node_2'): [None, Decimal('1')],
+        })
+
+        self.accessor._cursor.execute(
+            f"""SELECT node, node_capacity_cpu_core_seconds, node_capacity_memory_byte_seconds
+                FROM {NODE_CAPACITY_TABLE} WHERE report_id = %s ORDER BY node""",
+            [report_id]
+        )
+        self.assertEqual(
+            self.accessor._cursor.fetchall(),
+            [('node_1', Decimal('10'), Decimal('30')), ('node_2', None, Decimal('1'))]
+        )
+        self.accessor._pg2_conn.commit()
+
+    def _get_line_item_node_capacity(self, usage_date):
+        """Return the line item node capacity of each interval of a day in the cluster."""
+        self.accessor._cursor.execute(
+            f"""SELECT li.report_id, li.node, max(li.node_capacity_cpu_core_seconds),
+                    max(li.node_capacity_memory_byte_seconds)
+                FROM {OCP_REPORT_TABLE_MAP['line_item']} AS li
+                JOIN {OCP_REPORT_TABLE_MAP['report']} AS ur ON li.report_id = ur.id
+                JOIN {OCP_REPORT_TABLE_MAP['report_period']} AS rp ON ur.report_period_id = rp.id
+                WHERE date(ur.interval_start) = %s AND rp.cluster_id = %s
+                GROUP BY li.report_id, li.node""",
+            [usage_date.date(), self.cluster_id]
+        )
+        capacity = self.accessor._cursor.fetchall()
+        self.accessor._pg2_conn.commit()
+        return capacity
+
+    def _get_cluster_capacity(self, usage_date):
+        """Populate the daily table and return the cluster capacity of a day."""
+        daily_table_name = OCP_REPORT_TABLE_MAP['line_item_daily']
+        daily_table = getattr(self.accessor.report_schema, daily_table_name)
+        self.accessor.populate_line_item_daily_table(usage_date, usage_date, self.cluster_id)
+        entry = self.accessor._get_db_obj_query(daily_table_name).filter(
+            daily_table.usage_start == usage_date
+        ).first()
+        return entry.cluster_capacity_cpu_core_seconds, entry.cluster_capacity_memory_byte_seconds
+
+    def test_populate_line_item_daily_table_node_capacity(self):
+        """Test that recorded node capacity is used instead of the line items."""
+        report_table = getattr(self.accessor.report_schema, OCP_REPORT_TABLE_MAP['report'])
+        report = self.accessor._session.query(report_table).first()
+        usage_date = report.interval_start.replace(hour=0, minute=0, second=0, microsecond=0)
+        line_item_capacity = self._get_line_item_node_capacity(usage_date)
+
+        self.accessor.save_node_capacity({
+            (report_id, node): [Decimal('7200'), Decimal('3600')]
+            for report_id, node, _, _ in line_item_capacity
+        })
+
+        self.assertEqual(
+            self._get_cluster_capacity(usage_date),
+            (Decimal('7200') * len(line_item_capacity), Decimal('3600') * len(line_item_capacity))
+        )
+
+    def test_populate_line_item_daily_table_node_capacity_fallback(self):
+        """Test that intervals without recorded capacity fall back to the line items."""
+        report_table = getattr(self.accessor.report_schema, OCP_REPORT_TABLE_MAP['report'])
+        report = self.accessor._session.query(report_table).first()
+        usage_date = report.interval_start.replace(hour=0, minute=0, second=0, microsecond=0)
+        line_item_capacity = self._get_line_item_node_capacity(usage_date)
+
+        self.accessor.save_node_capacity({
+            (report.id, 'capacity_node'): [Decimal('7200'), Decimal('3600')]
+        })
+
+        other_intervals = [capacity for capacity in line_item_capacity if capacity[0] != report.id]
+        self.assertEqual(
+            self._get_cluster_capacity(usage_date),
+            (Decimal('7200') + sum(cpu for _, _, cpu, _ in other_intervals),
+             Decimal('3600') + sum(memory for _, _, _, memory in other_intervals))
+        )
+
+    def test_delete_node_capacity(self):
+        """Test that the node capacity of a report period is removed."""
+        report_table = getattr(self.accessor.report_schema, OCP_REPORT_TABLE_MAP['report'])
+        report = self.accessor._session.query(report_table).first()
+
+        self.accessor.save_node_capacity({(report.id, 'node_1'): [Decimal('10'), Decimal('20')]})
+        removed = self.accessor.delete_node_capacity(report.report_period_id)
+
+        self.assertGreaterEqual(removed, 1)
+        self.accessor._cursor.execute(
+            f"""SELECT count(*) FROM {NODE_CAPACITY_TABLE} AS nc
+                JOIN {OCP_REPORT_TABLE_MAP['report']} AS ur ON nc.report_id = ur.id
+                WHERE ur.report_period_id = %s""",
+            [report.report_period_id]
+        )
+        self.assertEqual(self.accessor._cursor.fetchone()[0], 0)
+        self.accessor._pg2_conn.commit()
+
     def test_populate_line_item_daily_table(self):
         """Test that the line item daily table populates."""
         report_table_name = OCP_REPORT_TABLE_MAP['report']
@@ -500,6 +675,88 @@ class OCPReportDBAccessorTest(MasuTestCase):
 
         self.assertEqual(tag_keys, expected_tag_keys)
 
+    def _assert_label_values_kept(self, populate, daily_table_name, label_column,
+                                  summary_table_name, day):
+        """Assert that a date-scoped label summary keeps the values already saved."""
+        cursor = self.accessor._cursor
+        cursor.execute(
+            f"""SELECT labels.key, labels.value
+                FROM {daily_table_name} AS li, jsonb_each_text(li.{label_column}) labels
+                WHERE li.usage_start::date = %s
+                LIMIT 1""",
+            [day]
+        )
+        key, daily_value = cursor.fetchone()
+        cursor.execute(
+            f"""UPDATE {summary_table_name}
+                SET values = array_append(values, 'kept_value')
+                WHERE key = %s""",
+            [key]
+        )
+        self.accessor._pg2_conn.commit()
+
+        populate(day, day)
+
+        cursor.execute(f'SELECT values FROM {summary_table_name} WHERE key = %s', [key])
+        values = cursor.fetchone()[0]
+        self.accessor._pg2_conn.commit()
+        self.assertIn('kept_value', values)
+        self.assertIn(daily_value, values)
+        self.assertEqual(len(values), len(set(values)))
+
+    def test_populate_pod_label_summary_table_date_range(self):
+        """Test that pod labels of a date range are merged into the saved values."""
+        report_table = getattr(self.accessor.report_schema, OCP_REPORT_TABLE_MAP['report'])
+        today = DateAccessor().today_with_timezone('UTC')
+        last_month = today - relativedelta.relativedelta(months=1)
+
+        for start_date in (today, last_month):
+            period = self.creator.create_ocp_report_period(start_date)
+            report = self.creator.create_ocp_report(period, start_date)
+            self.creator.create_ocp_usage_line_item(period, report)
+
+        start_date, end_date = self.accessor._session.query(
+            func.min(report_table.interval_start),
+            func.max(report_table.interval_start)
+        ).first()
+        self.accessor.populate_line_item_daily_table(start_date, end_date, self.cluster_id)
+        self.accessor.populate_pod_label_summary_table()
+
+        self._assert_label_values_kept(
+            self.accessor.populate_pod_label_summary_table,
+            OCP_REPORT_TABLE_MAP['line_item_daily'],
+            'pod_labels',
+            OCP_REPORT_TABLE_MAP['pod_label_summary'],
+            today.date()
+        )
+
+    def test_populate_volume_label_summary_table_date_range(self):
+        """Test that volume labels of a date range are merged into the saved values."""
+        report_table = getattr(self.accessor.report_schema, OCP_REPORT_TABLE_MAP['report'])
+        today = DateAccessor().today_with_timezone('UTC')
+        last_month = today - relativedelta.relativedelta(months=1)
+
+        for start_date in (today, last_month):
+            period = self.creator.create_ocp_report_period(start_date)
+            report = self.creator.create_ocp_report(period, start_date)
+            self.creator.create_ocp_storage_line_item(period, report)
+
+        start_date, end_date = self.accessor._session.query(
+            func.min(report_table.interval_start),
+            func.max(report_table.interval_start)
+        ).first()
+        self.accessor.populate_storage_line_item_daily_table(start_date, end_date,
+                                                             self.cluster_id)
+        self.accessor.populate_volume_label_summary_table()
+
+        self._assert_label_values_kept(
+            self.accessor.populate_volume_label_summary_table,
+            OCP_REPORT_TABLE_MAP['storage_line_item_daily'],
+            'persistentvolume_labels',
+            OCP_REPORT_TABLE_MAP['volume_label_summary'],
+            today.date()
+        )
+
     def test_get_usage_period_before_date(self):
         """Test that gets a query for usage report periods before a date."""
         table_name = OCP_REPORT_TABLE_MAP['report_period']
@@ -91,3 +91,22 @@ class ReportManifestDBAccessorTest(MasuTestCase):
         self.manifest_accessor.mark_manifest_as_updated(manifest)
         self.assertGreater(manifest.manifest_updated_datetime, now)
         self.manifest_accessor.commit()
+
+    def test_increment_num_processed_files(self):
+        """Test that processed files are counted in the database."""
+        manifest = self.manifest_accessor.add(**self.manifest_dict)
+        self.manifest_accessor.commit()
+
+        with ReportManifestDBAccessor() as first, ReportManifestDBAccessor() as second:
+            self.assertTrue(first.increment_num_processed_files(manifest.id))
+            first.commit()
+            self.assertTrue(second.increment_num_processed_files(manifest.id))
+            second.commit()
+
+        self.manifest_accessor._session.refresh(manifest)
+        self.assertEqual(manifest.num_processed_files, 2)
+        self.assertIsNotNone(manifest.manifest_updated_datetime)
+
+    def test_increment_num_processed_files_missing(self):
+        """Test that a missing manifest is reported."""
+        self.assertFalse(self.manifest_accessor.increment_num_processed_files(-1))
@@ -22,7 +22,10 @@ from unittest.mock import Mock, patch
 from sqlalchemy.orm.session import Session
 
 from masu.database import AWS_CUR_TABLE_MAP
-from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
+from masu.database.reporting_common_db_accessor import (ColumnMap,
+                                                         ReportingCommonDBAccessor,
+                                                         get_column_map,
+                                                         refresh_column_map)
 from tests import MasuTestCase
 
 
@@ -88,3 +91,36 @@ class ReportingCommonDBAccessorTest(MasuTestCase):
         accessor._session = mock_session
         accessor.commit()
         mock_session.commit.assert_called()
+
+    def test_get_column_map_cached(self):
+        """Test that the column map is read once until it expires."""
+        refresh_column_map()
+        column_map = ColumnMap({'reporting_test': {'report/column': 'column'}})
+        with patch.object(ReportingCommonDBAccessor, 'generate_column_map',
+                          return_value=column_map) as mock_generate:
+            self.assertIs(get_column_map(), column_map)
+            self.assertIs(self.accessor.column_map, column_map)
+            mock_generate.assert_called_once()
+
+            refresh_column_map()
+            get_column_map()
+            self.assertEqual(mock_generate.call_count, 2)
+
+            with patch('masu.database.reporting_common_db_accessor.Config.COLUMN_MAP_TTL', 0):
+                refresh_column_map()
+                get_column_map()
+                get_column_map()
+            self.assertEqual(mock_generate.call_count, 4)
+        refresh_column_map()
+
+    def test_column_map_views(self):
+        """Test the compiled views of the column map."""
+        column_map = ColumnMap({'reporting_test': {'report/a': 'a', 'report/b': 'b'}})
+
+        self.assertEqual(column_map.columns('reporting_test'), ('a', 'b'))
+        self.assertEqual(column_map.inverse('reporting_test'),
+                         {'a': 'report/a', 'b': 'report/b'})
+        self.assertEqual(column_map['reporting_missing'], {})
+        self.assertEqual(column_map.columns('reporting_missing'), ())
+        self.assertEqual(column_map.inverse('reporting_missing'), {})
+        self.assertNotIn('reporting_missing', column_map)
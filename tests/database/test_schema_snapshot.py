@@ -0,0 +1,137 @@
+#
+# Copyright 2018 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Test the schema_snapshot module."""
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from masu.database import schema_snapshot
+from masu.database.engine import DB_ENGINE
+from masu.database.koku_database_access import KokuDBAccess, invalidate_base_cache
+from tests import MasuTestCase
+
+
+class SchemaSnapshotTest(MasuTestCase):
+    """Test cases for the schema snapshot."""
+
+    def setUp(self):
+        """Use an empty snapshot directory for every test."""
+        super().setUp()
+        self.snapshot_dir = tempfile.mkdtemp()
+        self.dir_patch = patch('masu.database.schema_snapshot.Config.SCHEMA_SNAPSHOT_DIR',
+                               self.snapshot_dir)
+        self.dir_patch.start()
+        schema_snapshot.clear_snapshot()
+        invalidate_base_cache()
+
+    def tearDown(self):
+        """Remove the snapshot directory."""
+        self.dir_patch.stop()
+        schema_snapshot.clear_snapshot()
+        invalidate_base_cache()
+        shutil.rmtree(self.snapshot_dir)
+
+    def test_migration_fingerprint(self):
+        """Test that the fingerprint changes with the applied migrations."""
+        fingerprint = schema_snapshot.migration_fingerprint(DB_ENGINE, self.test_schema)
+        self.assertEqual(
+            schema_snapshot.migration_fingerprint(DB_ENGINE, self.test_schema), fingerprint
+        )
+
+        with DB_ENGINE.begin() as connection:
+            connection.execute(
+                f"""INSERT INTO {self.test_schema}.django_migrations (app, name, applied)
+                    VALUES ('reporting', '9999_test', now())"""
+            )
+        try:
+            self.assertNotEqual(
+                schema_snapshot.migration_fingerprint(DB_ENGINE, self.test_schema), fingerprint
+            )
+        finally:
+            with DB_ENGINE.begin() as connection:
+                connection.execute(
+                    f"DELETE FROM {self.test_schema}.django_migrations WHERE name = '9999_test'"
+                )
+
+    def test_migration_fingerprint_no_table(self):
+        """Test that a schema without migrations has no fingerprint."""
+        self.assertIsNone(schema_snapshot.migration_fingerprint(DB_ENGINE, 'acct_no_schema'))
+
+    def test_save_and_load_metadata(self):
+        """Test that saved metadata is loaded for any tenant schema."""
+        accessor = KokuDBAccess(self.test_schema)
+        schema_snapshot.save_metadata(self.test_schema, 'abc', accessor.get_meta())
+        accessor.close_session()
+        self.assertTrue(os.path.exists(schema_snapshot.snapshot_path()))
+
+        schema_snapshot.clear_snapshot()
+        metadata = schema_snapshot.load_metadata(DB_ENGINE, 'acct10002', 'abc')
+
+        self.assertEqual(metadata.schema, 'acct10002')
+        self.assertIn('acct10002.reporting_awscostentrybill', metadata.tables)
+        self.assertNotIn(f'{self.test_schema}.reporting_awscostentrybill', metadata.tables)
+        self.assertIsNone(schema_snapshot.load_metadata(DB_ENGINE, 'acct10002', 'def'))
+        self.assertIsNone(schema_snapshot.load_metadata(DB_ENGINE, 'public', 'abc'))
+
+    def test_snapshot_writable_by_others_ignored(self):
+        """Test that a snapshot in a directory others can write to is not loaded."""
+        accessor = KokuDBAccess(self.test_schema)
+        schema_snapshot.save_metadata(self.test_schema, 'abc', accessor.get_meta())
+        accessor.close_session()
+
+        os.chmod(self.snapshot_dir, 0o777)
+        schema_snapshot.clear_snapshot()
+        self.assertIsNone(schema_snapshot.load_metadata(DB_ENGINE, self.test_schema, 'abc'))
+
+        os.chmod(self.snapshot_dir, 0o700)
+        schema_snapshot.clear_snapshot()
+        self.assertIsNotNone(schema_snapshot.load_metadata(DB_ENGINE, self.test_schema, 'abc'))
+
+    def test_accessor_uses_snapshot(self):
+        """Test that an accessor reflects once and then loads the snapshot."""
+        with patch('masu.database.koku_database_access.Config.SCHEMA_SNAPSHOT', True):
+            first = KokuDBAccess(self.test_schema)
+            first.close_session()
+            self.assertTrue(os.path.exists(schema_snapshot.snapshot_path()))
+
+            invalidate_base_cache()
+            schema_snapshot.clear_snapshot()
+            with patch.object(KokuDBAccess, '_create_metadata') as mock_reflect:
+                second = KokuDBAccess(self.test_schema)
+                mock_reflect.assert_not_called()
+            second.close_session()
+
+        self.assertEqual(set(first.get_base().classes.keys()),
+                         set(second.get_base().classes.keys()))
+
+    def test_accessor_rebuilds_stale_snapshot(self):
+        """Test that a snapshot of other migrations is replaced."""
+        accessor = KokuDBAccess(self.test_schema)
+        schema_snapshot.save_metadata(self.test_schema, 'stale', accessor.get_meta())
+        accessor.close_session()
+        invalidate_base_cache()
+
+        with patch('masu.database.koku_database_access.Config.SCHEMA_SNAPSHOT', True):
+            KokuDBAccess(self.test_schema).close_session()
+
+        fingerprint = schema_snapshot.migration_fingerprint(DB_ENGINE, self.test_schema)
+        schema_snapshot.clear_snapshot()
+        self.assertIsNotNone(
+            schema_snapshot.load_metadata(DB_ENGINE, self.test_schema, fingerprint)
+        )
@@ -0,0 +1,73 @@
+#
+# Copyright 2018 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Test the SQL template registry."""
+import os
+import re
+
+import masu.database.sql_templates as sql_templates
+from masu.database.sql_templates import SQL_TEMPLATES, SQLTemplate, get_sql_template
+from tests import MasuTestCase
+
+
+class SQLTemplateTest(MasuTestCase):
+    """Test Cases for the SQL templates."""
+
+    def test_all_templates_loaded(self):
+        """Test that every SQL file is loaded as a template."""
+        sql_dir = os.path.join(os.path.dirname(sql_templates.__file__), 'sql')
+        sql_files = [name for name in os.listdir(sql_dir) if name.endswith('.sql')]
+
+        self.assertEqual(len(SQL_TEMPLATES), len(sql_files))
+        template = get_sql_template('reporting_ocpusagelineitem_daily')
+        self.assertEqual(template.identifiers, {'uuid'})
+        self.assertEqual(template.params, {'start_date', 'end_date', 'cluster_id'})
+
+    def test_render_identifiers(self):
+        """Test that identifiers are formatted and parameters left bound."""
+        template = SQLTemplate('test.sql',
+                               'SELECT * FROM {table} WHERE day = %(day)s::date')
+
+        sql = template.render(identifiers={'table': 'temp_1'},
+                              bind_params={'day': '2019-01-01'})
+
+        self.assertEqual(sql, 'SELECT * FROM temp_1 WHERE day = %(day)s::date')
+
+    def test_render_checks_values(self):
+        """Test that missing, unexpected and unsafe values are rejected."""
+        template = SQLTemplate('test.sql', 'SELECT * FROM {table} WHERE id = %(id)s')
+
+        with self.assertRaises(ValueError):
+            template.render(identifiers={'table': 'temp_1'})
+        with self.assertRaises(ValueError):
+            template.render(identifiers={'table': 'temp_1'},
+                            bind_params={'id': 1, 'other': 2})
+        with self.assertRaises(ValueError):
+            template.render(identifiers={'table': 'temp_1; DROP TABLE x'},
+                            bind_params={'id': 1})
+
+    def test_stray_percent_rejected(self):
+        """Test that a template with an unescaped % is rejected."""
+        with self.assertRaises(ValueError):
+            SQLTemplate('test.sql', "SELECT * FROM t WHERE a LIKE 'x%' AND b = %(b)s")
+
+    def test_date_ranges_not_wrapped(self):
+        """Test that no template wraps a column in date() to compare it to a range."""
+        wrapped = re.compile(r'date\([\w.]+\)\s*[<>]=?\s*%\(')
+        for name, template in SQL_TEMPLATES.items():
+            with self.subTest(template=name):
+                self.assertIsNone(wrapped.search(template.text))
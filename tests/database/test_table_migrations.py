@@ -0,0 +1,53 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+"""Test the table_migrations module."""
+from unittest.mock import patch
+
+from masu.database import table_migrations
+from masu.database.engine import DB_ENGINE
+from tests import MasuTestCase
+
+
+class TableMigrationsTest(MasuTestCase):
+    """Test cases for the masu table migrations."""
+
+    def setUp(self):
+        """Forget the schemas migrated by earlier tests."""
+        super().setUp()
+        table_migrations.clear_migrated()
+
+    def tearDown(self):
+        """Leave the migrated schemas unknown."""
+        table_migrations.clear_migrated()
+
+    def test_ensure_tables(self):
+        """Test that the masu tables of public and tenant schemas are created."""
+        for schema in ('public', self.test_schema):
+            table_migrations.ensure_tables(DB_ENGINE, schema)
+            with DB_ENGINE.connect() as connection:
+                for table in table_migrations.schema_tables(schema):
+                    self.assertIsNotNone(connection.execute(
+                        'SELECT to_regclass(%s)', f'{schema}.{table.name}'
+                    ).scalar())
+
+    def test_ensure_tables_once(self):
+        """Test that the tables of a schema are only created once per process."""
+        with patch.object(table_migrations, 'apply_table_migrations') as mock_apply:
+            table_migrations.ensure_tables(DB_ENGINE, self.test_schema)
+            table_migrations.ensure_tables(DB_ENGINE, self.test_schema)
+
+        mock_apply.assert_called_once()
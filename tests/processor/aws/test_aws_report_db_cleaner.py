@@ -17,6 +17,8 @@
 
 """Test the AWSReportDBCleaner utility object."""
 import datetime
+from unittest.mock import patch
+
 from dateutil import relativedelta
 
 from masu.database import AWS_CUR_TABLE_MAP
@@ -223,6 +225,33 @@ class AWSReportDBCleanerTest(MasuTestCase):
         self.assertIsNone(self.accessor._get_db_obj_query(line_item_table_name).first())
         self.assertIsNone(self.accessor._get_db_obj_query(cost_entry_table_name).first())
 
+    def test_purge_expired_report_data_drops_partitions(self):
+        """Test that line item partitions are dropped when the table is partitioned."""
+        bill_table_name = AWS_CUR_TABLE_MAP['bill']
+        line_item_table_name = AWS_CUR_TABLE_MAP['line_item']
+        first_bill = self.accessor._get_db_obj_query(bill_table_name).first()
+        cleaner = AWSReportDBCleaner('acct10001')
+
+        def drop_partition(table_name, bill_id):
+            """Stand in for dropping the partition of a bill."""
+            self.accessor._cursor.execute(
+                f'DELETE FROM {table_name} WHERE cost_entry_bill_id = %s', [bill_id]
+            )
+            self.accessor._pg2_conn.commit()
+            return True
+
+        with patch.object(AWSReportDBAccessor, 'is_partitioned', return_value=True), \
+                patch.object(AWSReportDBAccessor, 'drop_partition',
+                             side_effect=drop_partition) as mock_drop:
+            cleaner.purge_expired_report_data(first_bill.billing_period_start, simulate=True)
+            mock_drop.assert_not_called()
+
+            cleaner.purge_expired_report_data(first_bill.billing_period_start)
+            mock_drop.assert_called_with(line_item_table_name, first_bill.id)
+
+        self.assertIsNone(self.accessor._get_db_obj_query(bill_table_name).first())
+        self.assertIsNone(self.accessor._get_db_obj_query(line_item_table_name).first())
+
     def test_purge_expired_report_data_no_args(self):
         """Test that the provider_id deletes all data for the provider."""
 
@@ -25,9 +25,11 @@ import gzip
 from itertools import islice
 import json
 import logging
+import os
 import random
 import shutil
 import tempfile
+from unittest.mock import patch
 import psycopg2
 
 from sqlalchemy.sql.expression import delete
@@ -36,6 +38,7 @@ from sqlalchemy.sql import func
 from masu.config import Config
 from masu.database import AWS_CUR_TABLE_MAP
 from masu.database.aws_report_db_accessor import AWSReportDBAccessor
+from masu.database.engine import DB_ENGINE
 from masu.database.report_manifest_db_accessor import ReportManifestDBAccessor
 from masu.database.report_stats_db_accessor import ReportStatsDBAccessor
 from tests.database.helpers import ReportObjectCreator
@@ -43,7 +46,10 @@ from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
 from masu.exceptions import MasuProcessingError
 from masu.external import GZIP_COMPRESSED, UNCOMPRESSED
 from masu.external.date_accessor import DateAccessor
-from masu.processor.aws.aws_report_processor import AWSReportProcessor, ProcessedReport
+from masu.processor.aws.aws_report_processor import (AWSReportProcessor,
+                                                     ProcessedReport,
+                                                     ReportProjection,
+                                                     _use_worker_connection_pool)
 import masu.util.common as common_util
 from tests import MasuTestCase
 
@@ -114,8 +120,10 @@ class AWSReportProcessorTest(MasuTestCase):
         cls.report_tables = list(_report_tables.values())
         # Grab a single row of test data to work with
         with open(cls.test_report, 'r') as f:
-            reader = csv.DictReader(f)
-            cls.row = next(reader)
+            reader = csv.reader(f)
+            cls.header = next(reader)
+            cls.raw_row = next(reader)
+        cls.row_dict = dict(zip(cls.header, cls.raw_row))
 
     @classmethod
     def tearDownClass(cls):
@@ -129,6 +137,11 @@ class AWSReportProcessorTest(MasuTestCase):
         self.session = self.accessor._session
         self.manifest = self.manifest_accessor.add(**self.manifest_dict)
         self.manifest_accessor.commit()
+        self.processor._projection = self.processor._compile_projection(
+            self.header,
+            self.accessor
+        )
+        self.row = self.processor._projection.prepare(list(self.raw_row))
 
     def tearDown(self):
         """Return the database to a pre-test state."""
@@ -208,6 +221,59 @@ class AWSReportProcessorTest(MasuTestCase):
             else:
                 self.assertTrue(count > counts[table_name])
 
+    def test_process_with_process_pool(self):
+        """Test that a file processed in parallel saves every line item."""
+        processor = AWSReportProcessor(
+            schema_name='acct10001',
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_id=1
+        )
+        processor._workers = 2
+        processor._batch_size = 100
+        with open(self.test_report, 'r') as f:
+            expected = sum(1 for row in csv.reader(f) if row) - 1
+
+        processor.process()
+
+        table = getattr(self.report_schema, AWS_CUR_TABLE_MAP['line_item'])
+        self.assertEqual(self.accessor._session.query(table).count(), expected)
+
+    def test_use_worker_connection_pool(self):
+        """Test that a pool process replaces its inherited connection pool once."""
+        inherited = DB_ENGINE.pool
+        with patch('masu.processor.aws.aws_report_processor.getpid', return_value=-1), \
+                patch('masu.processor.aws.aws_report_processor._WORKER_POOL_PID', None), \
+                patch('masu.processor.aws.aws_report_processor._PARENT_POOLS', []) as parent_pools, \
+                patch.object(DB_ENGINE, 'pool', inherited):
+            _use_worker_connection_pool()
+            worker_pool = DB_ENGINE.pool
+            _use_worker_connection_pool()
+
+            self.assertIsNot(worker_pool, inherited)
+            self.assertIs(DB_ENGINE.pool, worker_pool)
+            self.assertEqual(parent_pools, [inherited])
+            worker_pool.dispose()
+        self.assertIs(DB_ENGINE.pool, inherited)
+
+    def test_use_process_pool(self):
+        """Test that a process pool is only used when configured and allowed."""
+        processor = AWSReportProcessor(
+            schema_name='acct10001',
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_id=1
+        )
+        processor._workers = 1
+        self.assertFalse(processor._use_process_pool())
+
+        processor._workers = 4
+        self.assertTrue(processor._use_process_pool())
+
+        with patch('masu.processor.aws.aws_report_processor.multiprocessing') as mock_mp:
+            mock_mp.current_process.return_value.daemon = True
+            self.assertFalse(processor._use_process_pool())
+
     def test_process_gzip(self):
         """Test the processing of a gzip compressed file."""
         counts = {}
@@ -471,7 +537,7 @@ class AWSReportProcessorTest(MasuTestCase):
 
     def test_update_mappings(self):
         """Test that mappings are updated."""
-        test_entry = {'key': 'value'}
+        test_entry = {(1, 'key'): 'value'}
         counts = {}
         ce_maps = {
             'cost_entry': self.processor.existing_cost_entry_map,
@@ -537,6 +603,49 @@ class AWSReportProcessorTest(MasuTestCase):
             for key in data:
                 self.assertIn(key, expected_columns)
 
+    def test_resolve_dimensions(self):
+        """Test that a batch of rows resolves every dimension up front."""
+        processor = AWSReportProcessor(
+            schema_name='acct10001',
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_id=1
+        )
+        processor._projection = self.processor._projection
+        with open(self.test_report, 'r') as f:
+            reader = csv.reader(f)
+            next(reader)
+            rows = [processor._projection.prepare(row) for row in islice(reader, 50)]
+
+        processor._resolve_dimensions(rows, self.accessor)
+
+        processed = processor.processed_report
+        self.assertNotEqual(processed.bills, {})
+        self.assertNotEqual(processed.cost_entries, {})
+        self.assertNotEqual(processed.products, {})
+        self.assertNotEqual(processed.pricing, {})
+
+        with patch.object(self.accessor, 'insert_on_conflict_do_nothing') as mock_insert:
+            for row in rows:
+                processor.create_cost_entry_objects(row, self.accessor)
+            mock_insert.assert_not_called()
+
+    def test_process_rows_updates_mappings(self):
+        """Test that a processed batch is cached for the next batch."""
+        processor = AWSReportProcessor(
+            schema_name='acct10001',
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_id=1
+        )
+        processor._projection = self.processor._projection
+
+        bill_id = processor._process_rows([self.row], self.accessor, 0)
+
+        self.assertIn(bill_id, processor.existing_bill_map.values())
+        self.assertEqual(processor.processed_report.bills, {})
+        self.assertEqual(processor.processed_report.line_items, [])
+
     def test_process_tags(self):
         """Test that tags are properly packaged in a JSON string."""
         row = {
@@ -545,12 +654,66 @@ class AWSReportProcessorTest(MasuTestCase):
             'resourceTags/System': 'value',
             'resourceTags/system:system_key': 'system_value'
         }
+        self.processor._projection = ReportProjection(row.keys(), self.column_map)
         expected = {'environment': 'prod', 'system_key': 'system_value'}
-        actual = json.loads(self.processor._process_tags(row))
+        actual = json.loads(self.processor._process_tags(list(row.values())))
 
         self.assertNotIn(row['notATag'], actual)
         self.assertEqual(expected, actual)
 
+    def test_projection_splits_memory_unit(self):
+        """Test that product memory is split into a value and unit."""
+        header = ['product/sku', 'product/memory']
+        projection = ReportProjection(header, self.column_map)
+        table_name = AWS_CUR_TABLE_MAP['product']
+
+        row = projection.prepare(['sku', '1 GiB'])
+        data = projection.project(row, table_name)
+        self.assertEqual(data.get('memory'), '1')
+        self.assertEqual(data.get('memory_unit'), 'GiB')
+
+        row = projection.prepare(['sku', '1'])
+        data = projection.project(row, table_name)
+        self.assertEqual(data.get('memory'), '1')
+        self.assertIsNone(data.get('memory_unit'))
+
+    def test_read_first_row_keeps_memory_unit(self):
+        """Test that the first row is prepared once when it is read back."""
+        header = ['product/sku', 'product/memory']
+        self.processor._projection = ReportProjection(header, self.column_map)
+        table_name = AWS_CUR_TABLE_MAP['product']
+
+        first_row, rows = self.processor._read_first_row(iter([['sku', '16 GiB']]))
+        batches = list(self.processor._read_batches(rows))
+
+        self.assertEqual(first_row[1], '16')
+        data = self.processor._projection.project(batches[0][0], table_name)
+        self.assertEqual(data.get('memory'), '16')
+        self.assertEqual(data.get('memory_unit'), 'GiB')
+
+    def test_projection_matches_dict_rows(self):
+        """Test that projected data matches a dict walk of the row."""
+        projection = ReportProjection(self.header, self.column_map)
+        row = projection.prepare(list(self.raw_row))
+        for table_name in (AWS_CUR_TABLE_MAP['bill'],
+                           AWS_CUR_TABLE_MAP['pricing'],
+                           AWS_CUR_TABLE_MAP['line_item']):
+            table_map = self.column_map[table_name]
+            expected = {table_map[key]: value
+                        for key, value in self.row_dict.items()
+                        if key in table_map}
+            self.assertEqual(projection.project(row, table_name), expected)
+
+    def test_projection_pads_short_rows(self):
+        """Test that a short row is padded like csv.DictReader would."""
+        header = ['bill/BillType', 'bill/PayerAccountId']
+        projection = ReportProjection(header, self.column_map)
+        row = projection.prepare(['Anniversary'])
+
+        self.assertEqual(projection.get(row, 'bill/BillType'), 'Anniversary')
+        self.assertIsNone(projection.get(row, 'bill/PayerAccountId'))
+        self.assertEqual(projection.get(row, 'not/AColumn', ''), '')
+
     def test_get_cost_entry_time_interval(self):
         """Test that an interval string is properly split."""
         fmt = Config.AWS_DATETIME_STR_FORMAT
@@ -627,7 +790,7 @@ class AWSReportProcessorTest(MasuTestCase):
         bill_id = self.processor._create_cost_entry_bill(self.row, self.accessor)
         self.accessor.commit()
 
-        interval = self.row.get('identity/TimeInterval')
+        interval = self.row_dict.get('identity/TimeInterval')
         start, _ = self.processor._get_cost_entry_time_interval(interval)
         key = (bill_id, start)
         expected_id = random.randint(1,9)
@@ -695,9 +858,9 @@ class AWSReportProcessorTest(MasuTestCase):
     def test_create_cost_entry_product_already_processed(self):
         """Test that an already processed product id is returned."""
         expected_id = random.randint(1,9)
-        sku = self.row.get('product/sku')
-        product_name = self.row.get('product/ProductName')
-        region = self.row.get('product/region')
+        sku = self.row_dict.get('product/sku')
+        product_name = self.row_dict.get('product/ProductName')
+        region = self.row_dict.get('product/region')
         key = (sku, product_name, region)
         self.processor.processed_report.products.update({key: expected_id})
 
@@ -708,9 +871,9 @@ class AWSReportProcessorTest(MasuTestCase):
     def test_create_cost_entry_product_existing(self):
         """Test that a previously existing product id is returned."""
         expected_id = random.randint(1,9)
-        sku = self.row.get('product/sku')
-        product_name = self.row.get('product/ProductName')
-        region = self.row.get('product/region')
+        sku = self.row_dict.get('product/sku')
+        product_name = self.row_dict.get('product/ProductName')
+        region = self.row_dict.get('product/region')
         key = (sku, product_name, region)
         self.processor.existing_product_map.update({key: expected_id})
 
@@ -740,8 +903,8 @@ class AWSReportProcessorTest(MasuTestCase):
         expected_id = random.randint(1,9)
 
         key = '{term}-{unit}'.format(
-            term=self.row['pricing/term'],
-            unit=self.row['pricing/unit']
+            term=self.row_dict['pricing/term'],
+            unit=self.row_dict['pricing/unit']
         )
         self.processor.processed_report.pricing.update({key: expected_id})
 
@@ -754,8 +917,8 @@ class AWSReportProcessorTest(MasuTestCase):
         expected_id = random.randint(1,9)
 
         key = '{term}-{unit}'.format(
-            term=self.row['pricing/term'],
-            unit=self.row['pricing/unit']
+            term=self.row_dict['pricing/term'],
+            unit=self.row_dict['pricing/unit']
         )
         self.processor.existing_pricing_map.update({key: expected_id})
 
@@ -768,7 +931,7 @@ class AWSReportProcessorTest(MasuTestCase):
         # Ensure a reservation exists on the row
         arn = 'TestARN'
         row = copy.deepcopy(self.row)
-        row['reservation/ReservationARN'] = arn
+        row[self.header.index('reservation/ReservationARN')] = arn
 
         table_name = AWS_CUR_TABLE_MAP['reservation']
         table = getattr(self.report_schema, table_name)
@@ -790,8 +953,11 @@ class AWSReportProcessorTest(MasuTestCase):
         # Ensure a reservation exists on the row
         arn = 'TestARN'
         row = copy.deepcopy(self.row)
-        row['reservation/ReservationARN'] = arn
-        row['reservation/NumberOfReservations'] = 1
+        arn_index = self.header.index('reservation/ReservationARN')
+        line_item_type_index = self.header.index('lineItem/LineItemType')
+        num_reservations_index = self.header.index('reservation/NumberOfReservations')
+        row[arn_index] = arn
+        row[num_reservations_index] = 1
 
         table_name = AWS_CUR_TABLE_MAP['reservation']
         table = getattr(self.report_schema, table_name)
@@ -808,9 +974,9 @@ class AWSReportProcessorTest(MasuTestCase):
 
         self.assertEqual(reservation_id, id_in_db)
 
-        row['lineItem/LineItemType'] = 'RIFee'
-        res_count = row['reservation/NumberOfReservations']
-        row['reservation/NumberOfReservations'] = res_count + 1
+        row[line_item_type_index] = 'RIFee'
+        res_count = row[num_reservations_index]
+        row[num_reservations_index] = res_count + 1
         reservation_id = self.processor._create_cost_entry_reservation(row, self.accessor)
         self.accessor.commit()
 
@@ -818,12 +984,12 @@ class AWSReportProcessorTest(MasuTestCase):
 
         db_row = query.filter_by(id=id_in_db).first()
         self.assertEqual(db_row.number_of_reservations,
-                         row['reservation/NumberOfReservations'])
+                         row[num_reservations_index])
 
     def test_create_cost_entry_reservation_already_processed(self):
         """Test that an already processed reservation id is returned."""
         expected_id = random.randint(1,9)
-        arn = self.row.get('reservation/ReservationARN')
+        arn = self.row_dict.get('reservation/ReservationARN')
         self.processor.processed_report.reservations.update({arn: expected_id})
 
         reservation_id = self.processor._create_cost_entry_reservation(self.row, self.accessor)
@@ -833,7 +999,7 @@ class AWSReportProcessorTest(MasuTestCase):
     def test_create_cost_entry_reservation_existing(self):
         """Test that a previously existing reservation id is returned."""
         expected_id = random.randint(1,9)
-        arn = self.row.get('reservation/ReservationARN')
+        arn = self.row_dict.get('reservation/ReservationARN')
         self.processor.existing_reservation_map.update({arn: expected_id})
 
         product_id = self.processor._create_cost_entry_reservation(self.row, self.accessor)
@@ -905,11 +1071,40 @@ class AWSReportProcessorTest(MasuTestCase):
             compression=UNCOMPRESSED,
             provider_id=1
         )
+        processor._projection = processor._compile_projection(list(field_names), self.accessor)
+        row = processor._projection.prepare(list(data[0].values()))
 
-        result = processor._check_for_finalized_bill()
+        result = processor._check_for_finalized_bill(row)
 
         self.assertTrue(result)
 
+    def test_process_finalized_first_row_before_checkpoint(self):
+        """Verify that the file's first row is checked when a checkpoint skips it."""
+        with open(self.test_report, 'r') as f:
+            data = list(csv.DictReader(f))
+        for row in data:
+            row['bill/InvoiceId'] = ''
+        data[0]['bill/InvoiceId'] = '12345'
+
+        tmp_file = '/tmp/test_process_finalized_checkpoint.csv'
+        with open(tmp_file, 'w') as f:
+            writer = csv.DictWriter(f, fieldnames=data[0].keys())
+            writer.writeheader()
+            writer.writerows(data)
+
+        processor = AWSReportProcessor(
+            schema_name='acct10001',
+            report_path=tmp_file,
+            compression=UNCOMPRESSED,
+            provider_id=1
+        )
+        with patch.object(processor, '_get_checkpoint', return_value=1), \
+                patch('masu.processor.aws.aws_report_processor.AWSReportDBAccessor.'
+                      'mark_bill_as_finalized') as mock_mark:
+            self.assertTrue(processor.process())
+        mock_mark.assert_called_once()
+        os.remove(tmp_file)
+
     def test_check_for_finalized_bill_bill_not_finalized(self):
         """Verify that a file without invoice_id is not marked as finalzed."""
 
@@ -919,11 +1114,190 @@ class AWSReportProcessorTest(MasuTestCase):
             compression=UNCOMPRESSED,
             provider_id=1
         )
+        processor._projection = self.processor._projection
 
-        result = processor._check_for_finalized_bill()
+        result = processor._check_for_finalized_bill(self.row)
 
         self.assertFalse(result)
 
+    def test_process_gzip_opens_report_once(self):
+        """Verify that finalization is detected without reopening the report."""
+        processor = AWSReportProcessor(
+            schema_name='acct10001',
+            report_path=self.test_report_gzip,
+            compression=GZIP_COMPRESSED,
+            provider_id=1
+        )
+
+        with patch('masu.processor.aws.aws_report_processor.gzip.open',
+                   wraps=gzip.open) as mock_open:
+            result = processor.process()
+
+        mock_open.assert_called_once()
+        self.assertFalse(result)
+
+    def test_read_batches_skips_checkpointed_rows(self):
+        """Test that rows saved by an earlier attempt are skipped."""
+        self.processor._batch_size = 2
+        rows = [list(self.raw_row) for _ in range(5)]
+
+        batches = list(self.processor._read_batches(iter(rows), skip=2))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+
+    def test_process_resumes_from_checkpoint(self):
+        """Test that processing resumes after the checkpointed rows."""
+        with open(self.test_report, 'r') as f:
+            total_rows = sum(1 for row in csv.reader(f) if row) - 1
+        report_name = os.path.basename(self.test_report)
+        with ReportStatsDBAccessor(report_name, self.manifest.id) as stats:
+            stats.set_cursor_position(total_rows - 1)
+            stats.commit()
+
+        processor = AWSReportProcessor(
+            schema_name='acct10001',
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_id=1,
+            manifest_id=self.manifest.id
+        )
+        with patch.object(processor, '_delete_line_items') as mock_delete:
+            processor.process()
+            mock_delete.assert_not_called()
+
+        line_item_table = getattr(self.report_schema, AWS_CUR_TABLE_MAP['line_item'])
+        self.assertEqual(self.session.query(line_item_table).count(), 1)
+        with ReportStatsDBAccessor(report_name, self.manifest.id) as stats:
+            self.assertEqual(stats.get_cursor_position(), 0)
+            stats.delete()
+            stats.commit()
+
+    def test_save_to_db_saves_checkpoint_with_manifest(self):
+        """Test that a checkpoint is only streamed for files with a manifest."""
+        self.processor.create_cost_entry_objects(self.row, self.accessor)
+        with patch.object(self.accessor, 'stream_rows') as mock_stream:
+            self.processor._save_to_db(self.accessor, 10)
+        self.assertIsNone(mock_stream.call_args[1]['checkpoint'])
+
+        self.processor.manifest_id = self.manifest.id
+        with patch.object(self.accessor, 'stream_rows') as mock_stream:
+            self.processor._save_to_db(self.accessor, 10)
+        self.processor.manifest_id = None
+        self.assertEqual(
+            mock_stream.call_args[1]['checkpoint'],
+            (os.path.basename(self.test_report), self.manifest.id, 10)
+        )
+
+    def test_process_delta_ingestion(self):
+        """Test that re-processing an unchanged report writes no line items."""
+        line_item_table = getattr(self.report_schema, AWS_CUR_TABLE_MAP['line_item'])
+        self.manifest.num_total_files = 1
+        self.manifest_accessor.commit()
+
+        with patch.object(Config, 'AWS_DELTA_INGESTION', True):
+            processor = AWSReportProcessor(
+                schema_name='acct10001',
+                report_path=self.test_report,
+                compression=UNCOMPRESSED,
+                provider_id=1,
+                manifest_id=self.manifest.id
+            )
+            with patch.object(processor, '_delete_line_items') as mock_delete:
+                processor.process()
+                mock_delete.assert_not_called()
+            line_item_count = self.session.query(line_item_table).count()
+            self.assertEqual(processor.delta_counts['inserted'], line_item_count)
+
+            processor = AWSReportProcessor(
+                schema_name='acct10001',
+                report_path=self.test_report,
+                compression=UNCOMPRESSED,
+                provider_id=1,
+                manifest_id=self.manifest.id
+            )
+            processor.process()
+
+        self.assertEqual(processor.delta_counts, {'inserted': 0, 'updated': 0, 'removed': 0})
+        self.assertEqual(self.session.query(line_item_table).count(), line_item_count)
+
+    def test_process_delta_ingestion_not_last_file(self):
+        """Test that line items are only staged until the last file of a manifest."""
+        with patch.object(Config, 'AWS_DELTA_INGESTION', True):
+            processor = AWSReportProcessor(
+                schema_name='acct10001',
+                report_path=self.test_report,
+                compression=UNCOMPRESSED,
+                provider_id=1,
+                manifest_id=self.manifest.id
+            )
+            with patch.object(processor, '_apply_delta') as mock_apply:
+                processor.process()
+                mock_apply.assert_not_called()
+
+        line_item_table = getattr(self.report_schema, AWS_CUR_TABLE_MAP['line_item'])
+        self.assertEqual(self.session.query(line_item_table).count(), 0)
+        self.assertEqual(processor._line_item_table,
+                         f"{AWS_CUR_TABLE_MAP['line_item']}_delta")
+
+    def test_process_partition_swap_not_partitioned(self):
+        """Test that line items are loaded in place when the table is not partitioned."""
+        with patch.object(Config, 'LINE_ITEM_PARTITION_SWAP', True):
+            processor = AWSReportProcessor(
+                schema_name='acct10001',
+                report_path=self.test_report,
+                compression=UNCOMPRESSED,
+                provider_id=1,
+                manifest_id=self.manifest.id
+            )
+            self.assertEqual(processor._get_load_mode(), (None, None))
+
+    def test_process_records_usage_ranges(self):
+        """Test that the usage dates of each bill are recorded for summarization."""
+        with patch.object(Config, 'INCREMENTAL_SUMMARY', True):
+            processor = AWSReportProcessor(
+                schema_name='acct10001',
+                report_path=self.test_report,
+                compression=UNCOMPRESSED,
+                provider_id=1,
+                manifest_id=self.manifest.id
+            )
+            with patch.object(AWSReportDBAccessor, 'save_dirty_ranges') as mock_save:
+                processor.process()
+
+        period_table, ranges = mock_save.call_args[0]
+        self.assertEqual(period_table, AWS_CUR_TABLE_MAP['bill'])
+        for start, end in ranges.values():
+            self.assertLessEqual(start, end)
+
+    def test_save_to_db_partition_staging(self):
+        """Test that line items are streamed into the staging table of their bill."""
+        self.processor.create_cost_entry_objects(self.row, self.accessor)
+        bill_id = self.processor.processed_report.line_items[0]['cost_entry_bill_id']
+        self.processor._partition_staging = {}
+
+        with patch.object(self.accessor, 'create_partition_staging_table',
+                          return_value='staging') as mock_create, \
+                patch.object(self.accessor, 'stream_rows') as mock_stream:
+            self.processor._save_to_db(self.accessor)
+        self.processor._partition_staging = None
+
+        mock_create.assert_called_with(AWS_CUR_TABLE_MAP['line_item'], bill_id)
+        self.assertEqual(mock_stream.call_args[0][0], 'staging')
+
+    def test_swap_partitions(self):
+        """Test that the staging tables of every bill of the manifest are swapped in."""
+        manifest_progress = {
+            'billing_period_start': self.manifest.billing_period_start_datetime,
+            'is_first_file': False,
+            'is_last_file': True
+        }
+        with patch.object(self.processor, '_get_manifest_bill_ids', return_value=[1, 2]), \
+                patch.object(self.accessor, 'swap_partition') as mock_swap:
+            self.processor._swap_partitions(manifest_progress, self.accessor)
+
+        mock_swap.assert_any_call(AWS_CUR_TABLE_MAP['line_item'], 'cost_entry_bill_id', 1)
+        mock_swap.assert_any_call(AWS_CUR_TABLE_MAP['line_item'], 'cost_entry_bill_id', 2)
+
     def test_delete_line_items_success(self):
         """Test that data is deleted before processing a manifest."""
         processor = AWSReportProcessor(
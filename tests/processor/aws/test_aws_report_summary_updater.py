@@ -165,6 +165,40 @@ class AWSReportSummaryUpdaterTest(MasuTestCase):
             self.assertIsNotNone(bill.summary_data_creation_datetime)
             self.assertIsNotNone(bill.summary_data_updated_datetime)
 
+    @patch('masu.processor.aws.aws_report_summary_updater.Config.INCREMENTAL_SUMMARY', True)
+    @patch('masu.processor.aws.aws_report_summary_updater.AWSReportDBAccessor.populate_line_item_daily_summary_table')
+    @patch('masu.processor.aws.aws_report_summary_updater.AWSReportDBAccessor.populate_line_item_daily_table')
+    def test_update_summary_tables_dirty_ranges(self, mock_daily, mock_summary):
+        """Test that only the recorded dates are summarized."""
+        self.manifest.num_processed_files = self.manifest.num_total_files
+        self.manifest_accessor.commit()
+
+        start_date = self.date_accessor.today_with_timezone('UTC')
+        end_date = start_date + datetime.timedelta(days=1)
+        bill_date = start_date.replace(day=1).date()
+
+        bill = self.accessor.get_cost_entry_bills_by_date(bill_date)[0]
+        bill.summary_data_creation_datetime = start_date
+        self.accessor.commit()
+
+        self.accessor.save_dirty_ranges(
+            AWS_CUR_TABLE_MAP['bill'],
+            {bill.id: (start_date.date(), start_date.date())}
+        )
+
+        start_date_str = start_date.strftime('%Y-%m-%d')
+        end_date_str = end_date.strftime('%Y-%m-%d')
+
+        self.updater.update_daily_tables(start_date_str, end_date_str)
+        mock_daily.assert_called_once_with(start_date_str, start_date_str, [str(bill.id)])
+
+        self.updater.update_summary_tables(start_date_str, end_date_str)
+        mock_summary.assert_called_once_with(start_date_str, start_date_str, [str(bill.id)])
+
+        last_id, ranges = self.accessor.get_dirty_ranges(AWS_CUR_TABLE_MAP['bill'], [bill.id])
+        self.assertIsNone(last_id)
+        self.assertEqual(ranges, [])
+
     @patch('masu.processor.aws.aws_report_summary_updater.AWSReportDBAccessor.populate_line_item_daily_summary_table')
     @patch('masu.processor.aws.aws_report_summary_updater.AWSReportDBAccessor.populate_line_item_daily_table')
     def test_update_summary_tables_new_bill(self, mock_daily, mock_summary):
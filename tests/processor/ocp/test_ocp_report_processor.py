@@ -21,6 +21,7 @@ import copy
 import datetime
 import gzip
 import json
+import os
 import shutil
 import tempfile
 
@@ -28,12 +29,12 @@ from sqlalchemy.sql.expression import delete
 
 from masu.config import Config
 from masu.database import OCP_REPORT_TABLE_MAP
-from masu.database.ocp_report_db_accessor import OCPReportDBAccessor
+from masu.database.ocp_report_db_accessor import NODE_CAPACITY_TABLE, OCPReportDBAccessor
 from masu.database.report_stats_db_accessor import ReportStatsDBAccessor
 from masu.database.reporting_common_db_accessor import ReportingCommonDBAccessor
 from masu.exceptions import MasuProcessingError
 from masu.external import GZIP_COMPRESSED, UNCOMPRESSED
-from masu.processor.ocp.ocp_report_processor import OCPReportProcessor, OCPReportProcessorError, OCPReportTypes, ProcessedOCPReport
+from masu.processor.ocp.ocp_report_processor import OCPReportProcessor, OCPReportProcessorError, OCPReportTypes, ProcessedOCPReport, SharedOCPDimensions
 from tests import MasuTestCase
 from unittest.mock import patch
 
@@ -194,6 +195,168 @@ class OCPReportProcessorTest(MasuTestCase):
                 if table_name not in ('reporting_ocpusagelineitem_daily', 'reporting_ocpusagelineitem_daily_summary'):
                     self.assertTrue(count >= counts[table_name])
 
+    def test_process_records_node_capacity(self):
+        """Test that the highest node capacity of each interval is saved."""
+        with patch.object(Config, 'OCP_NODE_CAPACITY', True):
+            processor = OCPReportProcessor(
+                schema_name='acct10001',
+                report_path=self.test_report,
+                compression=UNCOMPRESSED,
+                provider_id=1
+            )
+        processor.process()
+
+        cursor = self.accessor._cursor
+        cursor.execute(
+            f"""SELECT nc.report_id, nc.node, nc.node_capacity_cpu_core_seconds,
+                    nc.node_capacity_memory_byte_seconds
+                FROM {NODE_CAPACITY_TABLE} AS nc
+                JOIN {OCP_REPORT_TABLE_MAP['report']} AS ur ON nc.report_id = ur.id
+                ORDER BY nc.report_id, nc.node"""
+        )
+        capacity = cursor.fetchall()
+        cursor.execute(
+            f"""SELECT report_id, node, max(node_capacity_cpu_core_seconds),
+                    max(node_capacity_memory_byte_seconds)
+                FROM {OCP_REPORT_TABLE_MAP['line_item']}
+                GROUP BY report_id, node ORDER BY report_id, node"""
+        )
+        expected = cursor.fetchall()
+        self.accessor._pg2_conn.commit()
+
+        self.assertNotEqual(capacity, [])
+        self.assertEqual(capacity, expected)
+
+    def test_process_records_usage_ranges(self):
+        """Test that the usage dates of each report period are recorded for summarization."""
+        with open(self.test_report, 'r') as f:
+            usage_dates = [
+                datetime.datetime.strptime(row['interval_start'],
+                                           Config.OCP_DATETIME_STR_FORMAT).date()
+                for row in csv.DictReader(f)
+            ]
+        processor = OCPReportProcessor(
+            schema_name='acct10001',
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_id=1
+        )
+
+        with patch.object(Config, 'INCREMENTAL_SUMMARY', True), \
+                patch.object(OCPReportDBAccessor, 'save_dirty_ranges') as mock_save:
+            processor._processor._batch_size = 100
+            processor.process()
+
+        ranges = []
+        for call in mock_save.call_args_list:
+            period_table, period_ranges = call[0]
+            self.assertEqual(period_table, OCP_REPORT_TABLE_MAP['report_period'])
+            ranges.extend(period_ranges.values())
+        self.assertEqual(min(start for start, _ in ranges), min(usage_dates))
+        self.assertEqual(max(end for _, end in ranges), max(usage_dates))
+
+    def test_process_merges_every_batch_count(self):
+        """Test that batches are merged every OCP_MERGE_BATCH_COUNT batches."""
+        processor = OCPReportProcessor(
+            schema_name='acct10001',
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_id=1
+        )
+
+        with patch.object(OCPReportDBAccessor, 'merge_temp_table') as mock_merge, \
+                patch.object(OCPReportDBAccessor, 'analyze_table') as mock_analyze:
+            processor._processor._batch_size = 5
+            processor._processor._merge_batch_count = 10
+            processor.process()
+
+        # 480 rows are 96 batches, merged in nine groups of ten and the rest
+        self.assertEqual(mock_merge.call_count, 10)
+        self.assertEqual(mock_analyze.call_count, 10)
+
+    def test_process_shared_dimensions(self):
+        """Test that report periods and reports resolved by one file are shared."""
+        shared_dimensions = SharedOCPDimensions()
+        first = OCPReportProcessor(
+            schema_name='acct10001',
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_id=1,
+            shared_dimensions=shared_dimensions
+        )
+        second = OCPReportProcessor(
+            schema_name='acct10001',
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_id=1,
+            shared_dimensions=shared_dimensions
+        )
+
+        first.process()
+        self.assertTrue(shared_dimensions.report_periods)
+        self.assertTrue(shared_dimensions.reports)
+
+        processor = second._processor
+        with patch.object(processor.existing_report_periods_map, '_loader', None), \
+                patch.object(processor.existing_report_map, '_loader', None), \
+                patch.object(OCPReportDBAccessor, 'insert_on_conflict_do_nothing_many') as mock_insert:
+            second.process()
+        mock_insert.assert_not_called()
+
+    def test_process_resumes_from_checkpoint(self):
+        """Test that rows saved by an earlier attempt are skipped."""
+        with open(self.test_report, 'r') as f:
+            total_rows = sum(1 for _ in csv.DictReader(f))
+        processor = OCPReportProcessor(
+            schema_name='acct10001',
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_id=1
+        )
+        usage_processor = processor._processor
+
+        with patch.object(usage_processor, '_get_checkpoint', return_value=3), \
+                patch.object(usage_processor, '_process_rows') as mock_process:
+            processor.process()
+
+        rows = [row for call in mock_process.call_args_list for row in call[0][0]]
+        self.assertEqual(len(rows), total_rows - 3)
+        self.assertEqual(mock_process.call_args_list[0][0][3], 3)
+
+    def test_merge_temp_table_saves_checkpoint(self):
+        """Test that the checkpoint of the streamed rows is saved with the merge."""
+        processor = self.ocp_processor._processor
+        processor.manifest_id = 1
+        processor._pending_batch_count = 1
+        processor._pending_cursor_position = 10
+
+        with patch.object(self.accessor, 'merge_temp_table') as mock_merge, \
+                patch.object(self.accessor, 'analyze_table'):
+            processor._merge_temp_table('temp_table', self.accessor)
+        processor.manifest_id = None
+
+        self.assertEqual(mock_merge.call_args[1]['checkpoint'],
+                         (processor._report_name, 1, 10))
+        self.assertEqual(processor._pending_batch_count, 0)
+        self.assertIsNone(processor._pending_cursor_position)
+
+    def test_merge_temp_table_partition_staging(self):
+        """Test that each report period is merged into its own staging table."""
+        processor = self.ocp_processor._processor
+        processor._partition_staging = {1: 'staging_1', 2: 'staging_2'}
+        processor._pending_batch_count = 1
+        processor._pending_report_period_ids = {1, 2}
+
+        with patch.object(self.accessor, 'merge_temp_table') as mock_merge, \
+                patch.object(self.accessor, 'analyze_table'):
+            processor._merge_temp_table('temp_table', self.accessor)
+        processor._partition_staging = None
+
+        calls = mock_merge.call_args_list
+        self.assertEqual([call[0][0] for call in calls], ['staging_1', 'staging_2'])
+        self.assertEqual([call[1]['report_period_id'] for call in calls], [1, 2])
+        self.assertEqual([call[1]['clear'] for call in calls], [False, True])
+
     def test_process_duplicates(self):
         """Test that row duplicates are not inserted into the DB."""
         counts = {}
@@ -263,6 +426,69 @@ class OCPReportProcessorTest(MasuTestCase):
         count = report_db._session.query(table).count()
         self.assertEqual(count, expected_count)
 
+    def test_process_duplicate_rows_keep_first(self):
+        """Test that the first copy of a line item repeated in a later batch is kept."""
+        with open(self.test_report, 'r') as f:
+            data = list(csv.DictReader(f))
+        duplicate = dict(data[0], pod_usage_cpu_core_seconds='1')
+        data.append(duplicate)
+        tmp_file = '/tmp/test_process_duplicate_rows_keep_first.csv'
+        with open(tmp_file, 'w') as f:
+            writer = csv.DictWriter(f, fieldnames=data[0].keys())
+            writer.writeheader()
+            writer.writerows(data)
+
+        table_name = OCP_REPORT_TABLE_MAP['line_item']
+        table = getattr(self.accessor.report_schema, table_name)
+        # Repeated in the same merge window, then in a later one
+        for merge_batch_count in (1000, 1):
+            processor = OCPReportProcessor(
+                schema_name='acct10001',
+                report_path=tmp_file,
+                compression=UNCOMPRESSED,
+                provider_id=1
+            )
+            processor._processor._batch_size = 5
+            processor._processor._merge_batch_count = merge_batch_count
+            processor.process()
+
+            self.assertEqual(self.accessor._session.query(table).count(), len(data) - 1)
+            replaced = self.accessor._session.query(table).filter(
+                table.pod == duplicate['pod'],
+                table.namespace == duplicate['namespace'],
+                table.node == duplicate['node'],
+                table.pod_usage_cpu_core_seconds == 1
+            ).count()
+            self.assertEqual(replaced, 0)
+            self.accessor._session.rollback()
+        os.remove(tmp_file)
+
+    def test_process_hash_collisions_saved(self):
+        """Test that line items whose key hashes collide are all saved once."""
+        with open(self.test_report, 'r') as f:
+            data = list(csv.DictReader(f))
+        expected_count = len(data)
+        data.extend(data)
+        tmp_file = '/tmp/test_process_hash_collisions_saved.csv'
+        with open(tmp_file, 'w') as f:
+            writer = csv.DictWriter(f, fieldnames=data[0].keys())
+            writer.writeheader()
+            writer.writerows(data)
+
+        processor = OCPReportProcessor(
+            schema_name='acct10001',
+            report_path=tmp_file,
+            compression=UNCOMPRESSED,
+            provider_id=1
+        )
+        processor._processor._batch_size = 5
+        with patch('masu.processor.line_item_keys.hash', create=True, return_value=1):
+            processor.process()
+
+        table = getattr(self.accessor.report_schema, OCP_REPORT_TABLE_MAP['line_item'])
+        self.assertEqual(self.accessor._session.query(table).count(), expected_count)
+        os.remove(tmp_file)
+
     def test_get_file_opener_default(self):
         """Test that the default file opener is returned."""
         opener, mode = self.ocp_processor._processor._get_file_opener(UNCOMPRESSED)
@@ -279,7 +505,7 @@ class OCPReportProcessorTest(MasuTestCase):
 
     def test_update_mappings(self):
         """Test that mappings are updated."""
-        test_entry = {'key': 'value'}
+        test_entry = {(1, 'key'): 'value'}
         counts = {}
         ce_maps = {
             'report_periods': self.ocp_processor._processor.existing_report_periods_map,
@@ -358,6 +584,34 @@ class OCPReportProcessorTest(MasuTestCase):
 
         self.assertEqual(report_id, id_in_db)
 
+    def test_resolve_dimensions(self):
+        """Test that a batch of rows resolves report periods and reports up front."""
+        processor = OCPReportProcessor(
+            schema_name='acct10001',
+            report_path=self.test_report,
+            compression=UNCOMPRESSED,
+            provider_id=1
+        )._processor
+        with open(self.test_report, 'r') as f:
+            rows = list(csv.DictReader(f))
+
+        processor._resolve_dimensions(rows, self.accessor)
+
+        processed = processor.processed_report
+        self.assertEqual(len(processed.report_periods), 1)
+        self.assertEqual(
+            len(processed.reports),
+            len({(row['report_period_start'], row['interval_start']) for row in rows})
+        )
+
+        with patch.object(self.accessor, 'insert_on_conflict_do_nothing') as mock_insert:
+            for row in rows:
+                report_period_id = processor._create_report_period(
+                    row, processor._cluster_id, self.accessor
+                )
+                processor._create_report(row, report_period_id, self.accessor)
+            mock_insert.assert_not_called()
+
     def test_create_usage_report_line_item(self):
         """Test that line item data is returned properly."""
         cluster_id = '12345'
@@ -537,6 +791,38 @@ class OCPReportProcessorTest(MasuTestCase):
 
         self.assertEqual(result, expected)
 
+    def test_process_pod_labels_memoized(self):
+        """Test that repeated label strings are parsed once."""
+        processor = self.ocp_processor._processor
+        processor._parse_labels.cache_clear()
+        test_label_str = 'label_app:masu|label_env:test'
+
+        first = processor._process_pod_labels(test_label_str)
+        second = processor._process_pod_labels(test_label_str)
+
+        self.assertEqual(first, second)
+        info = processor._parse_labels.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+
+    def test_parse_datetime_memoized(self):
+        """Test that repeated timestamp strings are parsed once."""
+        processor = self.ocp_processor._processor
+        processor._parse_datetime.cache_clear()
+        row = {
+            'interval_start': '2018-09-01 00:00:00 +0000 UTC',
+            'interval_end': '2018-09-01 00:59:59 +0000 UTC'
+        }
+
+        key, data = processor._get_report_key(row, 1)
+        processor._get_report_key(row, 1)
+
+        self.assertEqual(key, (1, datetime.datetime(2018, 9, 1, 0, 0, 0)))
+        self.assertEqual(data['interval_end'], datetime.datetime(2018, 9, 1, 0, 59, 59))
+        info = processor._parse_datetime.cache_info()
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.hits, 2)
+
     def test_process_storage_default(self):
         """Test the processing of an uncompressed storagefile."""
         processor = OCPReportProcessor(
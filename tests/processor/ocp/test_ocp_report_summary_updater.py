@@ -170,6 +170,48 @@ class OCPReportSummaryUpdaterTest(MasuTestCase):
             self.assertIsNotNone(period.summary_data_creation_datetime)
             self.assertIsNotNone(period.summary_data_updated_datetime)
 
+    @patch('masu.processor.ocp.ocp_report_summary_updater.Config.INCREMENTAL_SUMMARY', True)
+    @patch('masu.processor.ocp.ocp_report_summary_updater.OCPReportDBAccessor.populate_storage_line_item_daily_summary_table')
+    @patch('masu.processor.ocp.ocp_report_summary_updater.OCPReportDBAccessor.populate_storage_line_item_daily_table')
+    @patch('masu.processor.ocp.ocp_report_summary_updater.OCPReportDBAccessor.populate_line_item_daily_summary_table')
+    @patch('masu.processor.ocp.ocp_report_summary_updater.OCPReportDBAccessor.populate_line_item_daily_table')
+    def test_update_summary_tables_dirty_ranges(self, mock_daily, mock_sum,
+                                                mock_storage_daily,
+                                                mock_storage_summary):
+        """Test that only the recorded dates are rebuilt and the ranges are then cleared."""
+        self.manifest.num_processed_files = self.manifest.num_total_files
+        self.manifest_accessor.commit()
+
+        start_date = self.date_accessor.today_with_timezone('UTC')
+        end_date = start_date + datetime.timedelta(days=1)
+        bill_date = start_date.replace(day=1).date()
+
+        period = self.accessor.get_usage_periods_by_date(bill_date)[0]
+        period.summary_data_creation_datetime = start_date
+        self.accessor.commit()
+
+        self.accessor.save_dirty_ranges(
+            OCP_REPORT_TABLE_MAP['report_period'],
+            {period.id: (start_date.date(), start_date.date())}
+        )
+
+        start_date_str = start_date.strftime('%Y-%m-%d')
+        end_date_str = end_date.strftime('%Y-%m-%d')
+        cluster_id = self.report_period.cluster_id
+
+        self.updater.update_daily_tables(start_date_str, end_date_str)
+        mock_daily.assert_called_once_with(start_date_str, start_date_str, cluster_id)
+        mock_storage_daily.assert_called_once_with(start_date_str, start_date_str, cluster_id)
+
+        self.updater.update_summary_tables(start_date_str, end_date_str)
+        mock_sum.assert_called_once_with(start_date_str, start_date_str, cluster_id)
+        mock_storage_summary.assert_called_once_with(start_date_str, start_date_str, cluster_id)
+
+        last_id, ranges = self.accessor.get_dirty_ranges(OCP_REPORT_TABLE_MAP['report_period'],
+                                                         [period.id])
+        self.assertIsNone(last_id)
+        self.assertEqual(ranges, [])
+
     @patch('masu.processor.ocp.ocp_report_summary_updater.OCPReportDBAccessor.populate_storage_line_item_daily_summary_table')
     @patch('masu.processor.ocp.ocp_report_summary_updater.OCPReportDBAccessor.populate_storage_line_item_daily_table')
     @patch('masu.processor.ocp.ocp_report_summary_updater.OCPReportDBAccessor.populate_line_item_daily_summary_table')
@@ -0,0 +1,103 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Test the DimensionCache object."""
+from operator import itemgetter
+from unittest.mock import Mock
+
+from masu.processor.dimension_cache import DimensionCache
+from tests import MasuTestCase
+
+
+class DimensionCacheTest(MasuTestCase):
+    """Test Cases for the DimensionCache object."""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted when full."""
+        cache = DimensionCache(2)
+        cache.update({'a': 1, 'b': 2})
+        self.assertIn('a', cache)
+        cache['c'] = 3
+
+        self.assertEqual(len(cache), 2)
+        self.assertIn('a', cache)
+        self.assertIn('c', cache)
+        self.assertNotIn('b', cache)
+
+    def test_get(self):
+        """Test that get returns the default for missing keys."""
+        cache = DimensionCache(10)
+        cache['a'] = 1
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('b', 2), 2)
+
+    def test_loads_scope_once(self):
+        """Test that a scope is loaded on its first lookup only."""
+        loader = Mock(side_effect=lambda bill_id: {(bill_id, 'start'): bill_id * 10})
+        cache = DimensionCache(10, loader=loader, scope=itemgetter(0))
+
+        self.assertEqual(cache[(1, 'start')], 10)
+        self.assertNotIn((1, 'other'), cache)
+        self.assertIn((2, 'start'), cache)
+
+        self.assertEqual(loader.call_count, 2)
+        loader.assert_any_call(1)
+        loader.assert_any_call(2)
+
+    def test_load_warms_cache(self):
+        """Test that a scope can be loaded before any lookup."""
+        loader = Mock(return_value={'a': 1, 'b': 2})
+        cache = DimensionCache(10, loader=loader)
+
+        cache.load(None)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache['b'], 2)
+        loader.assert_called_once_with(None)
+
+    def test_clear(self):
+        """Test that clearing the cache reloads scopes on lookup."""
+        loader = Mock(return_value={'a': 1})
+        cache = DimensionCache(10, loader=loader)
+        self.assertIn('a', cache)
+
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+        self.assertIn('a', cache)
+        self.assertEqual(loader.call_count, 2)
+
+    def test_loaded_scope_larger_than_maxsize(self):
+        """Test that the entries of a loaded scope are kept past the bound."""
+        loader = Mock(side_effect=lambda bill_id: {(bill_id, hour): hour for hour in range(5)}
+                      if bill_id == 1 else {})
+        cache = DimensionCache(2, loader=loader, scope=itemgetter(0))
+
+        for hour in range(5):
+            self.assertEqual(cache[(1, hour)], hour)
+        cache[(1, 5)] = 5
+        for hour in range(3):
+            cache[(2, hour)] = hour
+
+        self.assertEqual(len(cache), 8)
+        for hour in range(6):
+            self.assertEqual(cache.get((1, hour)), hour)
+        self.assertNotIn((2, 0), cache)
+        loader.assert_called_with(2)
+        self.assertEqual(loader.call_count, 2)
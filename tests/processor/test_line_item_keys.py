@@ -0,0 +1,54 @@
+#
+# Copyright 2019 Red Hat, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+
+"""Test the LineItemKeySet object."""
+from unittest.mock import patch
+
+from masu.processor.line_item_keys import KeyStatus, LineItemKeySet
+from tests import MasuTestCase
+
+
+class LineItemKeySetTest(MasuTestCase):
+    """Test Cases for the LineItemKeySet object."""
+
+    def test_add_detects_duplicates(self):
+        """Test that a repeated key is a duplicate within a batch."""
+        keys = LineItemKeySet()
+
+        self.assertIs(keys.add((1, 'namespace', 'pod', 'node')), KeyStatus.NEW)
+        self.assertIs(keys.add((1, 'namespace', 'pod', 'node')), KeyStatus.DUPLICATE)
+        self.assertIs(keys.add((2, 'namespace', 'pod', 'node')), KeyStatus.NEW)
+        self.assertEqual(len(keys), 2)
+
+    def test_release_batch_keeps_hashes(self):
+        """Test that a key of an earlier batch is unconfirmed."""
+        keys = LineItemKeySet()
+        keys.add((1, 'namespace', 'pod', 'node'))
+
+        keys.release_batch()
+
+        self.assertIs(keys.add((1, 'namespace', 'pod', 'node')), KeyStatus.UNCONFIRMED)
+        self.assertIs(keys.add((1, 'namespace', 'pod', 'node')), KeyStatus.DUPLICATE)
+        self.assertEqual(len(keys), 1)
+
+    def test_hash_collision_is_not_a_duplicate(self):
+        """Test that distinct keys with the same hash are both kept."""
+        keys = LineItemKeySet()
+
+        with patch('masu.processor.line_item_keys.hash', create=True, return_value=1):
+            self.assertIs(keys.add((1, 'namespace', 'pod-a', 'node')), KeyStatus.NEW)
+            self.assertIs(keys.add((1, 'namespace', 'pod-b', 'node')), KeyStatus.UNCONFIRMED)
@@ -40,7 +40,8 @@ from masu.external.report_downloader import ReportDownloader, ReportDownloaderEr
 from masu.processor.expired_data_remover import ExpiredDataRemover
 from masu.processor.report_processor import ReportProcessorError
 from masu.processor._tasks.download import _get_report_files
-from masu.processor._tasks.process import _process_report_file
+from masu.processor._tasks.process import _process_ocp_report_files, _process_report_file
+from masu.processor.ocp.ocp_report_processor import OCPReportTypes, SharedOCPDimensions
 from masu.processor.tasks import (get_report_files,
                                   summarize_reports,
                                   remove_expired_data,
@@ -218,9 +219,11 @@ class ProcessReportFileTests(MasuTestCase):
 
         mock_proc.process.assert_called()
         mock_stats_acc.log_last_started_datetime.assert_called()
+        mock_stats_acc.set_is_finalized.assert_called_with(True)
         mock_stats_acc.log_last_completed_datetime.assert_called()
         mock_stats_acc.commit.assert_called()
-        mock_manifest_acc.mark_manifest_as_updated.assert_called()
+        mock_manifest_acc.increment_num_processed_files.assert_called_with(None)
+        mock_manifest_acc.commit.assert_called()
         shutil.rmtree(report_dir)
 
     @patch('masu.processor._tasks.process.ReportProcessor')
@@ -276,6 +279,51 @@ class ProcessReportFileTests(MasuTestCase):
         mock_manifest_acc.mark_manifest_as_updated.assert_not_called()
         shutil.rmtree(report_dir)
 
+    @patch('masu.processor._tasks.process._process_report_file')
+    @patch('masu.processor._tasks.process.detect_report_type')
+    def test_process_ocp_report_files(self, mock_report_type, mock_process_file):
+        """Test that files loading different tables share their dimensions."""
+        report_dicts = [{'file': 'usage_1.csv'}, {'file': 'storage.csv'},
+                        {'file': 'usage_2.csv'}]
+        mock_report_type.side_effect = lambda path: (OCPReportTypes.STORAGE
+                                                     if 'storage' in path
+                                                     else OCPReportTypes.CPU_MEM_USAGE)
+
+        processed_reports = []
+        _process_ocp_report_files(self.test_schema, 'OCP', self.ocp_test_provider_uuid,
+                                  report_dicts, processed_reports)
+
+        self.assertEqual(mock_process_file.call_count, 3)
+        self.assertCountEqual(processed_reports, report_dicts)
+        processed = [call[0][3]['file'] for call in mock_process_file.call_args_list]
+        self.assertLess(processed.index('usage_1.csv'), processed.index('usage_2.csv'))
+        shared = {id(call[1]['shared_dimensions']) for call in mock_process_file.call_args_list}
+        self.assertEqual(len(shared), 1)
+        self.assertIsInstance(mock_process_file.call_args[1]['shared_dimensions'],
+                              SharedOCPDimensions)
+
+    @patch('masu.processor._tasks.process._process_report_file')
+    @patch('masu.processor._tasks.process.detect_report_type')
+    def test_process_ocp_report_files_failure(self, mock_report_type, mock_process_file):
+        """Test that a failing file keeps the files of other tables that were processed."""
+        report_dicts = [{'file': 'usage_1.csv'}, {'file': 'storage.csv'},
+                        {'file': 'usage_2.csv'}]
+        mock_report_type.side_effect = lambda path: (OCPReportTypes.STORAGE
+                                                     if 'storage' in path
+                                                     else OCPReportTypes.CPU_MEM_USAGE)
+
+        def process_file(*args, **kwargs):
+            if args[3]['file'] == 'usage_1.csv':
+                raise ReportProcessorError('failed')
+        mock_process_file.side_effect = process_file
+
+        processed = []
+        with self.assertRaises(ReportProcessorError):
+            _process_ocp_report_files(self.test_schema, 'OCP', self.ocp_test_provider_uuid,
+                                      report_dicts, processed)
+
+        self.assertEqual(processed, [{'file': 'storage.csv'}])
+
     @patch('masu.processor.tasks.update_summary_tables')
     def test_summarize_reports_empty_list(self, mock_update_summary):
         """
@@ -791,3 +839,33 @@ class TestUpdateSummaryTablesTask(MasuTestCase):
 
         mock_update.delay.assert_called_with(
             ANY, ANY, ANY, str(start_date), ANY)
+
+    @patch('masu.processor.tasks.ReportStatsDBAccessor.get_last_completed_datetime')
+    @patch('masu.processor.tasks.ReportStatsDBAccessor.get_last_started_datetime')
+    @patch('masu.processor.tasks._get_report_files')
+    @patch('masu.processor.tasks._process_ocp_report_files')
+    @patch('masu.processor.tasks._process_report_file')
+    def test_get_report_files_concurrent_ocp(self,
+                                             mock_process_file,
+                                             mock_process_ocp_files,
+                                             mock_get_files,
+                                             mock_started,
+                                             mock_completed):
+        """Test that the files of an OCP manifest are processed together."""
+        reports = [dict(report, manifest_id=1) for report in self.fake_reports]
+        mock_get_files.return_value = reports
+        mock_started.return_value = None
+        mock_completed.return_value = None
+        mock_process_ocp_files.side_effect = (
+            lambda *args: args[4].extend(args[3])
+        )
+        args = dict(self.fake_get_report_args, provider_type='OCP',
+                    provider_uuid=self.ocp_test_provider_uuid)
+
+        with patch.object(Config, 'OCP_CONCURRENT_FILES', True):
+            reports_to_summarize = get_report_files(**args)
+
+        mock_process_file.assert_not_called()
+        mock_process_ocp_files.assert_called_once_with(args['schema_name'], 'OCP',
+                                                       self.ocp_test_provider_uuid, reports, ANY)
+        self.assertEqual([report['manifest_id'] for report in reports_to_summarize], [1])
@@ -145,6 +145,16 @@ class ReportStatsDBAccessorTest(MasuTestCase):
         saver.commit()
         self.assertEqual(saver.get_cursor_position(), 100)
 
+        saver.set_is_finalized(True)
+        saver.commit()
+        with ReportStatsDBAccessor('myreport', self.manifest_id) as reloaded:
+            self.assertTrue(reloaded.get_is_finalized())
+        saver.set_is_finalized(False)
+        saver.commit()
+        with ReportStatsDBAccessor('myreport', self.manifest_id) as reloaded:
+            self.assertFalse(reloaded.get_is_finalized())
+        self.assertEqual(saver.get_manifest_id(), self.manifest_id)
+
         saver.delete()
         saver.commit()
         returned_obj = saver._get_db_obj_query()
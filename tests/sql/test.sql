@@ -1795,7 +1795,8 @@ CREATE TABLE public.reporting_common_costusagereportstatus (
     last_completed_datetime timestamp with time zone,
     last_started_datetime timestamp with time zone,
     etag character varying(64),
-    manifest_id integer
+    manifest_id integer,
+    cursor_position integer
 );
 
 
@@ -3004,7 +3005,7 @@ COPY public.reporting_common_costusagereportmanifest (id, assembly_id, manifest_
 -- Data for Name: reporting_common_costusagereportstatus; Type: TABLE DATA; Schema: public; Owner: kokuadmin
 --
 
-COPY public.reporting_common_costusagereportstatus (id, report_name, last_completed_datetime, last_started_datetime, etag, manifest_id) FROM stdin;
+COPY public.reporting_common_costusagereportstatus (id, report_name, last_completed_datetime, last_started_datetime, etag, manifest_id, cursor_position) FROM stdin;
 \.
 
 
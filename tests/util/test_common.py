@@ -18,7 +18,7 @@
 """Test the common util functions."""
 
 import json
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 
 from masu.external import (AMAZON_WEB_SERVICES,
@@ -108,3 +108,18 @@ class CommonUtilTests(MasuTestCase):
         for test in test_matrix:
             ingest_method = common_utils.ingest_method_for_provider(test.get('provider_type'))
             self.assertEqual(ingest_method, test.get('expected_ingest'))
+
+    def test_merge_date_ranges(self):
+        """Test that date ranges are clipped and joined into contiguous ranges."""
+        ranges = [
+            (date(2019, 1, 10), date(2019, 1, 12)),
+            (date(2019, 1, 1), date(2019, 1, 3)),
+            (date(2019, 1, 4), date(2019, 1, 4)),
+            (date(2019, 1, 11), date(2019, 1, 15)),
+            (date(2019, 2, 1), date(2019, 2, 2))
+        ]
+
+        result = common_utils.merge_date_ranges(ranges, date(2019, 1, 2), date(2019, 1, 31))
+
+        self.assertEqual(result, [(date(2019, 1, 2), date(2019, 1, 4)),
+                                  (date(2019, 1, 10), date(2019, 1, 15))])